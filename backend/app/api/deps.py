@@ -11,7 +11,7 @@ from jose.exceptions import JWTError as PyJWTError
 
 from app.core.config import settings
 from app.models.user import User
-from app.services.user_service import user_service
+from app.services.auth_cache_service import AuthCacheService
 
 security = HTTPBearer()
 
@@ -86,16 +86,6 @@ async def get_current_user_bot(
             detail="Missing X-Discord-User-ID header"
         )
 
-    # Get or create user
-    user = await user_service.get_by_discord_id(x_discord_user_id)
-    if not user:
-        # Auto-create user on first interaction
-        user = await user_service.create_from_discord(
-            discord_id=x_discord_user_id,
-            username="Unknown",  # Bot should update this
-            discriminator="0000"
-        )
-
     # Parse roles
     role_ids = []
     if x_discord_roles:
@@ -107,20 +97,15 @@ async def get_current_user_bot(
                 detail="Invalid X-Discord-Roles format"
             )
 
-    # Sync roles to user
-    await user_service.sync_discord_roles(x_discord_user_id, role_ids)
-
-    # Check permissions
-    is_admin = await user_service.is_admin(x_discord_user_id)
-    is_staff = await user_service.is_staff(x_discord_user_id)
-    is_exchanger = await user_service.is_exchanger(x_discord_user_id)
+    # Get or create user, syncing roles only when the role set changed
+    identity = await AuthCacheService.resolve_bot_identity(x_discord_user_id, role_ids)
 
     return AuthContext(
-        user=user,
+        user=identity.user,
         auth_type="bot",
-        is_admin=is_admin,
-        is_staff=is_staff,
-        is_exchanger=is_exchanger
+        is_admin=identity.is_admin,
+        is_staff=identity.is_staff,
+        is_exchanger=identity.is_exchanger
     )
 
 
@@ -163,25 +148,20 @@ async def get_current_user_web(
             detail="Invalid or expired token"
         )
 
-    # Get user
-    user = await user_service.get_by_discord_id(discord_id)
-    if not user:
+    # Get user and permissions
+    identity = await AuthCacheService.resolve_identity(discord_id)
+    if not identity:
         raise HTTPException(
             status_code=404,
             detail="User not found"
         )
 
-    # Check permissions
-    is_admin = await user_service.is_admin(discord_id)
-    is_staff = await user_service.is_staff(discord_id)
-    is_exchanger = await user_service.is_exchanger(discord_id)
-
     return AuthContext(
-        user=user,
+        user=identity.user,
         auth_type="web",
-        is_admin=is_admin,
-        is_staff=is_staff,
-        is_exchanger=is_exchanger
+        is_admin=identity.is_admin,
+        is_staff=identity.is_staff,
+        is_exchanger=identity.is_exchanger
     )
 
 
@@ -256,25 +236,20 @@ async def get_current_user(
             detail="Invalid or expired token"
         )
 
-    # Get user
-    user = await user_service.get_by_discord_id(discord_id)
-    if not user:
+    # Get user and permissions
+    identity = await AuthCacheService.resolve_identity(discord_id)
+    if not identity:
         raise HTTPException(
             status_code=404,
             detail="User not found"
         )
 
-    # Check permissions
-    is_admin = await user_service.is_admin(discord_id)
-    is_staff = await user_service.is_staff(discord_id)
-    is_exchanger = await user_service.is_exchanger(discord_id)
-
     return AuthContext(
-        user=user,
+        user=identity.user,
         auth_type="web",
-        is_admin=is_admin,
-        is_staff=is_staff,
-        is_exchanger=is_exchanger
+        is_admin=identity.is_admin,
+        is_staff=identity.is_staff,
+        is_exchanger=identity.is_exchanger
     )
 
 
@@ -19,6 +19,8 @@ from app.core.database import (
     get_transactions_collection,
     get_db_collection
 )
+from app.services.auth_cache_service import AuthCacheService
+from app.services.cache_service import CacheService
 from bson import ObjectId
 from pydantic import BaseModel
 
@@ -26,12 +28,27 @@ router = APIRouter(tags=["Admin"])
 logger = logging.getLogger(__name__)
 
 
+# Platform overview read-through cache (seconds); stale copies are served while one worker recomputes
+OVERVIEW_CACHE_TTL = 60
+OVERVIEW_STALE_TTL = 600
+
+
 @router.get("/stats/overview")
 async def get_platform_overview(
     admin_id: str = Depends(require_assistant_admin_or_higher_bot)
 ):
     """Get comprehensive platform statistics overview from stats_tracking_service"""
+    return await CacheService.get_or_load(
+        CacheService.PREFIX_ANALYTICS,
+        "admin_overview",
+        _build_platform_overview,
+        ttl=OVERVIEW_CACHE_TTL,
+        stale_ttl=OVERVIEW_STALE_TTL
+    )
 
+
+async def _build_platform_overview() -> dict:
+    """Count and aggregate the platform totals behind the admin overview"""
     users = get_users_collection()
     exchanges = get_exchanges_collection()
     wallets = get_wallets_collection()
@@ -427,107 +444,46 @@ async def toggle_maintenance_mode(
 
 @router.post("/system/backup-database")
 async def backup_database(
-    backup_type: str = "local",  # "local" or "cloud"
+    backup_type: str = "local",  # "local", "cloud" (full dump) or "incremental"
     admin_id: str = Depends(require_head_admin_bot)
 ):
     """
     Force backup database (HEAD ADMIN ONLY)
-    Creates MongoDB dump and optionally uploads to cloud storage
+    Streams a compressed mongodump archive to the backup volume
     """
-    import subprocess
-    import os
-    from datetime import datetime
+    import asyncio
+    from app.services.backup_service import BackupService, BackupInProgress
 
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-    backup_name = f"afroo_backup_{timestamp}"
+    if backup_type not in ("local", "cloud", "incremental"):
+        raise HTTPException(status_code=400, detail="Invalid backup_type. Use 'local', 'cloud' or 'incremental'")
 
     try:
-        if backup_type == "local":
-            # Local backup using mongodump
-            backup_dir = f"/backups/{backup_name}"
-            os.makedirs(backup_dir, exist_ok=True)
-
-            # Run mongodump
-            result = subprocess.run(
-                [
-                    "mongodump",
-                    "--uri", os.getenv("MONGODB_URL"),
-                    "--out", backup_dir
-                ],
-                capture_output=True,
-                text=True,
-                timeout=600  # 10 minute timeout
-            )
-
-            if result.returncode != 0:
-                raise Exception(f"Mongodump failed: {result.stderr}")
-
-            # Get backup size
-            backup_size = sum(
-                os.path.getsize(os.path.join(dirpath, filename))
-                for dirpath, _, filenames in os.walk(backup_dir)
-                for filename in filenames
-            )
-
-            return {
-                "success": True,
-                "data": {
-                    "backup_type": "local",
-                    "backup_name": backup_name,
-                    "backup_path": backup_dir,
-                    "backup_size_mb": round(backup_size / (1024 * 1024), 2),
-                    "timestamp": timestamp
-                }
-            }
-
-        elif backup_type == "cloud":
-            # Cloud backup (would integrate with S3/Google Cloud Storage)
-            # For now, just create local backup
-            backup_dir = f"/backups/{backup_name}"
-            os.makedirs(backup_dir, exist_ok=True)
-
-            result = subprocess.run(
-                [
-                    "mongodump",
-                    "--uri", os.getenv("MONGODB_URL"),
-                    "--out", backup_dir
-                ],
-                capture_output=True,
-                text=True,
-                timeout=600
-            )
-
-            if result.returncode != 0:
-                raise Exception(f"Mongodump failed: {result.stderr}")
-
-            # TODO: Upload to cloud storage (S3, Google Cloud, etc.)
-
-            backup_size = sum(
-                os.path.getsize(os.path.join(dirpath, filename))
-                for dirpath, _, filenames in os.walk(backup_dir)
-                for filename in filenames
-            )
-
-            return {
-                "success": True,
-                "data": {
-                    "backup_type": "cloud",
-                    "backup_name": backup_name,
-                    "backup_path": backup_dir,
-                    "backup_size_mb": round(backup_size / (1024 * 1024), 2),
-                    "cloud_url": "TODO - integrate cloud storage",
-                    "timestamp": timestamp
-                }
-            }
-
+        if backup_type == "incremental":
+            record = await BackupService.run_incremental_backup(trigger=f"admin:{admin_id}")
         else:
-            raise HTTPException(status_code=400, detail="Invalid backup_type. Use 'local' or 'cloud'")
+            record = await BackupService.run_full_backup(trigger=f"admin:{admin_id}")
 
-    except subprocess.TimeoutExpired:
+    except BackupInProgress as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except asyncio.TimeoutError:
         raise HTTPException(status_code=500, detail="Backup timeout - database too large")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Backup failed: {str(e)}")
 
+    return {
+        "success": True,
+        "data": {
+            "backup_type": record["backup_type"],
+            "backup_name": record["backup_name"],
+            "backup_path": record.get("path"),
+            "backup_size_mb": round(record.get("size_bytes", 0) / (1024 * 1024), 2),
+            "status": record["status"],
+            "duration_seconds": record.get("duration_seconds"),
+            "throughput_mb_s": record.get("throughput_mb_s"),
+            "timestamp": record["started_at"].strftime("%Y%m%d_%H%M%S") if record.get("started_at") else None
+        }
+    }
+
 
 @router.get("/profit/overview")
 async def get_profit_overview(
@@ -544,7 +500,10 @@ async def get_profit_overview(
 
     # === EXCHANGE FEES ===
     # 2% min $0.50 from each completed exchange
-    completed_exchanges = await tickets.find({"status": "completed", "type": "exchange"}).to_list(length=100000)
+    completed_exchanges = await tickets.find(
+        {"status": "completed", "type": "exchange"},
+        {"amount_usd": 1}
+    ).to_list(length=100000)
 
     exchange_fees_collected = 0.0
     exchange_fees_to_collect = 0.0
@@ -1167,6 +1126,7 @@ async def edit_user_stats(
                 {"_id": user_oid},
                 {"$set": user_update}
             )
+            await AuthCacheService.invalidate(discord_id)
 
         logger.warning(f"HEAD ADMIN {admin_id} edited stats for user {discord_id}: {changes}")
 
@@ -1212,6 +1172,7 @@ async def edit_user_roles(
             {"discord_id": discord_id},
             {"$set": {"roles": role_names}}
         )
+        await AuthCacheService.invalidate(discord_id)
 
         logger.warning(f"HEAD ADMIN {admin_id} edited roles for user {discord_id}: {old_roles} -> {role_names}")
 
@@ -1358,23 +1319,9 @@ async def get_system_info(
             uptime_hours = 0.0
 
         # Get last backup info
-        backup_dir = "/backups"
-        last_backup = "Never"
-        if os.path.exists(backup_dir):
-            backups = [
-                d for d in os.listdir(backup_dir)
-                if os.path.isdir(os.path.join(backup_dir, d)) and d.startswith("afroo_backup_")
-            ]
-            if backups:
-                backups.sort(reverse=True)
-                last_backup_name = backups[0]
-                # Extract timestamp from backup name (afroo_backup_YYYYMMDD_HHMMSS)
-                timestamp_str = last_backup_name.replace("afroo_backup_", "")
-                try:
-                    backup_dt = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
-                    last_backup = backup_dt.strftime("%Y-%m-%d %H:%M:%S UTC")
-                except:
-                    last_backup = last_backup_name
+        from app.services.backup_service import BackupService
+        last = await BackupService.get_last_success()
+        last_backup = last["started_at"].strftime("%Y-%m-%d %H:%M:%S UTC") if last else "Never"
 
         # Get scheduled tasks status
         from app.services.background_tasks import scheduler
@@ -1419,6 +1366,38 @@ async def get_system_info(
         raise HTTPException(status_code=500, detail="Failed to retrieve system information")
 
 
+@router.get("/system/http-pools")
+async def get_http_pool_stats_endpoint(
+    admin_id: str = Depends(require_assistant_admin_or_higher_bot)
+):
+    """
+    Get outbound HTTP pool statistics per provider (HEAD ADMIN & ASSISTANT ADMIN)
+    Open/idle connections, handshake counts and queue wait confirm connection reuse
+    """
+    from app.core.http_client import get_http_pool_stats
+
+    return {
+        "success": True,
+        "data": get_http_pool_stats()
+    }
+
+
+@router.get("/system/locks")
+async def get_lock_stats_endpoint(
+    admin_id: str = Depends(require_assistant_admin_or_higher_bot)
+):
+    """
+    Get distributed lock statistics per namespace (HEAD ADMIN & ASSISTANT ADMIN)
+    Wait times, contention, timeouts and lost leases for this worker
+    """
+    from app.core.locks import get_lock_stats
+
+    return {
+        "success": True,
+        "data": get_lock_stats()
+    }
+
+
 @router.get("/system/backup-history")
 async def get_backup_history(
     limit: Optional[int] = 10,
@@ -1426,60 +1405,26 @@ async def get_backup_history(
 ):
     """
     Get database backup history (HEAD ADMIN ONLY)
-    Returns list of recent backups with metadata
+    Returns list of recent backups with size, duration and throughput
     """
-    import os
-    from datetime import datetime
+    from app.services.backup_service import BackupService
 
     try:
-        backup_dir = "/backups"
-        backups = []
-
-        if os.path.exists(backup_dir):
-            # Get all backup directories
-            backup_folders = [
-                d for d in os.listdir(backup_dir)
-                if os.path.isdir(os.path.join(backup_dir, d)) and d.startswith("afroo_backup_")
-            ]
-
-            # Sort by timestamp (newest first)
-            backup_folders.sort(reverse=True)
-
-            # Limit results
-            backup_folders = backup_folders[:limit]
-
-            for backup_name in backup_folders:
-                backup_path = os.path.join(backup_dir, backup_name)
-
-                # Extract timestamp from name
-                timestamp_str = backup_name.replace("afroo_backup_", "")
-                try:
-                    backup_dt = datetime.strptime(timestamp_str, "%Y%m%d_%H%M%S")
-                    created_at = backup_dt.strftime("%Y-%m-%d %H:%M:%S UTC")
-                except:
-                    created_at = "Unknown"
-
-                # Calculate backup size
-                try:
-                    backup_size = sum(
-                        os.path.getsize(os.path.join(dirpath, filename))
-                        for dirpath, _, filenames in os.walk(backup_path)
-                        for filename in filenames
-                    )
-                    size_mb = round(backup_size / (1024 * 1024), 2)
-                except:
-                    size_mb = 0
-
-                # Determine backup type (could be enhanced with metadata file)
-                backup_type = "local"  # Default assumption
-
-                backups.append({
-                    "backup_name": backup_name,
-                    "backup_type": backup_type,
-                    "size_mb": size_mb,
-                    "created_at": created_at,
-                    "status": "success"  # If exists, assume success
-                })
+        backups = [
+            {
+                "backup_name": record["backup_name"],
+                "backup_type": record["backup_type"],
+                "size_mb": round(record.get("size_bytes", 0) / (1024 * 1024), 2),
+                "raw_size_mb": round(record.get("raw_bytes", 0) / (1024 * 1024), 2),
+                "compression_ratio": record.get("compression_ratio"),
+                "duration_seconds": record.get("duration_seconds"),
+                "throughput_mb_s": record.get("throughput_mb_s"),
+                "created_at": record["started_at"].strftime("%Y-%m-%d %H:%M:%S UTC"),
+                "status": record["status"],
+                "error": record.get("error")
+            }
+            for record in await BackupService.get_history(limit)
+        ]
 
         logger.info(f"Admin {admin_id} viewed backup history: {len(backups)} backups")
 
@@ -7,6 +7,11 @@ from fastapi import APIRouter, HTTPException, Depends
 import logging
 
 from app.api.dependencies import require_admin
+from app.core import delayed_jobs
+from app.core.leader import get_leader_status
+from app.services.afroo_swap_service import swap_refresher
+from app.services.price_service import PriceService
+from app.services.withdrawal_service import withdrawal_refresher
 from app.tasks import get_scheduler_status
 from app.tasks.ticket_cleanup import run_cleanup_task
 
@@ -23,14 +28,34 @@ async def get_status(admin=Depends(require_admin)):
     **Admin only**
 
     Returns:
-        - running: Whether scheduler is running
+        - running: Whether scheduler is running (only on the elected leader)
         - jobs: List of scheduled jobs with next run times
+        - leader: Worker role, this instance's leadership and the current leader
+          (has_leader is False when no process holds the lease, e.g. Redis is down)
+        - delayed_jobs: Deadline queue depth, next due time and counters
+        - prices: Age of each price snapshot and refresh counters of this worker
+        - status_refresh: Swap and withdrawal polling counters (leader only)
     """
     try:
         status = get_scheduler_status()
+
+        # The queue lives in Redis; keep the rest of the report when it is down
+        try:
+            delayed_job_stats = await delayed_jobs.get_stats()
+        except Exception as e:
+            logger.warning(f"Failed to read delayed job stats: {e}")
+            delayed_job_stats = {"error": str(e)}
+
         return {
             "success": True,
-            "scheduler": status
+            "scheduler": status,
+            "leader": await get_leader_status(),
+            "delayed_jobs": delayed_job_stats,
+            "prices": PriceService.get_stats(),
+            "status_refresh": {
+                "swaps": swap_refresher.stats,
+                "withdrawals": withdrawal_refresher.stats
+            }
         }
     except Exception as e:
         logger.error(f"Error getting scheduler status: {e}", exc_info=True)
@@ -12,6 +12,7 @@ from pydantic import BaseModel
 
 from app.api.dependencies import require_assistant_admin_or_higher, require_head_admin, require_assistant_admin_or_higher_bot
 from app.core.database import get_tickets_collection, get_users_collection, get_db_collection, get_audit_logs_collection
+from app.services.ticket_service import TicketService
 
 router = APIRouter(tags=["Admin - Tickets"])
 logger = logging.getLogger(__name__)
@@ -64,7 +65,7 @@ async def get_all_tickets(
     if ticket_type:
         query["type"] = ticket_type
 
-    cursor = tickets.find(query).sort("created_at", -1).limit(limit)
+    cursor = tickets.find(query, TicketService.SUMMARY_PROJECTION).sort("created_at", -1).limit(limit)
     ticket_list = await cursor.to_list(length=limit)
 
     return {
@@ -512,11 +513,18 @@ async def force_complete_ticket(
             update_data["$set"]["server_fee_collected"] = fee_result.get("amount_usd", 0)
             update_data["$set"]["server_fee_status"] = fee_result.get("status", "collected")
 
-        await tickets.update_one(
-            {"_id": ObjectId(ticket_id)},
+        # Only the update that completes the ticket counts it in the daily rollup
+        completed = await tickets.update_one(
+            {"_id": ObjectId(ticket_id), "status": {"$ne": "completed"}},
             update_data
         )
 
+        if completed.modified_count:
+            from app.services.analytics_rollup_service import AnalyticsRollupService
+            await AnalyticsRollupService.record_ticket_completed(ticket.get("amount_usd", 0))
+        else:
+            logger.warning(f"Ticket {ticket_id}: Already completed, not counted again")
+
         logger.info(f"Ticket {ticket_id}: Force completed successfully with full workflow")
 
         # Trigger completion notifications for bot to process
@@ -11,6 +11,7 @@ from pydantic import BaseModel
 
 from app.api.dependencies import require_head_admin, require_head_admin_bot
 from app.core.database import get_users_collection, get_db_collection, get_audit_logs_collection
+from app.services.auth_cache_service import AuthCacheService
 
 router = APIRouter(tags=["Admin - Users"])
 
@@ -72,6 +73,7 @@ async def edit_user_stats(
                 }
             }
         )
+        await AuthCacheService.invalidate(request.discord_id)
 
     # Update user_statistics
     stats_update = {}
@@ -151,6 +153,7 @@ async def edit_user_roles(
             }
         }
     )
+    await AuthCacheService.invalidate(request.discord_id)
 
     # Log action
     await audit_logs.insert_one({
@@ -208,6 +211,7 @@ async def update_user_status(
             }
         }
     )
+    await AuthCacheService.invalidate(request.discord_id)
 
     # Log action
     await audit_logs.insert_one({
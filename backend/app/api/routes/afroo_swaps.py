@@ -7,9 +7,13 @@ import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from pydantic import BaseModel, Field
 from datetime import datetime
+from typing import Optional
+
+from redis.exceptions import ResponseError
 
 from app.services.afroo_swap_service import AfrooSwapService
 from app.api.deps import get_current_user, AuthContext
+from app.api.dependencies import get_user_from_bot_request
 from app.core.database import get_users_collection
 
 logger = logging.getLogger(__name__)
@@ -31,6 +35,10 @@ class SwapExecuteRequest(BaseModel):
     slippage_tolerance: float = Field(ge=0.001, le=0.5, default=0.01, description="Slippage tolerance between 0.1% and 50%")
 
 
+class SwapChannelRequest(BaseModel):
+    channel_id: str = Field(max_length=32, description="Discord channel ID of the swap ticket")
+
+
 @router.post("/quote")
 async def get_swap_quote(
     data: SwapQuoteRequest,
@@ -253,43 +261,29 @@ async def get_supported_assets():
         )
 
 
-@router.get("/pending-notifications")
-async def get_pending_notifications(
-    auth: AuthContext = Depends(get_current_user)
+@router.get("/changes")
+async def get_swap_status_changes(
+    since: Optional[str] = Query(None, max_length=64, description="Cursor from the previous read; omit to start from now"),
+    count: int = Query(100, ge=1, le=500),
+    block_ms: int = Query(15000, ge=0, le=AfrooSwapService.CHANGES_MAX_BLOCK_MS),
+    consumer: Optional[str] = Query(None, max_length=64, pattern=r"^[a-z0-9_-]+$", description="Saves the cursor under this name; omitting since resumes from it"),
+    discord_user_id: str = Depends(get_user_from_bot_request)
 ):
     """
-    Get swaps with pending completion notifications.
-    Used by bot's completion notifier task.
-    Accepts both bot token and web JWT authentication.
+    Swap status changes after a cursor (bot only).
+    Blocks up to block_ms when nothing changed. Pass the returned cursor
+    as since on the next call. With a consumer name, a call without since
+    resumes from the last cursor that consumer passed.
     """
     try:
-        from app.core.database import get_db_collection
-        from app.utils.helpers import serialize_objectids
-
-        swaps_db = await get_db_collection("afroo_swaps")
-
-        # Find all swaps with notification_pending = true
-        cursor = swaps_db.find({
-            "notification_pending": True,
-            "status": "completed"
-        }).limit(50)
-
-        swaps = await cursor.to_list(length=50)
-
-        # Recursively convert all ObjectIds to strings for JSON serialization
-        swaps = serialize_objectids(swaps)
-
-        return {
-            "success": True,
-            "swaps": swaps,
-            "count": len(swaps)
-        }
-
+        return await AfrooSwapService.get_status_changes(since, count=count, block_ms=block_ms, consumer=consumer)
+    except ResponseError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid cursor: {str(e)}")
     except Exception as e:
-        logger.error(f"Failed to get pending swap notifications: {e}", exc_info=True)
+        logger.error(f"Failed to read swap status changes: {e}", exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get pending notifications: {str(e)}"
+            detail=f"Failed to read swap status changes: {str(e)}"
         )
 
 
@@ -336,6 +330,30 @@ async def get_swap_details(
         )
 
 
+@router.post("/{swap_id}/channel")
+async def set_swap_channel(
+    swap_id: str,
+    data: SwapChannelRequest,
+    auth: AuthContext = Depends(get_current_user)
+):
+    """
+    Record the Discord channel of a swap ticket.
+    Called by bot after creating the channel, so status changes can be
+    routed to it.
+    """
+    discord_user_id = auth.user.get("discord_id")
+    users = get_users_collection()
+    user = await users.find_one({"discord_id": discord_user_id})
+
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    if not await AfrooSwapService.set_swap_channel(swap_id, str(user["_id"]), data.channel_id):
+        raise HTTPException(status_code=404, detail="Swap not found")
+
+    return {"success": True}
+
+
 @router.post("/{swap_id}/mark-notification-processed")
 async def mark_notification_processed(
     swap_id: str,
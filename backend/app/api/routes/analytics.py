@@ -122,7 +122,7 @@ async def get_time_series_data(
     """
     Get time series data for metric.
 
-    Metrics: tickets, revenue
+    Metrics: tickets, revenue, tickets_completed, swaps_completed, volume
     Intervals: daily, weekly, monthly
     """
     try:
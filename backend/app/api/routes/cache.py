@@ -143,7 +143,18 @@ async def list_cache_patterns(current_user: dict = Depends(get_current_user)):
             "reputation": f"{CacheService.PREFIX_REPUTATION}[user_id]",
             "analytics": f"{CacheService.PREFIX_ANALYTICS}[metric]",
             "tos": f"{CacheService.PREFIX_TOS}[category]",
-            "session": f"{CacheService.PREFIX_SESSION}[token]"
+            "session": f"{CacheService.PREFIX_SESSION}[token]",
+            "read_through": "cache:[prefix]v[version]:[key]",
+            "portfolio": f"cache:{CacheService.PREFIX_PORTFOLIO}v[version]:[discord_id]",
+            "leaderboard": f"cache:{CacheService.PREFIX_LEADERBOARD}v[version]:[category]:[period]:[limit]",
+            "tag_set": "cache:tag:[tag]"
+        }
+
+        tags = {
+            "namespace": "ns:[prefix]",
+            "user": CacheService.TAG_USER.format(user_id="[user_id]"),
+            "user_balances": CacheService.TAG_USER_BALANCES.format(user_id="[user_id]"),
+            "balances": CacheService.TAG_BALANCES
         }
 
         ttls = {
@@ -156,6 +167,7 @@ async def list_cache_patterns(current_user: dict = Depends(get_current_user)):
         return {
             "success": True,
             "patterns": patterns,
+            "tags": tags,
             "ttls": ttls
         }
 
@@ -0,0 +1,75 @@
+"""
+Notification Routes - Completion event stream for the bot
+Long-polled reads from the notification consumer group plus acks
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel, Field
+from typing import List
+import logging
+
+from app.api.dependencies import get_user_from_bot_request, require_admin
+from app.services.notification_service import NotificationService
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/notifications", tags=["Notifications"])
+
+
+class AckEventsRequest(BaseModel):
+    """Processed completion events"""
+    event_ids: List[str] = Field(..., max_length=100)
+
+
+@router.get("/completions")
+async def read_completion_events(
+    consumer: str = Query("bot", max_length=100, description="Stable consumer name of the bot instance"),
+    count: int = Query(10, ge=1, le=100),
+    block_ms: int = Query(15000, ge=0, le=NotificationService.MAX_BLOCK_MS),
+    discord_user_id: str = Depends(get_user_from_bot_request)
+):
+    """
+    Read completion events (bot only).
+    Blocks up to block_ms when nothing is queued. Events must be acked
+    after processing or they are redelivered.
+    """
+    try:
+        events = await NotificationService.read_events(consumer, count=count, block_ms=block_ms)
+        return {
+            "events": events,
+            "count": len(events)
+        }
+    except Exception as e:
+        logger.error(f"Failed to read completion events: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to read completion events: {str(e)}"
+        )
+
+
+@router.post("/completions/ack")
+async def ack_completion_events(
+    data: AckEventsRequest,
+    discord_user_id: str = Depends(get_user_from_bot_request)
+):
+    """Acknowledge processed completion events (bot only)"""
+    try:
+        acked = await NotificationService.ack_events(data.event_ids)
+        return {
+            "success": True,
+            "acked": acked
+        }
+    except Exception as e:
+        logger.error(f"Failed to ack completion events: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to ack completion events: {str(e)}"
+        )
+
+
+@router.get("/completions/stats")
+async def get_completion_queue_stats(
+    admin: dict = Depends(require_admin)
+):
+    """Completion queue depth, pending and dead-lettered events (admin only)"""
+    return await NotificationService.get_queue_stats()
@@ -2,7 +2,7 @@
 Ticket Routes - Support ticket system
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from typing import Optional
 from pydantic import BaseModel
 
@@ -107,7 +107,7 @@ async def list_my_tickets(
                 "priority": t.get("priority"),
                 "created_at": t["created_at"],
                 "updated_at": t["updated_at"],
-                "message_count": len(t.get("messages", []))
+                "message_count": t.get("message_count", 0)
             }
             for t in tickets
         ],
@@ -145,7 +145,7 @@ async def get_active_tickets(
             "status": {
                 "$nin": ["completed", "cancelled", "closed"]
             }
-        }).sort("created_at", -1).limit(50)
+        }, TicketService.SUMMARY_PROJECTION).sort("created_at", -1).limit(50)
 
         active_tickets = await cursor.to_list(length=50)
 
@@ -178,34 +178,6 @@ async def get_active_tickets(
         )
 
 
-@router.get("/pending-notifications")
-async def get_pending_notifications(
-    request: Request
-):
-    """Get tickets with pending completion notifications (bot only)"""
-    # Verify bot authentication
-    x_bot_token = request.headers.get("x-bot-token")
-
-    if not x_bot_token or x_bot_token != settings.BOT_SERVICE_TOKEN:
-        raise HTTPException(status_code=401, detail="Bot authentication required")
-
-    from app.utils.helpers import serialize_objectids
-    tickets = get_tickets_collection()
-
-    # Find tickets with pending notifications
-    cursor = tickets.find({"notification_pending": True}).limit(20)
-    pending_tickets = await cursor.to_list(length=20)
-
-    # Recursively convert all ObjectIds to strings for JSON serialization
-    # This handles nested ObjectIds in completion_notification and other fields
-    pending_tickets = serialize_objectids(pending_tickets)
-
-    return {
-        "tickets": pending_tickets,
-        "count": len(pending_tickets)
-    }
-
-
 @router.post("/{ticket_id}/mark-notification-processed")
 async def mark_notification_processed(
     ticket_id: str,
@@ -222,6 +194,35 @@ async def mark_notification_processed(
     }
 
 
+@router.get("/{ticket_id}/transcript")
+async def get_ticket_transcript(
+    ticket_id: str,
+    include_html: bool = False,
+    discord_user_id: str = Depends(get_user_from_bot_request)
+):
+    """Get a completed ticket's transcript by ID (bot only, referenced by completion events)"""
+    from bson import ObjectId
+
+    if not ObjectId.is_valid(ticket_id):
+        raise HTTPException(status_code=400, detail="Invalid ticket ID")
+
+    projection = {"ticket_number": 1, "transcript_text": 1, "transcript_generated_at": 1}
+    if include_html:
+        projection["transcript_html"] = 1
+
+    ticket = await get_tickets_collection().find_one({"_id": ObjectId(ticket_id)}, projection)
+    if not ticket or not ticket.get("transcript_generated_at"):
+        raise HTTPException(status_code=404, detail="Transcript not found")
+
+    return {
+        "ticket_id": ticket_id,
+        "ticket_number": ticket.get("ticket_number"),
+        "transcript_text": ticket.get("transcript_text"),
+        "transcript_html": ticket.get("transcript_html") if include_html else None,
+        "generated_at": ticket["transcript_generated_at"]
+    }
+
+
 @router.get("/exchange-rates")
 async def get_exchange_rates(
     amount: float = 100.0
@@ -237,18 +238,12 @@ async def get_exchange_rates(
         raise HTTPException(status_code=500, detail=f"Failed to fetch rates: {str(e)}")
 
 
-@router.get("/{ticket_id}")
-async def get_ticket(
-    ticket_id: str,
-    request: Request
-):
-    """Get ticket details with messages (supports both JWT and bot authentication)"""
-
+async def _get_readable_ticket(ticket_id: str, request: Request) -> dict:
+    """Load a ticket summary and check the caller may read it (bot token or JWT)"""
     from bson import ObjectId
-    from app.core.database import get_tickets_collection
 
     tickets = get_tickets_collection()
-    ticket = await tickets.find_one({"_id": ObjectId(ticket_id)})
+    ticket = await tickets.find_one({"_id": ObjectId(ticket_id)}, TicketService.SUMMARY_PROJECTION)
 
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
@@ -262,9 +257,6 @@ async def get_ticket(
         if not discord_user_id:
             raise HTTPException(status_code=401, detail="Missing Discord user ID")
 
-        # Check ownership - compare Discord IDs
-        ticket_discord_id = ticket.get("discord_user_id", str(ticket["user_id"]))
-
         # For bot requests, just return the ticket (exchangers need to see ticket details)
         # No strict ownership check for bot requests since exchangers need access
     else:
@@ -287,6 +279,33 @@ async def get_ticket(
         if str(ticket["user_id"]) != user_id and not is_admin:
             raise HTTPException(status_code=403, detail="Not your ticket")
 
+    return ticket
+
+
+def _serialize_message(msg: dict) -> dict:
+    return {
+        "id": msg["id"],
+        "user_id": str(msg["user_id"]),
+        "message": msg["message"],
+        "is_internal": msg.get("is_internal", False),
+        "created_at": msg["created_at"]
+    }
+
+
+@router.get("/{ticket_id}")
+async def get_ticket(
+    ticket_id: str,
+    request: Request
+):
+    """
+    Get ticket details with the first page of messages (supports both JWT and bot authentication)
+    Further messages are paged with GET /{ticket_id}/messages?cursor=messages_next_cursor
+    """
+    from app.services.ticket_message_service import TicketMessageService
+
+    ticket = await _get_readable_ticket(ticket_id, request)
+    page = await TicketMessageService.get_messages(ticket_id)
+
     return {
         "ticket": {
             "id": str(ticket["_id"]),
@@ -313,16 +332,9 @@ async def get_ticket(
             "exchanger_channel_id": ticket.get("exchanger_channel_id"),
             "category_id": ticket.get("category_id"),
             "exchanger_category_id": ticket.get("exchanger_category_id"),
-            "messages": [
-                {
-                    "id": msg["id"],
-                    "user_id": str(msg["user_id"]),
-                    "message": msg["message"],
-                    "is_internal": msg.get("is_internal", False),
-                    "created_at": msg["created_at"]
-                }
-                for msg in ticket.get("messages", [])
-            ],
+            "messages": [_serialize_message(msg) for msg in page["messages"]],
+            "messages_next_cursor": page["next_cursor"],
+            "message_count": ticket.get("message_count", 0),
             "created_at": ticket["created_at"],
             "updated_at": ticket["updated_at"],
             "first_response_at": ticket.get("first_response_at"),
@@ -332,6 +344,29 @@ async def get_ticket(
     }
 
 
+@router.get("/{ticket_id}/messages")
+async def get_ticket_messages(
+    ticket_id: str,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200)
+):
+    """Page through a ticket's messages, oldest first (supports both JWT and bot authentication)"""
+    from app.services.ticket_message_service import TicketMessageService
+
+    await _get_readable_ticket(ticket_id, request)
+
+    try:
+        page = await TicketMessageService.get_messages(ticket_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "messages": [_serialize_message(msg) for msg in page["messages"]],
+        "next_cursor": page["next_cursor"]
+    }
+
+
 @router.post("/{ticket_id}/message")
 async def add_ticket_message(
     ticket_id: str,
@@ -345,7 +380,7 @@ async def add_ticket_message(
     from app.core.database import get_tickets_collection
 
     tickets = get_tickets_collection()
-    ticket = await tickets.find_one({"_id": ObjectId(ticket_id)})
+    ticket = await tickets.find_one({"_id": ObjectId(ticket_id)}, TicketService.SUMMARY_PROJECTION)
 
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
@@ -366,7 +401,7 @@ async def add_ticket_message(
         return {
             "message": "Message added successfully",
             "ticket_id": ticket_id,
-            "message_count": len(updated_ticket.get("messages", []))
+            "message_count": updated_ticket.get("message_count", 0)
         }
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -385,7 +420,7 @@ async def close_ticket(
     from app.services.user_service import UserService
 
     tickets = get_tickets_collection()
-    ticket = await tickets.find_one({"_id": ObjectId(ticket_id)})
+    ticket = await tickets.find_one({"_id": ObjectId(ticket_id)}, TicketService.SUMMARY_PROJECTION)
 
     if not ticket:
         raise HTTPException(status_code=404, detail="Ticket not found")
@@ -785,7 +820,7 @@ async def list_all_tickets_admin(
         query["type"] = type
 
     # Fetch tickets
-    cursor = tickets.find(query).sort("created_at", -1).limit(limit)
+    cursor = tickets.find(query, TicketService.SUMMARY_PROJECTION).sort("created_at", -1).limit(limit)
     ticket_list = await cursor.to_list(length=limit)
 
     return {
@@ -830,7 +865,7 @@ async def get_ticket_by_number_admin(
 
     # Try to find by ticket_number (int)
     try:
-        ticket = await tickets.find_one({"ticket_number": int(ticket_number)})
+        ticket = await tickets.find_one({"ticket_number": int(ticket_number)}, TicketService.SUMMARY_PROJECTION)
     except ValueError:
         ticket = None
 
@@ -942,8 +977,9 @@ async def force_complete_ticket_admin(
 
         # Update ticket status
         from datetime import datetime
+        # Only the update that completes the ticket counts it in the daily rollup
         result = await tickets.find_one_and_update(
-            {"_id": ObjectId(ticket_id)},
+            {"_id": ObjectId(ticket_id), "status": {"$ne": "completed"}},
             {
                 "$set": {
                     "status": "completed",
@@ -955,6 +991,9 @@ async def force_complete_ticket_admin(
             },
             return_document=True
         )
+        completed_now = result is not None
+        if not completed_now:
+            result = await tickets.find_one({"_id": ObjectId(ticket_id)})
 
         await TicketService.log_action(
             ticket_id,
@@ -963,6 +1002,12 @@ async def force_complete_ticket_admin(
             {"admin_id": discord_user_id}
         )
 
+        if completed_now:
+            from app.services.analytics_rollup_service import AnalyticsRollupService
+            await AnalyticsRollupService.record_ticket_completed(ticket.get("amount_usd", 0))
+        else:
+            logger.warning(f"Ticket {ticket_id}: Already completed, not counted again")
+
         # Auto-refresh exchanger deposits after completion
         if result.get("exchanger_discord_id"):
             try:
@@ -1167,6 +1212,8 @@ async def force_unclaim_ticket_admin(
             return_document=True
         )
 
+        await TicketService.schedule_deadlines(result)
+
         await TicketService.log_action(
             ticket_id,
             discord_user_id,
@@ -4,10 +4,11 @@ User Routes - Profile management
 
 from fastapi import APIRouter, Depends, HTTPException, Request
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from app.api.dependencies import get_current_active_user, require_admin, get_user_from_bot_request
 from app.services.user_service import UserService
+from app.services.auth_cache_service import AuthCacheService
 from app.models.user import UserUpdate
 
 router = APIRouter(tags=["Users"])
@@ -23,6 +24,11 @@ class SyncRolesRequest(BaseModel):
     global_name: Optional[str] = None
 
 
+class BulkSyncRolesRequest(BaseModel):
+    """Request to sync roles for many guild members"""
+    members: List[SyncRolesRequest] = Field(..., max_length=5000)
+
+
 class ComprehensiveStatsResponse(BaseModel):
     """Comprehensive user statistics from stats_tracking_service"""
     # Client Exchange Stats
@@ -112,6 +118,8 @@ async def sync_discord_roles(
             }
         )
 
+        await AuthCacheService.invalidate(request.discord_id)
+
         return {
             "success": True,
             "message": "Roles synced successfully",
@@ -127,6 +135,33 @@ async def sync_discord_roles(
         raise HTTPException(status_code=500, detail=f"Failed to sync roles: {str(e)}")
 
 
+@router.post("/sync-roles/bulk")
+async def bulk_sync_discord_roles(
+    request: BulkSyncRolesRequest,
+    discord_user_id: str = Depends(get_user_from_bot_request)
+):
+    """
+    Sync Discord roles for many members in one request
+
+    Called by the bot's role sync task with members whose roles or
+    profile changed since the last sync. Unknown members are created.
+    """
+    try:
+        result = await UserService.bulk_sync_discord_roles(
+            [member.model_dump() for member in request.members]
+        )
+        return {
+            "success": True,
+            "message": "Roles synced successfully",
+            **result
+        }
+    except Exception as e:
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.error(f"Error in bulk role sync ({len(request.members)} members): {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to sync roles: {str(e)}")
+
+
 @router.get("/me")
 async def get_current_user_profile(
     user: dict = Depends(get_current_active_user)
@@ -5,9 +5,10 @@ Endpoints for receiving blockchain event webhooks from Tatum
 
 from fastapi import APIRouter, Request, HTTPException, Header, status, Depends
 from typing import Optional
+import json
 import logging
 
-from app.services.webhook_service import WebhookService
+from app.services.webhook_service import WebhookService, webhook_ingestor
 from app.api.dependencies import require_admin
 from app.core.config import settings
 
@@ -22,45 +23,50 @@ async def tatum_webhook(
 ):
     """
     Receive Tatum blockchain webhook.
-    Processes incoming transactions and credits deposits.
+    Queues the event for the ingestion workers and returns immediately;
+    deposits are credited asynchronously.
     """
-    try:
-        # Get raw body for signature verification
-        body = await request.body()
-        webhook_data = await request.json()
-
-        # Verify signature
-        if x_signature:
-            is_valid = WebhookService.verify_signature(body, x_signature)
-            if not is_valid:
-                logger.warning("Invalid webhook signature")
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid signature"
-                )
-        else:
-            logger.warning("No signature provided in webhook")
-
-        # Log webhook received
-        logger.info(f"Tatum webhook received: {webhook_data.get('txId')}")
-
-        # Process transaction
-        result = await WebhookService.process_incoming_transaction(webhook_data)
+    # Get raw body for signature verification
+    body = await request.body()
+
+    # Verify signature
+    if x_signature:
+        is_valid = WebhookService.verify_signature(body, x_signature)
+        if not is_valid:
+            logger.warning("Invalid webhook signature")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid signature"
+            )
+    else:
+        logger.warning("No signature provided in webhook")
 
+    try:
+        webhook_data = json.loads(body)
+    except ValueError as e:
+        # Return 200 to prevent Tatum from retrying a payload that will never parse
+        logger.error(f"Unparseable Tatum webhook: {e}")
         return {
-            "success": True,
-            "result": result
+            "success": False,
+            "error": "Invalid JSON"
         }
 
-    except HTTPException:
-        raise
+    try:
+        event_id = await WebhookService.enqueue(body)
     except Exception as e:
-        logger.error(f"Error processing webhook: {e}", exc_info=True)
-        # Return 200 to prevent Tatum from retrying
-        return {
-            "success": False,
-            "error": str(e)
-        }
+        # Not queued: let Tatum retry rather than lose the deposit
+        logger.error(f"Failed to queue Tatum webhook {webhook_data.get('txId')}: {e}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Webhook queue unavailable"
+        )
+
+    logger.info(f"Tatum webhook queued: {webhook_data.get('txId')} (event {event_id})")
+
+    return {
+        "success": True,
+        "queued": event_id
+    }
 
 
 @router.post("/tatum/test")
@@ -91,6 +97,15 @@ async def test_webhook(
     }
 
 
+@router.get("/tatum/stats")
+async def webhook_stats(admin: dict = Depends(require_admin)):
+    """Ingestion backlog, pending and dead-letter counts (admin only)"""
+    return {
+        "success": True,
+        "ingestion": await webhook_ingestor.get_stats()
+    }
+
+
 @router.get("/health")
 async def webhook_health():
     """Webhook endpoint health check"""
@@ -1,13 +1,19 @@
 """
 Transcript Endpoints
 Handles uploading and serving ticket transcripts
+
+Transcripts are stored pre-compressed by TranscriptStorageService and served
+with Content-Encoding as stored; shared styles and images are served from
+/assets with immutable caching.
 """
 
 import os
+import json
+import asyncio
 import logging
 from datetime import datetime
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Header, Response
+from fastapi import APIRouter, HTTPException, Header, Request, Response
 from fastapi.responses import HTMLResponse
 
 from app.core.database import get_db_collection
@@ -17,13 +23,11 @@ from app.models.transcript import (
     TranscriptUploadRequest,
     TranscriptUploadResponse
 )
+from app.services.transcript_storage_service import TranscriptStorageService, VALID_TYPES
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Base directory for transcript storage
-TRANSCRIPTS_DIR = os.path.join(os.path.dirname(__file__), "../../../../../transcripts")
-
 
 def get_bot_token_from_header(x_bot_token: Optional[str] = Header(None)) -> str:
     """Verify bot service token for upload endpoint"""
@@ -43,82 +47,91 @@ def get_bot_token_from_header(x_bot_token: Optional[str] = Header(None)) -> str:
     return x_bot_token
 
 
+async def _read_upload_request(request: Request) -> TranscriptUploadRequest:
+    """
+    Parse an upload: multipart (metadata fields plus a gzip "html" file part)
+    or the legacy JSON body with html_content inline
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and int(content_length) > TranscriptStorageService.MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail="Transcript upload too large")
+
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("multipart/form-data"):
+            form = await request.form()
+            upload = form.get("html")
+            if upload is None or isinstance(upload, str):
+                raise HTTPException(status_code=400, detail="Missing html file part")
+
+            data = await upload.read(TranscriptStorageService.MAX_UPLOAD_BYTES + 1)
+            if len(data) > TranscriptStorageService.MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail="Transcript upload too large")
+            html = await asyncio.to_thread(TranscriptStorageService.decompress_upload, data)
+
+            return TranscriptUploadRequest(
+                ticket_id=form.get("ticket_id"),
+                ticket_type=form.get("ticket_type"),
+                ticket_number=form.get("ticket_number") or None,
+                user_id=form.get("user_id"),
+                participants=json.loads(form.get("participants") or "[]"),
+                message_count=form.get("message_count") or 0,
+                html_content=html.decode("utf-8", errors="replace")
+            )
+
+        return TranscriptUploadRequest(**await request.json())
+
+    except ValueError as e:
+        # Covers pydantic ValidationError, bad JSON and corrupt gzip
+        raise HTTPException(status_code=422, detail=str(e))
+
+
 @router.post("/upload", response_model=TranscriptUploadResponse)
 async def upload_transcript(
-    request: TranscriptUploadRequest,
+    request: Request,
     x_bot_token: str = Header(..., alias="X-Bot-Token")
 ):
     """
     Upload a transcript (Bot service only)
 
     Requires X-Bot-Token header with valid bot service token.
-    Saves HTML file and stores metadata in database.
-    Returns public URL for viewing.
+    Accepts multipart/form-data with the HTML as a gzip-compressed "html"
+    file part, or JSON with html_content. Stores the HTML compressed and
+    its metadata in the database. Returns public URL for viewing.
     """
     # Verify bot token
     get_bot_token_from_header(x_bot_token)
 
+    upload = await _read_upload_request(request)
+
     try:
         # Validate ticket type
-        valid_types = ['ticket', 'swap', 'automm', 'application', 'support']
-        if request.ticket_type not in valid_types:
+        if upload.ticket_type not in VALID_TYPES:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid ticket_type. Must be one of: {', '.join(valid_types)}"
+                detail=f"Invalid ticket_type. Must be one of: {', '.join(VALID_TYPES)}"
             )
 
-        # Create directory structure if it doesn't exist
-        type_dir = os.path.join(TRANSCRIPTS_DIR, request.ticket_type)
-        os.makedirs(type_dir, exist_ok=True)
-
-        # Generate filename (sanitize ticket_id for filesystem)
-        safe_ticket_id = request.ticket_id.replace('/', '_').replace('\\', '_')
-        filename = f"{safe_ticket_id}.html"
-        file_path = os.path.join(type_dir, filename)
-
-        # Write HTML file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(request.html_content)
-
-        # Get file size
-        file_size = os.path.getsize(file_path)
-
-        # Store metadata in database
-        transcripts_collection = await get_db_collection("transcript_metadata")
-
-        metadata = {
-            "ticket_id": request.ticket_id,
-            "ticket_type": request.ticket_type,
-            "ticket_number": request.ticket_number,
-            "user_id": request.user_id,
-            "participants": request.participants,
-            "file_path": file_path,
-            "file_size": file_size,
-            "message_count": request.message_count,
-            "generated_at": datetime.utcnow(),
-            "view_count": 0,
-            "last_viewed_at": None,
-            "status": "active"
-        }
-
-        result = await transcripts_collection.insert_one(metadata)
-        transcript_id = str(result.inserted_id)
+        metadata = await TranscriptStorageService.store(
+            ticket_id=upload.ticket_id,
+            ticket_type=upload.ticket_type,
+            html=upload.html_content.encode("utf-8"),
+            user_id=upload.user_id,
+            ticket_number=upload.ticket_number,
+            participants=upload.participants,
+            message_count=upload.message_count
+        )
 
         # Generate public URL
         base_url = os.getenv("PUBLIC_URL", "http://localhost:8001")
-        public_url = f"{base_url}/transcripts/{request.ticket_type}/{safe_ticket_id}"
-
-        logger.info(
-            f"Transcript uploaded: {request.ticket_type}/{safe_ticket_id} "
-            f"for user {request.user_id} ({file_size} bytes)"
-        )
+        public_url = f"{base_url}/transcripts/{upload.ticket_type}/{metadata['ticket_id']}"
 
         return TranscriptUploadResponse(
             success=True,
-            transcript_id=transcript_id,
+            transcript_id=str(metadata["_id"]),
             public_url=public_url,
-            file_path=file_path,
-            file_size=file_size
+            file_path=metadata["file_path"],
+            file_size=metadata["file_size"]
         )
 
     except HTTPException:
@@ -128,60 +141,83 @@ async def upload_transcript(
         raise HTTPException(status_code=500, detail=f"Failed to upload transcript: {str(e)}")
 
 
+@router.get("/assets/{name}")
+async def get_transcript_asset(
+    name: str,
+    accept_encoding: Optional[str] = Header(None)
+):
+    """
+    Shared transcript stylesheet or image (Public access)
+
+    Assets are named by content hash, so they never change and can be
+    cached forever.
+    """
+    gzip_ok = "gzip" in (accept_encoding or "").lower()
+    asset = await TranscriptStorageService.read_asset(name, gzip_ok)
+    if not asset:
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+    body, media_type, encoding = asset
+    headers = {
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "ETag": f'"{name.split(".")[0][:32]}"',
+        "X-Content-Type-Options": "nosniff"
+    }
+    if media_type == "text/css":
+        headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
 @router.get("/{ticket_type}/{ticket_id}", response_class=HTMLResponse)
 async def view_transcript(
     ticket_type: str,
-    ticket_id: str
+    ticket_id: str,
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None)
 ):
     """
     View a transcript (Public access)
 
-    Returns the HTML transcript file.
+    Returns the HTML transcript, compressed with br or gzip as stored when
+    the client accepts it. Supports If-None-Match revalidation.
     No authentication required - anyone with the URL can view.
     """
     try:
         # Validate ticket type
-        valid_types = ['ticket', 'swap', 'automm', 'application', 'support']
-        if ticket_type not in valid_types:
+        if ticket_type not in VALID_TYPES:
             raise HTTPException(
                 status_code=404,
                 detail="Transcript not found"
             )
 
-        # Get metadata from database
-        transcripts_collection = await get_db_collection("transcript_metadata")
-
-        # Sanitize ticket_id for consistency
-        safe_ticket_id = ticket_id.replace('/', '_').replace('\\', '_')
-
-        metadata = await transcripts_collection.find_one({
-            "ticket_id": safe_ticket_id,
-            "ticket_type": ticket_type,
-            "status": "active"
-        })
-
-        # Also try with unsanitized ID in case it was stored differently
-        if not metadata:
-            metadata = await transcripts_collection.find_one({
-                "ticket_id": ticket_id,
-                "ticket_type": ticket_type,
-                "status": "active"
-            })
-
+        metadata = await TranscriptStorageService.find(ticket_type, ticket_id)
         if not metadata:
             raise HTTPException(status_code=404, detail="Transcript not found")
 
-        # Read HTML file
-        file_path = metadata["file_path"]
-
-        if not os.path.exists(file_path):
-            logger.error(f"Transcript file not found on disk: {file_path}")
+        headers = {
+            "Cache-Control": "public, max-age=3600",  # Cache for 1 hour
+            "X-Content-Type-Options": "nosniff",
+            "Vary": "Accept-Encoding"
+        }
+        etag = f'"{metadata["etag"]}"' if metadata.get("etag") else None
+        if etag:
+            headers["ETag"] = etag
+            if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+                return Response(status_code=304, headers=headers)
+
+        encoding = TranscriptStorageService.choose_encoding(metadata, accept_encoding)
+        try:
+            body = await TranscriptStorageService.read_body(metadata, encoding)
+        except FileNotFoundError:
+            logger.error(f"Transcript file not found on disk: {metadata['file_path']}")
             raise HTTPException(status_code=404, detail="Transcript file not found")
-
-        with open(file_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
+        if encoding:
+            headers["Content-Encoding"] = encoding
 
         # Update view count and last viewed timestamp
+        transcripts_collection = await get_db_collection("transcript_metadata")
         await transcripts_collection.update_one(
             {"_id": metadata["_id"]},
             {
@@ -195,14 +231,10 @@ async def view_transcript(
             f"(view #{metadata.get('view_count', 0) + 1})"
         )
 
-        # Return HTML with proper headers
         return Response(
-            content=html_content,
+            content=body,
             media_type="text/html",
-            headers={
-                "Cache-Control": "public, max-age=3600",  # Cache for 1 hour
-                "X-Content-Type-Options": "nosniff"
-            }
+            headers=headers
         )
 
     except HTTPException:
@@ -223,22 +255,7 @@ async def get_transcript_metadata(
     Public endpoint - useful for checking if transcript exists
     """
     try:
-        transcripts_collection = await get_db_collection("transcript_metadata")
-
-        safe_ticket_id = ticket_id.replace('/', '_').replace('\\', '_')
-
-        metadata = await transcripts_collection.find_one({
-            "ticket_id": safe_ticket_id,
-            "ticket_type": ticket_type,
-            "status": "active"
-        })
-
-        if not metadata and safe_ticket_id != ticket_id:
-            metadata = await transcripts_collection.find_one({
-                "ticket_id": ticket_id,
-                "ticket_type": ticket_type,
-                "status": "active"
-            })
+        metadata = await TranscriptStorageService.find(ticket_type, ticket_id)
 
         if not metadata:
             raise HTTPException(status_code=404, detail="Transcript not found")
@@ -249,6 +266,7 @@ async def get_transcript_metadata(
             "ticket_number": metadata.get("ticket_number"),
             "message_count": metadata.get("message_count", 0),
             "file_size": metadata["file_size"],
+            "raw_size": metadata.get("raw_size", metadata["file_size"]),
             "generated_at": metadata["generated_at"],
             "view_count": metadata.get("view_count", 0),
             "last_viewed_at": metadata.get("last_viewed_at")
@@ -14,6 +14,7 @@ from app.api.deps import (
     AuthContext
 )
 from app.services.user_service import user_service
+from app.services.auth_cache_service import AuthCacheService
 from app.models.user import User, UserUpdate
 
 router = APIRouter()
@@ -413,6 +414,8 @@ async def unfreeze_user(
             detail="User not found"
         )
 
+    await AuthCacheService.invalidate(discord_id)
+
     return {
         "success": True,
         "message": f"User {discord_id} unfrozen"
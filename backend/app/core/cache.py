@@ -0,0 +1,334 @@
+"""
+Two-tier cache engine
+A bounded in-process LRU/TTL tier in front of Redis, with a binary codec and
+cross-worker invalidation over Redis pub/sub
+
+Values are stored encoded in both tiers, so every read returns a fresh copy
+callers may mutate. The codec is msgpack when installed, then orjson, then the
+standard library json; each payload starts with a one-byte codec marker so
+entries written by another codec are still readable. Decimal, ObjectId and
+datetime round-trip through all three.
+
+Local entries are dropped when any worker invalidates the key (or its
+prefix). If the subscription drops, messages may have been missed, so the
+local tier is cleared before resubscribing; LOCAL_MAX_TTL_SECONDS bounds the
+staleness if the subscriber is down entirely.
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Iterable, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+
+from bson import ObjectId
+
+from app.core.redis import RedisKeys, get_binary_redis
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LOCAL_MAX_ENTRIES = 10000
+LOCAL_MAX_TTL_SECONDS = 60
+RESUBSCRIBE_DELAY_SECONDS = 1.0
+
+# msgpack extension type codes
+EXT_DECIMAL = 1
+EXT_OBJECT_ID = 2
+EXT_DATETIME = 3
+
+CODEC_MSGPACK = b"m"
+CODEC_ORJSON = b"o"
+CODEC_JSON = b"j"
+
+
+# ====================
+# Codec
+# ====================
+
+def _msgpack_default(value):
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(EXT_DECIMAL, str(value).encode())
+    if isinstance(value, ObjectId):
+        return msgpack.ExtType(EXT_OBJECT_ID, value.binary)
+    if isinstance(value, datetime):
+        return msgpack.ExtType(EXT_DATETIME, value.isoformat().encode())
+    raise TypeError(f"Cannot cache {type(value).__name__}")
+
+
+def _msgpack_ext_hook(code: int, data: bytes):
+    if code == EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == EXT_OBJECT_ID:
+        return ObjectId(data)
+    if code == EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return {"$dec": str(value)}
+    if isinstance(value, ObjectId):
+        return {"$oid": str(value)}
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    raise TypeError(f"Cannot cache {type(value).__name__}")
+
+
+def _json_object_hook(obj: dict):
+    if len(obj) == 1:
+        if "$dec" in obj:
+            return Decimal(obj["$dec"])
+        if "$oid" in obj:
+            return ObjectId(obj["$oid"])
+        if "$dt" in obj:
+            return datetime.fromisoformat(obj["$dt"])
+    return obj
+
+
+def _revive(value):
+    """Apply _json_object_hook bottom-up (orjson has no object hook)"""
+    if isinstance(value, dict):
+        return _json_object_hook({k: _revive(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return [_revive(v) for v in value]
+    return value
+
+
+def encode(value: Any) -> bytes:
+    """Serialize a value for the cache"""
+    if msgpack is not None:
+        return CODEC_MSGPACK + msgpack.packb(value, default=_msgpack_default, use_bin_type=True)
+    if orjson is not None:
+        return CODEC_ORJSON + orjson.dumps(
+            value,
+            default=_json_default,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        )
+    return CODEC_JSON + json.dumps(value, default=_json_default, separators=(",", ":")).encode()
+
+
+def decode(data: bytes) -> Any:
+    """Deserialize a cached value"""
+    codec, body = data[:1], data[1:]
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack entry but msgpack is not installed")
+        return msgpack.unpackb(body, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+    if codec == CODEC_ORJSON and orjson is not None:
+        return _revive(orjson.loads(body))
+    if codec in (CODEC_ORJSON, CODEC_JSON):
+        return json.loads(body, object_hook=_json_object_hook)
+    raise ValueError(f"Unknown cache codec {codec!r}")
+
+
+# ====================
+# Engine
+# ====================
+
+class TwoTierCache:
+    """In-process LRU/TTL tier in front of Redis, kept coherent over pub/sub"""
+
+    def __init__(self):
+        self.instance_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._local: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "invalidations_received": 0}
+
+    # Local tier
+
+    def get_local(self, key: str) -> Optional[bytes]:
+        """Encoded local entry, or None if absent or expired"""
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at <= time.monotonic():
+            self._local.pop(key, None)
+            return None
+        self._local.move_to_end(key)
+        return data
+
+    def set_local(self, key: str, data: bytes, ttl: float):
+        """Keep an encoded entry in memory for up to ttl seconds (capped)"""
+        ttl = min(ttl, LOCAL_MAX_TTL_SECONDS)
+        if ttl <= 0:
+            return
+        self._local[key] = (time.monotonic() + ttl, data)
+        self._local.move_to_end(key)
+        while len(self._local) > LOCAL_MAX_ENTRIES:
+            self._local.popitem(last=False)
+
+    def drop_local(self, key: Optional[str] = None, prefix: Optional[str] = None):
+        """Drop one local entry, every entry under a prefix, or everything"""
+        if key is not None:
+            self._local.pop(key, None)
+        elif prefix is not None:
+            for cached_key in [k for k in self._local if k.startswith(prefix)]:
+                self._local.pop(cached_key, None)
+        else:
+            self._local.clear()
+
+    # Both tiers
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Get a value, from memory if possible
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Decoded value or None
+        """
+        data = self.get_local(key)
+        if data is not None:
+            self.stats["local_hits"] += 1
+            return decode(data)
+
+        redis = get_binary_redis()
+        if not redis:
+            return None
+
+        pipe = redis.pipeline(transaction=False)
+        pipe.get(key)
+        pipe.pttl(key)
+        data, pttl = await pipe.execute()
+        if data is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["redis_hits"] += 1
+        self.set_local(key, data, pttl / 1000 if pttl and pttl > 0 else LOCAL_MAX_TTL_SECONDS)
+        return decode(data)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        """
+        Set a value in both tiers; other workers drop their local copy
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live in seconds (None keeps it in Redis until deleted)
+        """
+        data = encode(value)
+        redis = get_binary_redis()
+        if redis:
+            if ttl:
+                await redis.setex(key, ttl, data)
+            else:
+                await redis.set(key, data)
+            await self.publish_invalidation(keys=[key])
+        self.set_local(key, data, ttl or LOCAL_MAX_TTL_SECONDS)
+
+    async def delete(self, *keys: str):
+        """Delete keys from both tiers on every worker"""
+        if not keys:
+            return
+        for key in keys:
+            self._local.pop(key, None)
+        redis = get_binary_redis()
+        if redis:
+            await redis.delete(*keys)
+            await self.publish_invalidation(keys=keys)
+
+    # Invalidation
+
+    async def publish_invalidation(self, keys: Optional[Iterable[str]] = None, prefix: Optional[str] = None):
+        """Tell other workers to drop keys, a prefix, or (neither given) everything"""
+        redis = get_binary_redis()
+        if not redis:
+            return
+        if keys is not None:
+            message = f"{self.instance_id}|k|" + "\n".join(keys)
+        elif prefix is not None:
+            message = f"{self.instance_id}|p|{prefix}"
+        else:
+            message = f"{self.instance_id}|a|"
+        try:
+            await redis.publish(RedisKeys.CACHE_INVALIDATION_CHANNEL, message)
+        except Exception as e:
+            logger.warning(f"Cache invalidation publish failed: {e}")
+
+    def _apply(self, message: bytes):
+        sender, kind, value = message.decode().split("|", 2)
+        if sender == self.instance_id:
+            return
+        self.stats["invalidations_received"] += 1
+        if kind == "k":
+            for key in value.split("\n"):
+                self.drop_local(key=key)
+        elif kind == "p":
+            self.drop_local(prefix=value)
+        else:
+            self.drop_local()
+
+    async def _listen(self):
+        while True:
+            pubsub = None
+            try:
+                pubsub = get_binary_redis().pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(RedisKeys.CACHE_INVALIDATION_CHANNEL)
+                # Anything published while we weren't subscribed was missed
+                self.drop_local()
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self._apply(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Cache invalidation subscriber error, resubscribing: {e}")
+                await asyncio.sleep(RESUBSCRIBE_DELAY_SECONDS)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.aclose()
+                    except Exception:
+                        pass
+
+    def start(self):
+        """Start listening for invalidations from other workers"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen())
+            codec = "msgpack" if msgpack else "orjson" if orjson else "json"
+            logger.info(f"✅ Two-tier cache started ({codec} codec, {LOCAL_MAX_ENTRIES} local entries)")
+
+    async def stop(self):
+        """Stop the invalidation subscriber and clear the local tier"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._local.clear()
+
+    def get_stats(self) -> dict:
+        """Local tier size and hit counters of this worker"""
+        return {
+            "local_entries": len(self._local),
+            "subscribed": self._task is not None and not self._task.done(),
+            "codec": "msgpack" if msgpack else "orjson" if orjson else "json",
+            **self.stats
+        }
+
+
+# Process-wide engine, started in the app lifespan
+cache_engine = TwoTierCache()
@@ -180,6 +180,15 @@ async def create_indexes():
     await db.tickets.create_index([("assigned_to", ASCENDING)])
     await db.tickets.create_index([("type", ASCENDING)])
     await db.tickets.create_index([("created_at", DESCENDING)])
+    await db.tickets.create_index([("updated_at", DESCENDING)])  # Incremental stats recalculation
+    await db.tickets.create_index(
+        [("notification_pending", ASCENDING)],
+        partialFilterExpression={"notification_pending": True}
+    )  # Completion notification requeue
+    await db.afroo_swaps.create_index([("status", ASCENDING), ("next_check_at", ASCENDING)])  # Status refresh
+
+    # Ticket messages (conversation stored outside the ticket document)
+    await db.ticket_messages.create_index([("ticket_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)])
 
     # Partners indexes
     await db.partners.create_index([("discord_guild_id", ASCENDING)], unique=True)
@@ -208,6 +217,8 @@ async def create_indexes():
     await db.exchanger_deposits.create_index([("user_id", ASCENDING), ("currency", ASCENDING)], unique=True)
     await db.exchanger_deposits.create_index([("wallet_address", ASCENDING)])
     await db.exchanger_deposits.create_index([("created_at", DESCENDING)])
+    await db.exchanger_deposits.create_index([("last_synced", ASCENDING)])
+    await db.exchanger_deposits.create_index([("address", ASCENDING), ("asset", ASCENDING)])  # Webhook address lookups
 
     # Ticket holds indexes (V3 system)
     await db.ticket_holds.create_index([("ticket_id", ASCENDING)])
@@ -236,6 +247,7 @@ async def create_indexes():
     await db.afroo_wallets.create_index([("user_id", ASCENDING), ("asset", ASCENDING)], unique=True)
     await db.afroo_wallets.create_index([("status", ASCENDING)])
     await db.afroo_wallets.create_index([("created_at", DESCENDING)])
+    await db.afroo_wallets.create_index([("last_synced", ASCENDING)])
 
     # Afroo Wallet Transactions indexes (V4 system)
     await db.afroo_wallet_transactions.create_index([("user_id", ASCENDING)])
@@ -249,6 +261,11 @@ async def create_indexes():
     await db.afroo_swaps.create_index([("from_asset", ASCENDING)])
     await db.afroo_swaps.create_index([("to_asset", ASCENDING)])
     await db.afroo_swaps.create_index([("created_at", DESCENDING)])
+    await db.afroo_swaps.create_index([("completed_at", DESCENDING)], sparse=True)
+    await db.afroo_swaps.create_index(
+        [("notification_pending", ASCENDING)],
+        partialFilterExpression={"notification_pending": True}
+    )  # Completion notification requeue
 
     # Blockchain Transactions indexes
     await db.blockchain_transactions.create_index([("tx_hash", ASCENDING)], unique=True)
@@ -263,6 +280,7 @@ async def create_indexes():
     await db.withdrawals.create_index([("asset", ASCENDING)])
     await db.withdrawals.create_index([("tx_hash", ASCENDING)])
     await db.withdrawals.create_index([("created_at", DESCENDING)])
+    await db.withdrawals.create_index([("status", ASCENDING), ("next_check_at", ASCENDING)])  # Status refresh
 
     # Payouts indexes (V4 system)
     await db.payouts.create_index([("ticket_id", ASCENDING)])
@@ -284,6 +302,7 @@ async def create_indexes():
     await db.user_statistics.create_index([("trust_score", DESCENDING)])
     await db.user_statistics.create_index([("total_volume_usd", DESCENDING)])
     await db.user_statistics.create_index([("updated_at", DESCENDING)])
+    await db.user_statistics.create_index([("last_calculated", DESCENDING)])
 
     # TOS Versions indexes (V4 system)
     await db.tos_versions.create_index([("category", ASCENDING), ("version", ASCENDING)], unique=True)
@@ -356,6 +375,14 @@ async def create_indexes():
     await db.admin_wallets.create_index([("asset", ASCENDING)])
     await db.admin_wallets.create_index([("active", ASCENDING)])
 
+    # Backups indexes (history and the incremental base lookup)
+    await db.backups.create_index([("started_at", DESCENDING)])
+    await db.backups.create_index([("status", ASCENDING), ("started_at", DESCENDING)])
+
+    # Transcript metadata indexes (view/upsert lookup and per-user listing)
+    await db.transcript_metadata.create_index([("ticket_type", ASCENDING), ("ticket_id", ASCENDING), ("status", ASCENDING)])
+    await db.transcript_metadata.create_index([("user_id", ASCENDING), ("status", ASCENDING), ("generated_at", DESCENDING)])
+
     logger.info("✅ All indexes created successfully")
 
 
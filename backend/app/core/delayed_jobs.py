@@ -0,0 +1,258 @@
+"""
+Delayed jobs - Redis sorted-set timer wheel for one-shot deadlines
+Replaces periodic collection scans (TOS reminders, stale ticket closing)
+with jobs enqueued when the deadline is created
+
+Layout:
+    jobs:due         ZSET  job_id -> due time (ms)
+    jobs:processing  ZSET  job_id -> visibility deadline (ms)
+    jobs:payload     HASH  job_id -> {"type", "args", "attempts"} JSON
+
+Job IDs are deterministic (e.g. "tos:{ticket_id}:ping:1"), so scheduling is
+idempotent and cancelling needs no lookup. The runner claims due jobs with a
+single Lua call that moves them to processing; a job is deleted only after
+its handler succeeds. Jobs whose worker died reappear after
+VISIBILITY_TIMEOUT_SECONDS, so handlers must be idempotent (guard on the
+document state they change).
+
+The runner only runs on the scheduler leader (see app.core.leader).
+"""
+
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import time
+
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+DUE_KEY = "jobs:due"
+PROCESSING_KEY = "jobs:processing"
+PAYLOAD_KEY = "jobs:payload"
+
+CLAIM_BATCH_SIZE = 50
+VISIBILITY_TIMEOUT_SECONDS = 60
+MAX_IDLE_SLEEP_SECONDS = 1.0  # Upper bound on pickup latency for newly scheduled jobs
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF_SECONDS = 10  # Multiplied by the attempt number
+
+# KEYS = due, processing, payload; ARGV = now_ms, batch, visibility_ms
+CLAIM_SCRIPT = """
+local now = tonumber(ARGV[1])
+
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now, 'LIMIT', 0, tonumber(ARGV[2]))
+for _, id in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], id)
+    redis.call('ZADD', KEYS[1], now, id)
+end
+
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', now, 'LIMIT', 0, tonumber(ARGV[2]))
+local claimed = {}
+for _, id in ipairs(due) do
+    redis.call('ZREM', KEYS[1], id)
+    local payload = redis.call('HGET', KEYS[3], id)
+    if payload then
+        redis.call('ZADD', KEYS[2], now + tonumber(ARGV[3]), id)
+        table.insert(claimed, id)
+        table.insert(claimed, payload)
+    end
+end
+return claimed
+"""
+
+# KEYS = processing, payload, due; ARGV = job_id, claimed payload
+# The payload is only deleted if the job wasn't rescheduled while running
+ACK_SCRIPT = """
+redis.call('ZREM', KEYS[1], ARGV[1])
+if redis.call('ZSCORE', KEYS[3], ARGV[1]) == false and redis.call('HGET', KEYS[2], ARGV[1]) == ARGV[2] then
+    redis.call('HDEL', KEYS[2], ARGV[1])
+end
+return 1
+"""
+
+JobHandler = Callable[..., Awaitable[None]]
+
+_handlers: Dict[str, JobHandler] = {}
+_stats = {"fired": 0, "failed": 0, "retried": 0, "dropped": 0, "scheduled": 0, "cancelled": 0}
+
+
+def register(job_type: str) -> Callable[[JobHandler], JobHandler]:
+    """Decorator registering the async handler for a job type"""
+    def decorator(handler: JobHandler) -> JobHandler:
+        _handlers[job_type] = handler
+        return handler
+    return decorator
+
+
+def _ms(when: datetime) -> int:
+    return int((when - datetime.utcfromtimestamp(0)).total_seconds() * 1000)
+
+
+async def schedule(job_id: str, job_type: str, due_at: datetime, **args) -> None:
+    """
+    Schedule (or move) a one-shot job
+
+    Args:
+        job_id: Deterministic job ID; scheduling it again replaces the previous one
+        job_type: Registered handler name
+        due_at: UTC due time (past times fire on the next runner tick)
+        **args: JSON-serializable handler arguments
+    """
+    payload = json.dumps({"type": job_type, "args": args, "attempts": 0}, default=str)
+    pipe = get_redis().pipeline(transaction=True)
+    pipe.hset(PAYLOAD_KEY, job_id, payload)
+    pipe.zadd(DUE_KEY, {job_id: _ms(due_at)})
+    await pipe.execute()
+    _stats["scheduled"] += 1
+
+
+async def schedule_many(jobs: Iterable[Tuple[str, str, datetime, Dict]]) -> int:
+    """
+    Schedule several jobs in one round trip
+
+    Args:
+        jobs: (job_id, job_type, due_at, args) tuples
+
+    Returns:
+        Number of jobs scheduled
+    """
+    pipe = get_redis().pipeline(transaction=True)
+    count = 0
+    for job_id, job_type, due_at, args in jobs:
+        pipe.hset(PAYLOAD_KEY, job_id, json.dumps({"type": job_type, "args": args, "attempts": 0}, default=str))
+        pipe.zadd(DUE_KEY, {job_id: _ms(due_at)})
+        count += 1
+    if count:
+        await pipe.execute()
+        _stats["scheduled"] += count
+    return count
+
+
+async def cancel(*job_ids: str) -> None:
+    """Cancel jobs that have not fired yet (unknown IDs are ignored)"""
+    if not job_ids:
+        return
+    pipe = get_redis().pipeline(transaction=True)
+    pipe.zrem(DUE_KEY, *job_ids)
+    pipe.zrem(PROCESSING_KEY, *job_ids)
+    pipe.hdel(PAYLOAD_KEY, *job_ids)
+    await pipe.execute()
+    _stats["cancelled"] += len(job_ids)
+
+
+class DelayedJobRunner:
+    """Claims due jobs and runs their handlers"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._claim = None
+        self._ack = None
+
+    def start(self):
+        """Start the runner loop in the background"""
+        if self._task is None or self._task.done():
+            redis = get_redis()
+            self._claim = redis.register_script(CLAIM_SCRIPT)
+            self._ack = redis.register_script(ACK_SCRIPT)
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"✅ Delayed job runner started ({len(_handlers)} job types)")
+
+    def stop(self):
+        """Stop the runner; claimed jobs are redelivered after the visibility timeout"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+            logger.info("Delayed job runner stopped")
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _claim_due(self) -> List[Tuple[str, str]]:
+        result = await self._claim(
+            keys=[DUE_KEY, PROCESSING_KEY, PAYLOAD_KEY],
+            args=[int(time.time() * 1000), CLAIM_BATCH_SIZE, VISIBILITY_TIMEOUT_SECONDS * 1000]
+        )
+        return list(zip(result[::2], result[1::2]))
+
+    async def _execute(self, job_id: str, raw_payload: str):
+        payload = json.loads(raw_payload)
+        handler = _handlers.get(payload["type"])
+
+        if handler is None:
+            logger.error(f"No handler for delayed job {job_id} (type {payload['type']}), dropping it")
+            _stats["dropped"] += 1
+            await self._ack(keys=[PROCESSING_KEY, PAYLOAD_KEY, DUE_KEY], args=[job_id, raw_payload])
+            return
+
+        try:
+            await handler(**payload["args"])
+        except Exception as e:
+            _stats["failed"] += 1
+            if await get_redis().hget(PAYLOAD_KEY, job_id) != raw_payload:
+                # Cancelled or rescheduled while running, don't resurrect it
+                await self._ack(keys=[PROCESSING_KEY, PAYLOAD_KEY, DUE_KEY], args=[job_id, raw_payload])
+                return
+
+            attempts = payload.get("attempts", 0) + 1
+            if attempts >= MAX_ATTEMPTS:
+                logger.error(f"Delayed job {job_id} failed {attempts} times, dropping it: {e}", exc_info=True)
+                _stats["dropped"] += 1
+                await self._ack(keys=[PROCESSING_KEY, PAYLOAD_KEY, DUE_KEY], args=[job_id, raw_payload])
+                return
+
+            logger.warning(f"Delayed job {job_id} failed (attempt {attempts}/{MAX_ATTEMPTS}): {e}")
+            _stats["retried"] += 1
+            retry_at = int(time.time() * 1000) + attempts * RETRY_BACKOFF_SECONDS * 1000
+            pipe = get_redis().pipeline(transaction=True)
+            pipe.hset(PAYLOAD_KEY, job_id, json.dumps({**payload, "attempts": attempts}))
+            pipe.zrem(PROCESSING_KEY, job_id)
+            pipe.zadd(DUE_KEY, {job_id: retry_at})
+            await pipe.execute()
+            return
+
+        _stats["fired"] += 1
+        await self._ack(keys=[PROCESSING_KEY, PAYLOAD_KEY, DUE_KEY], args=[job_id, raw_payload])
+
+    async def _sleep_until_next(self):
+        """Sleep until the next due job, capped so new jobs are picked up quickly"""
+        upcoming = await get_redis().zrange(DUE_KEY, 0, 0, withscores=True)
+        delay = MAX_IDLE_SLEEP_SECONDS
+        if upcoming:
+            delay = min(max(upcoming[0][1] / 1000 - time.time(), 0), MAX_IDLE_SLEEP_SECONDS)
+        await asyncio.sleep(delay)
+
+    async def _run(self):
+        while True:
+            try:
+                jobs = await self._claim_due()
+                if jobs:
+                    await asyncio.gather(*(self._execute(job_id, payload) for job_id, payload in jobs))
+                if len(jobs) < CLAIM_BATCH_SIZE:
+                    await self._sleep_until_next()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Delayed job runner error: {e}", exc_info=True)
+                await asyncio.sleep(MAX_IDLE_SLEEP_SECONDS)
+
+
+# Process runner, started and stopped with the scheduler leadership
+runner = DelayedJobRunner()
+
+
+async def get_stats() -> Dict:
+    """Queue depth, next due time and counters of this process"""
+    redis = get_redis()
+    upcoming = await redis.zrange(DUE_KEY, 0, 0, withscores=True)
+    return {
+        "running": runner.running,
+        "job_types": sorted(_handlers),
+        "due": await redis.zcard(DUE_KEY),
+        "processing": await redis.zcard(PROCESSING_KEY),
+        "next_due_at": datetime.utcfromtimestamp(upcoming[0][1] / 1000).isoformat() if upcoming else None,
+        **_stats
+    }
@@ -0,0 +1,374 @@
+"""
+Outbound HTTP client pool
+Process-wide keep-alive clients per external provider (Tatum, Solana RPC, ChangeNow, pricing)
+with per-provider timeouts, retry/backoff and circuit breakers
+"""
+
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Retried automatically; other methods must opt in with retry=True
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "DELETE"}
+
+
+@dataclass
+class ProviderPolicy:
+    """Connection, timeout and retry policy for one provider"""
+
+    timeout: float = 30.0
+    connect_timeout: float = 5.0
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    max_retries: int = 2
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    retry_statuses: Tuple[int, ...] = (429, 502, 503, 504)
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 30.0
+    breaker_per_host: bool = False  # One breaker per endpoint host instead of per provider
+    http2: bool = True
+
+
+PROVIDER_POLICIES: Dict[str, ProviderPolicy] = {
+    "tatum": ProviderPolicy(timeout=30.0, max_connections=50, max_keepalive_connections=20),
+    # Several public endpoints are tried in turn, so fail fast on each one; a
+    # rate-limited endpoint must not open the breaker for its fallbacks
+    "solana_rpc": ProviderPolicy(timeout=10.0, max_retries=0, breaker_failure_threshold=10, breaker_per_host=True),
+    "changenow": ProviderPolicy(timeout=15.0),
+    "coingecko": ProviderPolicy(timeout=10.0, max_retries=1, retry_statuses=(502, 503, 504)),
+    "exchangerate": ProviderPolicy(timeout=10.0, max_connections=5, max_keepalive_connections=2),
+}
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised when a provider's circuit breaker is open"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with timed half-open probing"""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_seconds:
+            return "open"
+        return "half_open"
+
+    def allow_request(self) -> bool:
+        return self.state != "open"
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            # Re-arms the open window when a half-open probe fails
+            self.opened_at = time.monotonic()
+
+
+@dataclass
+class PoolStats:
+    """Counters used to confirm that connections are being reused"""
+
+    requests: int = 0
+    retries: int = 0
+    failures: int = 0
+    circuit_rejections: int = 0
+    tcp_handshakes: int = 0
+    tls_handshakes: int = 0
+    queue_wait_total: float = 0.0
+    queue_wait_max: float = 0.0
+    status_counts: Dict[int, int] = field(default_factory=dict)
+
+
+class ProviderClient:
+    """
+    Pooled client for a single provider.
+
+    Mirrors the httpx.AsyncClient request methods so services can use it
+    as a drop-in replacement for a per-call client.
+    """
+
+    def __init__(self, name: str, policy: ProviderPolicy):
+        self.name = name
+        self.policy = policy
+        self.breaker = CircuitBreaker(policy.breaker_failure_threshold, policy.breaker_reset_seconds)
+        self.host_breakers: Dict[str, CircuitBreaker] = {}
+        self.stats = PoolStats()
+        self._client = httpx.AsyncClient(
+            http2=policy.http2 and HTTP2_AVAILABLE,
+            timeout=httpx.Timeout(policy.timeout, connect=policy.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=policy.max_connections,
+                max_keepalive_connections=policy.max_keepalive_connections,
+                keepalive_expiry=policy.keepalive_expiry
+            )
+        )
+
+    @property
+    def is_closed(self) -> bool:
+        return self._client.is_closed
+
+    def _make_trace(self, started: float):
+        """Build an httpcore trace hook recording handshakes and pool queue wait"""
+        waited = False
+
+        async def trace(event_name: str, info: dict):
+            nonlocal waited
+            if not waited and (
+                event_name == "connection.connect_tcp.started"
+                or event_name.endswith("send_request_headers.started")
+            ):
+                # First event after a connection was acquired from the pool
+                waited = True
+                wait = time.monotonic() - started
+                self.stats.queue_wait_total += wait
+                self.stats.queue_wait_max = max(self.stats.queue_wait_max, wait)
+            elif event_name == "connection.connect_tcp.complete":
+                self.stats.tcp_handshakes += 1
+            elif event_name == "connection.start_tls.complete":
+                self.stats.tls_handshakes += 1
+
+        return trace
+
+    def _breaker_for(self, url: str) -> CircuitBreaker:
+        """Provider breaker, or the URL host's breaker with breaker_per_host"""
+        if not self.policy.breaker_per_host:
+            return self.breaker
+        host = httpx.URL(url).host
+        breaker = self.host_breakers.get(host)
+        if breaker is None:
+            breaker = CircuitBreaker(self.policy.breaker_failure_threshold, self.policy.breaker_reset_seconds)
+            self.host_breakers[host] = breaker
+        return breaker
+
+    def _backoff_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.policy.backoff_max)
+        delay = min(self.policy.backoff_base * (2 ** attempt), self.policy.backoff_max)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        retry: Optional[bool] = None,
+        **kwargs
+    ) -> httpx.Response:
+        """
+        Send a request through the provider pool.
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            retry: Override retry behaviour (defaults to retrying idempotent methods only)
+            **kwargs: Passed through to httpx (headers, params, json, timeout, ...)
+
+        Returns:
+            httpx.Response (non-2xx responses are returned, not raised)
+        """
+        method = method.upper()
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        max_retries = self.policy.max_retries if retry else 0
+
+        breaker = self._breaker_for(url)
+        if not breaker.allow_request():
+            self.stats.circuit_rejections += 1
+            raise CircuitOpenError(f"Circuit open for provider '{self.name}' ({httpx.URL(url).host})")
+
+        base_extensions = kwargs.pop("extensions", None) or {}
+
+        attempt = 0
+        while True:
+            started = time.monotonic()
+            self.stats.requests += 1
+            extensions = dict(base_extensions)
+            extensions["trace"] = self._make_trace(started)
+
+            try:
+                response = await self._client.request(method, url, extensions=extensions, **kwargs)
+            except httpx.TransportError as e:
+                if attempt < max_retries:
+                    self.stats.retries += 1
+                    await asyncio.sleep(self._backoff_delay(attempt, None))
+                    attempt += 1
+                    continue
+                self.stats.failures += 1
+                breaker.record_failure()
+                logger.warning(f"{self.name} {method} {url} failed: {e}")
+                raise
+
+            status = response.status_code
+            self.stats.status_counts[status] = self.stats.status_counts.get(status, 0) + 1
+
+            if status in self.policy.retry_statuses and attempt < max_retries:
+                self.stats.retries += 1
+                await response.aclose()
+                await asyncio.sleep(self._backoff_delay(attempt, response))
+                attempt += 1
+                continue
+
+            if status >= 500 or status == 429:
+                self.stats.failures += 1
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+
+            return response
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    def get_stats(self) -> Dict:
+        """Pool and request statistics for this provider"""
+        open_connections = idle_connections = None
+        try:
+            # httpx does not expose pool state publicly; read it from the httpcore pool
+            connections = self._client._transport._pool.connections
+            open_connections = len(connections)
+            idle_connections = sum(1 for c in connections if c.is_idle())
+        except AttributeError:
+            pass
+
+        stats = self.stats
+        return {
+            "provider": self.name,
+            "http2": self.policy.http2 and HTTP2_AVAILABLE,
+            "open_connections": open_connections,
+            "idle_connections": idle_connections,
+            "requests": stats.requests,
+            "retries": stats.retries,
+            "failures": stats.failures,
+            "circuit_state": self.breaker.state,
+            "host_circuit_states": {host: b.state for host, b in self.host_breakers.items()},
+            "circuit_rejections": stats.circuit_rejections,
+            "tcp_handshakes": stats.tcp_handshakes,
+            "tls_handshakes": stats.tls_handshakes,
+            "reuse_ratio": round(1 - stats.tcp_handshakes / stats.requests, 3) if stats.requests else None,
+            "avg_queue_wait_ms": round(stats.queue_wait_total / stats.requests * 1000, 2) if stats.requests else 0.0,
+            "max_queue_wait_ms": round(stats.queue_wait_max * 1000, 2),
+            "status_counts": {str(k): v for k, v in stats.status_counts.items()}
+        }
+
+    async def aclose(self):
+        await self._client.aclose()
+
+
+# Provider clients, created at startup and shared by every service
+_clients: Dict[str, ProviderClient] = {}
+
+
+async def init_http_clients():
+    """Create pooled clients for all configured providers"""
+    for name, policy in PROVIDER_POLICIES.items():
+        if name not in _clients or _clients[name].is_closed:
+            _clients[name] = ProviderClient(name, policy)
+    logger.info(
+        f"✅ Outbound HTTP pools ready for {len(_clients)} providers "
+        f"(http2={'on' if HTTP2_AVAILABLE else 'unavailable'})"
+    )
+
+
+async def close_http_clients():
+    """Close all provider clients and their connections"""
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
+    logger.info("✅ Closed outbound HTTP pools")
+
+
+def get_http_client(provider: str) -> ProviderClient:
+    """
+    Get the shared client for a provider.
+
+    Clients are created lazily when used outside the app lifespan (scripts, shells).
+    """
+    client = _clients.get(provider)
+    if client is None or client.is_closed:
+        policy = PROVIDER_POLICIES.get(provider, ProviderPolicy())
+        client = ProviderClient(provider, policy)
+        _clients[provider] = client
+    return client
+
+
+class _TimeoutScopedClient:
+    """View of a ProviderClient applying a default per-request timeout"""
+
+    def __init__(self, client: ProviderClient, timeout: float):
+        self._client = client
+        self._timeout = timeout
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        kwargs.setdefault("timeout", self._timeout)
+        return await self._client.request(method, url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+
+@asynccontextmanager
+async def provider_client(provider: str, timeout: Optional[float] = None):
+    """
+    Context manager yielding the shared client for a provider.
+
+    Drop-in replacement for `async with httpx.AsyncClient() as client:`;
+    the pooled client stays open on exit.
+
+    Args:
+        provider: Provider name from PROVIDER_POLICIES
+        timeout: Default per-request timeout overriding the provider policy
+    """
+    client = get_http_client(provider)
+    yield client if timeout is None else _TimeoutScopedClient(client, timeout)
+
+
+def get_http_pool_stats() -> Dict[str, Dict]:
+    """Statistics for every provider pool"""
+    return {name: client.get_stats() for name, client in _clients.items()}
@@ -0,0 +1,231 @@
+"""
+Worker roles and scheduler leader election
+Lets the API run as several uvicorn workers / containers while periodic
+financial jobs (balance sync, profit sweeps, backups, TOS monitor) run in
+exactly one process
+
+WORKER_ROLE (environment, default "all"):
+    api        Serve HTTP only, never run scheduled jobs
+    scheduler  Candidate job runner (may also serve HTTP if mounted)
+    all        Serve HTTP and stand for election (single-process default)
+
+Candidates race for a Redis lease; the holder heartbeats it every
+HEARTBEAT_SECONDS and starts the schedulers. If the leader dies, its lease
+expires after LEASE_TTL_SECONDS and another candidate takes over. A leader
+that fails to renew stops its schedulers before anyone else can be elected.
+
+Demotion shuts the schedulers down, which also cancels jobs already running:
+APScheduler's asyncio executor cancels its in-flight coroutine jobs and the
+delayed-job runner cancels its handlers. Cancellation lands at the job's next
+await, so a database write already sent still completes; money writes go
+through fenced locks (app.core.locks), which reject a stale holder once the
+new leader has written. Synchronous jobs run in threads and finish.
+
+While no candidate can reach Redis nobody is leader and no scheduled job
+runs; failed election attempts are logged as warnings (rate limited) and
+/admin/scheduler/status reports the missing leader.
+"""
+
+from datetime import datetime
+from typing import Callable, Dict, Optional
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+
+from app.core import locks
+
+logger = logging.getLogger(__name__)
+
+ROLE_API = "api"
+ROLE_SCHEDULER = "scheduler"
+ROLE_ALL = "all"
+WORKER_ROLES = (ROLE_API, ROLE_SCHEDULER, ROLE_ALL)
+
+LEADER_LOCK = "leader:scheduler"
+LEASE_TTL_SECONDS = 15.0
+HEARTBEAT_SECONDS = 5.0
+ELECTION_WARNING_INTERVAL_SECONDS = 60.0  # Repeated election failures log at most this often
+
+
+def get_worker_role() -> str:
+    """Role of this process from WORKER_ROLE (unknown values fall back to "all")"""
+    role = os.getenv("WORKER_ROLE", ROLE_ALL).strip().lower()
+    if role not in WORKER_ROLES:
+        logger.warning(f"Unknown WORKER_ROLE '{role}', using '{ROLE_ALL}'")
+        return ROLE_ALL
+    return role
+
+
+class LeaderElector:
+    """Redis lease based leader election with heartbeats and failover"""
+
+    def __init__(
+        self,
+        on_elected: Callable[[], None],
+        on_demoted: Callable[[], None],
+        name: str = LEADER_LOCK,
+        ttl: float = LEASE_TTL_SECONDS,
+        heartbeat: float = HEARTBEAT_SECONDS
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.heartbeat = heartbeat
+        self.instance_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._on_elected = on_elected
+        self._on_demoted = on_demoted
+        self._task: Optional[asyncio.Task] = None
+        self.is_leader = False
+        self.term: Optional[int] = None  # Fencing token of the current leadership
+        self.leader_since: Optional[datetime] = None
+        self.last_heartbeat: Optional[datetime] = None
+        self.elections_won = 0
+        self.election_failures = 0  # Consecutive failed election attempts
+        self.last_election_error: Optional[str] = None
+        self._last_failure_warning: Optional[float] = None
+
+    def start(self):
+        """Start campaigning in the background"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"✅ Standing for scheduler leadership as {self.instance_id}")
+
+    async def stop(self):
+        """Stop campaigning and hand leadership over immediately"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self.is_leader:
+            self._demote("shutting down")
+            try:
+                await locks.release(self.name, self.instance_id)
+            except Exception as e:
+                # Lease expires on its own after ttl
+                logger.warning(f"Failed to release scheduler leadership: {e}")
+
+    def _promote(self, term: int):
+        self.is_leader = True
+        self.term = term
+        self.leader_since = datetime.utcnow()
+        self.last_heartbeat = self.leader_since
+        self.elections_won += 1
+        logger.info(f"✅ Elected scheduler leader (term {term}) - starting scheduled jobs")
+        try:
+            self._on_elected()
+        except Exception as e:
+            logger.error(f"Failed to start scheduled jobs after election: {e}", exc_info=True)
+
+    def _demote(self, reason: str):
+        self.is_leader = False
+        self.leader_since = None
+        logger.warning(f"Scheduler leadership lost ({reason}) - stopping scheduled jobs")
+        try:
+            self._on_demoted()
+        except Exception as e:
+            logger.error(f"Failed to stop scheduled jobs after demotion: {e}", exc_info=True)
+
+    async def _tick(self):
+        if self.is_leader:
+            try:
+                renewed = await locks.renew(self.name, self.instance_id, self.ttl)
+            except Exception as e:
+                logger.warning(f"Scheduler leader heartbeat failed: {e}")
+                # Step down before the lease can expire and another leader start
+                elapsed = (datetime.utcnow() - self.last_heartbeat).total_seconds()
+                if elapsed + self.heartbeat >= self.ttl:
+                    self._demote("heartbeat timed out")
+                return
+
+            if renewed:
+                self.last_heartbeat = datetime.utcnow()
+            else:
+                self._demote("lease taken over")
+            return
+
+        try:
+            term = await locks.try_acquire(self.name, self.instance_id, self.ttl)
+        except Exception as e:
+            self._election_failed(e)
+            return
+
+        if self.election_failures:
+            logger.info(f"Scheduler election reachable again after {self.election_failures} failed attempts")
+            self.election_failures = 0
+            self.last_election_error = None
+            self._last_failure_warning = None
+
+        if term:
+            self._promote(term)
+
+    def _election_failed(self, error: Exception):
+        """Count a failed election attempt, warning at most once per interval"""
+        self.election_failures += 1
+        self.last_election_error = str(error) or type(error).__name__
+
+        now = time.monotonic()
+        if self._last_failure_warning is None or now - self._last_failure_warning >= ELECTION_WARNING_INTERVAL_SECONDS:
+            self._last_failure_warning = now
+            logger.warning(
+                f"Scheduler election failed ({self.election_failures} attempts in a row): "
+                f"{self.last_election_error} - scheduled jobs are not running on this instance"
+            )
+
+    async def _run(self):
+        while True:
+            await self._tick()
+            await asyncio.sleep(self.heartbeat)
+
+    def get_status(self) -> Dict:
+        """Leadership state of this process"""
+        return {
+            "instance_id": self.instance_id,
+            "is_leader": self.is_leader,
+            "term": self.term if self.is_leader else None,
+            "leader_since": self.leader_since.isoformat() if self.leader_since else None,
+            "last_heartbeat": self.last_heartbeat.isoformat() if self.is_leader and self.last_heartbeat else None,
+            "elections_won": self.elections_won,
+            "election_failures": self.election_failures,
+            "last_election_error": self.last_election_error
+        }
+
+
+# Process elector, created by the app lifespan for scheduler-capable roles
+elector: Optional[LeaderElector] = None
+
+
+async def get_leader_status() -> Dict:
+    """
+    Worker role, local leadership state and the current cluster leader.
+
+    Returns:
+        Dict with role, this instance's state, the leader's instance id and
+        has_leader (False, with a warning, when nobody holds the lease)
+    """
+    from app.core.redis import get_redis
+
+    current_leader = None
+    leader_error = None
+    try:
+        current_leader = await get_redis().get(locks.LOCK_KEY.format(name=LEADER_LOCK))
+    except Exception as e:
+        leader_error = str(e) or type(e).__name__
+        logger.warning(f"Failed to read scheduler leader: {e}")
+
+    status = {
+        "role": get_worker_role(),
+        "instance": elector.get_status() if elector else None,
+        "current_leader": current_leader,
+        "has_leader": current_leader is not None
+    }
+    if current_leader is None:
+        status["warning"] = "No scheduler leader - scheduled jobs are not running"
+        if leader_error:
+            status["error"] = leader_error
+    return status
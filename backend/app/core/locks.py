@@ -0,0 +1,444 @@
+"""
+Distributed lease locks
+Redis-backed mutual exclusion shared by every API worker, with fencing tokens,
+automatic TTL renewal and lock-wait metrics
+
+A lease is held for at most its TTL unless the holder keeps renewing it, so a
+crashed worker never blocks an exchanger for longer than one TTL. Every
+successful acquisition returns a monotonically increasing fencing token
+(kept in MongoDB's counters collection, so Redis evictions and restarts
+cannot reset it below tokens already stored on documents); writes guarded by `versioned_update(..., fence=token)` are rejected once a
+newer holder has written, even if an old holder resumes after a long pause.
+
+When Redis is unreachable the lock degrades to a process-local asyncio.Lock
+and correctness across workers rests on the optimistic version check in
+`versioned_update` (set FALLBACK_TO_OPTIMISTIC = False to fail instead).
+"""
+
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+import asyncio
+import logging
+import os
+import random
+import time
+import uuid
+import weakref
+
+from pymongo import ReturnDocument
+
+from app.core import database
+from app.core.redis import get_redis
+
+logger = logging.getLogger(__name__)
+
+LOCK_KEY = "lock:{name}"
+FENCE_SEQUENCE = "lock_fence:{name}"  # counters collection _id
+LEGACY_FENCE_KEY = "lock:fence:{name}"  # Redis counter used before fences moved to MongoDB
+
+DEFAULT_TTL_SECONDS = 30.0
+DEFAULT_TIMEOUT_SECONDS = 15.0
+RETRY_MIN_SECONDS = 0.02
+RETRY_MAX_SECONDS = 0.5
+
+# Degrade to process-local locks + optimistic version checks when Redis is down
+FALLBACK_TO_OPTIMISTIC = True
+
+# KEYS[1] = lock, ARGV = owner, ttl_ms
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# KEYS[1] = lock, ARGV = owner
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LockError(Exception):
+    """Base class for lease lock errors"""
+
+
+class LockAcquireTimeout(LockError):
+    """Raised when a lease could not be acquired within the timeout"""
+
+
+class LockLostError(LockError):
+    """Raised when a lease expired or was taken over while held"""
+
+
+class StaleLeaseError(LockError):
+    """Raised when a write carries an older fencing token than the document"""
+
+
+class ConcurrentUpdateError(LockError):
+    """Raised when an optimistic update keeps losing to concurrent writers"""
+
+
+@dataclass
+class Lease:
+    """A held lock"""
+
+    name: str
+    owner: str
+    token: int  # Fencing token (0 for process-local fallback leases)
+    distributed: bool
+    ttl: float
+    lost: bool = False
+
+    @property
+    def fence(self) -> Optional[int]:
+        """Fencing token to pass to versioned_update (None when not distributed)"""
+        return self.token if self.distributed else None
+
+    def ensure_held(self):
+        """Raise LockLostError if the lease can no longer be trusted"""
+        if self.lost:
+            raise LockLostError(f"Lease on '{self.name}' was lost")
+
+
+@dataclass
+class LockStats:
+    """Counters per lock namespace (the part of the name before the first ':')"""
+
+    acquisitions: int = 0
+    contended: int = 0
+    timeouts: int = 0
+    renewals: int = 0
+    lost: int = 0
+    local_fallbacks: int = 0
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+    hold_total: float = 0.0
+    hold_max: float = 0.0
+
+
+_stats: Dict[str, LockStats] = {}
+
+# Leases held by the current task, so nested acquisitions of the same name re-enter
+_held: ContextVar[Optional[Dict[str, Lease]]] = ContextVar("held_leases", default=None)
+
+# Process-local fallback locks; entries disappear once nobody holds or waits on them
+_local_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+_scripts = {}
+_scripts_client = None
+
+_owner_prefix = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+def _stats_for(name: str) -> LockStats:
+    namespace = name.split(":", 1)[0]
+    if namespace not in _stats:
+        _stats[namespace] = LockStats()
+    return _stats[namespace]
+
+
+def _get_script(name: str, source: str):
+    global _scripts, _scripts_client
+    redis = get_redis()
+    if redis is None:
+        raise ConnectionError("Redis is not connected")
+    if redis is not _scripts_client:
+        # Scripts are bound to a client; re-register after reconnects
+        _scripts_client = redis
+        _scripts = {}
+    if name not in _scripts:
+        _scripts[name] = redis.register_script(source)
+    return _scripts[name]
+
+
+async def _next_fence(name: str) -> int:
+    """Next fencing token for `name`"""
+    sequence = FENCE_SEQUENCE.format(name=name)
+    fence = await database.get_next_sequence(sequence)
+    if fence == 1:
+        # First lease since the counter moved to MongoDB: continue past the
+        # tokens the old Redis counter handed out
+        legacy = await get_redis().get(LEGACY_FENCE_KEY.format(name=name))
+        if legacy and int(legacy) >= fence:
+            fence = int(legacy) + 1
+            await database.db.counters.update_one({"_id": sequence}, {"$max": {"sequence_value": fence}})
+    return fence
+
+
+async def try_acquire(name: str, owner: str, ttl: float) -> int:
+    """
+    Single non-blocking attempt to take a lease.
+
+    Args:
+        name: Lock name
+        owner: Unique owner value (only this owner can renew or release)
+        ttl: Lease time-to-live in seconds
+
+    Returns:
+        Fencing token, or 0 if the lock is held by someone else
+    """
+    redis = get_redis()
+    if redis is None:
+        raise ConnectionError("Redis is not connected")
+    if not await redis.set(LOCK_KEY.format(name=name), owner, nx=True, px=int(ttl * 1000)):
+        return 0
+
+    try:
+        return await _next_fence(name)
+    except BaseException:
+        # Without a token the lease is useless; let the next caller have it
+        await release(name, owner)
+        raise
+
+
+async def renew(name: str, owner: str, ttl: float) -> bool:
+    """Extend a lease; False if `owner` no longer holds it"""
+    renewed = await _get_script("renew", RENEW_SCRIPT)(
+        keys=[LOCK_KEY.format(name=name)],
+        args=[owner, int(ttl * 1000)]
+    )
+    return bool(renewed)
+
+
+async def release(name: str, owner: str) -> bool:
+    """Release a lease; False if `owner` no longer held it"""
+    released = await _get_script("release", RELEASE_SCRIPT)(
+        keys=[LOCK_KEY.format(name=name)],
+        args=[owner]
+    )
+    return bool(released)
+
+
+async def _renew_loop(lease: Lease, stats: LockStats):
+    """Extend the lease every third of its TTL until cancelled"""
+    interval = lease.ttl / 3
+    expires_at = time.monotonic() + lease.ttl
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            renewed = await renew(lease.name, lease.owner, lease.ttl)
+        except Exception as e:
+            logger.warning(f"Failed to renew lease on '{lease.name}': {e}")
+            if time.monotonic() < expires_at:
+                continue
+            renewed = False
+
+        if not renewed:
+            lease.lost = True
+            stats.lost += 1
+            logger.error(f"Lease on '{lease.name}' lost (token {lease.token})")
+            return
+
+        stats.renewals += 1
+        expires_at = time.monotonic() + lease.ttl
+
+
+async def _acquire_distributed(name: str, owner: str, ttl: float, timeout: float, stats: LockStats) -> int:
+    deadline = time.monotonic() + timeout
+    delay = RETRY_MIN_SECONDS
+    contended = False
+
+    while True:
+        token = await try_acquire(name, owner, ttl)
+        if token:
+            if contended:
+                stats.contended += 1
+            return token
+
+        contended = True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            stats.timeouts += 1
+            raise LockAcquireTimeout(f"Timed out after {timeout}s waiting for lock '{name}'")
+
+        # Jittered exponential backoff so waiters do not retry in lockstep
+        await asyncio.sleep(min(delay, remaining) * random.uniform(0.5, 1.0))
+        delay = min(delay * 2, RETRY_MAX_SECONDS)
+
+
+@asynccontextmanager
+async def lease_lock(
+    name: str,
+    ttl: float = DEFAULT_TTL_SECONDS,
+    timeout: float = DEFAULT_TIMEOUT_SECONDS
+):
+    """
+    Hold a distributed lease for the duration of the block.
+
+    Re-entrant within a task: nested `lease_lock(name)` calls reuse the
+    outer lease. The lease is renewed in the background, so blocks may
+    outlive `ttl`; check `lease.ensure_held()` before irreversible steps.
+
+    Args:
+        name: Lock name, namespaced by its first segment (e.g., "exchanger:123")
+        ttl: Lease time-to-live in seconds
+        timeout: Maximum seconds to wait for the lock
+
+    Yields:
+        Lease
+
+    Raises:
+        LockAcquireTimeout: Lock not acquired within timeout
+    """
+    held = _held.get() or {}
+    if name in held:
+        yield held[name]
+        return
+
+    stats = _stats_for(name)
+    owner = f"{_owner_prefix}-{uuid.uuid4().hex[:12]}"
+    started = time.monotonic()
+    local_lock = None
+
+    try:
+        token = await _acquire_distributed(name, owner, ttl, timeout, stats)
+        lease = Lease(name=name, owner=owner, token=token, distributed=True, ttl=ttl)
+    except LockAcquireTimeout:
+        raise
+    except Exception as e:
+        if not FALLBACK_TO_OPTIMISTIC:
+            raise LockError(f"Could not acquire lock '{name}': {e}") from e
+        logger.warning(f"Redis lock unavailable for '{name}', using local lock: {e}")
+        stats.local_fallbacks += 1
+        local_lock = _local_locks.get(name)
+        if local_lock is None:
+            local_lock = asyncio.Lock()
+            _local_locks[name] = local_lock
+        try:
+            await asyncio.wait_for(local_lock.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            raise LockAcquireTimeout(f"Timed out after {timeout}s waiting for lock '{name}'")
+        lease = Lease(name=name, owner=owner, token=0, distributed=False, ttl=ttl)
+
+    acquired_at = time.monotonic()
+    wait = acquired_at - started
+    stats.acquisitions += 1
+    stats.wait_total += wait
+    stats.wait_max = max(stats.wait_max, wait)
+
+    renewer = asyncio.create_task(_renew_loop(lease, stats)) if lease.distributed else None
+    context_token = _held.set({**held, name: lease})
+
+    try:
+        yield lease
+    finally:
+        _held.reset(context_token)
+        held_for = time.monotonic() - acquired_at
+        stats.hold_total += held_for
+        stats.hold_max = max(stats.hold_max, held_for)
+
+        if renewer:
+            renewer.cancel()
+            try:
+                await release(name, owner)
+            except Exception as e:
+                # The lease expires on its own after ttl
+                logger.warning(f"Failed to release lease on '{name}': {e}")
+        if local_lock:
+            local_lock.release()
+
+
+def exchanger_lock(user_id: str, **kwargs):
+    """
+    Lease serialising balance changes for one exchanger across all workers.
+
+    Args:
+        user_id: Exchanger Discord ID
+    """
+    return lease_lock(f"exchanger:{user_id}", **kwargs)
+
+
+async def versioned_update(
+    collection,
+    query: Dict,
+    compute: Callable[[Dict], Optional[Dict]],
+    fence: Optional[int] = None,
+    max_attempts: int = 5
+) -> Optional[Dict]:
+    """
+    Optimistic read-modify-write of a single document.
+
+    Reads the document, applies `compute` and writes the result only if the
+    document's `version` is unchanged, retrying from a fresh read otherwise.
+    With `fence`, the write is also rejected once a holder with a newer
+    fencing token has written the document.
+
+    Args:
+        collection: Motor collection
+        query: Filter selecting the document
+        compute: Function of the current document returning fields to $set
+                 (None to skip the write); may raise to abort
+        fence: Fencing token of the lease guarding the write
+        max_attempts: Attempts before giving up
+
+    Returns:
+        Updated document, the unchanged document if compute returned None,
+        or None if no document matched
+
+    Raises:
+        StaleLeaseError: A newer lease holder has written the document
+        ConcurrentUpdateError: Lost the race max_attempts times
+    """
+    for attempt in range(max_attempts):
+        doc = await collection.find_one(query)
+        if doc is None:
+            return None
+
+        changes = compute(doc)
+        if changes is None:
+            return doc
+
+        # Matches documents written before versioning (no field) as version None
+        update_filter = {"_id": doc["_id"], "version": doc.get("version")}
+        changes = dict(changes)
+        if fence is not None:
+            update_filter["$or"] = [
+                {"lock_fence": {"$exists": False}},
+                {"lock_fence": {"$lte": fence}}
+            ]
+            changes["lock_fence"] = fence
+
+        updated = await collection.find_one_and_update(
+            update_filter,
+            {"$set": changes, "$inc": {"version": 1}},
+            return_document=ReturnDocument.AFTER
+        )
+        if updated is not None:
+            return updated
+
+        if fence is not None:
+            current = await collection.find_one({"_id": doc["_id"]}, {"lock_fence": 1})
+            if current and current.get("lock_fence", 0) > fence:
+                raise StaleLeaseError(
+                    f"Fencing token {fence} is older than {current['lock_fence']} on {doc['_id']}"
+                )
+
+        await asyncio.sleep(random.uniform(0, RETRY_MIN_SECONDS * (attempt + 1)))
+
+    raise ConcurrentUpdateError(f"Document {query} changed concurrently {max_attempts} times")
+
+
+def get_lock_stats() -> Dict[str, Dict]:
+    """Lock statistics per namespace"""
+    return {
+        namespace: {
+            "acquisitions": stats.acquisitions,
+            "contended": stats.contended,
+            "timeouts": stats.timeouts,
+            "renewals": stats.renewals,
+            "lost": stats.lost,
+            "local_fallbacks": stats.local_fallbacks,
+            "avg_wait_ms": round(stats.wait_total / stats.acquisitions * 1000, 2) if stats.acquisitions else 0.0,
+            "max_wait_ms": round(stats.wait_max * 1000, 2),
+            "avg_hold_ms": round(stats.hold_total / stats.acquisitions * 1000, 2) if stats.acquisitions else 0.0,
+            "max_hold_ms": round(stats.hold_max * 1000, 2),
+        }
+        for namespace, stats in _stats.items()
+    }
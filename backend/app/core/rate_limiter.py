@@ -1,10 +1,19 @@
 """
-Rate Limiter - Token bucket rate limiting using Redis
+Rate Limiter - Atomic Redis rate limiting (sliding window, GCRA, token bucket)
 Prevents abuse and ensures fair API usage
+
+Each check-and-record is a single Lua script call (one round trip, atomic
+under concurrency). Keys that were just denied are short-circuited by an
+in-process pre-filter until their retry time passes.
 """
 
+import itertools
+import math
+import os
 import time
-from typing import Optional, Tuple
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
 from functools import wraps
 from fastapi import HTTPException, Request, status
 import logging
@@ -13,74 +22,233 @@ from app.core.redis import get_redis
 
 logger = logging.getLogger(__name__)
 
+SLIDING_WINDOW = "sliding_window"
+GCRA = "gcra"
+TOKEN_BUCKET = "token_bucket"
+
+# KEYS[1] = zset, ARGV = now_ms, window_ms, limit, member
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+local count = redis.call('ZCARD', KEYS[1])
+
+if count >= limit then
+    local retry = window
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    if oldest[2] then
+        retry = tonumber(oldest[2]) + window - now
+    end
+    return {0, 0, math.ceil(retry)}
+end
+
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], math.ceil(window) + 1000)
+return {1, limit - count - 1, 0}
+"""
+
+# KEYS[1] = theoretical arrival time, ARGV = now_ms, window_ms, limit
+GCRA_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local emission = window / limit
+
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+
+local new_tat = tat + emission
+local allow_at = new_tat - window
+if allow_at > now then
+    return {0, 0, math.ceil(allow_at - now)}
+end
+
+redis.call('SET', KEYS[1], tostring(new_tat), 'PX', math.ceil(new_tat - now) + 1000)
+return {1, math.floor((now - allow_at) / emission), 0}
+"""
+
+# KEYS[1] = hash {tokens, ts}, ARGV = now_ms, window_ms, limit
+TOKEN_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local capacity = tonumber(ARGV[3])
+local rate = capacity / window
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry = math.ceil((1 - tokens) / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(window) + 1000)
+return {allowed, math.floor(tokens), retry}
+"""
+
+SCRIPTS = {
+    SLIDING_WINDOW: SLIDING_WINDOW_SCRIPT,
+    GCRA: GCRA_SCRIPT,
+    TOKEN_BUCKET: TOKEN_BUCKET_SCRIPT,
+}
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a rate limit check"""
+
+    allowed: bool
+    remaining: int
+    retry_after_ms: int = 0
+    local: bool = False  # Decided by the in-process pre-filter without Redis
+
+    @property
+    def retry_after(self) -> Optional[int]:
+        """Retry-After in whole seconds (None when allowed)"""
+        if self.allowed:
+            return None
+        return max(1, math.ceil(self.retry_after_ms / 1000))
+
 
 class RateLimiter:
-    """Token bucket rate limiter using Redis"""
+    """Atomic Redis rate limiter with an in-process pre-filter"""
 
-    def __init__(self):
-        self.redis = None
+    # Upper bound on keys remembered by the pre-filter
+    LOCAL_MAX_KEYS = 10000
 
-    async def check_rate_limit(
+    def __init__(self, algorithm: str = SLIDING_WINDOW):
+        if algorithm not in SCRIPTS:
+            raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.redis = None
+        self._scripts = {}
+        # key -> monotonic time until which the key is known to be over limit
+        self._blocked_until: Dict[str, float] = {}
+        # Unique sliding-window members even for same-millisecond requests across workers
+        self._member_prefix = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._member_counter = itertools.count()
+        self.stats = {"redis_checks": 0, "local_rejections": 0, "denied": 0, "errors": 0}
+
+    def _get_script(self, algorithm: str):
+        redis = get_redis()
+        if redis is not self.redis:
+            # Scripts are bound to a client; re-register after reconnects
+            self.redis = redis
+            self._scripts = {}
+        if algorithm not in self._scripts:
+            self._scripts[algorithm] = self.redis.register_script(SCRIPTS[algorithm])
+        return self._scripts[algorithm]
+
+    def _check_local(self, redis_key: str) -> Optional[RateLimitResult]:
+        blocked_until = self._blocked_until.get(redis_key)
+        if blocked_until is None:
+            return None
+        remaining_ms = (blocked_until - time.monotonic()) * 1000
+        if remaining_ms <= 0:
+            self._blocked_until.pop(redis_key, None)
+            return None
+        self.stats["local_rejections"] += 1
+        return RateLimitResult(allowed=False, remaining=0, retry_after_ms=math.ceil(remaining_ms), local=True)
+
+    def _block_locally(self, redis_key: str, retry_after_ms: int):
+        if len(self._blocked_until) >= self.LOCAL_MAX_KEYS:
+            now = time.monotonic()
+            self._blocked_until = {k: v for k, v in self._blocked_until.items() if v > now}
+            if len(self._blocked_until) >= self.LOCAL_MAX_KEYS:
+                return
+        self._blocked_until[redis_key] = time.monotonic() + retry_after_ms / 1000
+
+    async def hit(
         self,
         key: str,
         max_requests: int,
-        window_seconds: int
-    ) -> Tuple[bool, Optional[int]]:
+        window_seconds: float,
+        algorithm: Optional[str] = None
+    ) -> RateLimitResult:
         """
-        Check if request is within rate limit.
+        Check a rate limit and record the request if allowed.
 
         Args:
             key: Rate limit key (e.g., "user:123:api_general")
-            max_requests: Maximum requests allowed
-            window_seconds: Time window in seconds
+            max_requests: Maximum requests allowed (bucket capacity / burst)
+            window_seconds: Time window in seconds (sub-second values allowed)
+            algorithm: sliding_window, gcra or token_bucket (defaults to the limiter's)
 
         Returns:
-            Tuple of (is_allowed, retry_after_seconds)
+            RateLimitResult
         """
-        if not self.redis:
-            self.redis = get_redis()
+        algorithm = algorithm or self.algorithm
+        redis_key = f"rate_limit:{algorithm}:{key}"
 
-        current_time = int(time.time())
-        window_start = current_time - window_seconds
+        local = self._check_local(redis_key)
+        if local:
+            return local
 
-        # Redis key for this rate limit
-        redis_key = f"rate_limit:{key}"
+        now_ms = time.time() * 1000
+        window_ms = window_seconds * 1000
+        args = [f"{now_ms:.3f}", f"{window_ms:.3f}", max_requests]
+        if algorithm == SLIDING_WINDOW:
+            args.append(f"{now_ms:.3f}-{self._member_prefix}-{next(self._member_counter)}")
 
         try:
-            # Remove old requests outside window
-            await self.redis.zremrangebyscore(redis_key, 0, window_start)
+            script = self._get_script(algorithm)
+            self.stats["redis_checks"] += 1
+            allowed, remaining, retry_after_ms = await script(keys=[redis_key], args=args)
 
-            # Count requests in current window
-            request_count = await self.redis.zcard(redis_key)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Rate limit check failed: {e}")
+            # Fail open - allow request if Redis fails
+            return RateLimitResult(allowed=True, remaining=max_requests)
 
-            if request_count >= max_requests:
-                # Get oldest request timestamp
-                oldest = await self.redis.zrange(redis_key, 0, 0, withscores=True)
-                if oldest:
-                    retry_after = int(oldest[0][1]) + window_seconds - current_time
-                    return False, max(0, retry_after)
-                return False, window_seconds
+        if not allowed:
+            self.stats["denied"] += 1
+            self._block_locally(redis_key, int(retry_after_ms))
+            return RateLimitResult(allowed=False, remaining=0, retry_after_ms=int(retry_after_ms))
 
-            # Add current request
-            await self.redis.zadd(redis_key, {str(current_time): current_time})
+        return RateLimitResult(allowed=True, remaining=int(remaining))
 
-            # Set expiry on key
-            await self.redis.expire(redis_key, window_seconds + 10)
+    async def check_rate_limit(
+        self,
+        key: str,
+        max_requests: int,
+        window_seconds: int,
+        algorithm: Optional[str] = None
+    ) -> Tuple[bool, Optional[int]]:
+        """
+        Check if request is within rate limit.
 
-            return True, None
+        Args:
+            key: Rate limit key (e.g., "user:123:api_general")
+            max_requests: Maximum requests allowed
+            window_seconds: Time window in seconds
+            algorithm: sliding_window, gcra or token_bucket (defaults to the limiter's)
 
-        except Exception as e:
-            logger.error(f"Rate limit check failed: {e}")
-            # Fail open - allow request if Redis fails
-            return True, None
+        Returns:
+            Tuple of (is_allowed, retry_after_seconds)
+        """
+        result = await self.hit(key, max_requests, window_seconds, algorithm)
+        return result.allowed, result.retry_after
 
     async def reset_rate_limit(self, key: str):
-        """Reset rate limit for key"""
-        if not self.redis:
-            self.redis = get_redis()
+        """Reset rate limit for key (all algorithms)"""
+        redis_keys = [f"rate_limit:{algorithm}:{key}" for algorithm in SCRIPTS]
+        for redis_key in redis_keys:
+            self._blocked_until.pop(redis_key, None)
 
-        redis_key = f"rate_limit:{key}"
-        await self.redis.delete(redis_key)
+        await get_redis().delete(*redis_keys)
 
 
 # Global rate limiter instance
@@ -90,7 +258,8 @@ rate_limiter = RateLimiter()
 def rate_limit(
     max_requests: int,
     window_seconds: int,
-    key_func=None
+    key_func=None,
+    algorithm: Optional[str] = None
 ):
     """
     Rate limit decorator for FastAPI routes.
@@ -99,6 +268,7 @@ def rate_limit(
         max_requests: Maximum requests allowed
         window_seconds: Time window in seconds
         key_func: Optional function to generate custom key
+        algorithm: sliding_window (default), gcra or token_bucket
 
     Example:
         @rate_limit(max_requests=10, window_seconds=60)
@@ -130,7 +300,7 @@ def rate_limit(
 
             # Check rate limit
             is_allowed, retry_after = await rate_limiter.check_rate_limit(
-                key, max_requests, window_seconds
+                key, max_requests, window_seconds, algorithm
             )
 
             if not is_allowed:
@@ -146,7 +316,7 @@ def rate_limit(
     return decorator
 
 
-def user_rate_limit(max_requests: int, window_seconds: int):
+def user_rate_limit(max_requests: int, window_seconds: int, algorithm: Optional[str] = None):
     """
     Rate limit decorator for authenticated routes.
     Uses user ID as key.
@@ -165,4 +335,4 @@ def user_rate_limit(max_requests: int, window_seconds: int):
         # Fallback to IP
         return f"ip:{request.client.host}:{request.url.path}"
 
-    return rate_limit(max_requests, window_seconds, key_func)
+    return rate_limit(max_requests, window_seconds, key_func, algorithm)
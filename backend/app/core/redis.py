@@ -14,10 +14,14 @@ logger = logging.getLogger(__name__)
 # Redis client
 redis_client: redis.Redis = None
 
+# Client without response decoding, for binary cache payloads (app.core.cache)
+redis_binary_client: redis.Redis = None
+BINARY_POOL_MAX_CONNECTIONS = 20
+
 
 async def connect_to_redis():
     """Connect to Redis with optimized connection pooling"""
-    global redis_client
+    global redis_client, redis_binary_client
     try:
         # Create connection pool with optimal settings
         pool = redis.ConnectionPool(
@@ -37,6 +41,20 @@ async def connect_to_redis():
         # Create Redis client with connection pool
         redis_client = redis.Redis(connection_pool=pool)
         await redis_client.ping()
+
+        binary_pool = redis.ConnectionPool(
+            host="afroo-redis-prod",
+            port=6379,
+            password=settings.REDIS_PASSWORD,
+            db=0,
+            decode_responses=False,
+            max_connections=BINARY_POOL_MAX_CONNECTIONS,
+            socket_keepalive=True,
+            socket_connect_timeout=5,
+            retry_on_timeout=True,
+            health_check_interval=30
+        )
+        redis_binary_client = redis.Redis(connection_pool=binary_pool)
         logger.info("✅ Connected to Redis with connection pool (max_connections=50)")
     except Exception as e:
         logger.error(f"❌ Failed to connect to Redis: {e}")
@@ -45,7 +63,10 @@ async def connect_to_redis():
 
 async def close_redis_connection():
     """Close Redis connection"""
-    global redis_client
+    global redis_client, redis_binary_client
+    if redis_binary_client:
+        await redis_binary_client.close()
+        redis_binary_client = None
     if redis_client:
         await redis_client.close()
         logger.info("✅ Closed Redis connection")
@@ -56,6 +77,11 @@ def get_redis():
     return redis_client
 
 
+def get_binary_redis():
+    """Get the Redis client that returns raw bytes (cache payloads)"""
+    return redis_binary_client
+
+
 # Redis key patterns
 class RedisKeys:
     """Redis key naming patterns"""
@@ -66,9 +92,17 @@ class RedisKeys:
 
     # Caching
     USER_CACHE = "cache:user:{discord_id}"
+    AUTH_IDENTITY = "cache:auth:{discord_id}"
     WALLET_BALANCE = "cache:wallet:{address}:balance"
     EXCHANGE_RATE = "cache:rate:{from_currency}:{to_currency}"
     PARTNER_BRANDING = "cache:partner:{slug}:branding"
+    PRICE_SNAPSHOT = "prices:{feed}"  # Last good price snapshot (JSON, no TTL)
+    CACHE_ENTRY = "cache:{prefix}v{version}:{key}"  # Read-through entries (CacheService.get_or_load)
+    CACHE_VERSION = "cache:version:{prefix}"
+    CACHE_GENERATION = "cache:gen:{prefix}{key}"  # Bumped by CacheService.invalidate so in-flight loads don't store
+    CACHE_TAG = "cache:tag:{tag}"  # SET of cache keys registered under a tag (CacheService.invalidate_tag)
+    CACHE_NAMESPACES = "cache:namespaces"  # SET of every prefix written, walked by clear_all_cache
+    CACHE_INVALIDATION_CHANNEL = "cache:invalidate"  # Pub/sub, drops in-process copies on other workers
 
     # Rate limiting
     RATE_LIMIT = "ratelimit:{identifier}:{window}"
@@ -79,11 +113,19 @@ class RedisKeys:
 
     # Queues
     NOTIFICATION_QUEUE = "queue:notifications"
+    COMPLETION_EVENTS = "stream:notifications:completions"
+    COMPLETION_EVENTS_DEAD = "stream:notifications:completions:dead"
+    TATUM_WEBHOOK_EVENTS = "stream:webhooks:tatum"
+    TATUM_WEBHOOK_EVENTS_DEAD = "stream:webhooks:tatum:dead"
+    SWAP_STATUS_EVENTS = "stream:swaps:status"
+    SWAP_STATUS_CURSOR = "stream:swaps:status:cursor:{consumer}"  # Last cursor a consumer passed
     BLOCKCHAIN_MONITOR_QUEUE = "queue:blockchain:monitor"
 
     # Locks
     WALLET_LOCK = "lock:wallet:{wallet_id}"
     EXCHANGE_LOCK = "lock:exchange:{exchange_id}"
+    CACHE_LOAD_LOCK = "lock:cache:{key}"
+    PRICE_REFRESH_LOCK = "lock:prices:{feed}"
 
 
 class CacheService:
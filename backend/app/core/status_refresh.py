@@ -0,0 +1,169 @@
+"""
+Status refresh engine - polls in-flight records against their provider
+Used for ChangeNOW swaps and on-chain withdrawals
+
+Each record carries a next_check_at time; a tick loads only the records that
+are due (oldest first), runs the provider lookups with bounded concurrency and
+writes every result with one unordered bulk_write. The polling interval adapts
+to the record's age: fast right after creation, backing off for records that
+stay in flight, and back to the fastest interval whenever the status moves.
+
+Writes are guarded on the status the record had when it was read, so a
+webhook or manual refresh that got there first wins. Status transitions are
+tagged with the tick ID and their side effects (stats, notifications) only run
+for the transitions this tick actually applied.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import asyncio
+import logging
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.core.database import get_db_collection
+
+logger = logging.getLogger(__name__)
+
+# (record age below, check interval) pairs, youngest first
+DEFAULT_INTERVALS: Tuple[Tuple[timedelta, timedelta], ...] = (
+    (timedelta(minutes=30), timedelta(minutes=1)),
+    (timedelta(hours=2), timedelta(minutes=5)),
+    (timedelta(hours=24), timedelta(minutes=15)),
+)
+DEFAULT_MAX_INTERVAL = timedelta(hours=1)
+
+# Returns the fields to $set, or None when the provider lookup failed
+CheckFn = Callable[[Dict], Awaitable[Optional[Dict]]]
+# Runs once per applied status transition with (record before, fields set)
+TransitionFn = Callable[[Dict, Dict], Awaitable[None]]
+
+
+@dataclass
+class StatusRefresher:
+    """Adaptive, batched poller for one collection of in-flight records"""
+
+    name: str
+    collection: str
+    active_statuses: List[str]
+    check: CheckFn
+    on_transition: Optional[TransitionFn] = None
+    age_field: str = "created_at"
+    intervals: Tuple[Tuple[timedelta, timedelta], ...] = DEFAULT_INTERVALS
+    max_interval: timedelta = DEFAULT_MAX_INTERVAL
+    concurrency: int = 10
+    batch_size: int = 500
+    stats: Dict = field(default_factory=lambda: {
+        "ticks": 0, "checked": 0, "updated": 0, "failed": 0, "transitions": 0, "conflicts": 0
+    })
+
+    def next_check_at(self, record: Dict, now: datetime, changed: bool = False) -> datetime:
+        """
+        When a record should be checked next
+
+        Args:
+            record: Record as read (needs the age field)
+            now: Current UTC time
+            changed: Whether its status just moved
+
+        Returns:
+            UTC time of the next check
+        """
+        if changed:
+            return now + self.intervals[0][1]
+        age = now - (record.get(self.age_field) or record.get("created_at") or now)
+        for max_age, interval in self.intervals:
+            if age < max_age:
+                return now + interval
+        return now + self.max_interval
+
+    async def _check(self, semaphore: asyncio.Semaphore, record: Dict) -> Optional[Dict]:
+        async with semaphore:
+            try:
+                return await self.check(record)
+            except Exception as e:
+                logger.error(f"{self.name} status check failed for {record['_id']}: {e}", exc_info=True)
+                return None
+
+    async def run_due(self) -> Dict:
+        """
+        Check every record whose next_check_at has passed
+
+        Returns:
+            Counts for this tick
+        """
+        now = datetime.utcnow()
+        collection = await get_db_collection(self.collection)
+
+        # Records that predate next_check_at have it null and sort first
+        records = await collection.find({
+            "status": {"$in": self.active_statuses},
+            "$or": [{"next_check_at": {"$lte": now}}, {"next_check_at": None}]
+        }).sort("next_check_at", 1).limit(self.batch_size).to_list(length=self.batch_size)
+
+        if not records:
+            return {"checked": 0, "updated": 0, "failed": 0, "transitions": 0}
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(self._check(semaphore, record) for record in records))
+
+        tick_id = ObjectId()
+        operations = []
+        transitions = []
+        failed = 0
+
+        for record, update in zip(records, results):
+            if update is None:
+                # Lookup failed, retry on the normal schedule
+                failed += 1
+                operations.append(UpdateOne(
+                    {"_id": record["_id"], "status": record["status"]},
+                    {"$set": {"next_check_at": self.next_check_at(record, now)}}
+                ))
+                continue
+
+            changed = update.get("status", record["status"]) != record["status"]
+            update["next_check_at"] = self.next_check_at(record, now, changed)
+            if changed:
+                update["status_refresh_tick"] = tick_id
+                transitions.append((record, update))
+            operations.append(UpdateOne(
+                {"_id": record["_id"], "status": record["status"]},
+                {"$set": update}
+            ))
+
+        result = await collection.bulk_write(operations, ordered=False)
+        conflicts = len(operations) - result.matched_count
+
+        applied = 0
+        if transitions:
+            cursor = collection.find(
+                {"_id": {"$in": [record["_id"] for record, _ in transitions]}, "status_refresh_tick": tick_id},
+                {"_id": 1}
+            )
+            applied_ids = {doc["_id"] async for doc in cursor}
+            for record, update in transitions:
+                if record["_id"] not in applied_ids:
+                    continue
+                applied += 1
+                if self.on_transition:
+                    try:
+                        await self.on_transition(record, update)
+                    except Exception as e:
+                        logger.error(f"{self.name} transition handler failed for {record['_id']}: {e}", exc_info=True)
+
+        updated = len(records) - failed
+        self.stats["ticks"] += 1
+        self.stats["checked"] += len(records)
+        self.stats["updated"] += updated
+        self.stats["failed"] += failed
+        self.stats["transitions"] += applied
+        self.stats["conflicts"] += conflicts
+
+        logger.info(
+            f"{self.name}: checked {len(records)} due, {updated} updated, {failed} lookups failed, "
+            f"{applied} status changes"
+        )
+        return {"checked": len(records), "updated": updated, "failed": failed, "transitions": applied}
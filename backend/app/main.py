@@ -11,8 +11,12 @@ import logging
 from app.core.config import settings
 from app.core.database import connect_to_mongo, create_indexes, close_mongo_connection
 from app.core.redis import connect_to_redis, close_redis_connection
+from app.core.cache import cache_engine
+from app.core.http_client import init_http_clients, close_http_clients
+from app.core import leader
 from app.services.background_tasks import start_background_tasks, stop_background_tasks
 from app.services.cache_service import warm_cache
+from app.services.webhook_service import webhook_ingestor
 from app.api.routes import (
     auth,
     users,
@@ -47,7 +51,8 @@ from app.api.routes import (
     admin_tickets,  # V4 Admin Ticket Management
     admin_users,  # V4 Admin User Management
     admin_automm_swaps,  # V4 Admin AutoMM & Swaps Management
-    admin_scheduler  # V4 Admin Scheduler Management
+    admin_scheduler,  # V4 Admin Scheduler Management
+    notifications  # Completion notification stream for the bot
 )
 from app.api.v1.endpoints import transcripts
 
@@ -59,6 +64,26 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def start_job_runner():
+    """Start every periodic job scheduler (leader only)"""
+    start_background_tasks()
+    logger.info("Background tasks started")
+
+    from app.tasks import start_scheduler
+    start_scheduler()
+    logger.info("Scheduler started for periodic tasks")
+
+
+def stop_job_runner():
+    """Stop every periodic job scheduler"""
+    from app.tasks import stop_scheduler
+    stop_scheduler()
+    logger.info("Scheduler stopped")
+
+    stop_background_tasks()
+    logger.info("Background tasks stopped")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
@@ -77,18 +102,26 @@ async def lifespan(app: FastAPI):
     await connect_to_redis()
     logger.info("Connected to Redis")
 
+    # In-process cache tier, kept coherent with other workers over pub/sub
+    cache_engine.start()
+
+    # Open pooled outbound HTTP clients (Tatum, Solana RPC, ChangeNow, pricing)
+    await init_http_clients()
+    logger.info("Outbound HTTP pools ready")
+
     # Create database indexes
     await create_indexes()
     logger.info("Database indexes created")
 
-    # Start background tasks
-    start_background_tasks()
-    logger.info("Background tasks started")
+    # Tatum webhooks are queued by the route and credited by this worker pool
+    await webhook_ingestor.start()
 
-    # Start scheduler for periodic tasks
-    from app.tasks import start_scheduler
-    start_scheduler()
-    logger.info("Scheduler started for periodic tasks")
+    # Periodic jobs run only in the elected leader, so API workers can scale out
+    worker_role = leader.get_worker_role()
+    logger.info(f"Worker role: {worker_role}")
+    if worker_role != leader.ROLE_API:
+        leader.elector = leader.LeaderElector(on_elected=start_job_runner, on_demoted=stop_job_runner)
+        leader.elector.start()
 
     # Warm cache
     await warm_cache()
@@ -99,15 +132,14 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("👋 Shutting down Afroo Backend API...")
 
-    # Stop scheduler
-    from app.tasks import stop_scheduler
-    stop_scheduler()
-    logger.info("Scheduler stopped")
-
-    # Stop background tasks
-    stop_background_tasks()
-    logger.info("Background tasks stopped")
+    # Stop campaigning; stops the schedulers and hands over leadership if held
+    if leader.elector:
+        await leader.elector.stop()
+        leader.elector = None
 
+    await webhook_ingestor.stop()
+    await close_http_clients()
+    await cache_engine.stop()
     await close_mongo_connection()
     await close_redis_connection()
     logger.info("All connections closed")
@@ -187,6 +219,7 @@ app.include_router(withdrawals.router, prefix="/api/v1", tags=["Withdrawals"])
 app.include_router(reputation.router, prefix="/api/v1", tags=["Reputation"])
 app.include_router(tos.router, prefix="/api/v1", tags=["Terms of Service"])
 app.include_router(ai.router, prefix="/api/v1", tags=["AI Assistant"])
+app.include_router(notifications.router, prefix="/api/v1", tags=["Notifications"])
 
 # Transcript System (Upload + View)
 app.include_router(transcripts.router, prefix="/api/v1/transcripts", tags=["Transcripts - Upload"])
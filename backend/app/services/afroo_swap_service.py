@@ -9,10 +9,14 @@ from bson import ObjectId
 import logging
 
 from app.core.database import get_db_collection
+from app.core.redis import get_redis, RedisKeys
+from app.core.status_refresh import StatusRefresher
 from app.services.changenow_service import ChangeNowService
 from app.services.afroo_wallet_service import AfrooWalletService
 from app.services.crypto_handler_service import CryptoHandlerService
 from app.services.fee_collection_service import FeeCollectionService
+from app.services.analytics_rollup_service import AnalyticsRollupService
+from app.services.price_service import PriceService
 
 logger = logging.getLogger(__name__)
 
@@ -23,6 +27,11 @@ class AfrooSwapService:
     # Platform swap fee - disabled since ChangeNOW takes commission for us
     PLATFORM_SWAP_FEE_RATE = 0.0  # 0%
 
+    # Status change stream the bot long-polls with a cursor
+    STATUS_EVENTS_MAXLEN = 10000  # Approximate cap on retained events
+    CHANGES_MAX_BLOCK_MS = 20000  # Longest long-poll (bot HTTP timeout is 30s)
+    CHANGES_CURSOR_TTL = 7 * 86400  # Saved consumer cursors outlive any restart
+
     @staticmethod
     async def get_swap_quote(
         from_asset: str,
@@ -74,9 +83,13 @@ class AfrooSwapService:
             # Calculate platform fee
             platform_fee_units = amount * AfrooSwapService.PLATFORM_SWAP_FEE_RATE
 
-            # Calculate Afroo platform fee in USD for fee collection
-            from_asset_usd_price = await AfrooSwapService._get_usd_price(from_asset)
-            platform_fee_usd = platform_fee_units * from_asset_usd_price
+            # Calculate Afroo platform fee in USD for fee collection (None without a price)
+            from_asset_usd_price = await PriceService.get_price_usd(from_asset)
+            if from_asset_usd_price is None:
+                logger.warning(f"No price for {from_asset}, quoting swap without a USD platform fee")
+                platform_fee_usd = None
+            else:
+                platform_fee_usd = platform_fee_units * float(from_asset_usd_price)
 
             total_deducted = amount + platform_fee_units
 
@@ -208,7 +221,8 @@ class AfrooSwapService:
     async def update_swap_status(swap_id: str) -> bool:
         """
         Update swap status from ChangeNow.
-        Called by webhook handler or periodic checker.
+        Called by webhook handler or on demand; the periodic checker goes
+        through swap_refresher instead.
 
         Args:
             swap_id: Afroo swap ID
@@ -224,82 +238,236 @@ class AfrooSwapService:
                 logger.error(f"Swap {swap_id} not found")
                 return False
 
-            changenow_id = swap.get("changenow_exchange_id")
-            if not changenow_id:
-                logger.error(f"Swap {swap_id} has no ChangeNow exchange ID")
+            update_dict = await AfrooSwapService.check_swap(swap)
+            if update_dict is None:
                 return False
 
-            # Get status from ChangeNow
-            exchange_status = await ChangeNowService.get_exchange_status(changenow_id)
-            if not exchange_status:
-                logger.warning(f"Failed to get ChangeNow status for {changenow_id}")
-                return False
+            changed = update_dict["status"] != swap["status"]
+            update_dict["next_check_at"] = swap_refresher.next_check_at(swap, datetime.utcnow(), changed)
 
-            changenow_status = exchange_status["status"]
-            afroo_status = ChangeNowService.parse_changenow_status(changenow_status)
+            # Guarded on the status we read, so a concurrent refresh can't apply it twice
+            result = await swaps_db.update_one(
+                {"_id": swap["_id"], "status": swap["status"]},
+                {"$set": update_dict}
+            )
 
-            # Update database
-            update_dict = {
-                "changenow_status": changenow_status,
-                "status": afroo_status,
-                "last_status_check": datetime.utcnow()
-            }
+            if changed and result.modified_count:
+                await AfrooSwapService.on_swap_transition(swap, update_dict)
 
-            # If completed - ChangeNOW already sent to user's destination address
-            if afroo_status == "completed" and swap["status"] != "completed":
-                from app.services.stats_tracking_service import StatsTrackingService
-
-                actual_output = exchange_status.get("toAmount", swap["estimated_output"])
-                payout_hash = exchange_status.get("payoutHash")
-
-                update_dict["actual_output"] = actual_output
-                update_dict["completed_at"] = datetime.utcnow()
-                update_dict["payout_hash"] = payout_hash
-                update_dict["payout_link"] = exchange_status.get("payoutLink")
-                update_dict["notification_pending"] = True  # Mark for bot notification
-
-                # Track swap completion stats with USD value
-                from_asset_usd_price = await AfrooSwapService._get_usd_price(swap["from_asset"])
-                swap_value_usd = swap["input_amount"] * from_asset_usd_price
-
-                await StatsTrackingService.track_swap_completion(
-                    user_id=str(swap["user_id"]),
-                    from_amount=swap["input_amount"],
-                    to_amount=actual_output,
-                    from_asset=swap["from_asset"],
-                    to_asset=swap["to_asset"],
-                    amount_usd=swap_value_usd
-                )
+            return True
 
-                logger.info(
-                    f"Swap completed: {swap_id} - User received {actual_output} "
-                    f"{swap['to_asset']} at {swap.get('destination_address', 'N/A')} (tx: {payout_hash})"
-                )
+        except Exception as e:
+            logger.error(f"Failed to update swap status {swap_id}: {e}", exc_info=True)
+            return False
 
-            # If failed - no refund needed (user never sent funds to us)
-            elif afroo_status == "failed" and swap["status"] not in ["failed", "refunded"]:
-                from app.services.stats_tracking_service import StatsTrackingService
+    @staticmethod
+    async def check_swap(swap: Dict) -> Optional[Dict]:
+        """
+        Look up a swap on ChangeNow
 
-                update_dict["failed_at"] = datetime.utcnow()
-                update_dict["status"] = "failed"
+        Args:
+            swap: Swap record
 
-                # Track swap failure stats
-                await StatsTrackingService.track_swap_failure(str(swap["user_id"]))
+        Returns:
+            Fields to set on the swap, or None if the lookup failed
+        """
+        swap_id = str(swap["_id"])
+        changenow_id = swap.get("changenow_exchange_id")
+        if not changenow_id:
+            logger.error(f"Swap {swap_id} has no ChangeNow exchange ID")
+            return None
 
-                logger.warning(
-                    f"Swap failed: {swap_id} - {changenow_status}"
-                )
+        # Get status from ChangeNow
+        exchange_status = await ChangeNowService.get_exchange_status(changenow_id)
+        if not exchange_status:
+            logger.warning(f"Failed to get ChangeNow status for {changenow_id}")
+            return None
 
-            await swaps_db.update_one(
-                {"_id": ObjectId(swap_id)},
-                {"$set": update_dict}
-            )
+        changenow_status = exchange_status["status"]
+        afroo_status = ChangeNowService.parse_changenow_status(changenow_status)
 
-            return True
+        update_dict = {
+            "changenow_status": changenow_status,
+            "status": afroo_status,
+            "last_status_check": datetime.utcnow()
+        }
+
+        # If completed - ChangeNOW already sent to user's destination address
+        if afroo_status == "completed" and swap["status"] != "completed":
+            update_dict["actual_output"] = exchange_status.get("toAmount", swap["estimated_output"])
+            update_dict["completed_at"] = datetime.utcnow()
+            update_dict["payout_hash"] = exchange_status.get("payoutHash")
+            update_dict["payout_link"] = exchange_status.get("payoutLink")
+            update_dict["notification_pending"] = True  # Mark for bot notification
+            update_dict["notification_queued_at"] = update_dict["completed_at"]
+
+            # Kept for analytics rollup backfills; None (not $0) when there is no price
+            from_asset_usd_price = await PriceService.get_price_usd(swap["from_asset"])
+            if from_asset_usd_price is None:
+                logger.warning(f"Swap {swap['_id']}: No price for {swap['from_asset']}, recording completion without USD value")
+                update_dict["amount_usd"] = None
+            else:
+                update_dict["amount_usd"] = swap["input_amount"] * float(from_asset_usd_price)
+
+        # If failed - no refund needed (user never sent funds to us)
+        elif afroo_status == "failed" and swap["status"] not in ["failed", "refunded"]:
+            update_dict["failed_at"] = datetime.utcnow()
+
+        return update_dict
+
+    @staticmethod
+    async def on_swap_transition(swap: Dict, update_dict: Dict):
+        """
+        Stats, analytics and notifications for a status change that was applied
 
+        Args:
+            swap: Swap record before the change
+            update_dict: Fields that were set
+        """
+        from app.services.stats_tracking_service import StatsTrackingService
+
+        swap_id = str(swap["_id"])
+
+        try:
+            await AfrooSwapService.publish_status_change(swap, update_dict)
         except Exception as e:
-            logger.error(f"Failed to update swap status {swap_id}: {e}", exc_info=True)
-            return False
+            logger.error(f"Swap {swap_id}: Failed to publish status change: {e}")
+
+        if update_dict.get("completed_at"):
+            await StatsTrackingService.track_swap_completion(
+                user_id=str(swap["user_id"]),
+                from_amount=swap["input_amount"],
+                to_amount=update_dict["actual_output"],
+                from_asset=swap["from_asset"],
+                to_asset=swap["to_asset"],
+                amount_usd=update_dict["amount_usd"]
+            )
+
+            await AnalyticsRollupService.record_swap_completed(
+                update_dict["amount_usd"],
+                update_dict["completed_at"]
+            )
+
+            logger.info(
+                f"Swap completed: {swap_id} - User received {update_dict['actual_output']} "
+                f"{swap['to_asset']} at {swap.get('destination_address', 'N/A')} (tx: {update_dict['payout_hash']})"
+            )
+
+            from app.services.notification_service import NotificationService
+
+            try:
+                await NotificationService.trigger_swap_completion_notification(swap_id)
+            except Exception as e:
+                logger.error(f"Swap {swap_id}: Failed to queue completion notification: {e}")
+
+        elif update_dict.get("failed_at"):
+            # Track swap failure stats
+            await StatsTrackingService.track_swap_failure(str(swap["user_id"]))
+
+            logger.warning(
+                f"Swap failed: {swap_id} - {update_dict['changenow_status']}"
+            )
+
+    @staticmethod
+    async def publish_status_change(swap: Dict, update_dict: Dict) -> str:
+        """
+        Append a status change to the swap status stream
+
+        Args:
+            swap: Swap record before the change
+            update_dict: Fields that were set
+
+        Returns:
+            Stream event ID
+        """
+        return await get_redis().xadd(
+            RedisKeys.SWAP_STATUS_EVENTS,
+            {
+                "swap_id": str(swap["_id"]),
+                "user_id": str(swap["user_id"]),
+                "channel_id": swap.get("discord_channel_id") or "",
+                "status": update_dict["status"],
+                "previous_status": swap["status"],
+                "changenow_status": update_dict.get("changenow_status") or "",
+                "changed_at": datetime.utcnow().isoformat()
+            },
+            maxlen=AfrooSwapService.STATUS_EVENTS_MAXLEN,
+            approximate=True
+        )
+
+    @staticmethod
+    async def get_status_changes(
+        since: Optional[str],
+        count: int = 100,
+        block_ms: int = 15000,
+        consumer: Optional[str] = None
+    ) -> Dict:
+        """
+        Read swap status changes after a cursor, long-polling when there are none
+
+        A named consumer's cursor is saved each time it passes one (everything
+        up to it was handled), so after a restart it resumes where it left off
+        instead of skipping the changes made while it was down.
+
+        Args:
+            since: Cursor from the previous read (None resumes the consumer's
+                saved cursor, or starts at the newest change)
+            count: Maximum changes to return
+            block_ms: Long-poll time when nothing is new
+            consumer: Name to save the cursor under
+
+        Returns:
+            Dict with events and the cursor to pass next time
+        """
+        redis = get_redis()
+
+        if consumer:
+            cursor_key = RedisKeys.SWAP_STATUS_CURSOR.format(consumer=consumer)
+            if since is None:
+                since = await redis.get(cursor_key)
+            else:
+                await redis.set(cursor_key, since, ex=AfrooSwapService.CHANGES_CURSOR_TTL)
+
+        if since is None:
+            latest = await redis.xrevrange(RedisKeys.SWAP_STATUS_EVENTS, count=1)
+            cursor = latest[0][0] if latest else "0-0"
+            if consumer:
+                await redis.set(cursor_key, cursor, ex=AfrooSwapService.CHANGES_CURSOR_TTL)
+            return {"events": [], "cursor": cursor}
+
+        block_ms = max(0, min(block_ms, AfrooSwapService.CHANGES_MAX_BLOCK_MS))
+        result = await redis.xread(
+            {RedisKeys.SWAP_STATUS_EVENTS: since},
+            count=count,
+            block=block_ms or None
+        )
+        entries = result[0][1] if result else []
+
+        return {
+            "events": [{"event_id": event_id, **fields} for event_id, fields in entries],
+            "cursor": entries[-1][0] if entries else since
+        }
+
+    @staticmethod
+    async def set_swap_channel(swap_id: str, user_id: str, channel_id: str) -> bool:
+        """
+        Record the Discord channel of a swap ticket
+
+        Args:
+            swap_id: Swap ID
+            user_id: Owner's user ID
+            channel_id: Discord channel ID
+
+        Returns:
+            Whether the swap was found
+        """
+        swaps_db = await get_db_collection("afroo_swaps")
+
+        result = await swaps_db.update_one(
+            {"_id": ObjectId(swap_id), "user_id": ObjectId(user_id)},
+            {"$set": {"discord_channel_id": channel_id}}
+        )
+        return result.matched_count > 0
 
     @staticmethod
     async def get_swap_history(
@@ -358,53 +526,25 @@ class AfrooSwapService:
 
         return swap
 
-    @staticmethod
-    async def _get_usd_price(asset: str) -> float:
-        """
-        Get USD price for asset.
-        TODO: Integrate with real price API (Tatum or CoinGecko).
-        """
-        # Current market rates (keep in sync with bot modal)
-        rates = {
-            "BTC": 90000.0,
-            "ETH": 3200.0,
-            "LTC": 85.0,
-            "SOL": 150.0,
-            "USDT-SOL": 1.0,
-            "USDC-SOL": 1.0,
-            "USDT-ETH": 1.0,
-            "USDC-ETH": 1.0
-        }
 
-        base_asset = asset.split("-")[0] if "-" in asset else asset
-        return rates.get(base_asset, 1.0)
+# ChangeNow status polling for swaps still in flight
+swap_refresher = StatusRefresher(
+    name="Swap status refresh",
+    collection="afroo_swaps",
+    active_statuses=["pending", "waiting", "confirming", "exchanging", "sending", "verifying", "processing"],
+    check=AfrooSwapService.check_swap,
+    on_transition=AfrooSwapService.on_swap_transition
+)
 
 
 # Background task to update pending swap statuses
 async def update_pending_swaps():
     """
-    Update status for all pending/processing swaps.
+    Update status for the pending/processing swaps that are due a check.
     Should be called periodically by background task scheduler.
     """
     try:
-        swaps_db = await get_db_collection("afroo_swaps")
-
-        # Get all swaps that are not completed, failed, or expired
-        cursor = swaps_db.find({
-            "status": {"$in": ["pending", "waiting", "confirming", "exchanging", "sending", "verifying", "processing"]}
-        })
-
-        swaps = await cursor.to_list(length=1000)
-
-        updated_count = 0
-        for swap in swaps:
-            success = await AfrooSwapService.update_swap_status(str(swap["_id"]))
-            if success:
-                updated_count += 1
-
-        logger.info(f"Updated {updated_count}/{len(swaps)} pending swaps")
-
-        return {"checked": len(swaps), "updated": updated_count}
+        return await swap_refresher.run_due()
 
     except Exception as e:
         logger.error(f"Failed to update pending swaps: {e}", exc_info=True)
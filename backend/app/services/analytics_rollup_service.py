@@ -0,0 +1,337 @@
+"""
+Analytics Rollup Service - Incrementally maintained daily aggregates
+One document per UTC day in analytics_daily_rollups, updated as tickets and
+swaps complete and fees are recorded, so dashboards read a few hundred
+pre-aggregated rows instead of scanning raw collections
+"""
+
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+import logging
+
+from pymongo import ReplaceOne
+
+from app.core.database import get_db_collection
+
+logger = logging.getLogger(__name__)
+
+ROLLUPS_COLLECTION = "analytics_daily_rollups"
+
+# Counters kept on every rollup document
+METRIC_FIELDS = (
+    "tickets_completed",
+    "ticket_volume_usd",
+    "swaps_completed",
+    "swap_volume_usd",
+    "fees_count",
+    "fees_usd",
+)
+
+# Fee collections and the expression used as the fee type in revenue breakdowns
+FEE_SOURCES = {
+    "platform_fees": "$transaction_type",
+    "server_fees": "server_fee",
+}
+
+
+def number_expr(field: str) -> Dict:
+    """Numeric value of a field (amounts are stored as float, string or Decimal128 depending on the writer)"""
+    return {"$convert": {"input": f"${field}", "to": "double", "onError": 0.0, "onNull": 0.0}}
+
+
+class AnalyticsRollupService:
+    """Service for daily analytics rollups"""
+
+    @staticmethod
+    def day_start(value: datetime) -> datetime:
+        """Truncate a datetime to its UTC day (the rollup _id)"""
+        return datetime(value.year, value.month, value.day)
+
+    @staticmethod
+    def _fee_type_key(fee_type: Optional[str]) -> str:
+        # Used as a sub-document key, so strip characters MongoDB reserves in field paths
+        return (fee_type or "unknown").replace(".", "_").replace("$", "_")
+
+    # ====================
+    # Incremental updates
+    # ====================
+
+    @staticmethod
+    async def _increment(at: Optional[datetime], inc: Dict[str, float]):
+        """Apply counters to the rollup for the day containing `at`"""
+        try:
+            rollups = await get_db_collection(ROLLUPS_COLLECTION)
+            await rollups.update_one(
+                {"_id": AnalyticsRollupService.day_start(at or datetime.utcnow())},
+                {"$inc": inc, "$set": {"updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+        except Exception as e:
+            # Rollups are repaired by the consistency check; never fail the caller
+            logger.error(f"Failed to update analytics rollup: {e}", exc_info=True)
+
+    @staticmethod
+    async def record_ticket_completed(amount_usd: float, completed_at: Optional[datetime] = None):
+        """Count a completed exchange ticket"""
+        await AnalyticsRollupService._increment(completed_at, {
+            "tickets_completed": 1,
+            "ticket_volume_usd": float(amount_usd or 0)
+        })
+
+    @staticmethod
+    async def record_swap_completed(amount_usd: float, completed_at: Optional[datetime] = None):
+        """Count a completed swap"""
+        await AnalyticsRollupService._increment(completed_at, {
+            "swaps_completed": 1,
+            "swap_volume_usd": float(amount_usd or 0)
+        })
+
+    @staticmethod
+    async def record_fee(fee_type: str, amount_usd: float, created_at: Optional[datetime] = None):
+        """Count a recorded platform or server fee"""
+        amount_usd = float(amount_usd or 0)
+        key = AnalyticsRollupService._fee_type_key(fee_type)
+        await AnalyticsRollupService._increment(created_at, {
+            "fees_count": 1,
+            "fees_usd": amount_usd,
+            f"fees_by_type.{key}.count": 1,
+            f"fees_by_type.{key}.total_usd": amount_usd
+        })
+
+    # ====================
+    # Reads
+    # ====================
+
+    @staticmethod
+    async def get_rollups(start_date: datetime, end_date: datetime) -> List[Dict]:
+        """
+        Get rollup rows covering a date range.
+
+        Args:
+            start_date: Range start (its whole day is included)
+            end_date: Range end (its whole day is included)
+
+        Returns:
+            Rollup documents sorted by day
+        """
+        rollups = await get_db_collection(ROLLUPS_COLLECTION)
+        cursor = rollups.find({
+            "_id": {
+                "$gte": AnalyticsRollupService.day_start(start_date),
+                "$lte": end_date
+            }
+        }).sort("_id", 1)
+        return await cursor.to_list(length=None)
+
+    # ====================
+    # Backfill and consistency
+    # ====================
+
+    @staticmethod
+    def _empty_row(day: datetime) -> Dict:
+        row = {"_id": day, "fees_by_type": {}}
+        for field in METRIC_FIELDS:
+            row[field] = 0
+        return row
+
+    @staticmethod
+    async def compute_from_raw(start: datetime, end: datetime) -> Dict[datetime, Dict]:
+        """
+        Recompute rollup rows for [start, end) from the raw collections.
+
+        Args:
+            start: First day (inclusive, day-aligned)
+            end: Last day (exclusive, day-aligned)
+
+        Returns:
+            Dict of day -> rollup row (days without activity are omitted)
+        """
+        rows: Dict[datetime, Dict] = {}
+
+        def row_for(day: datetime) -> Dict:
+            if day not in rows:
+                rows[day] = AnalyticsRollupService._empty_row(day)
+            return rows[day]
+
+        def completed_pipeline(completed_field: str) -> List[Dict]:
+            return [
+                {"$match": {"status": "completed"}},
+                {"$addFields": {"_at": {"$ifNull": [f"${completed_field}", "$created_at"]}}},
+                {"$match": {"_at": {"$gte": start, "$lt": end}}},
+                {"$group": {
+                    "_id": {"$dateTrunc": {"date": "$_at", "unit": "day"}},
+                    "count": {"$sum": 1},
+                    "total_usd": {"$sum": number_expr("amount_usd")}
+                }}
+            ]
+
+        tickets_db = await get_db_collection("tickets")
+        async for doc in tickets_db.aggregate(completed_pipeline("closed_at")):
+            row = row_for(doc["_id"])
+            row["tickets_completed"] = doc["count"]
+            row["ticket_volume_usd"] = doc["total_usd"]
+
+        swaps_db = await get_db_collection("afroo_swaps")
+        async for doc in swaps_db.aggregate(completed_pipeline("completed_at")):
+            row = row_for(doc["_id"])
+            row["swaps_completed"] = doc["count"]
+            row["swap_volume_usd"] = doc["total_usd"]
+
+        for collection_name, type_expr in FEE_SOURCES.items():
+            fees_db = await get_db_collection(collection_name)
+            pipeline = [
+                {"$match": {"created_at": {"$gte": start, "$lt": end}}},
+                {"$group": {
+                    "_id": {
+                        "day": {"$dateTrunc": {"date": "$created_at", "unit": "day"}},
+                        "type": {"$ifNull": [type_expr, "unknown"]}
+                    },
+                    "count": {"$sum": 1},
+                    "total_usd": {"$sum": number_expr("amount_usd")}
+                }}
+            ]
+            async for doc in fees_db.aggregate(pipeline):
+                row = row_for(doc["_id"]["day"])
+                key = AnalyticsRollupService._fee_type_key(doc["_id"]["type"])
+                by_type = row["fees_by_type"].setdefault(key, {"count": 0, "total_usd": 0.0})
+                by_type["count"] += doc["count"]
+                by_type["total_usd"] += doc["total_usd"]
+                row["fees_count"] += doc["count"]
+                row["fees_usd"] += doc["total_usd"]
+
+        return rows
+
+    @staticmethod
+    def _day_range(start_date: datetime, end_date: datetime):
+        start = AnalyticsRollupService.day_start(start_date)
+        end = AnalyticsRollupService.day_start(end_date) + timedelta(days=1)
+        return start, end
+
+    @staticmethod
+    async def rebuild(start_date: datetime, end_date: datetime) -> Dict:
+        """
+        Backfill rollups for a date range from raw data, replacing existing rows.
+
+        Args:
+            start_date: First day to rebuild
+            end_date: Last day to rebuild (inclusive)
+
+        Returns:
+            Dict with days rebuilt and removed
+        """
+        start, end = AnalyticsRollupService._day_range(start_date, end_date)
+        rows = await AnalyticsRollupService.compute_from_raw(start, end)
+
+        rollups = await get_db_collection(ROLLUPS_COLLECTION)
+        now = datetime.utcnow()
+
+        if rows:
+            await rollups.bulk_write(
+                [ReplaceOne({"_id": day}, {**row, "updated_at": now}, upsert=True) for day, row in rows.items()],
+                ordered=False
+            )
+
+        # Drop rows for days that no longer have any activity
+        removed = await rollups.delete_many({
+            "_id": {"$gte": start, "$lt": end, "$nin": list(rows.keys())}
+        })
+
+        logger.info(
+            f"Rebuilt analytics rollups {start.date()}..{(end - timedelta(days=1)).date()}: "
+            f"{len(rows)} days written, {removed.deleted_count} removed"
+        )
+
+        return {
+            "start_date": start,
+            "end_date": end - timedelta(days=1),
+            "days_written": len(rows),
+            "days_removed": removed.deleted_count
+        }
+
+    @staticmethod
+    async def check_consistency(
+        start_date: datetime,
+        end_date: datetime,
+        tolerance_usd: float = 0.01,
+        repair: bool = False
+    ) -> Dict:
+        """
+        Compare rollups against raw data for a date range.
+
+        Args:
+            start_date: First day to check
+            end_date: Last day to check (inclusive)
+            tolerance_usd: Allowed absolute difference for USD totals
+            repair: Rebuild the days that do not match
+
+        Returns:
+            Dict with days checked and per-field mismatches
+        """
+        start, end = AnalyticsRollupService._day_range(start_date, end_date)
+        raw_rows = await AnalyticsRollupService.compute_from_raw(start, end)
+
+        rollups = await get_db_collection(ROLLUPS_COLLECTION)
+        stored_rows = {
+            row["_id"]: row
+            async for row in rollups.find({"_id": {"$gte": start, "$lt": end}})
+        }
+
+        mismatches = []
+        for day in sorted(set(raw_rows) | set(stored_rows)):
+            raw = raw_rows.get(day) or AnalyticsRollupService._empty_row(day)
+            stored = stored_rows.get(day) or AnalyticsRollupService._empty_row(day)
+
+            for field in METRIC_FIELDS:
+                raw_value = raw.get(field, 0) or 0
+                stored_value = stored.get(field, 0) or 0
+                allowed = tolerance_usd if field.endswith("_usd") else 0
+                if abs(raw_value - stored_value) > allowed:
+                    mismatches.append({
+                        "date": day,
+                        "field": field,
+                        "rollup": stored_value,
+                        "raw": raw_value
+                    })
+
+        mismatched_days = sorted({m["date"] for m in mismatches})
+
+        if mismatches:
+            logger.warning(
+                f"Analytics rollups inconsistent on {len(mismatched_days)} day(s) "
+                f"between {start.date()} and {(end - timedelta(days=1)).date()}"
+            )
+
+        if repair:
+            for day in mismatched_days:
+                await AnalyticsRollupService.rebuild(day, day)
+
+        return {
+            "start_date": start,
+            "end_date": end - timedelta(days=1),
+            "days_checked": (end - start).days,
+            "consistent": not mismatches,
+            "mismatched_days": mismatched_days,
+            "mismatches": mismatches,
+            "repaired": repair and bool(mismatches)
+        }
+
+
+async def verify_recent_rollups():
+    """
+    Check the last two days of rollups against raw data and repair drift.
+    Runs daily.
+    """
+    try:
+        end_date = datetime.utcnow()
+        result = await AnalyticsRollupService.check_consistency(
+            start_date=end_date - timedelta(days=1),
+            end_date=end_date,
+            repair=True
+        )
+        if result["consistent"]:
+            logger.info("Analytics rollups consistent for the last 2 days")
+        return result
+
+    except Exception as e:
+        logger.error(f"Failed to verify analytics rollups: {e}", exc_info=True)
+        return {"success": False, "error": str(e)}
@@ -9,9 +9,39 @@ from bson import ObjectId
 import logging
 
 from app.core.database import get_db_collection
+from app.services.analytics_rollup_service import AnalyticsRollupService, number_expr
 
 logger = logging.getLogger(__name__)
 
+# Time series interval -> $dateTrunc unit
+INTERVAL_UNITS = {"daily": "day", "weekly": "week", "monthly": "month"}
+
+# Time series metrics served from analytics_daily_rollups (summed fields)
+ROLLUP_METRICS = {
+    "revenue": ("fees_usd",),
+    "tickets_completed": ("tickets_completed",),
+    "swaps_completed": ("swaps_completed",),
+    "volume": ("ticket_volume_usd", "swap_volume_usd"),
+}
+
+
+def _bucket_start(value: datetime, unit: str) -> datetime:
+    """Start of the day/week (Monday)/month containing value, matching $dateTrunc"""
+    day = datetime(value.year, value.month, value.day)
+    if unit == "week":
+        return day - timedelta(days=day.weekday())
+    if unit == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _next_bucket(bucket: datetime, unit: str) -> datetime:
+    if unit == "week":
+        return bucket + timedelta(weeks=1)
+    if unit == "month":
+        return (bucket.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return bucket + timedelta(days=1)
+
 
 class AnalyticsService:
     """Service for platform analytics and statistics"""
@@ -38,75 +68,59 @@ class AnalyticsService:
             if not start_date:
                 start_date = end_date - timedelta(days=30)
 
+            period = {"created_at": {"$gte": start_date, "$lte": end_date}}
+
             tickets_db = await get_db_collection("tickets")
             users_db = await get_db_collection("users")
             swaps_db = await get_db_collection("afroo_swaps")
             withdrawals_db = await get_db_collection("withdrawals")
 
             # Total users
-            total_users = await users_db.count_documents({})
-            new_users = await users_db.count_documents({
-                "created_at": {"$gte": start_date, "$lte": end_date}
-            })
-
-            # Active users (users with activity in period)
-            active_user_ids = set()
-
-            # Get active users from tickets
-            active_tickets = await tickets_db.find({
-                "created_at": {"$gte": start_date, "$lte": end_date}
-            }).to_list(length=10000)
-
-            for ticket in active_tickets:
-                active_user_ids.add(str(ticket.get("client_id", "")))
-                active_user_ids.add(str(ticket.get("exchanger_id", "")))
-
-            active_users = len([uid for uid in active_user_ids if uid])
+            total_users = await users_db.estimated_document_count()
+            new_users = await users_db.count_documents(period)
+
+            # Ticket status counts, completed volume and distinct participants in one pass
+            ticket_facets = await tickets_db.aggregate([
+                {"$match": period},
+                {"$facet": {
+                    "by_status": [
+                        {"$group": {
+                            "_id": "$status",
+                            "count": {"$sum": 1},
+                            "volume_usd": {"$sum": number_expr("amount_usd")}
+                        }}
+                    ],
+                    "participants": [
+                        {"$project": {"participant": ["$user_id", "$assigned_to"]}},
+                        {"$unwind": "$participant"},
+                        {"$match": {"participant": {"$ne": None}}},
+                        {"$group": {"_id": "$participant"}},
+                        {"$count": "count"}
+                    ]
+                }}
+            ]).to_list(length=1)
+
+            facets = ticket_facets[0] if ticket_facets else {"by_status": [], "participants": []}
+            tickets_by_status = {row["_id"]: row for row in facets["by_status"]}
+
+            # Active users (users with ticket activity in period)
+            active_users = facets["participants"][0]["count"] if facets["participants"] else 0
 
             # Ticket statistics
-            total_tickets = await tickets_db.count_documents({
-                "created_at": {"$gte": start_date, "$lte": end_date}
-            })
-
-            completed_tickets = await tickets_db.count_documents({
-                "created_at": {"$gte": start_date, "$lte": end_date},
-                "status": "completed"
-            })
-
-            cancelled_tickets = await tickets_db.count_documents({
-                "created_at": {"$gte": start_date, "$lte": end_date},
-                "status": "cancelled"
-            })
-
-            # Calculate total volume from completed tickets
-            completed_ticket_list = await tickets_db.find({
-                "created_at": {"$gte": start_date, "$lte": end_date},
-                "status": "completed"
-            }).to_list(length=10000)
-
-            total_volume_usd = sum(
-                t.get("amount_usd", 0.0) for t in completed_ticket_list
-            )
+            total_tickets = sum(row["count"] for row in tickets_by_status.values())
+            completed_tickets = tickets_by_status.get("completed", {}).get("count", 0)
+            cancelled_tickets = tickets_by_status.get("cancelled", {}).get("count", 0)
+            total_volume_usd = tickets_by_status.get("completed", {}).get("volume_usd", 0.0)
 
             # Swap statistics
-            total_swaps = await swaps_db.count_documents({
-                "created_at": {"$gte": start_date, "$lte": end_date}
-            })
-
-            completed_swaps = await swaps_db.count_documents({
-                "created_at": {"$gte": start_date, "$lte": end_date},
-                "status": "completed"
-            })
+            swaps_by_status = await AnalyticsService._count_by_status(swaps_db, period)
+            total_swaps = sum(swaps_by_status.values())
+            completed_swaps = swaps_by_status.get("completed", 0)
 
             # Withdrawal statistics
-            total_withdrawals = await withdrawals_db.count_documents({
-                "created_at": {"$gte": start_date, "$lte": end_date}
-            })
-
-            completed_withdrawals = await withdrawals_db.count_documents({
-                "created_at": {"$gte": start_date, "$lte": end_date},
-                "status": "completed"
-            })
+            withdrawals_by_status = await AnalyticsService._count_by_status(withdrawals_db, period)
+            total_withdrawals = sum(withdrawals_by_status.values())
+            completed_withdrawals = withdrawals_by_status.get("completed", 0)
 
             # Calculate success rates
             ticket_success_rate = (
@@ -152,6 +166,15 @@ class AnalyticsService:
             logger.error(f"Failed to get platform overview: {e}", exc_info=True)
             return {"error": str(e)}
 
+    @staticmethod
+    async def _count_by_status(collection, match: Dict) -> Dict[str, int]:
+        """Document counts per status for a filter"""
+        rows = await collection.aggregate([
+            {"$match": match},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ]).to_list(length=None)
+        return {row["_id"]: row["count"] for row in rows}
+
     @staticmethod
     async def get_revenue_stats(
         start_date: Optional[datetime] = None,
@@ -160,6 +183,8 @@ class AnalyticsService:
         """
         Get platform revenue statistics.
 
+        Read from the daily rollups, so the whole first day of the range is included.
+
         Args:
             start_date: Start date for filtering
             end_date: End date for filtering
@@ -173,32 +198,26 @@ class AnalyticsService:
             if not start_date:
                 start_date = end_date - timedelta(days=30)
 
-            fees_db = await get_db_collection("fee_collection")
-
-            # Get all fees in period
-            cursor = fees_db.find({
-                "created_at": {"$gte": start_date, "$lte": end_date}
-            })
-
-            fees = await cursor.to_list(length=100000)
+            rollups = await AnalyticsRollupService.get_rollups(start_date, end_date)
 
             # Group by transaction type
             revenue_by_type = {}
             total_revenue_usd = 0.0
+            total_transactions = 0
 
-            for fee in fees:
-                tx_type = fee.get("transaction_type", "unknown")
-                amount_usd = fee.get("amount_usd", 0.0)
+            for rollup in rollups:
+                total_revenue_usd += rollup.get("fees_usd", 0.0)
+                total_transactions += rollup.get("fees_count", 0)
 
-                if tx_type not in revenue_by_type:
-                    revenue_by_type[tx_type] = {
-                        "count": 0,
-                        "total_usd": 0.0
-                    }
+                for tx_type, totals in rollup.get("fees_by_type", {}).items():
+                    if tx_type not in revenue_by_type:
+                        revenue_by_type[tx_type] = {
+                            "count": 0,
+                            "total_usd": 0.0
+                        }
 
-                revenue_by_type[tx_type]["count"] += 1
-                revenue_by_type[tx_type]["total_usd"] += amount_usd
-                total_revenue_usd += amount_usd
+                    revenue_by_type[tx_type]["count"] += totals.get("count", 0)
+                    revenue_by_type[tx_type]["total_usd"] += totals.get("total_usd", 0.0)
 
             # Calculate daily average
             days = max((end_date - start_date).days, 1)
@@ -211,7 +230,7 @@ class AnalyticsService:
                 },
                 "total_revenue_usd": round(total_revenue_usd, 2),
                 "daily_average_usd": round(daily_average, 2),
-                "total_transactions": len(fees),
+                "total_transactions": total_transactions,
                 "revenue_by_type": {
                     k: {
                         "count": v["count"],
@@ -237,42 +256,26 @@ class AnalyticsService:
             deposits_db = await get_db_collection("exchanger_deposits")
             wallets_db = await get_db_collection("afroo_wallets")
 
+            pipeline = [
+                {"$match": {"asset": {"$ne": None}}},
+                {"$group": {"_id": "$asset", "balance": {"$sum": number_expr("balance_units")}}}
+            ]
+
             # Aggregate by asset
             asset_totals = {}
 
-            # Exchanger deposits
-            cursor = deposits_db.find({})
-            deposits = await cursor.to_list(length=100000)
-
-            for deposit in deposits:
-                asset = deposit["asset"]
-                balance = deposit.get("balance_units", 0.0)
-
-                if asset not in asset_totals:
-                    asset_totals[asset] = {
-                        "exchanger_deposits": 0.0,
-                        "afroo_wallets": 0.0,
-                        "total": 0.0
-                    }
-
-                asset_totals[asset]["exchanger_deposits"] += balance
-
-            # Afroo wallets
-            cursor = wallets_db.find({})
-            wallets = await cursor.to_list(length=100000)
+            for source, collection in (("exchanger_deposits", deposits_db), ("afroo_wallets", wallets_db)):
+                async for row in collection.aggregate(pipeline):
+                    asset = row["_id"]
 
-            for wallet in wallets:
-                asset = wallet["asset"]
-                balance = wallet.get("balance_units", 0.0)
-
-                if asset not in asset_totals:
-                    asset_totals[asset] = {
-                        "exchanger_deposits": 0.0,
-                        "afroo_wallets": 0.0,
-                        "total": 0.0
-                    }
+                    if asset not in asset_totals:
+                        asset_totals[asset] = {
+                            "exchanger_deposits": 0.0,
+                            "afroo_wallets": 0.0,
+                            "total": 0.0
+                        }
 
-                asset_totals[asset]["afroo_wallets"] += balance
+                    asset_totals[asset][source] += row["balance"]
 
             # Calculate totals
             for asset in asset_totals:
@@ -375,46 +378,42 @@ class AnalyticsService:
             List of time series data points
         """
         try:
-            if interval == "daily":
-                delta = timedelta(days=1)
-            elif interval == "weekly":
-                delta = timedelta(weeks=1)
-            elif interval == "monthly":
-                delta = timedelta(days=30)
-            else:
-                delta = timedelta(days=1)
+            unit = INTERVAL_UNITS.get(interval, "day")
+
+            if metric == "tickets":
+                # Tickets created per bucket, grouped server-side
+                tickets_db = await get_db_collection("tickets")
+                trunc = {"date": "$created_at", "unit": unit}
+                if unit == "week":
+                    trunc["startOfWeek"] = "monday"
+
+                rows = await tickets_db.aggregate([
+                    {"$match": {"created_at": {"$gte": _bucket_start(start_date, unit), "$lte": end_date}}},
+                    {"$group": {"_id": {"$dateTrunc": trunc}, "value": {"$sum": 1}}}
+                ]).to_list(length=None)
+                values = {row["_id"]: row["value"] for row in rows}
+
+            elif metric in ROLLUP_METRICS:
+                values = {}
+                for rollup in await AnalyticsRollupService.get_rollups(start_date, end_date):
+                    bucket = _bucket_start(rollup["_id"], unit)
+                    values[bucket] = values.get(bucket, 0) + sum(
+                        rollup.get(field, 0) for field in ROLLUP_METRICS[metric]
+                    )
 
-            tickets_db = await get_db_collection("tickets")
-            fees_db = await get_db_collection("fee_collection")
+            else:
+                values = {}
 
             time_series = []
-            current_date = start_date
+            current_date = _bucket_start(start_date, unit)
 
             while current_date <= end_date:
-                next_date = current_date + delta
-
-                if metric == "tickets":
-                    count = await tickets_db.count_documents({
-                        "created_at": {"$gte": current_date, "$lt": next_date}
-                    })
-                    value = count
-
-                elif metric == "revenue":
-                    cursor = fees_db.find({
-                        "created_at": {"$gte": current_date, "$lt": next_date}
-                    })
-                    fees = await cursor.to_list(length=100000)
-                    value = sum(f.get("amount_usd", 0.0) for f in fees)
-
-                else:
-                    value = 0
-
+                value = values.get(current_date, 0)
                 time_series.append({
                     "date": current_date,
-                    "value": value
+                    "value": round(value, 2) if isinstance(value, float) else value
                 })
-
-                current_date = next_date
+                current_date = _next_bucket(current_date, unit)
 
             return time_series
 
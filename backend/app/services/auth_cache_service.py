@@ -0,0 +1,198 @@
+"""
+Auth Cache Service - Short-lived cache of resolved request identities
+Lets the auth dependencies resolve a user and their permission flags
+with at most one user fetch, and skip role-sync writes when the
+Discord role set has not changed
+"""
+
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+import logging
+import time
+
+from bson import json_util
+
+from app.core.redis import RedisKeys, get_redis
+from app.services.cache_service import CacheService
+from app.services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+
+class ResolvedIdentity:
+    """User document with its role-set hash and permission flags"""
+
+    def __init__(self, user: dict):
+        self.user = user
+        self.role_hash = UserService.role_set_hash(user.get("discord_roles", []))
+        flags = UserService.compute_role_flags(user.get("discord_roles", []))
+        self.is_admin = flags["is_admin"]
+        self.is_staff = flags["is_staff"]
+        self.is_exchanger = flags["is_exchanger"]
+
+
+class AuthCacheService:
+    """
+    Two-level identity cache: a tiny in-process map in front of Redis.
+
+    The in-process level absorbs bursts of bot calls for the same user and is
+    not invalidated across workers, so its TTL is kept to a few seconds. Redis
+    entries are dropped explicitly whenever roles, status or profile change.
+    """
+
+    LOCAL_TTL_SECONDS = 5
+    LOCAL_MAX_ENTRIES = 5000
+    REDIS_TTL_SECONDS = 60
+    INVALIDATE_CHUNK_SIZE = 500
+
+    _local: "OrderedDict[str, Tuple[float, ResolvedIdentity]]" = OrderedDict()
+
+    # ====================
+    # Resolution
+    # ====================
+
+    @staticmethod
+    async def resolve_bot_identity(discord_id: str, role_ids: List[int]) -> ResolvedIdentity:
+        """
+        Resolve a bot-authenticated user, creating them on first interaction.
+
+        Roles are only written back when the role set sent by the bot differs
+        from the stored one.
+
+        Args:
+            discord_id: User's Discord ID
+            role_ids: Discord role IDs from X-Discord-Roles
+
+        Returns:
+            ResolvedIdentity reflecting the given role set
+        """
+        role_hash = UserService.role_set_hash(role_ids)
+
+        identity = await AuthCacheService._get(discord_id)
+        if identity and identity.role_hash == role_hash:
+            return identity
+
+        user = identity.user if identity else await UserService.get_by_discord_id(discord_id)
+        if not user:
+            # Auto-create user on first interaction
+            user = await UserService.create_from_discord(
+                discord_id=discord_id,
+                username="Unknown",  # Bot should update this
+                discriminator="0000"
+            )
+
+        if UserService.role_set_hash(user.get("discord_roles", [])) != role_hash:
+            synced = await UserService.sync_discord_roles(discord_id, role_ids)
+            user = synced or {**user, "discord_roles": role_ids}
+
+        identity = ResolvedIdentity(user)
+        await AuthCacheService._set(discord_id, identity)
+        return identity
+
+    @staticmethod
+    async def resolve_identity(discord_id: str) -> Optional[ResolvedIdentity]:
+        """
+        Resolve a web-authenticated user from the stored role set.
+
+        Args:
+            discord_id: User's Discord ID
+
+        Returns:
+            ResolvedIdentity, or None if the user does not exist
+        """
+        identity = await AuthCacheService._get(discord_id)
+        if identity:
+            return identity
+
+        user = await UserService.get_by_discord_id(discord_id)
+        if not user:
+            return None
+
+        identity = ResolvedIdentity(user)
+        await AuthCacheService._set(discord_id, identity)
+        return identity
+
+    @staticmethod
+    async def invalidate(discord_id: str):
+        """Drop a user's cached identity and user document (call after role, freeze or status changes)"""
+        AuthCacheService._local.pop(discord_id, None)
+        await CacheService.invalidate(CacheService.PREFIX_USER, discord_id)
+
+        redis = get_redis()
+        if not redis:
+            return
+        try:
+            await redis.delete(RedisKeys.AUTH_IDENTITY.format(discord_id=discord_id))
+        except Exception as e:
+            logger.warning(f"Auth cache invalidation failed for {discord_id}: {e}")
+
+    @staticmethod
+    async def invalidate_many(discord_ids: List[str]):
+        """Drop cached identities for many users (bulk role sync)"""
+        for discord_id in discord_ids:
+            AuthCacheService._local.pop(discord_id, None)
+        await CacheService.invalidate_many(CacheService.PREFIX_USER, discord_ids)
+
+        redis = get_redis()
+        if not redis or not discord_ids:
+            return
+        try:
+            keys = [RedisKeys.AUTH_IDENTITY.format(discord_id=d) for d in discord_ids]
+            for i in range(0, len(keys), AuthCacheService.INVALIDATE_CHUNK_SIZE):
+                await redis.delete(*keys[i:i + AuthCacheService.INVALIDATE_CHUNK_SIZE])
+        except Exception as e:
+            logger.warning(f"Auth cache bulk invalidation failed for {len(discord_ids)} users: {e}")
+
+    # ====================
+    # Storage
+    # ====================
+
+    @staticmethod
+    async def _get(discord_id: str) -> Optional[ResolvedIdentity]:
+        local = AuthCacheService._local
+        entry = local.get(discord_id)
+        if entry:
+            expires_at, identity = entry
+            if expires_at > time.monotonic():
+                local.move_to_end(discord_id)
+                return identity
+            local.pop(discord_id, None)
+
+        redis = get_redis()
+        if not redis:
+            return None
+        try:
+            data = await redis.get(RedisKeys.AUTH_IDENTITY.format(discord_id=discord_id))
+        except Exception as e:
+            logger.warning(f"Auth cache get failed for {discord_id}: {e}")
+            return None
+        if not data:
+            return None
+
+        identity = ResolvedIdentity(json_util.loads(data))
+        AuthCacheService._set_local(discord_id, identity)
+        return identity
+
+    @staticmethod
+    async def _set(discord_id: str, identity: ResolvedIdentity):
+        AuthCacheService._set_local(discord_id, identity)
+
+        redis = get_redis()
+        if not redis:
+            return
+        try:
+            await redis.setex(
+                RedisKeys.AUTH_IDENTITY.format(discord_id=discord_id),
+                AuthCacheService.REDIS_TTL_SECONDS,
+                json_util.dumps(identity.user)
+            )
+        except Exception as e:
+            logger.warning(f"Auth cache set failed for {discord_id}: {e}")
+
+    @staticmethod
+    def _set_local(discord_id: str, identity: ResolvedIdentity):
+        local = AuthCacheService._local
+        local[discord_id] = (time.monotonic() + AuthCacheService.LOCAL_TTL_SECONDS, identity)
+        local.move_to_end(discord_id)
+        while len(local) > AuthCacheService.LOCAL_MAX_ENTRIES:
+            local.popitem(last=False)
@@ -13,37 +13,35 @@ from app.services.balance_sync_service import run_periodic_balance_sync
 from app.services.afroo_swap_service import update_pending_swaps
 from app.services.withdrawal_service import update_pending_withdrawals
 from app.services.reputation_service import recalculate_all_stats
-from app.services.ticket_service import TicketService
 from app.services.profit_sweep_service import ProfitSweepService
+from app.services.analytics_rollup_service import verify_recent_rollups
+from app.services.notification_service import requeue_missed_notifications
+from app.services.backup_service import BackupService, BackupInProgress
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-async def run_mongodb_backup():
-    """Run MongoDB LOCAL backup using backup script (4x daily)"""
-    try:
-        import subprocess
-        from pathlib import Path
+def _is_atlas() -> bool:
+    """Atlas clusters are backed up by Atlas Cloud Backup, not mongodump"""
+    mongodb_url = settings.MONGODB_URL
+    return "mongodb.net" in mongodb_url or "mongodb+srv://" in mongodb_url
 
-        script_path = Path(__file__).parent.parent.parent / "scripts" / "backup_mongodb.py"
 
-        logger.info("Starting MongoDB LOCAL backup...")
-
-        # Run backup script (local only, no cloud)
-        result = subprocess.run(
-            ["python3", str(script_path)],
-            capture_output=True,
-            text=True,
-            timeout=3600  # 1 hour timeout
-        )
-
-        if result.returncode == 0:
-            logger.info("MongoDB LOCAL backup completed successfully")
+async def run_mongodb_backup():
+    """Run an incremental MongoDB backup (4x daily, full when there is no base)"""
+    try:
+        # Without an oplog base this falls back to a full dump, never on Atlas
+        if _is_atlas():
+            logger.info("MongoDB Atlas detected - skipping incremental backup (Atlas Cloud Backup)")
             return True
-        else:
-            logger.error(f"MongoDB backup failed: {result.stderr}")
-            return False
 
+        record = await BackupService.run_incremental_backup()
+        return record["status"] in ("success", "skipped")
+
+    except BackupInProgress:
+        logger.info("Incremental MongoDB backup skipped - another backup is still running")
+        return True
     except Exception as e:
         logger.error(f"Error running MongoDB backup: {e}", exc_info=True)
         return False
@@ -51,50 +49,25 @@ async def run_mongodb_backup():
 
 async def run_mongodb_cloud_backup():
     """
-    Run MongoDB CLOUD backup to Atlas (1x daily at 4 AM)
-    Uses MongoDB Atlas backup API to trigger backup and upload
+    Run a full MongoDB backup (1x daily at 4 AM)
+    Atlas clusters are backed up by Atlas Cloud Backup instead
     """
     try:
-        import os
-        import subprocess
-        from pathlib import Path
-
-        logger.info("Starting MongoDB CLOUD backup to Atlas...")
-
-        # Check if cloud backup is configured
-        mongodb_url = os.getenv("MONGODB_URL", "")
-
         # If using Atlas (mongodb+srv://), Atlas handles backups automatically via their service
-        if "mongodb.net" in mongodb_url or "mongodb+srv://" in mongodb_url:
+        if _is_atlas():
             logger.info("MongoDB Atlas detected - backups handled by Atlas Cloud Backup service")
             logger.info("Atlas automatic backup is enabled. No manual trigger needed.")
             logger.info("Configure backup policy at: https://cloud.mongodb.com/")
             return True
 
-        # For self-hosted MongoDB, run backup script with cloud upload enabled
-        script_path = Path(__file__).parent.parent.parent / "scripts" / "backup_mongodb.py"
-
-        # Set environment variable to enable cloud upload
-        env = os.environ.copy()
-        env["BACKUP_CLOUD_ENABLED"] = "true"
-
-        result = subprocess.run(
-            ["python3", str(script_path)],
-            capture_output=True,
-            text=True,
-            timeout=3600,
-            env=env
-        )
-
-        if result.returncode == 0:
-            logger.info("MongoDB CLOUD backup completed successfully")
-            return True
-        else:
-            logger.error(f"MongoDB cloud backup failed: {result.stderr}")
-            return False
+        record = await BackupService.run_full_backup()
+        return record["status"] == "success"
 
+    except BackupInProgress:
+        logger.info("Full MongoDB backup skipped - another backup is still running")
+        return True
     except Exception as e:
-        logger.error(f"Error running MongoDB cloud backup: {e}", exc_info=True)
+        logger.error(f"Error running MongoDB full backup: {e}", exc_info=True)
         return False
 
 
@@ -151,26 +124,36 @@ def start_background_tasks():
             max_instances=1  # Prevent overlapping runs
         )
 
-        # Swap status updates - every 5 minutes
+        # Swap status updates - every minute (each tick only checks records that are due)
         scheduler.add_job(
             update_pending_swaps,
-            trigger=IntervalTrigger(minutes=5),
+            trigger=IntervalTrigger(minutes=1),
             id="swap_status_update",
             name="Update Pending Swaps",
             replace_existing=True,
             max_instances=1
         )
 
-        # Withdrawal status updates - every 5 minutes
+        # Withdrawal status updates - every minute (each tick only checks records that are due)
         scheduler.add_job(
             update_pending_withdrawals,
-            trigger=IntervalTrigger(minutes=5),
+            trigger=IntervalTrigger(minutes=1),
             id="withdrawal_status_update",
             name="Update Pending Withdrawals",
             replace_existing=True,
             max_instances=1
         )
 
+        # Completion notifications whose stream publish failed - every 2 minutes
+        scheduler.add_job(
+            requeue_missed_notifications,
+            trigger=IntervalTrigger(minutes=2),
+            id="notification_requeue",
+            name="Requeue Missed Completion Notifications",
+            replace_existing=True,
+            max_instances=1
+        )
+
         # Daily stats recalculation - 3 AM
         scheduler.add_job(
             recalculate_all_stats,
@@ -189,32 +172,32 @@ def start_background_tasks():
             replace_existing=True
         )
 
-        # TOS deadline monitoring - every 1 minute
+        # Analytics rollup consistency check - 2:30 AM (repairs drifted days)
         scheduler.add_job(
-            TicketService.monitor_tos_deadlines,
-            trigger=IntervalTrigger(minutes=1),
-            id="tos_deadline_monitor",
-            name="Monitor TOS Agreement Deadlines",
+            verify_recent_rollups,
+            trigger=CronTrigger(hour=2, minute=30),
+            id="analytics_rollup_check",
+            name="Verify Analytics Rollups",
             replace_existing=True,
             max_instances=1
         )
 
-        # Local MongoDB backup - every 6 hours (4x daily)
+        # Incremental MongoDB backup - every 6 hours (4x daily), offset from the 4 AM full backup
         scheduler.add_job(
             run_mongodb_backup,
-            trigger=IntervalTrigger(hours=6),
+            trigger=CronTrigger(hour="1,7,13,19", minute=0),
             id="mongodb_backup_local",
-            name="MongoDB Local Backup",
+            name="MongoDB Incremental Backup",
             replace_existing=True,
             max_instances=1
         )
 
-        # Cloud MongoDB backup to Atlas - once daily at 4 AM
+        # Full MongoDB backup - once daily at 4 AM (skipped on Atlas)
         scheduler.add_job(
             run_mongodb_cloud_backup,
             trigger=CronTrigger(hour=4, minute=0),
             id="mongodb_backup_cloud",
-            name="MongoDB Cloud Backup",
+            name="MongoDB Full Backup",
             replace_existing=True,
             max_instances=1
         )
@@ -234,13 +217,14 @@ def start_background_tasks():
         logger.info("Background tasks started successfully")
         logger.info("Scheduled jobs:")
         logger.info("  - Balance Sync: Every 30 minutes")
-        logger.info("  - Swap Status Updates: Every 5 minutes")
-        logger.info("  - Withdrawal Status Updates: Every 5 minutes")
+        logger.info("  - Swap Status Updates: Every minute (adaptive per swap)")
+        logger.info("  - Withdrawal Status Updates: Every minute (adaptive per withdrawal)")
+        logger.info("  - Notification Requeue: Every 2 minutes")
         logger.info("  - Stats Recalculation: Daily at 3 AM")
         logger.info("  - Sync Record Cleanup: Daily at 2 AM")
-        logger.info("  - TOS Deadline Monitor: Every 1 minute")
-        logger.info("  - MongoDB Local Backup: Every 6 hours (4x daily)")
-        logger.info("  - MongoDB Cloud Backup: Daily at 4 AM (Atlas)")
+        logger.info("  - Analytics Rollup Check: Daily at 2:30 AM")
+        logger.info("  - MongoDB Incremental Backup: Every 6 hours (4x daily)")
+        logger.info("  - MongoDB Full Backup: Daily at 4 AM")
         logger.info("  - Profit Sweep: Twice daily at 6 AM and 6 PM")
 
     except Exception as e:
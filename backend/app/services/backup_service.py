@@ -0,0 +1,342 @@
+"""
+Backup Service - Streaming MongoDB backups
+Runs mongodump as an async subprocess and streams its --archive output through
+zstd (gzip when zstandard isn't installed) to disk in chunks, so a dump never
+blocks the event loop or holds the database in memory
+
+Full backups dump the whole instance (with --oplog on a replica set, so the
+archive is a consistent snapshot). Incremental backups dump only the
+local.oplog.rs entries written since the previous backup; restore the last
+full archive with --oplogReplay, then replay each incremental in order.
+Every run is recorded in the backups collection with its size, duration and
+throughput.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import time
+import zlib
+from collections import deque
+
+from app.core.config import settings
+from app.core.database import get_database, get_db_collection
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class BackupInProgress(Exception):
+    """Another backup is still running"""
+
+
+class _Compressor:
+    """Incremental zstd compressor, or gzip if zstandard is unavailable"""
+
+    def __init__(self):
+        if zstandard is not None:
+            self.codec = "zstd"
+            self.extension = ".zst"
+            self._obj = zstandard.ZstdCompressor(level=BackupService.ZSTD_LEVEL, threads=-1).compressobj()
+        else:
+            self.codec = "gzip"
+            self.extension = ".gz"
+            self._obj = zlib.compressobj(BackupService.GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._obj.compress(chunk)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+
+class BackupService:
+    """Full and incremental MongoDB backups"""
+
+    BACKUP_DIR = os.getenv("BACKUP_DIR", "/backups/mongodb")
+    CHUNK_SIZE = 1024 * 1024  # Bytes read from mongodump per compress/write
+    ZSTD_LEVEL = 3
+    GZIP_LEVEL = 6
+    TIMEOUT_SECONDS = 3600
+    STDERR_TAIL_LINES = 20  # mongodump output kept for the error message
+
+    TYPE_FULL = "full"
+    TYPE_INCREMENTAL = "incremental"
+
+    # ====================
+    # Running backups
+    # ====================
+
+    @staticmethod
+    async def run_full_backup(trigger: str = "scheduled") -> Dict:
+        """
+        Dump the whole instance to a compressed archive
+
+        Args:
+            trigger: What started it ("scheduled" or "admin:{id}")
+
+        Returns:
+            The backups record
+        """
+        # Read before the dump starts: the next incremental overlaps the
+        # dump's own oplog instead of leaving a gap (replaying is idempotent)
+        oplog_end = await BackupService._latest_oplog_ts()
+
+        args = ["--uri", settings.MONGODB_URL, "--archive"]
+        if oplog_end is not None:
+            args.append("--oplog")
+
+        return await BackupService._run(
+            BackupService.TYPE_FULL,
+            args,
+            trigger,
+            oplog_end=oplog_end
+        )
+
+    @staticmethod
+    async def run_incremental_backup(trigger: str = "scheduled") -> Dict:
+        """
+        Dump the oplog entries written since the previous backup.
+        Falls back to a full backup when there is no usable base (first run,
+        not a replica set, or the oplog has rolled past the previous backup).
+
+        Args:
+            trigger: What started it ("scheduled" or "admin:{id}")
+
+        Returns:
+            The backups record
+        """
+        backups = await get_db_collection("backups")
+        base = await backups.find_one(
+            {"status": "success", "oplog_end": {"$ne": None}},
+            sort=[("started_at", -1)]
+        )
+        oplog_start = base["oplog_end"] if base else None
+        oplog_end = await BackupService._latest_oplog_ts()
+        oldest = await BackupService._oldest_oplog_ts()
+
+        if oplog_start is None or oplog_end is None or oldest is None or oldest > oplog_start:
+            logger.info("No usable oplog base for an incremental backup, running a full backup")
+            return await BackupService.run_full_backup(trigger)
+
+        if oplog_end <= oplog_start:
+            logger.info("No writes since the last backup, skipping incremental backup")
+            return {"backup_name": base["backup_name"], "backup_type": BackupService.TYPE_INCREMENTAL, "status": "skipped"}
+
+        query = {"ts": {
+            "$gt": {"$timestamp": {"t": oplog_start.time, "i": oplog_start.inc}},
+            "$lte": {"$timestamp": {"t": oplog_end.time, "i": oplog_end.inc}}
+        }}
+        args = [
+            "--uri", settings.MONGODB_URL,
+            "--db", "local",
+            "--collection", "oplog.rs",
+            "--query", json.dumps(query),
+            "--archive"
+        ]
+
+        return await BackupService._run(
+            BackupService.TYPE_INCREMENTAL,
+            args,
+            trigger,
+            oplog_start=oplog_start,
+            oplog_end=oplog_end,
+            base_backup=base["backup_name"]
+        )
+
+    @staticmethod
+    async def _run(backup_type: str, args: List[str], trigger: str, **fields) -> Dict:
+        """Record, stream and finalize one mongodump run"""
+        backups = await get_db_collection("backups")
+
+        # A run older than the timeout was orphaned by a restart, don't wait on it
+        running_since = datetime.utcnow() - timedelta(seconds=BackupService.TIMEOUT_SECONDS)
+        if await backups.find_one({"status": "running", "started_at": {"$gt": running_since}}, {"_id": 1}):
+            raise BackupInProgress("Another backup is already running")
+
+        compressor = _Compressor()
+        started_at = datetime.utcnow()
+        backup_name = f"afroo_backup_{started_at.strftime('%Y%m%d_%H%M%S')}_{backup_type}"
+        path = os.path.join(BackupService.BACKUP_DIR, f"{backup_name}.archive{compressor.extension}")
+
+        record = {
+            "backup_name": backup_name,
+            "backup_type": backup_type,
+            "status": "running",
+            "trigger": trigger,
+            "path": path,
+            "codec": compressor.codec,
+            "started_at": started_at,
+            **fields
+        }
+        result = await backups.insert_one(record)
+        record["_id"] = result.inserted_id
+
+        logger.info(f"Starting MongoDB {backup_type} backup {backup_name}...")
+        started = time.monotonic()
+        try:
+            raw_bytes, size_bytes = await asyncio.wait_for(
+                BackupService._stream_dump(args, path, compressor),
+                timeout=BackupService.TIMEOUT_SECONDS
+            )
+        except BaseException as e:
+            error = "Timed out" if isinstance(e, asyncio.TimeoutError) else str(e) or type(e).__name__
+            await backups.update_one(
+                {"_id": record["_id"]},
+                {"$set": {
+                    "status": "failed",
+                    "error": error,
+                    "duration_seconds": round(time.monotonic() - started, 2),
+                    "finished_at": datetime.utcnow()
+                }}
+            )
+            logger.error(f"MongoDB {backup_type} backup {backup_name} failed: {error}")
+            raise
+
+        duration = time.monotonic() - started
+        update = {
+            "status": "success",
+            "raw_bytes": raw_bytes,
+            "size_bytes": size_bytes,
+            "compression_ratio": round(raw_bytes / size_bytes, 2) if size_bytes else None,
+            "duration_seconds": round(duration, 2),
+            "throughput_mb_s": round(raw_bytes / (1024 * 1024) / duration, 2) if duration else None,
+            "finished_at": datetime.utcnow()
+        }
+        await backups.update_one({"_id": record["_id"]}, {"$set": update})
+        record.update(update)
+
+        logger.info(
+            f"✅ MongoDB {backup_type} backup {backup_name}: {size_bytes / (1024 * 1024):.1f} MB "
+            f"({compressor.codec}) in {duration:.1f}s, {update['throughput_mb_s']} MB/s"
+        )
+        return record
+
+    @staticmethod
+    async def _stream_dump(args: List[str], path: str, compressor: _Compressor):
+        """
+        Stream mongodump's archive through the compressor to a .partial file,
+        renamed into place once mongodump exits cleanly
+
+        Returns:
+            (raw archive bytes, compressed bytes)
+        """
+        await asyncio.to_thread(os.makedirs, BackupService.BACKUP_DIR, exist_ok=True)
+        partial = f"{path}.partial"
+
+        process = await asyncio.create_subprocess_exec(
+            "mongodump", *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+        # mongodump logs progress to stderr; drain it so the pipe never fills
+        stderr_tail = deque(maxlen=BackupService.STDERR_TAIL_LINES)
+
+        async def drain_stderr():
+            async for line in process.stderr:
+                stderr_tail.append(line.decode(errors="replace").rstrip())
+
+        stderr_task = asyncio.create_task(drain_stderr())
+        raw_bytes = size_bytes = 0
+        try:
+            output = await asyncio.to_thread(open, partial, "wb")
+            try:
+                while True:
+                    chunk = await process.stdout.read(BackupService.CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    raw_bytes += len(chunk)
+                    data = await asyncio.to_thread(compressor.compress, chunk)
+                    if data:
+                        await asyncio.to_thread(output.write, data)
+                        size_bytes += len(data)
+
+                data = compressor.flush()
+                await asyncio.to_thread(output.write, data)
+                size_bytes += len(data)
+                await asyncio.to_thread(output.flush)
+                await asyncio.to_thread(os.fsync, output.fileno())
+            finally:
+                await asyncio.to_thread(output.close)
+
+            returncode = await process.wait()
+            await stderr_task
+            if returncode != 0:
+                raise RuntimeError(f"mongodump exited with {returncode}: {' | '.join(stderr_tail)}")
+
+            await asyncio.to_thread(os.replace, partial, path)
+            return raw_bytes, size_bytes
+
+        except BaseException:
+            if process.returncode is None:
+                process.kill()
+                await process.wait()
+            stderr_task.cancel()
+            try:
+                await asyncio.to_thread(os.remove, partial)
+            except OSError:
+                pass
+            raise
+
+    # ====================
+    # Oplog position
+    # ====================
+
+    @staticmethod
+    async def _oplog_ts(direction: int):
+        """Newest (-1) or oldest (1) oplog timestamp, None without a replica set"""
+        try:
+            oplog = get_database().client["local"]["oplog.rs"]
+            entry = await oplog.find_one({}, {"ts": 1}, sort=[("$natural", direction)])
+            return entry["ts"] if entry else None
+        except Exception as e:
+            logger.debug(f"Oplog not readable, incremental backups unavailable: {e}")
+            return None
+
+    @staticmethod
+    async def _latest_oplog_ts():
+        return await BackupService._oplog_ts(-1)
+
+    @staticmethod
+    async def _oldest_oplog_ts():
+        return await BackupService._oplog_ts(1)
+
+    # ====================
+    # History
+    # ====================
+
+    @staticmethod
+    async def get_history(limit: int = 10) -> List[Dict]:
+        """
+        Recent backups, newest first
+
+        Args:
+            limit: Maximum number of backups
+
+        Returns:
+            backups records (without _id)
+        """
+        backups = await get_db_collection("backups")
+        cursor = backups.find(
+            {},
+            {"_id": 0, "oplog_start": 0, "oplog_end": 0}
+        ).sort("started_at", -1).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    @staticmethod
+    async def get_last_success() -> Optional[Dict]:
+        """Most recent successful backup, or None"""
+        backups = await get_db_collection("backups")
+        return await backups.find_one(
+            {"status": "success"},
+            {"_id": 0, "oplog_start": 0, "oplog_end": 0},
+            sort=[("started_at", -1)]
+        )
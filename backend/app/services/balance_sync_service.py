@@ -8,12 +8,15 @@ from typing import Optional, Dict, List, Tuple
 from datetime import datetime, timedelta
 from bson import ObjectId
 from decimal import Decimal
+from pymongo import UpdateOne, InsertOne
 import logging
 import asyncio
+import time
 
 from app.core.database import get_db_collection
-from app.services.crypto_handler_service import CryptoHandlerService
+from app.services.tatum_service import TatumService
 from app.core.config import settings
+from app.utils.throttling import TokenBucket
 
 logger = logging.getLogger(__name__)
 
@@ -30,63 +33,43 @@ class BalanceSyncService:
     CRITICAL_DRIFT_THRESHOLD = 0.05  # 5% drift triggers immediate alert
 
     @staticmethod
-    async def sync_all_deposit_wallets(force: bool = False) -> Dict:
+    def _build_sync_query(force: bool) -> Dict:
+        """Build wallet selection query for a full sync pass"""
+        query = {"balance_units": {"$gt": 0}}
+        if not force:
+            # Skip recently synced (within last 30 min)
+            recent_cutoff = datetime.utcnow() - timedelta(
+                minutes=BalanceSyncService.SYNC_INTERVAL_MINUTES
+            )
+            query["last_synced"] = {"$lt": recent_cutoff}
+        return query
+
+    @staticmethod
+    async def sync_all_deposit_wallets(
+        force: bool = False,
+        engine: Optional["BalanceReconciliationEngine"] = None
+    ) -> Dict:
         """
         Sync all exchanger deposit wallets.
 
         Args:
             force: Force sync even if recently synced
+            engine: Reconciliation engine to share provider budgets with
 
         Returns:
             Dict with sync results
         """
         try:
-            deposits_db = await get_db_collection("exchanger_deposits")
-
-            # Get all active deposits
-            query = {"balance_units": {"$gt": 0}}
-            if not force:
-                # Skip recently synced (within last 30 min)
-                recent_cutoff = datetime.utcnow() - timedelta(
-                    minutes=BalanceSyncService.SYNC_INTERVAL_MINUTES
-                )
-                query["last_synced"] = {"$lt": recent_cutoff}
-
-            cursor = deposits_db.find(query)
-            deposits = await cursor.to_list(length=10000)
-
-            results = {
-                "total_checked": len(deposits),
-                "synced": 0,
-                "drifts_detected": 0,
-                "critical_drifts": 0,
-                "errors": 0,
-                "drifts": []
-            }
-
-            for deposit in deposits:
-                success, drift_info = await BalanceSyncService._sync_deposit_wallet(
-                    deposit_id=str(deposit["_id"]),
-                    user_id=str(deposit["user_id"]),
-                    asset=deposit["asset"],
-                    address=deposit["address"],
-                    db_balance=deposit["balance_units"]
-                )
-
-                if success:
-                    results["synced"] += 1
-                    if drift_info and drift_info.get("has_drift"):
-                        results["drifts_detected"] += 1
-                        results["drifts"].append(drift_info)
-
-                        if drift_info.get("is_critical"):
-                            results["critical_drifts"] += 1
-                else:
-                    results["errors"] += 1
+            engine = engine or BalanceReconciliationEngine()
+            results = await engine.reconcile(
+                wallet_type="deposit",
+                collection_name="exchanger_deposits",
+                query=BalanceSyncService._build_sync_query(force)
+            )
 
             logger.info(
                 f"Deposit wallet sync complete: {results['synced']}/{results['total_checked']} synced, "
-                f"{results['drifts_detected']} drifts detected"
+                f"{results['drifts_detected']} drifts detected in {results['duration_seconds']}s"
             )
 
             return results
@@ -96,62 +79,31 @@ class BalanceSyncService:
             return {"error": str(e)}
 
     @staticmethod
-    async def sync_all_afroo_wallets(force: bool = False) -> Dict:
+    async def sync_all_afroo_wallets(
+        force: bool = False,
+        engine: Optional["BalanceReconciliationEngine"] = None
+    ) -> Dict:
         """
         Sync all Afroo custodial wallets.
 
         Args:
             force: Force sync even if recently synced
+            engine: Reconciliation engine to share provider budgets with
 
         Returns:
             Dict with sync results
         """
         try:
-            wallets_db = await get_db_collection("afroo_wallets")
-
-            # Get all wallets with balance
-            query = {"balance_units": {"$gt": 0}}
-            if not force:
-                recent_cutoff = datetime.utcnow() - timedelta(
-                    minutes=BalanceSyncService.SYNC_INTERVAL_MINUTES
-                )
-                query["last_synced"] = {"$lt": recent_cutoff}
-
-            cursor = wallets_db.find(query)
-            wallets = await cursor.to_list(length=10000)
-
-            results = {
-                "total_checked": len(wallets),
-                "synced": 0,
-                "drifts_detected": 0,
-                "critical_drifts": 0,
-                "errors": 0,
-                "drifts": []
-            }
-
-            for wallet in wallets:
-                success, drift_info = await BalanceSyncService._sync_afroo_wallet(
-                    wallet_id=str(wallet["_id"]),
-                    user_id=str(wallet["user_id"]),
-                    asset=wallet["asset"],
-                    address=wallet["address"],
-                    db_balance=wallet["balance_units"]
-                )
-
-                if success:
-                    results["synced"] += 1
-                    if drift_info and drift_info.get("has_drift"):
-                        results["drifts_detected"] += 1
-                        results["drifts"].append(drift_info)
-
-                        if drift_info.get("is_critical"):
-                            results["critical_drifts"] += 1
-                else:
-                    results["errors"] += 1
+            engine = engine or BalanceReconciliationEngine()
+            results = await engine.reconcile(
+                wallet_type="afroo",
+                collection_name="afroo_wallets",
+                query=BalanceSyncService._build_sync_query(force)
+            )
 
             logger.info(
                 f"Afroo wallet sync complete: {results['synced']}/{results['total_checked']} synced, "
-                f"{results['drifts_detected']} drifts detected"
+                f"{results['drifts_detected']} drifts detected in {results['duration_seconds']}s"
             )
 
             return results
@@ -243,22 +195,14 @@ class BalanceSyncService:
         """
         try:
             # Get blockchain balance
-            balance_data = await CryptoHandlerService.get_balance(asset, address)
+            balance_data = await TatumService.get_balance(asset, address)
             blockchain_balance = balance_data["confirmed"]
 
             # Calculate drift
-            drift = blockchain_balance - db_balance
-            drift_percent = abs(drift / db_balance) if db_balance > 0 else 0
-
-            # Check if drift exceeds tolerance
-            tolerance = max(
-                BalanceSyncService.DRIFT_TOLERANCE_MIN_UNITS,
-                db_balance * BalanceSyncService.DRIFT_TOLERANCE_PERCENT
+            drift, drift_percent, has_drift, is_critical = BalanceSyncService._evaluate_drift(
+                db_balance, blockchain_balance
             )
 
-            has_drift = abs(drift) > tolerance
-            is_critical = drift_percent > BalanceSyncService.CRITICAL_DRIFT_THRESHOLD
-
             # Update database
             deposits_db = await get_db_collection("exchanger_deposits")
             await deposits_db.update_one(
@@ -333,22 +277,14 @@ class BalanceSyncService:
         """
         try:
             # Get blockchain balance
-            balance_data = await CryptoHandlerService.get_balance(asset, address)
+            balance_data = await TatumService.get_balance(asset, address)
             blockchain_balance = balance_data["confirmed"]
 
             # Calculate drift
-            drift = blockchain_balance - db_balance
-            drift_percent = abs(drift / db_balance) if db_balance > 0 else 0
-
-            # Check if drift exceeds tolerance
-            tolerance = max(
-                BalanceSyncService.DRIFT_TOLERANCE_MIN_UNITS,
-                db_balance * BalanceSyncService.DRIFT_TOLERANCE_PERCENT
+            drift, drift_percent, has_drift, is_critical = BalanceSyncService._evaluate_drift(
+                db_balance, blockchain_balance
             )
 
-            has_drift = abs(drift) > tolerance
-            is_critical = drift_percent > BalanceSyncService.CRITICAL_DRIFT_THRESHOLD
-
             # Update database
             wallets_db = await get_db_collection("afroo_wallets")
             await wallets_db.update_one(
@@ -396,7 +332,29 @@ class BalanceSyncService:
             return False, None
 
     @staticmethod
-    async def _record_balance_sync(
+    def _evaluate_drift(db_balance: float, blockchain_balance: float) -> Tuple[float, float, bool, bool]:
+        """
+        Compare database and blockchain balances.
+
+        Returns:
+            Tuple of (drift, drift_percent, has_drift, is_critical)
+        """
+        drift = blockchain_balance - db_balance
+        drift_percent = abs(drift / db_balance) if db_balance > 0 else 0
+
+        # Check if drift exceeds tolerance
+        tolerance = max(
+            BalanceSyncService.DRIFT_TOLERANCE_MIN_UNITS,
+            db_balance * BalanceSyncService.DRIFT_TOLERANCE_PERCENT
+        )
+
+        has_drift = abs(drift) > tolerance
+        is_critical = drift_percent > BalanceSyncService.CRITICAL_DRIFT_THRESHOLD
+
+        return drift, drift_percent, has_drift, is_critical
+
+    @staticmethod
+    def _build_sync_record(
         wallet_type: str,
         wallet_id: str,
         user_id: str,
@@ -408,10 +366,8 @@ class BalanceSyncService:
         drift_percent: float,
         is_critical: bool
     ) -> Dict:
-        """Record balance sync in database"""
-        sync_db = await get_db_collection("balance_sync_records")
-
-        sync_record = {
+        """Build balance_sync_records document"""
+        return {
             "wallet_type": wallet_type,
             "wallet_id": ObjectId(wallet_id),
             "user_id": ObjectId(user_id),
@@ -425,8 +381,19 @@ class BalanceSyncService:
             "synced_at": datetime.utcnow()
         }
 
-        result = await sync_db.insert_one(sync_record)
-
+    @staticmethod
+    def _build_drift_info(
+        wallet_type: str,
+        wallet_id: str,
+        asset: str,
+        address: str,
+        db_balance: float,
+        blockchain_balance: float,
+        drift: float,
+        drift_percent: float,
+        is_critical: bool
+    ) -> Dict:
+        """Build drift summary returned to callers"""
         return {
             "has_drift": True,
             "is_critical": is_critical,
@@ -440,6 +407,34 @@ class BalanceSyncService:
             "blockchain_balance": blockchain_balance
         }
 
+    @staticmethod
+    async def _record_balance_sync(
+        wallet_type: str,
+        wallet_id: str,
+        user_id: str,
+        asset: str,
+        address: str,
+        db_balance: float,
+        blockchain_balance: float,
+        drift: float,
+        drift_percent: float,
+        is_critical: bool
+    ) -> Dict:
+        """Record balance sync in database"""
+        sync_db = await get_db_collection("balance_sync_records")
+
+        sync_record = BalanceSyncService._build_sync_record(
+            wallet_type, wallet_id, user_id, asset, address,
+            db_balance, blockchain_balance, drift, drift_percent, is_critical
+        )
+
+        await sync_db.insert_one(sync_record)
+
+        return BalanceSyncService._build_drift_info(
+            wallet_type, wallet_id, asset, address,
+            db_balance, blockchain_balance, drift, drift_percent, is_critical
+        )
+
     @staticmethod
     async def get_sync_history(
         wallet_id: Optional[str] = None,
@@ -485,6 +480,271 @@ class BalanceSyncService:
         return records
 
 
+class ChainSyncStats:
+    """Throughput and latency counters for one chain during a sync pass"""
+
+    def __init__(self):
+        self.requests = 0
+        self.addresses = 0
+        self.errors = 0
+        self.latencies: List[float] = []
+        self.started_at = time.monotonic()
+
+    def record(self, latency: float, addresses: int, errors: int):
+        self.requests += 1
+        self.addresses += addresses
+        self.errors += errors
+        self.latencies.append(latency)
+
+    def to_dict(self) -> Dict:
+        elapsed = max(time.monotonic() - self.started_at, 1e-6)
+        latencies = sorted(self.latencies)
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+
+        return {
+            "requests": self.requests,
+            "addresses": self.addresses,
+            "errors": self.errors,
+            "addresses_per_sec": round(self.addresses / elapsed, 2),
+            "avg_latency_ms": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+            "p95_latency_ms": round(p95 * 1000, 1),
+            "max_latency_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0
+        }
+
+
+class BalanceReconciliationEngine:
+    """
+    Concurrent, rate-aware wallet reconciliation.
+
+    Streams wallets from a Mongo cursor in batches, groups them by asset into
+    bulk balance lookups (TatumService.get_balances_batch) run under per-chain
+    concurrency limits and per-provider token buckets, and applies the
+    resulting writes with bulk_write.
+    Share one engine between passes so they draw from the same provider budget.
+    """
+
+    # Wallets pulled from the cursor and written back per batch
+    BATCH_SIZE = 500
+
+    # Max in-flight balance requests per chain
+    DEFAULT_CHAIN_CONCURRENCY = 4
+    CHAIN_CONCURRENCY = {
+        "BTC": 8,
+        "LTC": 8,
+        "ETH": 8,
+        "SOL": 8
+    }
+
+    # Which upstream quota each chain's lookups draw from
+    CHAIN_PROVIDERS = {
+        "SOL": "solana_rpc",
+        "USDT-SOL": "solana_rpc",
+        "USDC-SOL": "solana_rpc"
+    }
+    DEFAULT_PROVIDER = "tatum"
+
+    # Provider quotas: (requests per second, burst)
+    PROVIDER_RATE_LIMITS = {
+        "tatum": (20.0, 20),
+        "solana_rpc": (4.0, 4)
+    }
+
+    def __init__(self):
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _get_semaphore(self, asset: str) -> asyncio.Semaphore:
+        if asset not in self._semaphores:
+            limit = self.CHAIN_CONCURRENCY.get(asset, self.DEFAULT_CHAIN_CONCURRENCY)
+            self._semaphores[asset] = asyncio.Semaphore(limit)
+        return self._semaphores[asset]
+
+    def _get_bucket(self, asset: str) -> TokenBucket:
+        provider = self.CHAIN_PROVIDERS.get(asset, self.DEFAULT_PROVIDER)
+        if provider not in self._buckets:
+            rate, burst = self.PROVIDER_RATE_LIMITS[provider]
+            self._buckets[provider] = TokenBucket(rate, burst)
+        return self._buckets[provider]
+
+    async def reconcile(self, wallet_type: str, collection_name: str, query: Dict) -> Dict:
+        """
+        Reconcile every wallet in a collection matching query.
+
+        Args:
+            wallet_type: "deposit" or "afroo" (recorded on drift records)
+            collection_name: Wallet collection to stream from
+            query: Wallet selection query
+
+        Returns:
+            Dict with sync results and per-chain stats
+        """
+        started = time.monotonic()
+        collection = await get_db_collection(collection_name)
+        sync_db = await get_db_collection("balance_sync_records")
+
+        results = {
+            "total_checked": 0,
+            "synced": 0,
+            "drifts_detected": 0,
+            "critical_drifts": 0,
+            "errors": 0,
+            "drifts": []
+        }
+        chain_stats: Dict[str, ChainSyncStats] = {}
+
+        projection = {"user_id": 1, "asset": 1, "address": 1, "balance_units": 1}
+        cursor = collection.find(query, projection).batch_size(self.BATCH_SIZE)
+
+        batch = []
+        async for wallet in cursor:
+            batch.append(wallet)
+            if len(batch) >= self.BATCH_SIZE:
+                await self._process_batch(wallet_type, collection, sync_db, batch, results, chain_stats)
+                batch = []
+
+        if batch:
+            await self._process_batch(wallet_type, collection, sync_db, batch, results, chain_stats)
+
+        results["duration_seconds"] = round(time.monotonic() - started, 2)
+        results["chain_stats"] = {asset: stats.to_dict() for asset, stats in chain_stats.items()}
+
+        return results
+
+    async def _fetch_balances(
+        self,
+        asset: str,
+        wallets: List[Dict],
+        chain_stats: Dict[str, ChainSyncStats]
+    ) -> List[Tuple[Dict, Optional[float]]]:
+        """Fetch confirmed on-chain balances for one bulk request within the chain's budget"""
+        stats = chain_stats.setdefault(asset, ChainSyncStats())
+        addresses = [wallet["address"] for wallet in wallets]
+
+        async with self._get_semaphore(asset):
+            request_started = time.monotonic()
+            try:
+                # One token per upstream request, including single-address fallbacks
+                balances = await TatumService.get_balances_batch(
+                    asset,
+                    addresses,
+                    rate_limit=self._get_bucket(asset).acquire
+                )
+            except Exception as e:
+                stats.record(time.monotonic() - request_started, len(wallets), len(wallets))
+                logger.error(f"Balance lookup failed for {len(wallets)} {asset} wallets: {e}")
+                return [(wallet, None) for wallet in wallets]
+
+        fetched = []
+        for wallet in wallets:
+            balance_data = balances.get(wallet["address"])
+            fetched.append((wallet, balance_data["confirmed"] if balance_data else None))
+
+        errors = sum(1 for _, balance in fetched if balance is None)
+        stats.record(time.monotonic() - request_started, len(wallets), errors)
+        return fetched
+
+    async def _process_batch(
+        self,
+        wallet_type: str,
+        collection,
+        sync_db,
+        batch: List[Dict],
+        results: Dict,
+        chain_stats: Dict[str, ChainSyncStats]
+    ):
+        """Fetch balances for a batch concurrently and bulk-write the outcome"""
+        results["total_checked"] += len(batch)
+
+        # One bulk lookup per asset chunk, chunks sized to the chain's batch capability
+        by_asset: Dict[str, List[Dict]] = {}
+        for wallet in batch:
+            by_asset.setdefault(wallet["asset"], []).append(wallet)
+
+        lookups = []
+        for asset, wallets in by_asset.items():
+            chunk_size = TatumService.get_balance_batch_size(asset)
+            for i in range(0, len(wallets), chunk_size):
+                lookups.append(self._fetch_balances(asset, wallets[i:i + chunk_size], chain_stats))
+
+        fetched = [pair for chunk in await asyncio.gather(*lookups) for pair in chunk]
+
+        now = datetime.utcnow()
+        wallet_updates = []
+        sync_records = []
+        drifts = []
+
+        for wallet, blockchain_balance in fetched:
+            if blockchain_balance is None:
+                results["errors"] += 1
+                continue
+
+            wallet_id = str(wallet["_id"])
+            asset = wallet["asset"]
+            address = wallet["address"]
+            db_balance = wallet["balance_units"]
+
+            drift, drift_percent, has_drift, is_critical = BalanceSyncService._evaluate_drift(
+                db_balance, blockchain_balance
+            )
+
+            wallet_updates.append(UpdateOne(
+                {"_id": wallet["_id"]},
+                {
+                    "$set": {
+                        "balance_units": blockchain_balance,
+                        "last_synced": now,
+                        "last_sync_drift": drift
+                    }
+                }
+            ))
+
+            if not has_drift:
+                continue
+
+            sync_records.append(InsertOne(BalanceSyncService._build_sync_record(
+                wallet_type, wallet_id, str(wallet["user_id"]), asset, address,
+                db_balance, blockchain_balance, drift, drift_percent, is_critical
+            )))
+            drifts.append(BalanceSyncService._build_drift_info(
+                wallet_type, wallet_id, asset, address,
+                db_balance, blockchain_balance, drift, drift_percent, is_critical
+            ))
+
+            if is_critical:
+                logger.warning(
+                    f"CRITICAL DRIFT in {wallet_type} wallet {wallet_id}: "
+                    f"{asset} {address[:8]}... "
+                    f"DB={db_balance} Blockchain={blockchain_balance} "
+                    f"Drift={drift} ({drift_percent*100:.2f}%)"
+                )
+            else:
+                logger.info(
+                    f"Drift detected in {wallet_type} wallet {wallet_id}: "
+                    f"{asset} drift={drift}"
+                )
+
+        if not wallet_updates:
+            return
+
+        try:
+            await collection.bulk_write(wallet_updates, ordered=False)
+        except Exception as e:
+            logger.error(f"Bulk balance update failed for {wallet_type} batch: {e}", exc_info=True)
+            results["errors"] += len(wallet_updates)
+            return
+
+        results["synced"] += len(wallet_updates)
+        results["drifts_detected"] += len(drifts)
+        results["critical_drifts"] += sum(1 for d in drifts if d["is_critical"])
+        results["drifts"].extend(drifts)
+
+        if sync_records:
+            try:
+                await sync_db.bulk_write(sync_records, ordered=False)
+            except Exception as e:
+                logger.error(f"Failed to record {len(sync_records)} balance drifts: {e}", exc_info=True)
+
+
 # Background sync task (to be called by scheduler)
 async def run_periodic_balance_sync():
     """
@@ -493,11 +753,12 @@ async def run_periodic_balance_sync():
     """
     logger.info("Starting periodic balance sync...")
 
-    # Sync deposit wallets
-    deposit_results = await BalanceSyncService.sync_all_deposit_wallets()
-
-    # Sync Afroo wallets
-    afroo_results = await BalanceSyncService.sync_all_afroo_wallets()
+    # Deposit and Afroo wallets sync concurrently against the same provider budget
+    engine = BalanceReconciliationEngine()
+    deposit_results, afroo_results = await asyncio.gather(
+        BalanceSyncService.sync_all_deposit_wallets(engine=engine),
+        BalanceSyncService.sync_all_afroo_wallets(engine=engine)
+    )
 
     # Log summary
     total_synced = deposit_results.get("synced", 0) + afroo_results.get("synced", 0)
@@ -1,18 +1,81 @@
 """
 Cache Service - Redis-based caching for performance optimization
 Provides caching for frequently accessed data to reduce database queries
+
+Values go through the two-tier engine in app.core.cache (in-process LRU in
+front of Redis, binary codec, pub/sub invalidation across workers).
+
+get_or_load is the read-through entry point used on hot paths: concurrent
+misses for the same entry are coalesced into one load (per process, and
+across workers via a short Redis lock), entries can be served stale while a
+single background refresh runs, and keys carry a per-prefix version so a
+whole namespace is invalidated with one INCR instead of a keyspace scan.
+A load only stores its result if neither the namespace version nor the
+entry's generation (bumped by invalidate) changed while it ran, so a load
+that read the document before a write can't cache it again afterwards.
+
+Plain entries written with set() are registered in tag sets: always their
+namespace (the key prefix), plus any tags the caller passes (e.g. the
+user:{id} tag shared by a user's data, balances and reputation).
+Invalidating a tag pops its members in chunks and deletes them, so the cost
+is proportional to the entries under that tag and nothing else in Redis
+(sessions, rate limits, job queues) is touched.
 """
 
-from typing import Optional, Any
+from typing import Optional, Any, Awaitable, Callable, Dict, List
 from datetime import timedelta
-import json
+import asyncio
+import functools
 import logging
-import pickle
+import time
 
-from app.core.redis import get_redis
+from app.core.cache import cache_engine, decode, encode
+from app.core.redis import RedisKeys, get_binary_redis, get_redis
 
 logger = logging.getLogger(__name__)
 
+# KEYS = version key, generation key; ARGV = prefix, key
+# Reads the namespace version, the entry's generation and the entry in one round trip
+READ_THROUGH_SCRIPT = """
+local version = redis.call('GET', KEYS[1]) or '0'
+local generation = redis.call('GET', KEYS[2]) or '0'
+return {version, generation, redis.call('GET', 'cache:' .. ARGV[1] .. 'v' .. version .. ':' .. ARGV[2])}
+"""
+
+# KEYS = version key, generation key, entry key, namespace registry
+# ARGV = version and generation the load started from, ttl, data, prefix
+# Stores a loaded entry only if nothing was invalidated while it loaded
+STORE_SCRIPT = """
+if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] or (redis.call('GET', KEYS[2]) or '0') ~= ARGV[2] then
+    return 0
+end
+redis.call('SETEX', KEYS[3], ARGV[3], ARGV[4])
+redis.call('SADD', KEYS[4], ARGV[5])
+return 1
+"""
+
+# KEYS = namespace registry, tag sets...; ARGV = cache key, ttl (0 = none), namespace
+# A tag set lives as long as its longest-lived member
+TAG_SCRIPT = """
+local ttl = tonumber(ARGV[2])
+redis.call('SADD', KEYS[1], ARGV[3])
+for i = 2, #KEYS do
+    local created = redis.call('EXISTS', KEYS[i]) == 0
+    redis.call('SADD', KEYS[i], ARGV[1])
+    if ttl <= 0 then
+        redis.call('PERSIST', KEYS[i])
+    else
+        local current = redis.call('TTL', KEYS[i])
+        if created or (current >= 0 and current < ttl) then
+            redis.call('EXPIRE', KEYS[i], ttl)
+        end
+    end
+end
+return 1
+"""
+
+READ_THROUGH_STATS = ("hits", "stale_hits", "misses", "coalesced", "loads", "errors")
+
 
 class CacheService:
     """Service for Redis caching operations"""
@@ -25,6 +88,13 @@ class CacheService:
     PREFIX_REPUTATION = "reputation:"
     PREFIX_ANALYTICS = "analytics:"
     PREFIX_SESSION = "session:"
+    PREFIX_PORTFOLIO = "portfolio:"
+    PREFIX_LEADERBOARD = "leaderboard:"
+
+    # Tags
+    TAG_USER = "user:{user_id}"  # A user's data, balances and reputation
+    TAG_USER_BALANCES = "balances:{user_id}"
+    TAG_BALANCES = "balances"  # Every cached balance
 
     # Default TTLs (in seconds)
     TTL_SHORT = 300  # 5 minutes
@@ -32,10 +102,23 @@ class CacheService:
     TTL_LONG = 3600  # 1 hour
     TTL_DAY = 86400  # 24 hours
 
+    # Read-through loading
+    LOAD_LOCK_TTL = 10  # Seconds one worker may hold an entry's load lock
+    LOAD_WAIT_SECONDS = 2.0  # Other workers wait this long for that load before loading themselves
+    LOAD_POLL_SECONDS = 0.05
+    INVALIDATE_CHUNK_SIZE = 500
+    GENERATION_TTL = TTL_DAY  # Outlives any load; an expired generation only fails a store
+
+    _inflight: Dict[str, asyncio.Future] = {}
+    _stats: Dict[str, Dict[str, int]] = {}
+    _read_script = None
+    _store_script = None
+    _tag_script = None
+
     @staticmethod
     async def get(key: str) -> Optional[Any]:
         """
-        Get value from cache.
+        Get value from cache (in-process tier first, then Redis).
 
         Args:
             key: Cache key
@@ -44,23 +127,7 @@ class CacheService:
             Cached value or None
         """
         try:
-            redis = get_redis()
-            if not redis:
-                return None
-
-            value = await redis.get(key)
-            if value:
-                try:
-                    # Try JSON first
-                    return json.loads(value)
-                except json.JSONDecodeError:
-                    # Fall back to pickle for complex objects
-                    try:
-                        return pickle.loads(value)
-                    except:
-                        return value.decode() if isinstance(value, bytes) else value
-
-            return None
+            return await cache_engine.get(key)
 
         except Exception as e:
             logger.warning(f"Cache get failed for {key}: {e}")
@@ -70,37 +137,37 @@ class CacheService:
     async def set(
         key: str,
         value: Any,
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        tags: Optional[List[str]] = None
     ) -> bool:
         """
-        Set value in cache.
+        Set value in cache (both tiers; other workers drop their local copy).
 
         Args:
-            key: Cache key
+            key: Cache key ("{namespace}:...")
             value: Value to cache
             ttl: Time to live in seconds
+            tags: Extra tags to register the key under (its namespace is always one)
 
         Returns:
             Success status
         """
         try:
-            redis = get_redis()
-            if not redis:
-                return False
-
-            # Serialize value
-            try:
-                serialized = json.dumps(value)
-            except (TypeError, ValueError):
-                # Use pickle for non-JSON-serializable objects
-                serialized = pickle.dumps(value)
-
-            # Set with TTL
-            if ttl:
-                await redis.setex(key, ttl, serialized)
-            else:
-                await redis.set(key, serialized)
+            await cache_engine.set(key, value, ttl)
 
+            redis = get_redis()
+            if redis:
+                if CacheService._tag_script is None:
+                    CacheService._tag_script = redis.register_script(TAG_SCRIPT)
+                namespace = CacheService._namespace(key)
+                tag_keys = [
+                    RedisKeys.CACHE_TAG.format(tag=tag)
+                    for tag in [CacheService._namespace_tag(namespace), *(tags or [])]
+                ]
+                await CacheService._tag_script(
+                    keys=[RedisKeys.CACHE_NAMESPACES, *tag_keys],
+                    args=[key, ttl or 0, namespace]
+                )
             return True
 
         except Exception as e:
@@ -119,11 +186,7 @@ class CacheService:
             Success status
         """
         try:
-            redis = get_redis()
-            if not redis:
-                return False
-
-            await redis.delete(key)
+            await cache_engine.delete(key)
             return True
 
         except Exception as e:
@@ -134,9 +197,11 @@ class CacheService:
     async def delete_pattern(pattern: str) -> int:
         """
         Delete all keys matching pattern.
+        Walks the keyspace incrementally with SCAN, so keep it for one-off
+        maintenance; application invalidation goes through invalidate_tag.
 
         Args:
-            pattern: Key pattern (e.g., "user:*")
+            pattern: Key pattern (e.g., "balance:123:*")
 
         Returns:
             Number of keys deleted
@@ -146,18 +211,65 @@ class CacheService:
             if not redis:
                 return 0
 
-            # Get all matching keys
-            keys = await redis.keys(pattern)
+            deleted = 0
+            batch = []
+            async for key in redis.scan_iter(match=pattern, count=CacheService.INVALIDATE_CHUNK_SIZE):
+                batch.append(key)
+                if len(batch) >= CacheService.INVALIDATE_CHUNK_SIZE:
+                    await cache_engine.delete(*batch)
+                    deleted += len(batch)
+                    batch = []
+            if batch:
+                await cache_engine.delete(*batch)
+                deleted += len(batch)
+            return deleted
+
+        except Exception as e:
+            logger.warning(f"Cache delete pattern failed for {pattern}: {e}")
+            return 0
+
+    # ====================
+    # Tags
+    # ====================
+
+    @staticmethod
+    def _namespace(key: str) -> str:
+        """Namespace of a plain key, in PREFIX_* form ("balance:123:BTC" -> "balance:")"""
+        return key.split(":", 1)[0] + ":"
+
+    @staticmethod
+    def _namespace_tag(prefix: str) -> str:
+        return f"ns:{prefix}"
+
+    @staticmethod
+    async def invalidate_tag(tag: str) -> int:
+        """
+        Delete every entry registered under a tag, on every worker.
+
+        Args:
+            tag: Tag name (e.g. "user:123" or "balances")
 
-            if not keys:
+        Returns:
+            Number of keys deleted
+        """
+        try:
+            redis = get_redis()
+            if not redis:
                 return 0
 
-            # Delete all keys
-            await redis.delete(*keys)
-            return len(keys)
+            tag_key = RedisKeys.CACHE_TAG.format(tag=tag)
+            deleted = 0
+            while True:
+                # SPOP keeps each round bounded; keys tagged meanwhile are picked up by the next round
+                keys = await redis.spop(tag_key, CacheService.INVALIDATE_CHUNK_SIZE)
+                if not keys:
+                    break
+                await cache_engine.delete(*keys)
+                deleted += len(keys)
+            return deleted
 
         except Exception as e:
-            logger.warning(f"Cache delete pattern failed for {pattern}: {e}")
+            logger.warning(f"Cache tag invalidate failed for {tag}: {e}")
             return 0
 
     @staticmethod
@@ -182,13 +294,313 @@ class CacheService:
             logger.warning(f"Cache exists check failed for {key}: {e}")
             return False
 
+    # ====================
+    # Read-through cache
+    # ====================
+
+    @staticmethod
+    async def get_or_load(
+        prefix: str,
+        key: Any,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = TTL_SHORT,
+        stale_ttl: int = 0
+    ) -> Any:
+        """
+        Get a cached value, loading and caching it on a miss.
+
+        Args:
+            prefix: Namespace prefix (one of the PREFIX_* constants)
+            key: Entry key within the namespace
+            loader: Coroutine function producing the value (None is not cached)
+            ttl: Seconds the entry is fresh
+            stale_ttl: Extra seconds the entry may be served stale while it is
+                refreshed in the background (0 disables stale-while-revalidate)
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        key = str(key)
+        local_key = CacheService._local_key(prefix, key)
+
+        data = cache_engine.get_local(local_key)
+        if data is not None:
+            CacheService._count(prefix, "hits")
+            return decode(data)["value"]
+
+        redis = get_binary_redis()
+        if not redis:
+            return await loader()
+
+        try:
+            if CacheService._read_script is None:
+                CacheService._read_script = redis.register_script(READ_THROUGH_SCRIPT)
+            version, generation, raw = await CacheService._read_script(
+                keys=[
+                    RedisKeys.CACHE_VERSION.format(prefix=prefix),
+                    RedisKeys.CACHE_GENERATION.format(prefix=prefix, key=key)
+                ],
+                args=[prefix, key],
+                client=redis
+            )
+            entry = decode(raw) if raw is not None else None
+        except Exception as e:
+            logger.warning(f"Cache read failed for {prefix}{key}: {e}")
+            CacheService._count(prefix, "errors")
+            return await loader()
+
+        version, generation = version.decode(), generation.decode()
+        entry_key = RedisKeys.CACHE_ENTRY.format(prefix=prefix, version=version, key=key)
+
+        if entry is not None:
+            fresh_for = entry["fresh_until"] - time.time()
+            if fresh_for > 0:
+                CacheService._count(prefix, "hits")
+                cache_engine.set_local(local_key, raw, fresh_for)
+                return entry["value"]
+
+            # Past its TTL but inside the stale window: serve it, refresh once in the background
+            CacheService._count(prefix, "stale_hits")
+            if entry_key not in CacheService._inflight:
+                CacheService._start_load(
+                    prefix, key, version, generation, loader, ttl, stale_ttl, refresh=True
+                )
+            return entry["value"]
+
+        CacheService._count(prefix, "misses")
+        task = CacheService._inflight.get(entry_key)
+        if task is None:
+            task = CacheService._start_load(prefix, key, version, generation, loader, ttl, stale_ttl)
+        else:
+            CacheService._count(prefix, "coalesced")
+
+        # Shielded so one cancelled request doesn't cancel the load others are waiting on
+        return await asyncio.shield(task)
+
+    @staticmethod
+    def _local_key(prefix: str, key: Any) -> str:
+        """In-process key of a read-through entry (unversioned, dropped on invalidation)"""
+        return f"cache:{prefix}{key}"
+
+    @staticmethod
+    def _start_load(
+        prefix: str,
+        key: str,
+        version: str,
+        generation: str,
+        loader,
+        ttl: int,
+        stale_ttl: int,
+        refresh: bool = False
+    ) -> asyncio.Future:
+        entry_key = RedisKeys.CACHE_ENTRY.format(prefix=prefix, version=version, key=key)
+        task = asyncio.ensure_future(
+            CacheService._load_and_store(prefix, key, version, generation, loader, ttl, stale_ttl, refresh)
+        )
+        CacheService._inflight[entry_key] = task
+
+        def _done(finished: asyncio.Future):
+            if CacheService._inflight.get(entry_key) is finished:
+                CacheService._inflight.pop(entry_key, None)
+            if refresh and not finished.cancelled() and finished.exception():
+                logger.warning(f"Background cache refresh failed for {entry_key}: {finished.exception()}")
+
+        task.add_done_callback(_done)
+        return task
+
+    @staticmethod
+    async def _load_and_store(
+        prefix: str,
+        key: str,
+        version: str,
+        generation: str,
+        loader,
+        ttl: int,
+        stale_ttl: int,
+        refresh: bool
+    ):
+        redis = get_binary_redis()
+        entry_key = RedisKeys.CACHE_ENTRY.format(prefix=prefix, version=version, key=key)
+        lock_key = RedisKeys.CACHE_LOAD_LOCK.format(key=entry_key)
+
+        try:
+            locked = await redis.set(lock_key, b"1", nx=True, ex=CacheService.LOAD_LOCK_TTL)
+        except Exception as e:
+            logger.warning(f"Cache load lock failed for {entry_key}: {e}")
+            locked = False
+        else:
+            if not locked:
+                if refresh:
+                    # Another worker is already refreshing this entry
+                    return None
+
+                # Another worker is loading this entry, wait briefly for its result
+                deadline = time.monotonic() + CacheService.LOAD_WAIT_SECONDS
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(CacheService.LOAD_POLL_SECONDS)
+                    raw = await redis.get(entry_key)
+                    if raw is not None:
+                        CacheService._count(prefix, "coalesced")
+                        return decode(raw)["value"]
+
+        try:
+            value = await loader()
+            CacheService._count(prefix, "loads")
+            if value is not None:
+                try:
+                    data = encode({"value": value, "fresh_until": time.time() + ttl})
+                    if CacheService._store_script is None:
+                        CacheService._store_script = redis.register_script(STORE_SCRIPT)
+                    received = cache_engine.stats["invalidations_received"]
+                    stored = await CacheService._store_script(
+                        keys=[
+                            RedisKeys.CACHE_VERSION.format(prefix=prefix),
+                            RedisKeys.CACHE_GENERATION.format(prefix=prefix, key=key),
+                            entry_key,
+                            RedisKeys.CACHE_NAMESPACES
+                        ],
+                        args=[version, generation, ttl + stale_ttl, data, prefix],
+                        client=redis
+                    )
+                    if stored:
+                        # Skip the local copy if another worker's invalidation landed meanwhile
+                        if cache_engine.stats["invalidations_received"] == received:
+                            cache_engine.set_local(CacheService._local_key(prefix, key), data, ttl)
+                    else:
+                        # Invalidated while loading; the value may predate the change
+                        logger.debug(f"Discarded cache load for {entry_key} invalidated mid-load")
+                except Exception as e:
+                    logger.warning(f"Cache store failed for {entry_key}: {e}")
+            return value
+        finally:
+            if locked:
+                try:
+                    await redis.delete(lock_key)
+                except Exception:
+                    pass
+
+    @staticmethod
+    async def invalidate(prefix: str, key: Any) -> bool:
+        """
+        Drop one read-through entry on every worker (call after the underlying data changes).
+
+        Args:
+            prefix: Namespace prefix
+            key: Entry key within the namespace
+
+        Returns:
+            Success status
+        """
+        return await CacheService.invalidate_many(prefix, [key])
+
+    @staticmethod
+    async def invalidate_many(prefix: str, keys: List[Any]) -> bool:
+        """
+        Drop several read-through entries of one namespace on every worker.
+
+        Args:
+            prefix: Namespace prefix
+            keys: Entry keys within the namespace
+
+        Returns:
+            Success status
+        """
+        if not keys:
+            return False
+
+        local_keys = [CacheService._local_key(prefix, key) for key in keys]
+        for local_key in local_keys:
+            cache_engine.drop_local(key=local_key)
+
+        try:
+            redis = get_binary_redis()
+            if not redis:
+                return False
+
+            version = (await redis.get(RedisKeys.CACHE_VERSION.format(prefix=prefix)) or b"0").decode()
+            entry_keys = [RedisKeys.CACHE_ENTRY.format(prefix=prefix, version=version, key=key) for key in keys]
+            for entry_key in entry_keys:
+                # New readers must not join a load that started before the change
+                CacheService._inflight.pop(entry_key, None)
+            for i in range(0, len(keys), CacheService.INVALIDATE_CHUNK_SIZE):
+                chunk = slice(i, i + CacheService.INVALIDATE_CHUNK_SIZE)
+                pipe = redis.pipeline(transaction=False)
+                for key in keys[chunk]:
+                    # Loads already running must not store what they read before the change
+                    generation_key = RedisKeys.CACHE_GENERATION.format(prefix=prefix, key=key)
+                    pipe.incr(generation_key)
+                    pipe.expire(generation_key, CacheService.GENERATION_TTL)
+                pipe.delete(*entry_keys[chunk])
+                # Nor may other workers keep waiting on them instead of loading
+                pipe.delete(*(RedisKeys.CACHE_LOAD_LOCK.format(key=entry_key) for entry_key in entry_keys[chunk]))
+                await pipe.execute()
+                await cache_engine.publish_invalidation(keys=local_keys[chunk])
+            return True
+
+        except Exception as e:
+            logger.warning(f"Cache invalidate failed for {len(keys)} {prefix} entries: {e}")
+            return False
+
+    @staticmethod
+    async def invalidate_namespace(prefix: str) -> bool:
+        """
+        Invalidate every entry under a prefix.
+        Read-through entries are dropped by bumping the namespace version (old
+        entries are never read again and expire with their TTL); plain entries
+        are deleted through the namespace tag.
+
+        Args:
+            prefix: Namespace prefix
+
+        Returns:
+            Success status
+        """
+        await CacheService.invalidate_tag(CacheService._namespace_tag(prefix))
+
+        local_prefix = CacheService._local_key(prefix, "")
+        cache_engine.drop_local(prefix=local_prefix)
+
+        try:
+            redis = get_binary_redis()
+            if not redis:
+                return False
+
+            await redis.incr(RedisKeys.CACHE_VERSION.format(prefix=prefix))
+            await cache_engine.publish_invalidation(prefix=local_prefix)
+            return True
+
+        except Exception as e:
+            logger.warning(f"Cache namespace invalidate failed for {prefix}: {e}")
+            return False
+
+    @staticmethod
+    def _count(prefix: str, stat: str):
+        CacheService._stats.setdefault(prefix, dict.fromkeys(READ_THROUGH_STATS, 0))[stat] += 1
+
+    @staticmethod
+    def get_read_through_stats() -> Dict[str, Dict]:
+        """
+        Hit/miss counters per prefix for this worker.
+
+        Returns:
+            Dict of prefix -> counters and hit rate
+        """
+        stats = {}
+        for prefix, counters in CacheService._stats.items():
+            lookups = counters["hits"] + counters["stale_hits"] + counters["misses"]
+            stats[prefix] = {
+                **counters,
+                "hit_rate": round((counters["hits"] + counters["stale_hits"]) / lookups * 100, 2) if lookups else 0.0
+            }
+        return stats
+
     # Convenience methods for common cache patterns
 
     @staticmethod
     async def cache_user_data(user_id: str, user_data: dict, ttl: int = TTL_MEDIUM):
         """Cache user data"""
         key = f"{CacheService.PREFIX_USER}{user_id}"
-        return await CacheService.set(key, user_data, ttl)
+        return await CacheService.set(key, user_data, ttl, tags=[CacheService.TAG_USER.format(user_id=user_id)])
 
     @staticmethod
     async def get_cached_user_data(user_id: str) -> Optional[dict]:
@@ -198,15 +610,18 @@ class CacheService:
 
     @staticmethod
     async def invalidate_user_cache(user_id: str):
-        """Invalidate all user-related cache"""
-        pattern = f"{CacheService.PREFIX_USER}{user_id}*"
-        return await CacheService.delete_pattern(pattern)
+        """Invalidate all user-related cache (data, balances, reputation)"""
+        return await CacheService.invalidate_tag(CacheService.TAG_USER.format(user_id=user_id))
 
     @staticmethod
     async def cache_balance(user_id: str, asset: str, balance_data: dict, ttl: int = TTL_SHORT):
         """Cache balance data"""
         key = f"{CacheService.PREFIX_BALANCE}{user_id}:{asset}"
-        return await CacheService.set(key, balance_data, ttl)
+        return await CacheService.set(key, balance_data, ttl, tags=[
+            CacheService.TAG_USER.format(user_id=user_id),
+            CacheService.TAG_USER_BALANCES.format(user_id=user_id),
+            CacheService.TAG_BALANCES
+        ])
 
     @staticmethod
     async def get_cached_balance(user_id: str, asset: str) -> Optional[dict]:
@@ -221,8 +636,12 @@ class CacheService:
             key = f"{CacheService.PREFIX_BALANCE}{user_id}:{asset}"
             return await CacheService.delete(key)
         else:
-            pattern = f"{CacheService.PREFIX_BALANCE}{user_id}:*"
-            return await CacheService.delete_pattern(pattern)
+            return await CacheService.invalidate_tag(CacheService.TAG_USER_BALANCES.format(user_id=user_id))
+
+    @staticmethod
+    async def invalidate_all_balances():
+        """Invalidate every cached balance (e.g. after a price or fee change)"""
+        return await CacheService.invalidate_tag(CacheService.TAG_BALANCES)
 
     @staticmethod
     async def cache_exchange_rate(from_asset: str, to_asset: str, rate: float, ttl: int = TTL_SHORT):
@@ -240,7 +659,7 @@ class CacheService:
     async def cache_reputation(user_id: str, reputation_data: dict, ttl: int = TTL_LONG):
         """Cache reputation data"""
         key = f"{CacheService.PREFIX_REPUTATION}{user_id}"
-        return await CacheService.set(key, reputation_data, ttl)
+        return await CacheService.set(key, reputation_data, ttl, tags=[CacheService.TAG_USER.format(user_id=user_id)])
 
     @staticmethod
     async def get_cached_reputation(user_id: str) -> Optional[dict]:
@@ -281,8 +700,7 @@ class CacheService:
     @staticmethod
     async def invalidate_tos_cache():
         """Invalidate all TOS cache"""
-        pattern = f"{CacheService.PREFIX_TOS}*"
-        return await CacheService.delete_pattern(pattern)
+        return await CacheService.invalidate_namespace(CacheService.PREFIX_TOS)
 
     @staticmethod
     async def get_cache_stats() -> dict:
@@ -309,7 +727,9 @@ class CacheService:
                     info.get("keyspace_hits", 0) /
                     (info.get("keyspace_hits", 0) + info.get("keyspace_misses", 1))
                     * 100
-                )
+                ),
+                "read_through": CacheService.get_read_through_stats(),
+                "local_tier": cache_engine.get_stats()
             }
 
         except Exception as e:
@@ -321,15 +741,17 @@ class CacheService:
 def cached(
     key_prefix: str,
     ttl: int = CacheService.TTL_MEDIUM,
-    key_func=None
+    key_func=None,
+    stale_ttl: int = 0
 ):
     """
-    Decorator for caching function results.
+    Decorator for caching function results (read-through, see CacheService.get_or_load).
 
     Args:
         key_prefix: Prefix for cache key
         ttl: Time to live in seconds
         key_func: Optional function to generate cache key from args
+        stale_ttl: Seconds a result may be served stale while it is refreshed
 
     Example:
         @cached("user_profile", ttl=3600)
@@ -337,27 +759,22 @@ def cached(
             ...
     """
     def decorator(func):
+        @functools.wraps(func)
         async def wrapper(*args, **kwargs):
             # Generate cache key
             if key_func:
-                cache_key = f"{key_prefix}:{key_func(*args, **kwargs)}"
+                cache_key = key_func(*args, **kwargs)
             else:
                 # Use first arg as key
-                cache_key = f"{key_prefix}:{args[0] if args else ''}"
-
-            # Try cache first
-            cached_value = await CacheService.get(cache_key)
-            if cached_value is not None:
-                return cached_value
-
-            # Execute function
-            result = await func(*args, **kwargs)
-
-            # Cache result
-            if result is not None:
-                await CacheService.set(cache_key, result, ttl)
+                cache_key = args[0] if args else ''
 
-            return result
+            return await CacheService.get_or_load(
+                f"{key_prefix}:",
+                cache_key,
+                lambda: func(*args, **kwargs),
+                ttl=ttl,
+                stale_ttl=stale_ttl
+            )
 
         return wrapper
     return decorator
@@ -372,11 +789,9 @@ async def warm_cache():
     try:
         logger.info("Warming cache...")
 
-        # Preload active TOS
+        # Preload active TOS (read-through, so this fills the cache)
         from app.services.tos_service import TOSService
-        all_tos = await TOSService.get_all_active_tos()
-        for category, tos_data in all_tos.items():
-            await CacheService.cache_tos(category, tos_data)
+        await TOSService.get_all_active_tos()
 
         # Preload platform analytics
         from app.services.analytics_service import AnalyticsService
@@ -391,19 +806,28 @@ async def warm_cache():
 
 # Cache invalidation helpers
 async def invalidate_user_related_cache(user_id: str):
-    """Invalidate all cache related to a user"""
+    """Invalidate all cache related to a user (by Discord ID or MongoDB ID)"""
     await CacheService.invalidate_user_cache(user_id)
-    await CacheService.invalidate_balance_cache(user_id)
-    await CacheService.invalidate_reputation_cache(user_id)
+    for prefix in (CacheService.PREFIX_USER, CacheService.PREFIX_PORTFOLIO, CacheService.PREFIX_REPUTATION):
+        await CacheService.invalidate(prefix, user_id)
 
 
 async def clear_all_cache():
-    """Clear all application cache"""
+    """Clear all application cache (sessions, rate limits and queues are kept)"""
     try:
         redis = get_redis()
         if redis:
-            await redis.flushdb()
-            logger.info("All cache cleared")
+            namespaces = set(await redis.smembers(RedisKeys.CACHE_NAMESPACES))
+            # Prefixes written before the registry existed
+            namespaces.update(
+                value for name, value in vars(CacheService).items() if name.startswith("PREFIX_")
+            )
+            for prefix in namespaces:
+                await CacheService.invalidate_namespace(prefix)
+
+            cache_engine.drop_local()
+            await cache_engine.publish_invalidation()
+            logger.info(f"All cache cleared ({len(namespaces)} namespaces)")
             return True
         return False
     except Exception as e:
@@ -7,9 +7,9 @@ Documentation: https://documenter.getpostman.com/view/8180765/SVfTPnbB
 from typing import Optional, Dict, Tuple
 from datetime import datetime
 import logging
-import httpx
 
 from app.core.config import settings
+from app.core.http_client import provider_client
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +30,7 @@ class ChangeNowService:
             List of currency objects
         """
         try:
-            async with httpx.AsyncClient() as client:
+            async with provider_client("changenow") as client:
                 response = await client.get(
                     f"{ChangeNowService.API_URL}/exchange/currencies",
                     params={"active": True},
@@ -78,7 +78,7 @@ class ChangeNowService:
             if to_network:
                 params["toNetwork"] = to_network
 
-            async with httpx.AsyncClient() as client:
+            async with provider_client("changenow") as client:
                 response = await client.get(
                     f"{ChangeNowService.API_URL}/exchange/range",
                     params=params,
@@ -135,7 +135,7 @@ class ChangeNowService:
             if to_network:
                 params["toNetwork"] = to_network
 
-            async with httpx.AsyncClient() as client:
+            async with provider_client("changenow") as client:
                 headers = {"x-changenow-api-key": settings.CHANGENOW_API_KEY}
 
                 response = await client.get(
@@ -229,7 +229,7 @@ class ChangeNowService:
             # Log payload for debugging
             logger.info(f"ChangeNOW create_exchange payload: {payload}")
 
-            async with httpx.AsyncClient() as client:
+            async with provider_client("changenow") as client:
                 headers = {
                     "x-changenow-api-key": settings.CHANGENOW_API_KEY,
                     "Content-Type": "application/json"
@@ -301,7 +301,7 @@ class ChangeNowService:
                 logger.error("ChangeNow API key not configured")
                 return None
 
-            async with httpx.AsyncClient() as client:
+            async with provider_client("changenow") as client:
                 headers = {"x-changenow-api-key": settings.CHANGENOW_API_KEY}
 
                 response = await client.get(
@@ -7,9 +7,9 @@ Matches V3 implementation using Tatum API
 from typing import Optional, Dict, Tuple
 from decimal import Decimal
 import logging
-import httpx
 
 from app.core.config import settings
+from app.core.http_client import provider_client
 from app.core.security import encrypt_private_key, get_decrypted_private_key
 
 logger = logging.getLogger(__name__)
@@ -43,7 +43,7 @@ class CryptoHandlerService:
             if not blockchain:
                 raise ValueError(f"Unsupported asset: {asset}")
 
-            async with httpx.AsyncClient() as client:
+            async with provider_client("tatum") as client:
                 headers = {
                     "x-api-key": settings.TATUM_API_KEY,
                     "Content-Type": "application/json"
@@ -123,7 +123,7 @@ class CryptoHandlerService:
             if not blockchain:
                 raise ValueError(f"Unsupported asset: {asset}")
 
-            async with httpx.AsyncClient() as client:
+            async with provider_client("tatum") as client:
                 headers = {"x-api-key": settings.TATUM_API_KEY}
 
                 url = f"{settings.TATUM_API_URL}/v3/{blockchain}/address/balance/{address}"
@@ -204,7 +204,7 @@ class CryptoHandlerService:
             # Decrypt private key
             private_key = get_decrypted_private_key(encrypted_private_key)
 
-            async with httpx.AsyncClient() as client:
+            async with provider_client("tatum") as client:
                 headers = {
                     "x-api-key": settings.TATUM_API_KEY,
                     "Content-Type": "application/json"
@@ -322,7 +322,7 @@ class CryptoHandlerService:
             if not chain:
                 return None
 
-            async with httpx.AsyncClient() as client:
+            async with provider_client("tatum") as client:
                 headers = {"x-api-key": settings.TATUM_API_KEY}
 
                 url = f"{settings.TATUM_API_URL}/v3/blockchain/transaction/{chain}/{tx_hash}"
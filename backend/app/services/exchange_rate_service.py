@@ -1,12 +1,13 @@
 """
 Exchange Rate Service - Provides USD to global currency conversions
-Uses exchangerate-api.com for live rates
+Rates come from the shared price oracle (exchangerate-api.com, refreshed hourly)
 """
 
 from typing import Dict
-import aiohttp
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
+
+from app.services.price_service import fiat_rates
 
 logger = logging.getLogger(__name__)
 
@@ -14,11 +15,6 @@ logger = logging.getLogger(__name__)
 class ExchangeRateService:
     """Service for currency exchange rates"""
 
-    # Cache rates for 1 hour
-    _cache = {}
-    _cache_time = None
-    _cache_duration = timedelta(hours=1)
-
     # Top 10 global currencies (excluding USD)
     TOP_CURRENCIES = [
         "EUR",  # Euro
@@ -48,42 +44,18 @@ class ExchangeRateService:
 
     @classmethod
     async def get_rates(cls) -> Dict[str, float]:
-        """Get current USD exchange rates (cached)"""
-
-        # Check cache
-        if cls._cache_time and datetime.utcnow() - cls._cache_time < cls._cache_duration:
-            return cls._cache
-
-        # Fetch new rates
+        """Get current USD exchange rates (shared snapshot, see app.services.price_service)"""
         try:
-            async with aiohttp.ClientSession() as session:
-                # Using exchangerate-api.com free tier (no API key needed for basic usage)
-                url = "https://api.exchangerate-api.com/v4/latest/USD"
-
-                async with session.get(url, timeout=10) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        rates = data.get("rates", {})
-
-                        # Cache the rates
-                        cls._cache = rates
-                        cls._cache_time = datetime.utcnow()
-
-                        logger.info(f"Fetched fresh exchange rates: {len(rates)} currencies")
-                        return rates
-                    else:
-                        logger.error(f"Failed to fetch rates: {response.status}")
-
+            snapshot = await fiat_rates.get()
         except Exception as e:
-            logger.error(f"Error fetching exchange rates: {e}")
-
-        # Return cached rates if fetch failed
-        if cls._cache:
-            logger.warning("Using cached exchange rates due to fetch error")
-            return cls._cache
-
-        # Return empty dict if no cache available
-        return {}
+            logger.error(f"Error reading exchange rates: {e}")
+            return {}
+
+        if snapshot is None:
+            return {}
+        if snapshot.stale:
+            logger.warning(f"Using exchange rates from {snapshot.age_seconds:.0f}s ago")
+        return snapshot.values
 
     @classmethod
     async def get_top_currencies(cls, amount_usd: float) -> Dict:
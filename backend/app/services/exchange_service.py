@@ -240,17 +240,21 @@ class ExchangeService:
         """Update user reputation scores after successful exchange"""
         users = get_users_collection()
 
-        # Increase reputation for both parties
-        await users.update_one(
-            {"_id": exchange["creator_id"]},
-            {"$inc": {"reputation_score": 1}}
-        )
+        from app.services.auth_cache_service import AuthCacheService
 
+        # Increase reputation for both parties
+        user_ids = [exchange["creator_id"]]
         if exchange.get("exchanger_id"):
-            await users.update_one(
-                {"_id": exchange["exchanger_id"]},
-                {"$inc": {"reputation_score": 1}}
+            user_ids.append(exchange["exchanger_id"])
+
+        for user_id in user_ids:
+            user = await users.find_one_and_update(
+                {"_id": user_id},
+                {"$inc": {"reputation_score": 1}},
+                projection={"discord_id": 1}
             )
+            if user:
+                await AuthCacheService.invalidate(user["discord_id"])
 
     @staticmethod
     async def log_action(exchange_id: str, user_id: str, action: str, details: dict):
@@ -226,11 +226,15 @@ class ExchangerApplicationService:
             # If approved, add exchanger role to user
             if status == "approved":
                 from app.core.database import get_users_collection
+                from app.services.auth_cache_service import AuthCacheService
                 users = get_users_collection()
-                await users.update_one(
+                user = await users.find_one_and_update(
                     {"user_id": application["user_id"]},
-                    {"$addToSet": {"roles": "exchanger"}}
+                    {"$addToSet": {"roles": "exchanger"}},
+                    projection={"discord_id": 1}
                 )
+                if user:
+                    await AuthCacheService.invalidate(user["discord_id"])
 
                 logger.info(f"Approved exchanger application {application_id} for user {application['user_id']}")
 
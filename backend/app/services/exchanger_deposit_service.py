@@ -25,6 +25,9 @@ class ExchangerDepositService:
     CLAIM_LIMIT_MULTIPLIER = 1.0
     HOLD_MULTIPLIER = 1.0
 
+    # Recently credited tx hashes kept on each deposit to make crediting idempotent
+    CREDITED_TX_WINDOW = 1000
+
     @staticmethod
     async def create_deposit_wallet(user_id: str, asset: str) -> dict:
         """
@@ -138,52 +141,121 @@ class ExchangerDepositService:
         amount_units: float,
         amount_usd: float,
         tx_hash: str
-    ) -> dict:
+    ) -> Optional[dict]:
         """
         Credit exchanger deposit from blockchain confirmation.
-        Called by webhook handler.
+        Called by webhook handler. Crediting the same tx_hash twice is a no-op.
+        """
+        await ExchangerDepositService.credit_deposits(user_id, asset, [{
+            "tx_hash": tx_hash,
+            "amount_units": amount_units,
+            "amount_usd": amount_usd
+        }])
+        return await ExchangerDepositService.get_deposit(user_id, asset)
+
+    @staticmethod
+    async def credit_deposits(user_id: str, asset: str, credits: List[Dict]) -> List[str]:
+        """
+        Credit several confirmed transactions to one exchanger deposit.
+
+        The deposit keeps the last CREDITED_TX_WINDOW credited tx hashes, and an
+        update only applies if none of its hashes are among them, so a
+        transaction redelivered after a crash (or credited concurrently by
+        another worker) is never counted twice. The whole batch is applied in
+        one atomic update; if some of it was already credited, the rest is
+        applied one transaction at a time.
+
+        Args:
+            user_id: Exchanger user ID
+            asset: Deposit asset
+            credits: Dicts with tx_hash, amount_units and amount_usd
+
+        Returns:
+            tx hashes credited by this call
         """
+        if not credits:
+            return []
+
         db = await get_db_collection("exchanger_deposits")
 
-        # Update balance
-        result = await db.find_one_and_update(
-            {"user_id": ObjectId(user_id), "asset": asset},
-            {
-                "$inc": {
-                    "balance_units": amount_units,
-                    "balance_usd": amount_usd
-                },
-                "$set": {
-                    "claim_limit_usd": f"$balance_usd * {ExchangerDepositService.CLAIM_LIMIT_MULTIPLIER}",
-                    "updated_at": datetime.utcnow(),
-                    "last_balance_check": datetime.utcnow()
+        async def apply(batch: List[Dict]) -> bool:
+            tx_hashes = [credit["tx_hash"] for credit in batch]
+            units = sum(credit["amount_units"] for credit in batch)
+            usd = sum(credit["amount_usd"] or 0.0 for credit in batch)
+            balance_usd = {"$add": [{"$ifNull": ["$balance_usd", 0]}, usd]}
+            result = await db.update_one(
+                {"user_id": ObjectId(user_id), "asset": asset, "credited_tx_hashes": {"$nin": tx_hashes}},
+                [{"$set": {
+                    "balance_units": {"$add": [{"$ifNull": ["$balance_units", 0]}, units]},
+                    "balance_usd": balance_usd,
+                    "claim_limit_usd": {"$multiply": [balance_usd, ExchangerDepositService.CLAIM_LIMIT_MULTIPLIER]},
+                    "credited_tx_hashes": {"$slice": [
+                        {"$concatArrays": [{"$ifNull": ["$credited_tx_hashes", []]}, tx_hashes]},
+                        -ExchangerDepositService.CREDITED_TX_WINDOW
+                    ]},
+                    "updated_at": "$$NOW",
+                    "last_balance_check": "$$NOW"
+                }}]
+            )
+            return result.modified_count == 1
+
+        if await apply(credits):
+            credited = credits
+        else:
+            credited = [credit for credit in credits if len(credits) > 1 and await apply([credit])]
+
+        if credited:
+            audit_logs = get_audit_logs_collection()
+            now = datetime.utcnow()
+            await audit_logs.insert_many([
+                {
+                    "user_id": ObjectId(user_id),
+                    "actor_type": "system",
+                    "action": "deposit.credited",
+                    "resource_type": "exchanger_deposit",
+                    "resource_id": ObjectId(user_id),
+                    "details": {
+                        "asset": asset,
+                        "amount_units": credit["amount_units"],
+                        "amount_usd": credit["amount_usd"],
+                        "tx_hash": credit["tx_hash"]
+                    },
+                    "created_at": now
                 }
-            },
-            return_document=True
-        )
+                for credit in credited
+            ])
+            logger.info(
+                f"Credited deposit: user={user_id} asset={asset} "
+                f"amount={sum(c['amount_units'] for c in credited)} txs={len(credited)}"
+            )
 
-        # Recalculate claim limit
-        new_claim_limit = result["balance_usd"] * ExchangerDepositService.CLAIM_LIMIT_MULTIPLIER
-        await db.update_one(
-            {"_id": result["_id"]},
-            {"$set": {"claim_limit_usd": new_claim_limit}}
-        )
+        return [credit["tx_hash"] for credit in credited]
 
-        # Log deposit
-        await ExchangerDepositService.log_action(
-            user_id,
-            "deposit.credited",
-            {
-                "asset": asset,
-                "amount_units": amount_units,
-                "amount_usd": amount_usd,
-                "tx_hash": tx_hash
-            }
-        )
+    @staticmethod
+    async def add_usd_value(user_id: str, asset: str, amount_usd: float) -> bool:
+        """
+        Add USD value to a deposit balance after the fact, for transactions
+        credited before a price was available (see WebhookService.backfill_usd_values).
 
-        logger.info(f"Credited deposit: user={user_id} asset={asset} amount={amount_units} tx={tx_hash}")
+        Args:
+            user_id: Exchanger user ID
+            asset: Deposit asset
+            amount_usd: USD value to add
 
-        return result
+        Returns:
+            True if the deposit was updated
+        """
+        db = await get_db_collection("exchanger_deposits")
+        balance_usd = {"$add": [{"$ifNull": ["$balance_usd", 0]}, amount_usd]}
+        result = await db.update_one(
+            {"user_id": ObjectId(user_id), "asset": asset},
+            [{"$set": {
+                "balance_usd": balance_usd,
+                "claim_limit_usd": {"$multiply": [balance_usd, ExchangerDepositService.CLAIM_LIMIT_MULTIPLIER]},
+                "updated_at": "$$NOW"
+            }}]
+        )
+        return result.modified_count == 1
 
     @staticmethod
     async def check_claim_limit(
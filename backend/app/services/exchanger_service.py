@@ -9,10 +9,9 @@ from datetime import datetime
 from bson import ObjectId
 from decimal import Decimal
 import logging
-import asyncio
-from collections import defaultdict
 
 from app.core.database import get_db_collection
+from app.core.locks import exchanger_lock, versioned_update
 from app.models.exchanger import (
     ExchangerDeposit,
     TicketHold,
@@ -22,6 +21,7 @@ from app.models.exchanger import (
     ExchangerProfile
 )
 from app.services.price_service import price_service
+from app.services.hold_allocation_service import HoldAllocationService
 
 logger = logging.getLogger(__name__)
 
@@ -43,14 +43,6 @@ class ExchangerService:
     CLAIM_LIMIT_MULTIPLIER = 1.0  # Can claim up to 1x deposit balance ($100 deposited = $100 claim limit)
     HOLD_MULTIPLIER = 1.0  # Hold 100% of ticket value
 
-    # Per-user locks to prevent race conditions
-    _user_locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
-
-    @staticmethod
-    def _get_user_lock(user_id: str) -> asyncio.Lock:
-        """Get lock for user to prevent race conditions"""
-        return ExchangerService._user_locks[user_id]
-
     @staticmethod
     async def create_deposit_wallet(user_id: str, currency: str) -> ExchangerDeposit:
         """
@@ -64,7 +56,7 @@ class ExchangerService:
         Returns:
             ExchangerDeposit
         """
-        async with ExchangerService._get_user_lock(user_id):
+        async with exchanger_lock(user_id):
             db = await get_db_collection("exchanger_deposits")
 
             # Check if already exists
@@ -178,7 +170,7 @@ class ExchangerService:
         Sync deposit balance from V4 wallet system
         Updates balance, held, fee_reserved based on active holds/fees
         """
-        async with ExchangerService._get_user_lock(user_id):
+        async with exchanger_lock(user_id):
             db = await get_db_collection("exchanger_deposits")
 
             deposit_data = await db.find_one({
@@ -260,9 +252,10 @@ class ExchangerService:
             if fee_reserved_usd is not None:
                 update_fields["fee_reserved_usd"] = fee_reserved_usd
 
+            # Bump the version so in-flight optimistic updates re-read the synced balance
             await db.update_one(
                 {"user_id": user_id, "currency": currency},
-                {"$set": update_fields}
+                {"$set": update_fields, "$inc": {"version": 1}}
             )
 
             # Get updated deposit
@@ -272,17 +265,8 @@ class ExchangerService:
     @staticmethod
     async def get_aggregate_balance_usd(user_id: str) -> Decimal:
         """Get total USD value of all deposit balances"""
-        deposits = await ExchangerService.list_deposits(user_id)
-
-        total_usd = Decimal("0")
-        for deposit in deposits:
-            balance = Decimal(deposit.balance)
-            if balance > 0:
-                price_usd = await price_service.get_price_usd(deposit.currency)
-                if price_usd:
-                    total_usd += balance * price_usd
-
-        return total_usd
+        snapshot = await HoldAllocationService.snapshot(user_id, active_only=True)
+        return snapshot.balance_usd
 
     @staticmethod
     async def get_total_held_usd(user_id: str) -> Decimal:
@@ -311,32 +295,14 @@ class ExchangerService:
     @staticmethod
     async def get_total_fee_reserved_usd(user_id: str) -> Decimal:
         """Get total USD value of fee_reserved across all deposits"""
-        deposits = await ExchangerService.list_deposits(user_id)
-
-        total_fee_reserved_usd = Decimal("0")
-        for deposit in deposits:
-            fee_reserved = deposit.get_fee_reserved_decimal()
-            if fee_reserved > 0:
-                price_usd = await price_service.get_price_usd(deposit.currency)
-                if price_usd:
-                    total_fee_reserved_usd += fee_reserved * price_usd
-
-        return total_fee_reserved_usd
+        snapshot = await HoldAllocationService.snapshot(user_id, active_only=True)
+        return snapshot.fee_reserved_usd
 
     @staticmethod
     async def get_available_usd_for_holds(user_id: str) -> Decimal:
         """Get available USD that can be used for new holds"""
-        deposits = await ExchangerService.list_deposits(user_id)
-
-        total_available_usd = Decimal("0")
-        for deposit in deposits:
-            available = deposit.get_available_decimal()
-            if available > 0:
-                price_usd = await price_service.get_price_usd(deposit.currency)
-                if price_usd:
-                    total_available_usd += available * price_usd
-
-        return total_available_usd
+        snapshot = await HoldAllocationService.snapshot(user_id, active_only=True)
+        return snapshot.available_usd
 
     @staticmethod
     async def can_claim_ticket(user_id: str, ticket_amount_usd: Decimal) -> Tuple[bool, str, Decimal]:
@@ -346,17 +312,17 @@ class ExchangerService:
         Returns:
             (can_claim, reason, available_to_claim_usd)
         """
-        # Get total deposit balance
-        total_deposit_usd = await ExchangerService.get_aggregate_balance_usd(user_id)
+        # One deposit read and one price lookup for balance, held and available
+        snapshot = await HoldAllocationService.snapshot(user_id, active_only=True)
 
         # Calculate claim limit
-        claim_limit_usd = total_deposit_usd * Decimal(str(ExchangerService.CLAIM_LIMIT_MULTIPLIER))
+        claim_limit_usd = snapshot.balance_usd * Decimal(str(ExchangerService.CLAIM_LIMIT_MULTIPLIER))
 
         # Get total already held
-        total_held_usd = await ExchangerService.get_total_held_usd(user_id)
+        total_held_usd = snapshot.held_usd
 
         # Check if enough available
-        available_usd = await ExchangerService.get_available_usd_for_holds(user_id)
+        available_usd = snapshot.available_usd
 
         if available_usd < ticket_amount_usd:
             return False, (
@@ -381,7 +347,7 @@ class ExchangerService:
         Hold funds for active ticket
         Locks exchanger deposits proportionally across assets
         """
-        async with ExchangerService._get_user_lock(exchanger_id):
+        async with exchanger_lock(exchanger_id) as lease:
             holds_db = await get_db_collection("ticket_holds")
             allocations_db = await get_db_collection("hold_allocations")
 
@@ -456,20 +422,16 @@ class ExchangerService:
                 alloc_dict = allocation.model_dump(by_alias=True, exclude_none=True)
                 await allocations_db.insert_one(alloc_dict)
 
-                # Update deposit held amount (atomic)
-                prev_held = Decimal(deposit.held)
-                new_held = prev_held + allocate_units
+                # Update deposit held amount from the current document
+                def add_held(doc, currency=deposit.currency, units=allocate_units):
+                    new_held = Decimal(doc.get("held", "0")) + units
+                    if new_held > Decimal(doc.get("balance", "0")):
+                        raise ValueError(f"Failed to hold funds for {currency} - insufficient balance")
+                    return {"held": str(new_held)}
 
-                update_result = await deposits_db.update_one(
-                    {
-                        "_id": deposit.id,
-                        "balance": {"$gte": str(new_held)}  # Ensure sufficient balance
-                    },
-                    {"$set": {"held": str(new_held)}}
-                )
-
-                if update_result.modified_count == 0:
-                    raise ValueError(f"Failed to hold funds for {deposit.currency} - race condition or insufficient balance")
+                updated = await versioned_update(deposits_db, {"_id": deposit.id}, add_held, fence=lease.fence)
+                if updated is None:
+                    raise ValueError(f"Failed to hold funds for {deposit.currency} - deposit not found")
 
                 remaining_usd -= allocate_usd
 
@@ -501,54 +463,67 @@ class ExchangerService:
             logger.warning(f"No active hold found for ticket {ticket_id}")
             return False
 
+        async with exchanger_lock(hold_data["exchanger_id"]) as lease:
+            return await ExchangerService._release_hold_allocations(
+                hold_data, ticket_id, lease.fence, holds_db, allocations_db, deposits_db
+            )
+
+    @staticmethod
+    async def _release_hold_allocations(
+        hold_data: Dict,
+        ticket_id: str,
+        fence: Optional[int],
+        holds_db,
+        allocations_db,
+        deposits_db
+    ) -> bool:
+        """Return a hold's allocations to the deposits (caller holds the exchanger lock)"""
+        # Claim the hold first so a concurrent release cannot return the same funds twice
+        claimed = await holds_db.update_one(
+            {"_id": hold_data["_id"], "status": "active"},
+            {
+                "$set": {
+                    "status": "released",
+                    "released_at": datetime.utcnow()
+                }
+            }
+        )
+        if claimed.modified_count == 0:
+            logger.warning(f"Hold for ticket {ticket_id} was already released")
+            return False
+
         # Get allocations
         cursor = allocations_db.find({"hold_id": hold_data["_id"]})
         allocations = await cursor.to_list(length=None)
 
         # Release each allocation
         for allocation in allocations:
-            # Get deposit
-            deposit_data = await deposits_db.find_one({
-                "user_id": hold_data["exchanger_id"],
-                "currency": allocation["currency"]
-            })
+            release_amount = Decimal(allocation["amount"])
+
+            # Update held amount from the current document
+            deposit_data = await versioned_update(
+                deposits_db,
+                {"user_id": hold_data["exchanger_id"], "currency": allocation["currency"]},
+                lambda doc: {"held": str(max(Decimal("0"), Decimal(doc.get("held", "0")) - release_amount))},
+                fence=fence
+            )
 
             if deposit_data:
-                # Update held amount
-                prev_held = Decimal(deposit_data.get("held", "0"))
-                release_amount = Decimal(allocation["amount"])
-                new_held = max(Decimal("0"), prev_held - release_amount)
-
-                await deposits_db.update_one(
-                    {"_id": deposit_data["_id"]},
-                    {"$set": {"held": str(new_held)}}
-                )
-
                 logger.info(
                     f"Released {release_amount:.8f} {allocation['currency']} "
                     f"from hold for ticket {ticket_id}"
                 )
 
-        # Update hold status
-        await holds_db.update_one(
-            {"_id": hold_data["_id"]},
-            {
-                "$set": {
-                    "status": "released",
-                    "released_at": datetime.utcnow()
-                }
-            }
-        )
-
         logger.info(f"Released hold for ticket {ticket_id}")
         return True
 
     @staticmethod
     async def get_claim_limit_info(user_id: str) -> Dict:
         """Get claim limit information for exchanger"""
-        total_deposit_usd = await ExchangerService.get_aggregate_balance_usd(user_id)
-        total_held_usd = await ExchangerService.get_total_held_usd(user_id)
-        total_fee_reserved_usd = await ExchangerService.get_total_fee_reserved_usd(user_id)
+        snapshot = await HoldAllocationService.snapshot(user_id, active_only=True)
+        total_deposit_usd = snapshot.balance_usd
+        total_held_usd = snapshot.held_usd
+        total_fee_reserved_usd = snapshot.fee_reserved_usd
 
         claim_limit_usd = total_deposit_usd * Decimal(str(ExchangerService.CLAIM_LIMIT_MULTIPLIER))
         # Available = Claim Limit - Held - Fee Reserved
@@ -582,7 +557,7 @@ class ExchangerService:
         Returns:
             (success, message, tx_hash, transaction_data)
         """
-        async with ExchangerService._get_user_lock(user_id):
+        async with exchanger_lock(user_id) as lease:
             deposits_db = await get_db_collection("exchanger_deposits")
             transactions_db = await get_db_collection("exchanger_transactions")
             
@@ -682,6 +657,9 @@ class ExchangerService:
             from app.services.tatum_service import TatumService
             tatum_service = TatumService()
 
+            # Do not move funds unless the lease is still ours
+            lease.ensure_held()
+
             # Send transaction (positional args: blockchain, from_address, private_key, to_address, amount)
             success, message, tx_hash = await tatum_service.send_transaction(
                 currency,  # blockchain
@@ -712,11 +690,12 @@ class ExchangerService:
             transaction["_id"] = result.inserted_id
             
             if success:
-                # Update deposit balance
-                new_balance = Decimal(deposit.balance) - withdraw_amount
-                await deposits_db.update_one(
+                # Update deposit balance from the current document. No fence here:
+                # the funds have left the wallet, so the deduction must land regardless
+                await versioned_update(
+                    deposits_db,
                     {"_id": deposit_data["_id"]},
-                    {"$set": {"balance": str(new_balance)}}
+                    lambda doc: {"balance": str(Decimal(doc.get("balance", "0")) - withdraw_amount)}
                 )
 
                 logger.info(
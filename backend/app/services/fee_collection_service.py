@@ -10,6 +10,7 @@ import logging
 
 from app.core.database import get_db_collection, get_audit_logs_collection
 from app.core.config import settings
+from app.services.analytics_rollup_service import AnalyticsRollupService
 
 logger = logging.getLogger(__name__)
 
@@ -80,7 +81,7 @@ class FeeCollectionService:
         user_id: str,
         asset: str,
         amount_units: float,
-        amount_usd: float
+        amount_usd: Optional[float]
     ) -> Tuple[bool, str, Optional[str]]:
         """
         Auto-send fee to admin wallet immediately.
@@ -94,12 +95,21 @@ class FeeCollectionService:
             user_id: User who generated the fee
             asset: Asset type
             amount_units: Fee amount in crypto units
-            amount_usd: Fee amount in USD equivalent
+            amount_usd: Fee amount in USD equivalent (None if the asset has no price)
 
         Returns:
             (success, message, fee_id)
         """
         try:
+            # Unpriced fees can't be checked against the minimum, leave them for manual collection
+            if amount_usd is None:
+                logger.warning(f"No USD value for {amount_units} {asset} fee. Adding to hold list.")
+                return await FeeCollectionService._add_to_hold_list(
+                    transaction_type, transaction_id, user_id,
+                    asset, amount_units, amount_usd,
+                    reason="No USD price available"
+                )
+
             # Check if fee meets minimum for auto-send
             if amount_usd < FeeCollectionService.MIN_AUTO_SEND_USD:
                 logger.info(
@@ -217,8 +227,11 @@ class FeeCollectionService:
         result = await fees_db.insert_one(fee_dict)
         fee_id = str(result.inserted_id)
 
+        await AnalyticsRollupService.record_fee(transaction_type, amount_usd, now)
+
+        usd_text = f"${amount_usd:.2f}" if amount_usd is not None else "no USD price"
         logger.info(
-            f"Fee added to hold list: {amount_units} {asset} (${amount_usd:.2f}). "
+            f"Fee added to hold list: {amount_units} {asset} ({usd_text}). "
             f"Reason: {reason}"
         )
 
@@ -355,6 +368,9 @@ class FeeCollectionService:
         }
 
         result = await fees_db.insert_one(fee_dict)
+
+        await AnalyticsRollupService.record_fee(transaction_type, amount_usd, now)
+
         return str(result.inserted_id)
 
     @staticmethod
@@ -0,0 +1,348 @@
+"""
+Hold Allocation Service - Multi-currency balance snapshots and hold allocation
+Reads all of an exchanger's deposits once, prices them with a single batch
+lookup and plans/applies hold allocations in one write batch
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime
+from decimal import Decimal
+import logging
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.core.database import get_db_collection
+from app.core.locks import ConcurrentUpdateError
+from app.services.price_service import price_service
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal("0")
+
+
+@dataclass
+class DepositPosition:
+    """One deposit with its price from the snapshot"""
+
+    currency: str
+    balance: Decimal
+    held: Decimal
+    fee_reserved: Decimal
+    price_usd: Optional[Decimal]
+    doc: Dict
+
+    @property
+    def available(self) -> Decimal:
+        return self.balance - self.held - self.fee_reserved
+
+    def usd(self, amount: Decimal) -> Decimal:
+        return amount * self.price_usd if self.price_usd else ZERO
+
+
+@dataclass
+class BalanceSnapshot:
+    """USD totals for all of a user's deposits at one set of prices"""
+
+    user_id: str
+    positions: List[DepositPosition]
+    balance_usd: Decimal = ZERO
+    held_usd: Decimal = ZERO
+    fee_reserved_usd: Decimal = ZERO
+    available_usd: Decimal = ZERO
+    unpriced: List[str] = field(default_factory=list)
+
+
+@dataclass
+class AllocationLeg:
+    """Portion of a hold taken from one currency"""
+
+    position: DepositPosition
+    ticket_usd: Decimal
+    fee_usd: Decimal
+
+    @property
+    def ticket_crypto(self) -> Decimal:
+        return self.ticket_usd / self.position.price_usd
+
+    @property
+    def fee_crypto(self) -> Decimal:
+        return self.fee_usd / self.position.price_usd
+
+
+class HoldAllocationService:
+    """Service for balance snapshots and multi-currency hold allocation"""
+
+    SERVER_FEE_RATE = Decimal("0.02")
+    MIN_SERVER_FEE_USD = Decimal("0.50")
+
+    # Snapshot + plan + write attempts when a deposit changes underneath the plan
+    MAX_APPLY_ATTEMPTS = 3
+
+    @staticmethod
+    def server_fee_usd(amount_usd: Decimal) -> Decimal:
+        """Server fee (2% of ticket, min $0.50) - taken FROM the ticket amount"""
+        return max(amount_usd * HoldAllocationService.SERVER_FEE_RATE, HoldAllocationService.MIN_SERVER_FEE_USD)
+
+    @staticmethod
+    async def snapshot(user_id: str, active_only: bool = False) -> BalanceSnapshot:
+        """
+        Read and price all deposits for a user.
+
+        Args:
+            user_id: Discord user ID
+            active_only: Only include deposits flagged is_active
+
+        Returns:
+            BalanceSnapshot (one Mongo read, one batched price lookup)
+        """
+        deposits_db = await get_db_collection("exchanger_deposits")
+        query = {"user_id": user_id}
+        if active_only:
+            query["is_active"] = True
+        docs = await deposits_db.find(query).to_list(length=100)
+
+        currencies = sorted({doc["currency"].upper() for doc in docs})
+        prices = await price_service.get_prices_batch(currencies) if currencies else {}
+
+        snapshot = BalanceSnapshot(user_id=user_id, positions=[])
+        for doc in docs:
+            position = DepositPosition(
+                currency=doc["currency"],
+                balance=Decimal(doc.get("balance", "0") or "0"),
+                held=Decimal(doc.get("held", "0") or "0"),
+                fee_reserved=Decimal(doc.get("fee_reserved", "0") or "0"),
+                price_usd=prices.get(doc["currency"].upper()),
+                doc=doc
+            )
+            snapshot.positions.append(position)
+
+            if not position.price_usd:
+                snapshot.unpriced.append(position.currency)
+                continue
+
+            snapshot.balance_usd += position.usd(max(position.balance, ZERO))
+            snapshot.held_usd += position.usd(max(position.held, ZERO))
+            snapshot.fee_reserved_usd += position.usd(max(position.fee_reserved, ZERO))
+            if position.available > 0:
+                snapshot.available_usd += position.usd(position.available)
+
+        if snapshot.unpriced:
+            logger.warning(f"No price for {', '.join(snapshot.unpriced)}, excluded from {user_id}'s balances")
+
+        return snapshot
+
+    @staticmethod
+    def plan(snapshot: BalanceSnapshot, amount_usd: Decimal) -> Tuple[List[AllocationLeg], Decimal]:
+        """
+        Greedy allocation of a ticket across currencies, largest available USD first.
+
+        The server fee comes FROM the ticket amount: for a $10 ticket, $9.50 is
+        held and $0.50 reserved as fee.
+
+        Args:
+            snapshot: Balance snapshot
+            amount_usd: Ticket amount in USD
+
+        Returns:
+            (allocation legs, server fee USD)
+
+        Raises:
+            ValueError: Not enough available funds
+        """
+        server_fee_usd = HoldAllocationService.server_fee_usd(amount_usd)
+
+        candidates = [p for p in snapshot.positions if p.price_usd and p.available > 0]
+        if not snapshot.positions:
+            raise ValueError(
+                f"Insufficient funds: You need to deposit at least ${amount_usd:.2f} USD worth of cryptocurrency to claim this ticket. "
+                f"Visit the deposit panel to add funds."
+            )
+
+        if snapshot.available_usd < amount_usd:
+            raise ValueError(
+                f"Insufficient balance. Need ${amount_usd:.2f} USD "
+                f"(includes ${server_fee_usd:.2f} server fee), "
+                f"but only ${snapshot.available_usd:.2f} USD available across all deposits"
+            )
+
+        candidates.sort(key=lambda p: p.usd(p.available), reverse=True)
+
+        legs = []
+        remaining_ticket_usd = amount_usd - server_fee_usd
+        remaining_fee_usd = server_fee_usd
+
+        for position in candidates:
+            if remaining_ticket_usd <= 0 and remaining_fee_usd <= 0:
+                break
+
+            take_usd = min(remaining_ticket_usd + remaining_fee_usd, position.usd(position.available))
+
+            ticket_usd = min(remaining_ticket_usd, take_usd) if remaining_ticket_usd > 0 else ZERO
+            remaining_ticket_usd -= ticket_usd
+
+            fee_usd = min(remaining_fee_usd, take_usd - ticket_usd) if remaining_fee_usd > 0 else ZERO
+            remaining_fee_usd -= fee_usd
+
+            legs.append(AllocationLeg(position=position, ticket_usd=ticket_usd, fee_usd=fee_usd))
+
+        return legs, server_fee_usd
+
+    @staticmethod
+    def _deposit_ops(legs: List[AllocationLeg], fence: Optional[int], reverse: bool = False) -> List[UpdateOne]:
+        """
+        Version-checked deposit updates for a plan (or their compensation).
+
+        Each update only matches the deposit version the plan was computed
+        from, so a concurrent change makes it miss instead of overwriting.
+        """
+        ops = []
+        now = datetime.utcnow()
+        for leg in legs:
+            position = leg.position
+            new_held = str(position.held + leg.ticket_crypto)
+            new_fee_reserved = str(position.fee_reserved + leg.fee_crypto)
+            version = position.doc.get("version")
+
+            if reverse:
+                update_filter = {
+                    "_id": position.doc["_id"],
+                    "version": (version or 0) + 1,
+                    "held": new_held,
+                    "fee_reserved": new_fee_reserved
+                }
+                changes = {"held": str(position.held), "fee_reserved": str(position.fee_reserved)}
+            else:
+                update_filter = {"_id": position.doc["_id"], "version": version}
+                changes = {"held": new_held, "fee_reserved": new_fee_reserved, "last_synced": now}
+                if fence is not None:
+                    update_filter["$or"] = [
+                        {"lock_fence": {"$exists": False}},
+                        {"lock_fence": {"$lte": fence}}
+                    ]
+                    changes["lock_fence"] = fence
+
+            ops.append(UpdateOne(update_filter, {"$set": changes, "$inc": {"version": 1}}))
+        return ops
+
+    @staticmethod
+    async def _undo(deposits_db, legs: List[AllocationLeg], fence: Optional[int], applied: int, user_id: str):
+        """
+        Reverse the legs of a plan that were applied.
+
+        A leg only reverses if its deposit is still exactly as the plan left
+        it. If a concurrent write got in first, the funds stay locked and
+        this raises instead of letting the caller retry over them.
+
+        Raises:
+            ConcurrentUpdateError: Fewer than `applied` legs could be reversed
+        """
+        if not applied:
+            return
+
+        result = await deposits_db.bulk_write(
+            HoldAllocationService._deposit_ops(legs, fence, reverse=True),
+            ordered=False
+        )
+        if result.modified_count < applied:
+            logger.error(
+                f"Undid only {result.modified_count} of {applied} hold legs for {user_id}, check these deposits: "
+                + ", ".join(
+                    f"{leg.ticket_crypto} held + {leg.fee_crypto} fee_reserved {leg.position.currency} "
+                    f"on deposit {leg.position.doc['_id']}"
+                    for leg in legs
+                )
+            )
+            raise ConcurrentUpdateError(
+                f"Deposits for {user_id} changed while undoing a hold allocation; "
+                f"{applied - result.modified_count} legs need manual release"
+            )
+
+    @staticmethod
+    async def allocate_hold(
+        ticket_id: str,
+        user_id: str,
+        amount_usd: Decimal,
+        fence: Optional[int] = None
+    ) -> Tuple[List[dict], Decimal]:
+        """
+        Snapshot, plan and apply a multi-currency hold.
+
+        Deposits are updated with one bulk_write and holds inserted with one
+        insert_many. Callers should hold the exchanger lock.
+
+        Args:
+            ticket_id: Ticket MongoDB _id
+            user_id: Discord user ID
+            amount_usd: Ticket amount in USD
+            fence: Fencing token of the exchanger lease
+
+        Returns:
+            (hold records, server fee USD)
+        """
+        deposits_db = await get_db_collection("exchanger_deposits")
+        holds_db = await get_db_collection("ticket_holds")
+
+        for attempt in range(HoldAllocationService.MAX_APPLY_ATTEMPTS):
+            snapshot = await HoldAllocationService.snapshot(user_id)
+            legs, server_fee_usd = HoldAllocationService.plan(snapshot, amount_usd)
+
+            logger.info(
+                f"Hold plan for ticket {ticket_id}: ${snapshot.available_usd:.2f} available across "
+                f"{len(snapshot.positions)} deposits, using {len(legs)} (server fee ${server_fee_usd})"
+            )
+
+            result = await deposits_db.bulk_write(
+                HoldAllocationService._deposit_ops(legs, fence),
+                ordered=False
+            )
+            if result.modified_count == len(legs):
+                break
+
+            # A deposit changed after the snapshot: undo the legs that landed and re-plan
+            await HoldAllocationService._undo(deposits_db, legs, fence, result.modified_count, user_id)
+            logger.warning(
+                f"Deposits for {user_id} changed during hold allocation "
+                f"(attempt {attempt + 1}/{HoldAllocationService.MAX_APPLY_ATTEMPTS}), retrying"
+            )
+        else:
+            raise ConcurrentUpdateError(f"Deposits for {user_id} kept changing during hold allocation")
+
+        now = datetime.utcnow()
+        hold_records = [
+            {
+                "ticket_id": ObjectId(ticket_id),
+                "user_id": user_id,
+                "currency": leg.position.currency,
+                "amount_usd": str(leg.ticket_usd),
+                "crypto_held": str(leg.ticket_crypto),
+                "server_fee_usd": str(leg.fee_usd),
+                "server_fee_crypto": str(leg.fee_crypto),
+                "price_at_hold": str(leg.position.price_usd),
+                "status": "active",
+                "created_at": now,
+                "released_at": None,
+                "refunded_at": None
+            }
+            for leg in legs
+        ]
+        if hold_records:
+            try:
+                result = await holds_db.insert_many(hold_records)
+            except Exception as e:
+                # Without hold records nothing would ever release these funds
+                logger.error(f"Inserting holds for ticket {ticket_id} failed, unlocking deposits: {e}")
+                await holds_db.delete_many({"_id": {"$in": [r["_id"] for r in hold_records if "_id" in r]}})
+                await HoldAllocationService._undo(deposits_db, legs, fence, len(legs), user_id)
+                raise
+            for record, inserted_id in zip(hold_records, result.inserted_ids):
+                record["_id"] = inserted_id
+
+        for leg in legs:
+            logger.info(
+                f"Allocated from {leg.position.currency}: ${leg.ticket_usd:.2f} ticket + ${leg.fee_usd:.2f} fee "
+                f"= {leg.ticket_crypto + leg.fee_crypto:.8f} {leg.position.currency}"
+            )
+
+        return hold_records, server_fee_usd
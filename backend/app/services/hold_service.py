@@ -11,6 +11,9 @@ from bson import ObjectId
 import logging
 
 from app.core.database import get_db_collection, get_audit_logs_collection
+from app.core.locks import exchanger_lock, versioned_update
+from app.services.analytics_rollup_service import AnalyticsRollupService
+from app.services.hold_allocation_service import HoldAllocationService
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +21,17 @@ logger = logging.getLogger(__name__)
 class HoldService:
     """Service for hold/escrow operations"""
 
+    @staticmethod
+    def _lock_funds(held_crypto: Decimal, fee_crypto: Decimal):
+        """Deposit update adding to held and fee_reserved, for versioned_update"""
+        def compute(doc: dict) -> dict:
+            return {
+                "held": str(Decimal(doc.get("held", "0")) + held_crypto),
+                "fee_reserved": str(Decimal(doc.get("fee_reserved", "0")) + fee_crypto),
+                "last_synced": datetime.utcnow()
+            }
+        return compute
+
     @staticmethod
     async def create_multi_currency_hold(
         ticket_id: str,
@@ -31,11 +45,10 @@ class HoldService:
         Example: Need $10 → Use $3 BTC + $4 ETH + $3 LTC
 
         Steps:
-        1. Calculate total needed (ticket amount + server fee)
-        2. Get all deposits and calculate available USD value
-        3. Allocate funds from available deposits to reach total
-        4. Create hold records for each currency used
-        5. Update deposits: increment held and fee_reserved
+        1. Snapshot all deposits with one batched price lookup
+        2. Plan the allocation, largest available USD first (server fee comes FROM the amount)
+        3. Update deposits (held / fee_reserved) in one bulk write
+        4. Insert hold records for each currency used in one batch
 
         Args:
             ticket_id: Ticket MongoDB _id
@@ -45,148 +58,12 @@ class HoldService:
         Returns:
             List of hold records created
         """
-        deposits_db = await get_db_collection("exchanger_deposits")
-        holds_db = await get_db_collection("ticket_holds")
-        from app.services.price_service import price_service
-
-        # 1. Calculate server fee (2% of ticket, min $0.50) - comes FROM the ticket amount
-        # Exchanger only needs the ticket amount available, fee is taken from it
-        server_fee_usd = max(amount_usd * Decimal("0.02"), Decimal("0.50"))
-        total_needed_usd = amount_usd  # NOT amount + fee! Fee comes from the amount.
+        logger.info(f"Creating multi-currency hold: ticket=${amount_usd} for user {user_id}")
 
-        logger.info(f"Creating multi-currency hold: ticket=${amount_usd} (server fee=${server_fee_usd} reserved from this)")
-
-        # 2. Get all deposits and calculate available USD value
-        deposits = await deposits_db.find({"user_id": user_id}).to_list(length=100)
-
-        if not deposits:
-            raise ValueError(
-                f"Insufficient funds: You need to deposit at least ${total_needed_usd:.2f} USD worth of cryptocurrency to claim this ticket. "
-                f"Visit the deposit panel to add funds."
-            )
-
-        # Calculate available USD value for each deposit
-        available_deposits = []
-        for deposit in deposits:
-            currency = deposit["currency"]
-            balance = Decimal(deposit.get("balance", "0"))
-            held = Decimal(deposit.get("held", "0"))
-            fee_reserved = Decimal(deposit.get("fee_reserved", "0"))
-            available_crypto = balance - held - fee_reserved
-
-            if available_crypto <= 0:
-                continue
-
-            # Get USD value
-            price_usd = await price_service.get_price_usd(currency)
-            if not price_usd:
-                logger.warning(f"Cannot get price for {currency}, skipping")
-                continue
-
-            available_usd = available_crypto * price_usd
-
-            available_deposits.append({
-                "currency": currency,
-                "available_crypto": available_crypto,
-                "available_usd": available_usd,
-                "price_usd": price_usd,
-                "deposit": deposit
-            })
-
-        # Sort by available USD (descending) - use largest deposits first
-        available_deposits.sort(key=lambda x: x["available_usd"], reverse=True)
-
-        # Calculate total available
-        total_available_usd = sum(d["available_usd"] for d in available_deposits)
-
-        logger.info(f"User has ${total_available_usd:.2f} available across {len(available_deposits)} currencies")
-
-        if total_available_usd < total_needed_usd:
-            raise ValueError(
-                f"Insufficient balance. Need ${total_needed_usd:.2f} USD "
-                f"(includes ${server_fee_usd:.2f} server fee), "
-                f"but only ${total_available_usd:.2f} USD available across all deposits"
-            )
-
-        # 3. Allocate funds from available deposits
-        # Important: Fee comes FROM the ticket amount, not added on top
-        # For $10 ticket: hold $9.50 + reserve $0.50 fee = $10 total
-        hold_records = []
-        ticket_after_fee_usd = amount_usd - server_fee_usd  # $10 - $0.50 = $9.50
-        remaining_ticket_usd = ticket_after_fee_usd
-        remaining_fee_usd = server_fee_usd
-
-        for deposit_info in available_deposits:
-            if remaining_ticket_usd <= 0 and remaining_fee_usd <= 0:
-                break
-
-            currency = deposit_info["currency"]
-            available_crypto = deposit_info["available_crypto"]
-            available_usd = deposit_info["available_usd"]
-            price_usd = deposit_info["price_usd"]
-
-            # Calculate how much to take from this deposit (max = ticket_after_fee + fee)
-            needed_usd = remaining_ticket_usd + remaining_fee_usd
-            take_usd = min(needed_usd, available_usd)
-
-            # Calculate ticket and fee portions
-            if remaining_ticket_usd > 0:
-                ticket_portion_usd = min(remaining_ticket_usd, take_usd)
-                remaining_ticket_usd -= ticket_portion_usd
-            else:
-                ticket_portion_usd = Decimal("0")
-
-            if remaining_fee_usd > 0:
-                fee_portion_usd = min(remaining_fee_usd, take_usd - ticket_portion_usd)
-                remaining_fee_usd -= fee_portion_usd
-            else:
-                fee_portion_usd = Decimal("0")
-
-            # Convert USD amounts to crypto
-            ticket_portion_crypto = ticket_portion_usd / price_usd
-            fee_portion_crypto = fee_portion_usd / price_usd
-
-            # 4. Create hold record
-            hold_dict = {
-                "ticket_id": ObjectId(ticket_id),
-                "user_id": user_id,
-                "currency": currency,
-                "amount_usd": str(ticket_portion_usd),
-                "crypto_held": str(ticket_portion_crypto),
-                "server_fee_usd": str(fee_portion_usd),
-                "server_fee_crypto": str(fee_portion_crypto),
-                "price_at_hold": str(price_usd),
-                "status": "active",
-                "created_at": datetime.utcnow(),
-                "released_at": None,
-                "refunded_at": None
-            }
-
-            result = await holds_db.insert_one(hold_dict)
-            hold_dict["_id"] = result.inserted_id
-            hold_records.append(hold_dict)
-
-            # 5. Update deposit (lock funds)
-            current_held = Decimal(deposit_info["deposit"].get("held", "0"))
-            current_fee_reserved = Decimal(deposit_info["deposit"].get("fee_reserved", "0"))
-
-            new_held = current_held + ticket_portion_crypto
-            new_fee_reserved = current_fee_reserved + fee_portion_crypto
-
-            await deposits_db.update_one(
-                {"user_id": user_id, "currency": currency},
-                {
-                    "$set": {
-                        "held": str(new_held),
-                        "fee_reserved": str(new_fee_reserved),
-                        "last_synced": datetime.utcnow()
-                    }
-                }
-            )
-
-            logger.info(
-                f"Allocated from {currency}: ${ticket_portion_usd:.2f} ticket + ${fee_portion_usd:.2f} fee "
-                f"= {ticket_portion_crypto + fee_portion_crypto:.8f} {currency}"
+        # Serialise against other claims, releases and withdrawals for this exchanger
+        async with exchanger_lock(user_id) as lease:
+            hold_records, server_fee_usd = await HoldAllocationService.allocate_hold(
+                ticket_id, user_id, amount_usd, fence=lease.fence
             )
 
         # Log action
@@ -238,76 +115,70 @@ class HoldService:
         server_fee_usd = max(amount_usd * Decimal("0.02"), Decimal("0.50"))
         total_needed_usd = amount_usd + server_fee_usd
 
-        # 2. Get deposit and check available balance
-        deposit = await deposits_db.find_one({
-            "user_id": user_id,
-            "currency": currency
-        })
-
-        if not deposit:
-            raise ValueError(f"No {currency} deposit found for user {user_id}")
+        async with exchanger_lock(user_id) as lease:
+            # 2. Get deposit and check available balance
+            deposit = await deposits_db.find_one({
+                "user_id": user_id,
+                "currency": currency
+            })
 
-        # Calculate available (balance - held - fee_reserved)
-        balance = Decimal(deposit.get("balance", "0"))
-        held = Decimal(deposit.get("held", "0"))
-        fee_reserved = Decimal(deposit.get("fee_reserved", "0"))
-        available_crypto = balance - held - fee_reserved
+            if not deposit:
+                raise ValueError(f"No {currency} deposit found for user {user_id}")
 
-        # Get USD value of available crypto
-        from app.services.price_service import price_service
-        price_usd = await price_service.get_price_usd(currency)
+            # Calculate available (balance - held - fee_reserved)
+            balance = Decimal(deposit.get("balance", "0"))
+            held = Decimal(deposit.get("held", "0"))
+            fee_reserved = Decimal(deposit.get("fee_reserved", "0"))
+            available_crypto = balance - held - fee_reserved
 
-        if not price_usd:
-            raise ValueError(f"Cannot get price for {currency}")
+            # Get USD value of available crypto
+            from app.services.price_service import price_service
+            price_usd = await price_service.get_price_usd(currency)
 
-        available_usd = available_crypto * price_usd
+            if not price_usd:
+                raise ValueError(f"Cannot get price for {currency}")
 
-        if available_usd < total_needed_usd:
-            raise ValueError(
-                f"Insufficient balance. Need ${total_needed_usd:.2f} USD "
-                f"(${amount_usd:.2f} ticket + ${server_fee_usd:.2f} fee), "
-                f"but only ${available_usd:.2f} USD available in {currency}"
-            )
+            available_usd = available_crypto * price_usd
 
-        # Calculate crypto amounts to lock
-        crypto_amount_for_ticket = amount_usd / price_usd
-        crypto_amount_for_fee = server_fee_usd / price_usd
+            if available_usd < total_needed_usd:
+                raise ValueError(
+                    f"Insufficient balance. Need ${total_needed_usd:.2f} USD "
+                    f"(${amount_usd:.2f} ticket + ${server_fee_usd:.2f} fee), "
+                    f"but only ${available_usd:.2f} USD available in {currency}"
+                )
 
-        # 3. Create hold record
-        holds_db = await get_db_collection("ticket_holds")
+            # Calculate crypto amounts to lock
+            crypto_amount_for_ticket = amount_usd / price_usd
+            crypto_amount_for_fee = server_fee_usd / price_usd
 
-        hold_dict = {
-            "ticket_id": ObjectId(ticket_id),
-            "user_id": user_id,  # Store as string (Discord ID)
-            "currency": currency,
-            "amount_usd": str(amount_usd),
-            "crypto_held": str(crypto_amount_for_ticket),
-            "server_fee_usd": str(server_fee_usd),
-            "server_fee_crypto": str(crypto_amount_for_fee),
-            "price_at_hold": str(price_usd),
-            "status": "active",
-            "created_at": datetime.utcnow(),
-            "released_at": None,
-            "refunded_at": None
-        }
+            # 3. Create hold record
+            holds_db = await get_db_collection("ticket_holds")
 
-        result = await holds_db.insert_one(hold_dict)
-        hold_dict["_id"] = result.inserted_id
+            hold_dict = {
+                "ticket_id": ObjectId(ticket_id),
+                "user_id": user_id,  # Store as string (Discord ID)
+                "currency": currency,
+                "amount_usd": str(amount_usd),
+                "crypto_held": str(crypto_amount_for_ticket),
+                "server_fee_usd": str(server_fee_usd),
+                "server_fee_crypto": str(crypto_amount_for_fee),
+                "price_at_hold": str(price_usd),
+                "status": "active",
+                "created_at": datetime.utcnow(),
+                "released_at": None,
+                "refunded_at": None
+            }
 
-        # 4. Update deposit (lock funds)
-        new_held = held + crypto_amount_for_ticket
-        new_fee_reserved = fee_reserved + crypto_amount_for_fee
+            result = await holds_db.insert_one(hold_dict)
+            hold_dict["_id"] = result.inserted_id
 
-        await deposits_db.update_one(
-            {"user_id": user_id, "currency": currency},
-            {
-                "$set": {
-                    "held": str(new_held),
-                    "fee_reserved": str(new_fee_reserved),
-                    "last_synced": datetime.utcnow()
-                }
-            }
-        )
+            # 4. Update deposit (lock funds)
+            await versioned_update(
+                deposits_db,
+                {"user_id": user_id, "currency": currency},
+                HoldService._lock_funds(crypto_amount_for_ticket, crypto_amount_for_fee),
+                fence=lease.fence
+            )
 
         # Log
         await HoldService.log_action(
@@ -343,7 +214,11 @@ class HoldService:
         2. Unlock held amount and fee_reserved
         3. Deduct ticket amount + fee from balance (if deduct_funds=True)
         4. Auto-collect server fee to admin wallet
-        5. Mark hold as released
+
+        The hold is marked released/refunded before the deposit is touched,
+        so a concurrent release of the same hold fails instead of double-counting.
+        If the deposit update then fails (lost fence, version race, missing
+        deposit) the hold is set back to active and the error re-raised.
 
         Args:
             hold_id: Hold MongoDB _id
@@ -367,94 +242,101 @@ class HoldService:
         server_fee_crypto = Decimal(hold["server_fee_crypto"])
         server_fee_usd = Decimal(hold["server_fee_usd"])
 
-        # 2. Get current deposit
-        logger.debug(f"[HOLD RELEASE DEBUG] Looking for deposit: user_id={user_id} (type={type(user_id).__name__}) currency={currency}")
+        async with exchanger_lock(user_id) as lease:
+            # 2. Get current deposit
+            logger.debug(f"[HOLD RELEASE DEBUG] Looking for deposit: user_id={user_id} (type={type(user_id).__name__}) currency={currency}")
 
-        deposit = await deposits_db.find_one({
-            "user_id": user_id,
-            "currency": currency
-        })
+            deposit = await deposits_db.find_one({
+                "user_id": user_id,
+                "currency": currency
+            })
 
-        if not deposit:
-            logger.error(f"[HOLD RELEASE ERROR] Deposit not found for user {user_id} currency {currency}")
-            raise ValueError(f"Deposit not found for user {user_id} currency {currency}")
-
-        balance = Decimal(deposit.get("balance", "0"))
-        held = Decimal(deposit.get("held", "0"))
-        fee_reserved = Decimal(deposit.get("fee_reserved", "0"))
-
-        logger.debug(f"[HOLD RELEASE DEBUG] Current deposit values: balance={balance} held={held} fee_reserved={fee_reserved}")
-        logger.debug(f"[HOLD RELEASE DEBUG] Hold values: crypto_held={crypto_held} server_fee_crypto={server_fee_crypto}")
-
-        # 3. Calculate new values with safeguards against negative amounts
-        new_held = max(Decimal("0"), held - crypto_held)
-        new_fee_reserved = max(Decimal("0"), fee_reserved - server_fee_crypto)
-
-        if deduct_funds:
-            # Completion: Deduct ticket amount + fee from balance
-            new_balance = max(Decimal("0"), balance - crypto_held - server_fee_crypto)
-        else:
-            # Cancel/Refund: Just unlock, don't deduct
-            new_balance = balance
-
-        # Validation: Warn if values would have gone negative
-        if held < crypto_held:
-            logger.warning(f"[HOLD RELEASE WARNING] held ({held}) < crypto_held ({crypto_held}), clamped to 0")
-        if fee_reserved < server_fee_crypto:
-            logger.warning(f"[HOLD RELEASE WARNING] fee_reserved ({fee_reserved}) < server_fee_crypto ({server_fee_crypto}), clamped to 0")
-        if deduct_funds and balance < (crypto_held + server_fee_crypto):
-            logger.warning(f"[HOLD RELEASE WARNING] balance ({balance}) < total_deduction ({crypto_held + server_fee_crypto}), clamped to 0")
-
-        logger.debug(f"[HOLD RELEASE DEBUG] New values: balance={new_balance} held={new_held} fee_reserved={new_fee_reserved}")
-
-        # Update deposit
-        update_result = await deposits_db.update_one(
-            {"user_id": user_id, "currency": currency},
-            {
-                "$set": {
+            if not deposit:
+                logger.error(f"[HOLD RELEASE ERROR] Deposit not found for user {user_id} currency {currency}")
+                raise ValueError(f"Deposit not found for user {user_id} currency {currency}")
+
+            # Claim the hold so concurrent releases cannot unlock or deduct it twice
+            final_status = "released" if deduct_funds else "refunded"
+            claimed = await holds_db.find_one_and_update(
+                {"_id": hold["_id"], "status": "active"},
+                {
+                    "$set": {
+                        "status": final_status,
+                        "released_at": datetime.utcnow() if deduct_funds else None,
+                        "refunded_at": None if deduct_funds else datetime.utcnow()
+                    }
+                }
+            )
+            if not claimed:
+                raise ValueError(f"Hold {hold_id} was released concurrently")
+
+            def unlock(doc: dict) -> dict:
+                balance = Decimal(doc.get("balance", "0"))
+                held = Decimal(doc.get("held", "0"))
+                fee_reserved = Decimal(doc.get("fee_reserved", "0"))
+
+                logger.debug(f"[HOLD RELEASE DEBUG] Current deposit values: balance={balance} held={held} fee_reserved={fee_reserved}")
+                logger.debug(f"[HOLD RELEASE DEBUG] Hold values: crypto_held={crypto_held} server_fee_crypto={server_fee_crypto}")
+
+                # 3. Calculate new values with safeguards against negative amounts
+                new_held = max(Decimal("0"), held - crypto_held)
+                new_fee_reserved = max(Decimal("0"), fee_reserved - server_fee_crypto)
+
+                if deduct_funds:
+                    # Completion: Deduct ticket amount + fee from balance
+                    new_balance = max(Decimal("0"), balance - crypto_held - server_fee_crypto)
+                else:
+                    # Cancel/Refund: Just unlock, don't deduct
+                    new_balance = balance
+
+                # Validation: Warn if values would have gone negative
+                if held < crypto_held:
+                    logger.warning(f"[HOLD RELEASE WARNING] held ({held}) < crypto_held ({crypto_held}), clamped to 0")
+                if fee_reserved < server_fee_crypto:
+                    logger.warning(f"[HOLD RELEASE WARNING] fee_reserved ({fee_reserved}) < server_fee_crypto ({server_fee_crypto}), clamped to 0")
+                if deduct_funds and balance < (crypto_held + server_fee_crypto):
+                    logger.warning(f"[HOLD RELEASE WARNING] balance ({balance}) < total_deduction ({crypto_held + server_fee_crypto}), clamped to 0")
+
+                logger.debug(f"[HOLD RELEASE DEBUG] New values: balance={new_balance} held={new_held} fee_reserved={new_fee_reserved}")
+
+                return {
                     "balance": str(new_balance),
                     "held": str(new_held),
                     "fee_reserved": str(new_fee_reserved),
                     "last_synced": datetime.utcnow()
                 }
-            }
-        )
-
-        logger.debug(f"[HOLD RELEASE DEBUG] Update result: matched={update_result.matched_count} modified={update_result.modified_count}")
 
-        if update_result.matched_count == 0:
-            logger.error(f"[HOLD RELEASE ERROR] Update did not match any documents! user_id={user_id} currency={currency}")
-        elif update_result.modified_count == 0:
-            logger.warning(f"[HOLD RELEASE WARNING] Update matched but did not modify any documents (values may be the same)")
+            # Update deposit from the current document; if that fails the claim
+            # is undone, so held/fee_reserved are never left locked by a
+            # hold that already reads released
+            try:
+                updated_deposit = await versioned_update(
+                    deposits_db,
+                    {"user_id": user_id, "currency": currency},
+                    unlock,
+                    fence=lease.fence
+                )
+                if not updated_deposit:
+                    raise ValueError(f"Deposit not found for user {user_id} currency {currency}")
+            except BaseException as e:
+                await holds_db.update_one(
+                    {"_id": hold["_id"], "status": final_status},
+                    {"$set": {"status": "active", "released_at": None, "refunded_at": None}}
+                )
+                logger.error(f"[HOLD RELEASE ERROR] Deposit update failed for hold {hold_id}, hold set back to active: {e}")
+                raise
 
-        # Verify update
-        updated_deposit = await deposits_db.find_one({"user_id": user_id, "currency": currency})
-        if updated_deposit:
             logger.debug(f"[HOLD RELEASE DEBUG] Verified updated values: balance={updated_deposit.get('balance')} held={updated_deposit.get('held')} fee_reserved={updated_deposit.get('fee_reserved')}")
-        else:
-            logger.error(f"[HOLD RELEASE ERROR] Could not find deposit after update!")
-
-        # 4. Auto-collect server fee to admin wallet (if completing ticket)
-        if deduct_funds and server_fee_crypto > 0:
-            await HoldService._collect_fee_to_admin(
-                currency=currency,
-                amount_crypto=server_fee_crypto,
-                amount_usd=server_fee_usd,
-                ticket_id=str(hold["ticket_id"]),
-                exchanger_id=user_id
-            )
 
-        # 5. Mark hold as released
-        await holds_db.update_one(
-            {"_id": ObjectId(hold_id)},
-            {
-                "$set": {
-                    "status": "released" if deduct_funds else "refunded",
-                    "released_at": datetime.utcnow() if deduct_funds else None,
-                    "refunded_at": None if deduct_funds else datetime.utcnow()
-                }
-            }
-        )
+            # 4. Auto-collect server fee to admin wallet (if completing ticket)
+            if deduct_funds and server_fee_crypto > 0:
+                await HoldService._collect_fee_to_admin(
+                    currency=currency,
+                    amount_crypto=server_fee_crypto,
+                    amount_usd=server_fee_usd,
+                    ticket_id=str(hold["ticket_id"]),
+                    exchanger_id=user_id
+                )
 
         # Log
         action = "hold.released" if deduct_funds else "hold.refunded"
@@ -537,21 +419,18 @@ class HoldService:
                 "last_synced": datetime.utcnow()
             }
             await deposits_db.insert_one(admin_deposit)
-            current_balance = Decimal("0")
-        else:
-            current_balance = Decimal(admin_deposit.get("balance", "0"))
 
-        # 2. Add fee to admin balance
-        new_admin_balance = current_balance + amount_crypto
-        await deposits_db.update_one(
+        # 2. Add fee to admin balance (shared by every exchanger's releases)
+        updated_admin = await versioned_update(
+            deposits_db,
             {"user_id": admin_user_id, "currency": currency},
-            {
-                "$set": {
-                    "balance": str(new_admin_balance),
-                    "last_synced": datetime.utcnow()
-                }
-            }
+            lambda doc: {
+                "balance": str(Decimal(doc.get("balance", "0")) + amount_crypto),
+                "last_synced": datetime.utcnow()
+            },
+            max_attempts=10
         )
+        new_admin_balance = updated_admin.get("balance") if updated_admin else None
 
         # 3. Record fee collection
         fee_record = {
@@ -566,6 +445,7 @@ class HoldService:
         }
 
         await server_fees_db.insert_one(fee_record)
+        await AnalyticsRollupService.record_fee("server_fee", amount_usd, fee_record["created_at"])
 
         logger.info(
             f"Server fee collected to admin wallet: ticket={ticket_id} exchanger={exchanger_id} "
@@ -1,26 +1,102 @@
 """
 Notification Service - Handles completion notifications, DMs, and vouch posting
-Triggered when tickets are completed
+Triggered when tickets and swaps are completed
+
+Completions are published as slim events to a Redis stream that the bot
+consumes through a consumer group (long-polled, so DMs go out as soon as an
+event lands). Events carry IDs and summary fields only - transcripts are
+fetched by ticket ID. An event stays pending until the bot acks it; events
+left unacked for CLAIM_IDLE_MS are redelivered, and after MAX_DELIVERIES
+they are moved to a dead-letter stream.
+
+The source document keeps notification_pending until the ack, so a failed
+publish is picked up by requeue_missed_notifications (an indexed query, not
+a collection scan).
 """
 
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from bson import ObjectId
+from datetime import datetime, timedelta
+import json
 import logging
-from datetime import datetime
 
-from app.core.database import get_tickets_collection, get_users_collection
+from redis.exceptions import ResponseError
+
+from app.core.database import get_tickets_collection, get_users_collection, get_db_collection
+from app.core.redis import get_redis, RedisKeys
 
 logger = logging.getLogger(__name__)
 
+TICKET_COMPLETED = "ticket_completed"
+SWAP_COMPLETED = "swap_completed"
+
+# Event type -> collection holding the notification_pending flag
+EVENT_COLLECTIONS = {
+    TICKET_COMPLETED: "tickets",
+    SWAP_COMPLETED: "afroo_swaps"
+}
+
 
 class NotificationService:
-    """Service for handling ticket completion notifications"""
+    """Service for handling ticket and swap completion notifications"""
+
+    STREAM_GROUP = "bot-notifier"
+    STREAM_MAXLEN = 10000  # Approximate cap on retained events
+    DEAD_LETTER_MAXLEN = 1000
+    MAX_BLOCK_MS = 20000  # Longest long-poll (bot HTTP timeout is 30s)
+    CLAIM_IDLE_MS = 60000  # Unacked events older than this are redelivered
+    MAX_DELIVERIES = 5  # Then moved to the dead-letter stream
+    REQUEUE_GRACE_SECONDS = 60  # Don't republish events that may still be publishing
+    REQUEUE_BATCH_SIZE = 50
+
+    _group_ready = False
+
+    @staticmethod
+    async def publish_event(event_type: str, ref_id: str, payload: Dict) -> str:
+        """
+        Append a completion event to the notification stream
+
+        Args:
+            event_type: TICKET_COMPLETED or SWAP_COMPLETED
+            ref_id: MongoDB _id of the ticket or swap
+            payload: Slim summary for the bot (no transcripts or messages)
+
+        Returns:
+            Stream event ID
+        """
+        return await get_redis().xadd(
+            RedisKeys.COMPLETION_EVENTS,
+            {
+                "type": event_type,
+                "ref_id": ref_id,
+                "payload": json.dumps(payload, default=str),
+                "created_at": datetime.utcnow().isoformat()
+            },
+            maxlen=NotificationService.STREAM_MAXLEN,
+            approximate=True
+        )
+
+    @staticmethod
+    async def _publish_for_document(collection, event_type: str, ref_id: str, payload: Dict) -> Optional[str]:
+        """Publish an event and record its ID on the source document (None if publishing failed)"""
+        try:
+            event_id = await NotificationService.publish_event(event_type, ref_id, payload)
+        except Exception as e:
+            # notification_pending stays set, requeue_missed_notifications retries it
+            logger.error(f"Failed to publish {event_type} event for {ref_id}: {e}")
+            return None
+
+        await collection.update_one(
+            {"_id": ObjectId(ref_id)},
+            {"$set": {"notification_event_id": event_id}}
+        )
+        return event_id
 
     @staticmethod
     async def trigger_completion_notifications(ticket_id: str) -> Dict:
         """
         Trigger all completion notifications for a ticket
-        This creates a notification record that the bot will pick up
+        This publishes a completion event that the bot will pick up
 
         Args:
             ticket_id: Ticket ID that was completed
@@ -31,8 +107,11 @@ class NotificationService:
         tickets = get_tickets_collection()
         users = get_users_collection()
 
-        # Get ticket details
-        ticket = await tickets.find_one({"_id": ObjectId(ticket_id)})
+        # Get ticket details (messages and transcripts are not needed here)
+        ticket = await tickets.find_one(
+            {"_id": ObjectId(ticket_id)},
+            {"messages": 0, "transcript_html": 0, "transcript_text": 0}
+        )
         if not ticket:
             raise ValueError(f"Ticket {ticket_id} not found")
 
@@ -43,53 +122,263 @@ class NotificationService:
         # Get exchanger's Discord ID
         exchanger_discord_id = None
         if exchanger_id:
-            exchanger_user = await users.find_one({"_id": ObjectId(exchanger_id)})
+            exchanger_user = await users.find_one({"_id": ObjectId(exchanger_id)}, {"discord_id": 1})
             if exchanger_user:
                 exchanger_discord_id = exchanger_user.get("discord_id")
 
-        # Create notification record for bot to pick up
+        # Slim notification - the transcript is fetched by ticket ID
         notification = {
-            "type": "ticket_completed",
-            "ticket_id": ObjectId(ticket_id),
+            "type": TICKET_COMPLETED,
+            "ticket_id": ticket_id,
             "ticket_number": ticket.get("ticket_number"),
             "client_discord_id": client_discord_id,
             "exchanger_discord_id": exchanger_discord_id,
-            "transcript_html": ticket.get("transcript_html"),
-            "transcript_text": ticket.get("transcript_text"),
+            "has_transcript": bool(ticket.get("transcript_generated_at")),
             "client_vouch_template": ticket.get("client_vouch_template"),
             "exchanger_vouch_template": ticket.get("exchanger_vouch_template"),
             "amount_usd": ticket.get("amount_usd", 0),
             "receiving_amount": ticket.get("receiving_amount", 0),
-            "server_fee_collected": ticket.get("server_fee_collected", 0),
-            "created_at": datetime.utcnow(),
-            "processed": False
+            "server_fee_collected": ticket.get("server_fee_collected", 0)
         }
 
-        # Store notification in ticket document for bot to pick up
+        # Flag the ticket first so a failed publish is retried
         await tickets.update_one(
             {"_id": ObjectId(ticket_id)},
             {
                 "$set": {
                     "completion_notification": notification,
-                    "notification_pending": True
-                }
+                    "notification_pending": True,
+                    "notification_queued_at": datetime.utcnow()
+                },
+                "$unset": {"notification_event_id": ""}
             }
         )
 
+        event_id = await NotificationService._publish_for_document(
+            tickets, TICKET_COMPLETED, ticket_id, notification
+        )
+
         logger.info(
-            f"Ticket {ticket_id}: Completion notifications queued for bot processing"
+            f"Ticket {ticket_id}: Completion notifications queued for bot processing (event {event_id})"
         )
 
         return {
-            "status": "queued",
+            "status": "queued" if event_id else "pending",
+            "event_id": event_id,
             "notification": {
                 "client_discord_id": client_discord_id,
                 "exchanger_discord_id": exchanger_discord_id,
-                "has_transcript": bool(ticket.get("transcript_html")),
+                "has_transcript": notification["has_transcript"],
                 "has_vouches": bool(ticket.get("client_vouch_template"))
             }
         }
 
+    @staticmethod
+    async def trigger_swap_completion_notification(swap_id: str) -> Optional[str]:
+        """
+        Publish the completion event for a swap
+
+        The swap must already be flagged notification_pending (set together
+        with its completed status).
+
+        Args:
+            swap_id: Swap MongoDB _id
+
+        Returns:
+            Stream event ID, or None if publishing failed
+        """
+        swaps_db = await get_db_collection("afroo_swaps")
+        users = get_users_collection()
+
+        swap = await swaps_db.find_one({"_id": ObjectId(swap_id)})
+        if not swap:
+            raise ValueError(f"Swap {swap_id} not found")
+
+        user_discord_id = None
+        if swap.get("user_id"):
+            user = await users.find_one({"_id": ObjectId(swap["user_id"])}, {"discord_id": 1})
+            if user:
+                user_discord_id = user.get("discord_id")
+
+        payload = {
+            "_id": swap_id,
+            "user_id": str(swap.get("user_id")),
+            "user_discord_id": user_discord_id,
+            "from_asset": swap.get("from_asset"),
+            "to_asset": swap.get("to_asset"),
+            "input_amount": swap.get("input_amount"),
+            "estimated_output": swap.get("estimated_output"),
+            "actual_output": swap.get("actual_output"),
+            "payout_hash": swap.get("payout_hash"),
+            "payout_link": swap.get("payout_link"),
+            "destination_address": swap.get("destination_address"),
+            "discord_channel_id": swap.get("discord_channel_id"),
+            "amount_usd": swap.get("amount_usd"),
+            "completed_at": swap.get("completed_at")
+        }
+
+        event_id = await NotificationService._publish_for_document(swaps_db, SWAP_COMPLETED, swap_id, payload)
+        logger.info(f"Swap {swap_id}: Completion notification queued for bot processing (event {event_id})")
+        return event_id
+
+    @staticmethod
+    async def _ensure_group(redis) -> None:
+        if NotificationService._group_ready:
+            return
+        try:
+            await redis.xgroup_create(
+                RedisKeys.COMPLETION_EVENTS,
+                NotificationService.STREAM_GROUP,
+                id="0",
+                mkstream=True
+            )
+            logger.info(f"✅ Created notification consumer group {NotificationService.STREAM_GROUP}")
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        NotificationService._group_ready = True
+
+    @staticmethod
+    def _parse_event(event_id: str, fields: Dict) -> Dict:
+        return {
+            "event_id": event_id,
+            "type": fields.get("type"),
+            "ref_id": fields.get("ref_id"),
+            "created_at": fields.get("created_at"),
+            "payload": json.loads(fields.get("payload") or "{}")
+        }
+
+    @staticmethod
+    async def _dead_letter_exhausted(redis) -> int:
+        """Move events that were delivered MAX_DELIVERIES times without an ack to the dead-letter stream"""
+        pending = await redis.xpending_range(
+            RedisKeys.COMPLETION_EVENTS,
+            NotificationService.STREAM_GROUP,
+            min="-",
+            max="+",
+            count=100,
+            idle=NotificationService.CLAIM_IDLE_MS
+        )
+        exhausted = [
+            entry["message_id"] for entry in pending
+            if entry["times_delivered"] >= NotificationService.MAX_DELIVERIES
+        ]
+
+        for event_id in exhausted:
+            entries = await redis.xrange(RedisKeys.COMPLETION_EVENTS, event_id, event_id)
+            if entries:
+                await redis.xadd(
+                    RedisKeys.COMPLETION_EVENTS_DEAD,
+                    {**entries[0][1], "original_id": event_id},
+                    maxlen=NotificationService.DEAD_LETTER_MAXLEN,
+                    approximate=True
+                )
+            await redis.xack(RedisKeys.COMPLETION_EVENTS, NotificationService.STREAM_GROUP, event_id)
+            logger.error(
+                f"Notification event {event_id} failed {NotificationService.MAX_DELIVERIES} deliveries, "
+                f"moved to {RedisKeys.COMPLETION_EVENTS_DEAD}"
+            )
+
+        return len(exhausted)
+
+    @staticmethod
+    async def read_events(consumer: str, count: int = 10, block_ms: int = 15000) -> List[Dict]:
+        """
+        Read completion events for a bot consumer
+
+        Stale unacked events are redelivered first; otherwise blocks up to
+        block_ms for new events.
+
+        Args:
+            consumer: Consumer name (stable per bot instance)
+            count: Maximum events to return
+            block_ms: Long-poll time when nothing is pending
+
+        Returns:
+            List of events with event_id, type, ref_id and payload
+        """
+        redis = get_redis()
+        block_ms = max(0, min(block_ms, NotificationService.MAX_BLOCK_MS))
+
+        await NotificationService._ensure_group(redis)
+
+        try:
+            await NotificationService._dead_letter_exhausted(redis)
+
+            claimed = await redis.xautoclaim(
+                RedisKeys.COMPLETION_EVENTS,
+                NotificationService.STREAM_GROUP,
+                consumer,
+                min_idle_time=NotificationService.CLAIM_IDLE_MS,
+                start_id="0-0",
+                count=count
+            )
+            entries = claimed[1]
+            if entries:
+                logger.warning(f"Redelivering {len(entries)} unacked notification events to {consumer}")
+            else:
+                result = await redis.xreadgroup(
+                    NotificationService.STREAM_GROUP,
+                    consumer,
+                    {RedisKeys.COMPLETION_EVENTS: ">"},
+                    count=count,
+                    block=block_ms or None
+                )
+                entries = result[0][1] if result else []
+        except ResponseError as e:
+            if "NOGROUP" in str(e):
+                # Stream was deleted, recreate the group on the next read
+                NotificationService._group_ready = False
+                return []
+            raise
+
+        return [
+            NotificationService._parse_event(event_id, fields)
+            for event_id, fields in entries
+            if fields
+        ]
+
+    @staticmethod
+    async def ack_events(event_ids: List[str]) -> int:
+        """
+        Acknowledge processed events and clear notification_pending on their documents
+
+        Args:
+            event_ids: Stream event IDs processed by the bot
+
+        Returns:
+            Number of events acknowledged
+        """
+        if not event_ids:
+            return 0
+
+        redis = get_redis()
+
+        pipe = redis.pipeline(transaction=False)
+        for event_id in event_ids:
+            pipe.xrange(RedisKeys.COMPLETION_EVENTS, event_id, event_id)
+        results = await pipe.execute()
+
+        refs: Dict[str, List[ObjectId]] = {}
+        for entries in results:
+            if not entries:
+                continue
+            fields = entries[0][1]
+            if fields.get("type") in EVENT_COLLECTIONS and ObjectId.is_valid(fields.get("ref_id", "")):
+                refs.setdefault(fields["type"], []).append(ObjectId(fields["ref_id"]))
+
+        now = datetime.utcnow()
+        for event_type, ids in refs.items():
+            collection = await get_db_collection(EVENT_COLLECTIONS[event_type])
+            await collection.update_many(
+                {"_id": {"$in": ids}},
+                {"$set": {"notification_pending": False, "notification_processed_at": now}}
+            )
+
+        acked = await redis.xack(RedisKeys.COMPLETION_EVENTS, NotificationService.STREAM_GROUP, *event_ids)
+        logger.info(f"Acknowledged {acked} completion notification events")
+        return acked
+
     @staticmethod
     async def mark_notification_processed(ticket_id: str) -> None:
         """
@@ -111,3 +400,60 @@ class NotificationService:
         )
 
         logger.info(f"Ticket {ticket_id}: Completion notifications marked as processed")
+
+    @staticmethod
+    async def get_queue_stats() -> Dict:
+        """Stream length, pending count and dead letters for monitoring"""
+        redis = get_redis()
+        pending = 0
+        try:
+            summary = await redis.xpending(RedisKeys.COMPLETION_EVENTS, NotificationService.STREAM_GROUP)
+            pending = summary.get("pending", 0)
+        except ResponseError:
+            pass
+
+        return {
+            "stream_length": await redis.xlen(RedisKeys.COMPLETION_EVENTS),
+            "pending": pending,
+            "dead_letters": await redis.xlen(RedisKeys.COMPLETION_EVENTS_DEAD)
+        }
+
+
+async def requeue_missed_notifications():
+    """
+    Publish events for completions whose publish failed.
+    Runs every 2 minutes; only reads documents still flagged
+    notification_pending without an event ID (partial index).
+    """
+    try:
+        cutoff = datetime.utcnow() - timedelta(seconds=NotificationService.REQUEUE_GRACE_SECONDS)
+        query = {
+            "notification_pending": True,
+            "notification_event_id": None,
+            "$or": [
+                {"notification_queued_at": {"$lt": cutoff}},
+                {"notification_queued_at": {"$exists": False}}
+            ]
+        }
+
+        requeued = 0
+        for event_type, collection_name in EVENT_COLLECTIONS.items():
+            collection = await get_db_collection(collection_name)
+            docs = await collection.find(query, {"_id": 1}).to_list(length=NotificationService.REQUEUE_BATCH_SIZE)
+
+            for doc in docs:
+                ref_id = str(doc["_id"])
+                try:
+                    if event_type == TICKET_COMPLETED:
+                        result = await NotificationService.trigger_completion_notifications(ref_id)
+                        requeued += 1 if result.get("event_id") else 0
+                    else:
+                        requeued += 1 if await NotificationService.trigger_swap_completion_notification(ref_id) else 0
+                except Exception as e:
+                    logger.error(f"Failed to requeue {event_type} notification for {ref_id}: {e}")
+
+        if requeued:
+            logger.warning(f"Requeued {requeued} completion notifications that were never published")
+
+    except Exception as e:
+        logger.error(f"Failed to requeue missed notifications: {e}", exc_info=True)
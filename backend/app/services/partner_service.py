@@ -59,10 +59,14 @@ class PartnerService:
 
         # Add partner role to user
         users = get_users_collection()
-        await users.update_one(
+        user = await users.find_one_and_update(
             {"_id": ObjectId(partner_data.user_id)},
-            {"$addToSet": {"roles": "partner"}}
+            {"$addToSet": {"roles": "partner"}},
+            projection={"discord_id": 1}
         )
+        if user:
+            from app.services.auth_cache_service import AuthCacheService
+            await AuthCacheService.invalidate(user["discord_id"])
 
         await PartnerService.log_action(
             str(result.inserted_id),
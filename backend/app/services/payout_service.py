@@ -9,11 +9,11 @@ from datetime import datetime
 from bson import ObjectId
 from decimal import Decimal
 import logging
-import httpx
 
 from app.core.database import get_db_collection
 from app.services.hold_service import HoldService
 from app.core.config import settings
+from app.core.http_client import provider_client
 from app.core.validators import CryptoValidators
 
 logger = logging.getLogger(__name__)
@@ -356,7 +356,7 @@ class PayoutService:
                 return False, f"Chain not supported: {asset}"
 
             # Get transaction from Tatum
-            async with httpx.AsyncClient() as client:
+            async with provider_client("tatum") as client:
                 headers = {"x-api-key": settings.TATUM_API_KEY}
 
                 response = await client.get(
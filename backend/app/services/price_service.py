@@ -1,14 +1,33 @@
 """
-Price Service - Fetch cryptocurrency prices in USD
-Uses CoinGecko API for real-time pricing
+Price Service - Shared cryptocurrency (and fiat) price oracle
+Uses CoinGecko for crypto prices and exchangerate-api.com for fiat rates
+
+Prices are never fetched on the request path. The scheduler leader refreshes
+every feed on a fixed cadence with one batched provider call and stores the
+result in Redis as a snapshot with its fetch time. Each worker keeps the last
+snapshot in memory: readers get it without awaiting anything, and a stale
+local copy is re-read from Redis in the background (one read per worker,
+however many requests arrive meanwhile).
+
+A failed or rate-limited refresh leaves the previous snapshot in place, so
+callers keep getting the last good prices (flagged stale once they are older
+than the feed's stale_after) instead of None. Only a worker that has never seen
+a snapshot, on a cluster that has never fetched one, waits for a fetch.
 """
 
-import aiohttp
-import logging
-from typing import Dict, Optional
+from dataclasses import dataclass, field
 from decimal import Decimal
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
 import asyncio
-from datetime import datetime, timedelta
+import json
+import logging
+import time
+
+import httpx
+
+from app.core.http_client import provider_client
+from app.core.redis import RedisKeys, get_redis
 
 logger = logging.getLogger(__name__)
 
@@ -33,101 +52,219 @@ COINGECKO_IDS = {
     "DOGE": "dogecoin"
 }
 
+PRICE_REFRESH_SECONDS = 60
+PRICE_STALE_AFTER_SECONDS = 300  # Older snapshots are flagged stale and any worker may refresh them
+FIAT_REFRESH_SECONDS = 3600
+FIAT_STALE_AFTER_SECONDS = 3 * 3600
+LOCAL_SNAPSHOT_SECONDS = 5  # How often a worker re-reads the shared snapshot
+REFRESH_LOCK_SECONDS = 30  # One refresh per feed across the cluster; also the backoff after a failure
 
-class PriceService:
-    """Service for fetching cryptocurrency prices"""
 
-    # Simple in-memory cache (5 minute expiry)
-    _price_cache: Dict[str, tuple[Decimal, datetime]] = {}
-    _cache_duration = timedelta(minutes=5)
+class PriceRateLimited(Exception):
+    """Raised by a fetcher when the provider answers 429"""
+
+
+@dataclass
+class PriceSnapshot:
+    """Prices of one feed as of one fetch"""
+
+    values: Dict[str, Any]
+    updated_at: float  # Unix time of the fetch
+    stale_after: float
+
+    @property
+    def age_seconds(self) -> float:
+        return max(time.time() - self.updated_at, 0.0)
+
+    @property
+    def stale(self) -> bool:
+        return self.age_seconds > self.stale_after
+
+
+@dataclass
+class PriceFeed:
+    """One shared price snapshot, refreshed by the leader and read by every worker"""
+
+    name: str
+    fetcher: Callable[[], Awaitable[Dict[str, Any]]]
+    value_type: Callable[[str], Any]
+    refresh_seconds: int
+    stale_after: float
+    snapshot: Optional[PriceSnapshot] = None
+    last_error: Optional[str] = None
+    stats: Dict[str, int] = field(default_factory=lambda: {
+        "refreshes": 0, "refresh_failures": 0, "rate_limited": 0, "reloads": 0
+    })
+    _checked_at: float = 0.0
+    _reload: Optional[asyncio.Task] = None
+
+    @property
+    def redis_key(self) -> str:
+        return RedisKeys.PRICE_SNAPSHOT.format(feed=self.name)
+
+    async def get(self) -> Optional[PriceSnapshot]:
+        """
+        Current snapshot of this worker
+
+        Returns:
+            Snapshot (possibly stale) or None if no prices were ever fetched
+        """
+        if self.snapshot is None:
+            # Cold worker: wait for the (coalesced) read of the shared snapshot
+            await asyncio.shield(self._start_reload())
+        elif time.monotonic() - self._checked_at > LOCAL_SNAPSHOT_SECONDS:
+            self._start_reload()
+        return self.snapshot
+
+    def _start_reload(self) -> asyncio.Task:
+        if self._reload is None or self._reload.done():
+            self._checked_at = time.monotonic()
+            self._reload = asyncio.create_task(self._reload_from_redis())
+        return self._reload
+
+    async def _reload_from_redis(self):
+        try:
+            raw = await get_redis().get(self.redis_key)
+            self.stats["reloads"] += 1
+            if raw:
+                self._keep(self._parse(raw))
+
+            # Nobody has fetched yet, or the leader stopped refreshing
+            if self.snapshot is None or self.snapshot.stale:
+                await self.refresh()
+        except Exception as e:
+            logger.warning(f"Price snapshot reload failed for {self.name}: {e}")
+
+    def _parse(self, raw: str) -> PriceSnapshot:
+        data = json.loads(raw)
+        return PriceSnapshot(
+            values={code: self.value_type(value) for code, value in data["values"].items()},
+            updated_at=data["updated_at"],
+            stale_after=self.stale_after
+        )
+
+    def _keep(self, snapshot: PriceSnapshot):
+        if self.snapshot is None or snapshot.updated_at >= self.snapshot.updated_at:
+            self.snapshot = snapshot
+
+    async def refresh(self) -> bool:
+        """
+        Fetch the whole feed in one provider call and publish it
+        (the previous snapshot stays in place if the fetch fails)
+
+        Returns:
+            True if a new snapshot was stored
+        """
+        redis = get_redis()
+        lock_key = RedisKeys.PRICE_REFRESH_LOCK.format(feed=self.name)
+        if not await redis.set(lock_key, "1", nx=True, ex=REFRESH_LOCK_SECONDS):
+            return False
+
+        try:
+            values = await self.fetcher()
+        except PriceRateLimited:
+            self.stats["rate_limited"] += 1
+            self.last_error = "rate limited"
+            age = f"{self.snapshot.age_seconds:.0f}s old" if self.snapshot else "none available"
+            logger.warning(f"{self.name} price provider rate limited, serving last good snapshot ({age})")
+            return False
+        except Exception as e:
+            self.stats["refresh_failures"] += 1
+            self.last_error = str(e) or type(e).__name__
+            logger.warning(f"{self.name} price refresh failed: {self.last_error}")
+            return False
+        # On failure the lock is left to expire, which backs off every worker
+
+        snapshot = PriceSnapshot(values=values, updated_at=time.time(), stale_after=self.stale_after)
+        await redis.set(self.redis_key, json.dumps({
+            "values": {code: str(value) for code, value in values.items()},
+            "updated_at": snapshot.updated_at
+        }))
+        await redis.delete(lock_key)
+        self._keep(snapshot)
+        self._checked_at = time.monotonic()
+        self.stats["refreshes"] += 1
+        self.last_error = None
+        return True
+
+    def get_stats(self) -> Dict:
+        """Snapshot age and refresh counters of this worker"""
+        snapshot = self.snapshot
+        return {
+            "values": len(snapshot.values) if snapshot else 0,
+            "updated_at": datetime.utcfromtimestamp(snapshot.updated_at).isoformat() if snapshot else None,
+            "age_seconds": round(snapshot.age_seconds, 1) if snapshot else None,
+            "stale": snapshot.stale if snapshot else True,
+            "last_error": self.last_error,
+            **self.stats
+        }
+
+
+async def _fetch_crypto_prices() -> Dict[str, Decimal]:
+    """USD price of every COINGECKO_IDS currency in one CoinGecko call"""
+    async with provider_client("coingecko") as client:
+        resp = await client.get(
+            "https://api.coingecko.com/api/v3/simple/price",
+            params={"ids": ",".join(sorted(set(COINGECKO_IDS.values()))), "vs_currencies": "usd"}
+        )
+    if resp.status_code == 429:
+        raise PriceRateLimited()
+    if resp.status_code != 200:
+        raise httpx.HTTPStatusError(f"CoinGecko API error: {resp.status_code}", request=resp.request, response=resp)
+
+    data = resp.json()
+    prices = {}
+    for currency, coin_id in COINGECKO_IDS.items():
+        price_usd = data.get(coin_id, {}).get("usd")
+        if price_usd is not None:
+            prices[currency] = Decimal(str(price_usd))
+    if not prices:
+        raise ValueError("CoinGecko returned no prices")
+    return prices
+
+
+async def _fetch_fiat_rates() -> Dict[str, float]:
+    """USD exchange rates for every fiat currency in one call"""
+    async with provider_client("exchangerate") as client:
+        # Using exchangerate-api.com free tier (no API key needed for basic usage)
+        resp = await client.get("https://api.exchangerate-api.com/v4/latest/USD")
+    if resp.status_code == 429:
+        raise PriceRateLimited()
+    if resp.status_code != 200:
+        raise httpx.HTTPStatusError(f"Exchange rate API error: {resp.status_code}", request=resp.request, response=resp)
+
+    rates = resp.json().get("rates", {})
+    if not rates:
+        raise ValueError("Exchange rate API returned no rates")
+    return {code: float(rate) for code, rate in rates.items()}
+
+
+crypto_prices = PriceFeed("crypto", _fetch_crypto_prices, Decimal, PRICE_REFRESH_SECONDS, PRICE_STALE_AFTER_SECONDS)
+fiat_rates = PriceFeed("fiat", _fetch_fiat_rates, float, FIAT_REFRESH_SECONDS, FIAT_STALE_AFTER_SECONDS)
+
+
+class PriceService:
+    """Service for reading cryptocurrency prices from the shared snapshot"""
 
     @classmethod
     async def get_prices_batch(cls, currencies: list[str]) -> Dict[str, Optional[Decimal]]:
         """
-        Batch fetch prices for multiple currencies to avoid rate limiting
+        Get prices for multiple currencies from one snapshot
 
         Args:
             currencies: List of currency codes
 
         Returns:
-            Dict mapping currency code to price
+            Dict mapping currency code to price (None if unknown or never fetched)
         """
         try:
-            # Check which currencies need fetching (not in cache or expired)
-            to_fetch = []
-            results = {}
-
-            for currency in currencies:
-                currency = currency.upper()
-                if currency in cls._price_cache:
-                    price, cached_at = cls._price_cache[currency]
-                    if datetime.utcnow() - cached_at < cls._cache_duration:
-                        results[currency] = price
-                        continue
-                to_fetch.append(currency)
-
-            if not to_fetch:
-                return results
-
-            # Get unique CoinGecko IDs for currencies that need fetching
-            coin_ids = []
-            currency_to_coin_id = {}
-            for currency in to_fetch:
-                coin_id = COINGECKO_IDS.get(currency)
-                if coin_id:
-                    if coin_id not in coin_ids:
-                        coin_ids.append(coin_id)
-                    currency_to_coin_id[currency] = coin_id
-
-            if not coin_ids:
-                return results
-
-            # Batch fetch from CoinGecko (max 250 IDs per request)
-            url = f"https://api.coingecko.com/api/v3/simple/price"
-            params = {
-                "ids": ",".join(coin_ids),
-                "vs_currencies": "usd"
-            }
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                    if resp.status == 429:
-                        logger.warning("CoinGecko rate limit hit - using cached values where available")
-                        # Return whatever we have cached
-                        for currency in to_fetch:
-                            results[currency] = None
-                        return results
-
-                    if resp.status != 200:
-                        logger.error(f"CoinGecko API error: {resp.status}")
-                        for currency in to_fetch:
-                            results[currency] = None
-                        return results
-
-                    data = await resp.json()
-
-                    # Map prices back to currencies
-                    for currency in to_fetch:
-                        coin_id = currency_to_coin_id.get(currency)
-                        if coin_id:
-                            price_usd = data.get(coin_id, {}).get("usd")
-                            if price_usd is not None:
-                                price = Decimal(str(price_usd))
-                                cls._price_cache[currency] = (price, datetime.utcnow())
-                                results[currency] = price
-                            else:
-                                results[currency] = None
-                        else:
-                            results[currency] = None
-
-            return results
-
-        except asyncio.TimeoutError:
-            logger.warning("Timeout fetching batch prices")
-            return {c: None for c in currencies}
+            snapshot = await crypto_prices.get()
         except Exception as e:
-            logger.error(f"Failed to fetch batch prices: {e}")
-            return {c: None for c in currencies}
+            logger.error(f"Failed to read price snapshot: {e}")
+            snapshot = None
+
+        values = snapshot.values if snapshot else {}
+        return {currency.upper(): values.get(currency.upper()) for currency in currencies}
 
     @classmethod
     async def get_price_usd(cls, currency: str) -> Optional[Decimal]:
@@ -140,23 +277,61 @@ class PriceService:
         Returns:
             Price in USD or None if unavailable
         """
-        try:
-            currency = currency.upper()
+        result = await cls.get_prices_batch([currency])
+        return result.get(currency.upper())
 
-            # Check cache first
-            if currency in cls._price_cache:
-                price, cached_at = cls._price_cache[currency]
-                if datetime.utcnow() - cached_at < cls._cache_duration:
-                    return price
+    @classmethod
+    async def get_snapshot(cls) -> Dict:
+        """
+        Get every known price with the age of the snapshot
 
-            # Use batch fetch for single currency
-            result = await cls.get_prices_batch([currency])
-            return result.get(currency)
+        Returns:
+            Dict with prices (as strings), updated_at, age_seconds and stale
+        """
+        snapshot = await crypto_prices.get()
+        if snapshot is None:
+            return {"prices": {}, "updated_at": None, "age_seconds": None, "stale": True}
+        return {
+            "prices": {currency: str(price) for currency, price in snapshot.values.items()},
+            "updated_at": datetime.utcfromtimestamp(snapshot.updated_at).isoformat(),
+            "age_seconds": round(snapshot.age_seconds, 1),
+            "stale": snapshot.stale
+        }
 
-        except Exception as e:
-            logger.error(f"Failed to fetch price for {currency}: {e}")
+    @classmethod
+    async def get_historical_price_usd(cls, currency: str, day: datetime) -> Optional[Decimal]:
+        """
+        Get the USD price of a currency on a past day from CoinGecko's history
+        endpoint. Calls the provider directly, so only use it in backfills.
+
+        Args:
+            currency: Currency code
+            day: UTC day
+
+        Returns:
+            Price in USD or None if CoinGecko has no price for that day
+
+        Raises:
+            PriceRateLimited: CoinGecko answered 429
+        """
+        coin_id = COINGECKO_IDS.get(currency.upper())
+        if not coin_id:
+            return None
+
+        async with provider_client("coingecko") as client:
+            resp = await client.get(
+                f"https://api.coingecko.com/api/v3/coins/{coin_id}/history",
+                params={"date": day.strftime("%d-%m-%Y"), "localization": "false"}
+            )
+        if resp.status_code == 429:
+            raise PriceRateLimited()
+        if resp.status_code != 200:
+            logger.warning(f"CoinGecko history error for {coin_id} on {day.date()}: {resp.status_code}")
             return None
 
+        price_usd = resp.json().get("market_data", {}).get("current_price", {}).get("usd")
+        return Decimal(str(price_usd)) if price_usd is not None else None
+
     @classmethod
     async def convert_to_usd(cls, amount: str, currency: str) -> Optional[str]:
         """
@@ -184,10 +359,16 @@ class PriceService:
             logger.error(f"Failed to convert {amount} {currency} to USD: {e}")
             return None
 
+    @classmethod
+    def get_stats(cls) -> Dict:
+        """Per-feed snapshot age and refresh counters of this worker"""
+        return {feed.name: feed.get_stats() for feed in (crypto_prices, fiat_rates)}
+
     @classmethod
     def clear_cache(cls):
-        """Clear price cache (for testing)"""
-        cls._price_cache.clear()
+        """Forget this worker's snapshots (for testing); the next read reloads them"""
+        crypto_prices.snapshot = None
+        fiat_rates.snapshot = None
 
 
 # Global instance
@@ -282,6 +282,8 @@ class RecoveryService:
                     }
                 }
             )
+            from app.services.auth_cache_service import AuthCacheService
+            await AuthCacheService.invalidate_many([old_user["discord_id"], new_discord_id])
 
             # Update wallet Discord IDs (if they store it)
             await wallets_db.update_many(
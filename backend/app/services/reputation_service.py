@@ -8,8 +8,10 @@ from datetime import datetime, timedelta
 from bson import ObjectId
 from decimal import Decimal
 import logging
+import time
 
 from app.core.database import get_db_collection
+from app.services.cache_service import CacheService
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +31,12 @@ class ReputationService:
         "highest_volume"
     ]
 
+    # Read-through cache TTLs (seconds)
+    REPUTATION_CACHE_TTL = 300
+    REPUTATION_STALE_TTL = 1800
+    LEADERBOARD_CACHE_TTL = 300
+    LEADERBOARD_STALE_TTL = 3600
+
     @staticmethod
     async def submit_rating(
         ticket_id: str,
@@ -106,6 +114,7 @@ class ReputationService:
 
             # Update user statistics
             await ReputationService._update_user_stats(rated_id)
+            await CacheService.invalidate(CacheService.PREFIX_REPUTATION, rated_id)
 
             logger.info(
                 f"Rating submitted: {rater_role} {rater_id} rated "
@@ -121,7 +130,7 @@ class ReputationService:
     @staticmethod
     async def get_user_reputation(user_id: str) -> Dict:
         """
-        Get user reputation summary.
+        Get user reputation summary (cached, refreshed when the user is rated).
 
         Args:
             user_id: User ID
@@ -130,59 +139,70 @@ class ReputationService:
             Dict with reputation data
         """
         try:
-            ratings_db = await get_db_collection("reputation_ratings")
-
-            # Get all ratings received by user
-            cursor = ratings_db.find({"rated_id": ObjectId(user_id)})
-            ratings = await cursor.to_list(length=10000)
-
-            if not ratings:
-                return {
-                    "user_id": user_id,
-                    "average_rating": 0.0,
-                    "total_ratings": 0,
-                    "rating_distribution": {1: 0, 2: 0, 3: 0, 4: 0, 5: 0},
-                    "recent_reviews": []
-                }
-
-            # Calculate statistics
-            total_ratings = len(ratings)
-            total_score = sum(r["rating"] for r in ratings)
-            average_rating = total_score / total_ratings
-
-            # Rating distribution
-            distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-            for rating in ratings:
-                distribution[rating["rating"]] += 1
-
-            # Get recent reviews (with text)
-            recent_reviews = [
-                {
-                    "rating": r["rating"],
-                    "review": r.get("review"),
-                    "rater_role": r["rater_role"],
-                    "created_at": r["created_at"]
-                }
-                for r in sorted(ratings, key=lambda x: x["created_at"], reverse=True)[:10]
-                if r.get("review")
-            ]
+            return await CacheService.get_or_load(
+                CacheService.PREFIX_REPUTATION,
+                user_id,
+                lambda: ReputationService._load_user_reputation(user_id),
+                ttl=ReputationService.REPUTATION_CACHE_TTL,
+                stale_ttl=ReputationService.REPUTATION_STALE_TTL
+            )
 
+        except Exception as e:
+            logger.error(f"Failed to get user reputation: {e}", exc_info=True)
             return {
                 "user_id": user_id,
-                "average_rating": round(average_rating, 2),
-                "total_ratings": total_ratings,
-                "rating_distribution": distribution,
-                "recent_reviews": recent_reviews
+                "average_rating": 0.0,
+                "total_ratings": 0,
+                "error": str(e)
             }
 
-        except Exception as e:
-            logger.error(f"Failed to get user reputation: {e}", exc_info=True)
+    @staticmethod
+    async def _load_user_reputation(user_id: str) -> Dict:
+        """Aggregate a user's ratings into the reputation summary"""
+        ratings_db = await get_db_collection("reputation_ratings")
+
+        # Get all ratings received by user
+        cursor = ratings_db.find({"rated_id": ObjectId(user_id)})
+        ratings = await cursor.to_list(length=10000)
+
+        if not ratings:
             return {
                 "user_id": user_id,
                 "average_rating": 0.0,
                 "total_ratings": 0,
-                "error": str(e)
+                "rating_distribution": {1: 0, 2: 0, 3: 0, 4: 0, 5: 0},
+                "recent_reviews": []
+            }
+
+        # Calculate statistics
+        total_ratings = len(ratings)
+        total_score = sum(r["rating"] for r in ratings)
+        average_rating = total_score / total_ratings
+
+        # Rating distribution
+        distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+        for rating in ratings:
+            distribution[rating["rating"]] += 1
+
+        # Get recent reviews (with text)
+        recent_reviews = [
+            {
+                "rating": r["rating"],
+                "review": r.get("review"),
+                "rater_role": r["rater_role"],
+                "created_at": r["created_at"]
             }
+            for r in sorted(ratings, key=lambda x: x["created_at"], reverse=True)[:10]
+            if r.get("review")
+        ]
+
+        return {
+            "user_id": user_id,
+            "average_rating": round(average_rating, 2),
+            "total_ratings": total_ratings,
+            "rating_distribution": distribution,
+            "recent_reviews": recent_reviews
+        }
 
     @staticmethod
     async def get_user_statistics(user_id: str) -> Dict:
@@ -229,7 +249,7 @@ class ReputationService:
         limit: int = 50
     ) -> List[Dict]:
         """
-        Get leaderboard for specified category.
+        Get leaderboard for specified category (cached, refreshed after stats recalculation).
 
         Args:
             category: Leaderboard type (top_exchangers, top_clients, etc.)
@@ -243,53 +263,64 @@ class ReputationService:
             if category not in ReputationService.LEADERBOARD_TYPES:
                 raise ValueError(f"Invalid category: {category}")
 
-            stats_db = await get_db_collection("user_statistics")
-            users_db = await get_db_collection("users")
-
-            # Build query based on time period
-            query = {}
-            if time_period == "monthly":
-                cutoff = datetime.utcnow() - timedelta(days=30)
-                query["last_active"] = {"$gte": cutoff}
-            elif time_period == "weekly":
-                cutoff = datetime.utcnow() - timedelta(days=7)
-                query["last_active"] = {"$gte": cutoff}
-
-            # Sort based on category
-            sort_field = {
-                "top_exchangers": "exchanger_rating",
-                "top_clients": "client_rating",
-                "most_active": "completed_exchanges",
-                "highest_volume": "total_volume_usd"
-            }.get(category, "exchanger_rating")
-
-            # Get top users
-            cursor = stats_db.find(query).sort(sort_field, -1).limit(limit)
-            stats_list = await cursor.to_list(length=limit)
-
-            # Enrich with user data
-            leaderboard = []
-            for idx, stats in enumerate(stats_list, 1):
-                user = await users_db.find_one({"_id": stats["user_id"]})
-                if user:
-                    leaderboard.append({
-                        "rank": idx,
-                        "user_id": str(stats["user_id"]),
-                        "username": user.get("username", "Unknown"),
-                        "discord_username": user.get("discord_username"),
-                        "average_rating": stats.get("exchanger_rating" if "exchanger" in category else "client_rating", 0.0),
-                        "total_exchanges": stats.get("completed_exchanges", 0),
-                        "total_volume_usd": stats.get("total_volume_usd", 0.0),
-                        "success_rate": stats.get("success_rate", 0.0),
-                        "join_date": user.get("created_at")
-                    })
-
-            return leaderboard
+            return await CacheService.get_or_load(
+                CacheService.PREFIX_LEADERBOARD,
+                f"{category}:{time_period}:{limit}",
+                lambda: ReputationService._load_leaderboard(category, time_period, limit),
+                ttl=ReputationService.LEADERBOARD_CACHE_TTL,
+                stale_ttl=ReputationService.LEADERBOARD_STALE_TTL
+            )
 
         except Exception as e:
             logger.error(f"Failed to get leaderboard: {e}", exc_info=True)
             return []
 
+    @staticmethod
+    async def _load_leaderboard(category: str, time_period: str, limit: int) -> List[Dict]:
+        """Query the top users for a leaderboard and enrich them with user data"""
+        stats_db = await get_db_collection("user_statistics")
+        users_db = await get_db_collection("users")
+
+        # Build query based on time period
+        query = {}
+        if time_period == "monthly":
+            cutoff = datetime.utcnow() - timedelta(days=30)
+            query["last_active"] = {"$gte": cutoff}
+        elif time_period == "weekly":
+            cutoff = datetime.utcnow() - timedelta(days=7)
+            query["last_active"] = {"$gte": cutoff}
+
+        # Sort based on category
+        sort_field = {
+            "top_exchangers": "exchanger_rating",
+            "top_clients": "client_rating",
+            "most_active": "completed_exchanges",
+            "highest_volume": "total_volume_usd"
+        }.get(category, "exchanger_rating")
+
+        # Get top users
+        cursor = stats_db.find(query).sort(sort_field, -1).limit(limit)
+        stats_list = await cursor.to_list(length=limit)
+
+        # Enrich with user data
+        leaderboard = []
+        for idx, stats in enumerate(stats_list, 1):
+            user = await users_db.find_one({"_id": stats["user_id"]})
+            if user:
+                leaderboard.append({
+                    "rank": idx,
+                    "user_id": str(stats["user_id"]),
+                    "username": user.get("username", "Unknown"),
+                    "discord_username": user.get("discord_username"),
+                    "average_rating": stats.get("exchanger_rating" if "exchanger" in category else "client_rating", 0.0),
+                    "total_exchanges": stats.get("completed_exchanges", 0),
+                    "total_volume_usd": stats.get("total_volume_usd", 0.0),
+                    "success_rate": stats.get("success_rate", 0.0),
+                    "join_date": user.get("created_at")
+                })
+
+        return leaderboard
+
     @staticmethod
     async def _update_user_stats(user_id: str):
         """
@@ -552,28 +583,321 @@ class ReputationService:
             return "Untrusted"
 
 
+# ====================
+# Bulk statistics recalculation
+# ====================
+
+STATS_WATERMARK_ID = "user_stats_recalculation"
+
+# Users per $in batch in incremental mode
+STATS_RECALC_BATCH_SIZE = 1000
+
+
+def _round2(expr) -> Dict:
+    return {"$round": [expr, 2]}
+
+
+def _avg_or_zero(total: str, count: str) -> Dict:
+    return {"$cond": [{"$gt": [count, 0]}, _round2({"$divide": [total, count]}), 0.0]}
+
+
+def _stats_pipelines(
+    user_ids: Optional[List[ObjectId]],
+    calculated_at: datetime
+) -> List[Tuple[str, List[Dict], Dict]]:
+    """
+    Aggregation pipelines producing user_statistics fields grouped by user.
+
+    Field semantics match ReputationService._calculate_user_stats. Each pipeline
+    ends in a $merge on user_id, so fields maintained elsewhere are preserved.
+    A pipeline only emits users that still have source rows, so each comes
+    with the zero values of its fields, to be set for every user in scope
+    before it runs (a user whose last warning was removed must go back to 0).
+
+    Args:
+        user_ids: Restrict to these users (None for all users)
+        calculated_at: Stamp written to last_calculated
+
+    Returns:
+        List of (collection name, pipeline, zero values of its fields)
+    """
+    def restrict(field: str) -> List[Dict]:
+        return [{"$match": {field: {"$in": user_ids}}}] if user_ids is not None else []
+
+    merge = {
+        "$merge": {
+            "into": "user_statistics",
+            "on": "user_id",
+            "whenMatched": "merge",
+            "whenNotMatched": "insert"
+        }
+    }
+    stamp = {"last_calculated": {"$literal": calculated_at}}
+
+    is_completed = {"$eq": ["$status", "completed"]}
+    has_times = {"$and": [{"$eq": [{"$type": "$completed_at"}, "date"]}, {"$eq": [{"$type": "$created_at"}, "date"]}]}
+
+    tickets = (
+        ([{"$match": {"$or": [{"exchanger_id": {"$in": user_ids}}, {"client_id": {"$in": user_ids}}]}}]
+         if user_ids is not None else [])
+        + [
+            # A ticket counts once for its exchanger and once for its client
+            {"$project": {
+                "participant": ["$exchanger_id", "$client_id"],
+                "status": 1,
+                "amount_usd": 1,
+                "created_at": 1,
+                "updated_at": 1,
+                "completed_at": 1
+            }},
+            {"$unwind": "$participant"},
+            {"$match": {"participant": {"$ne": None}}},
+        ]
+        + restrict("participant")
+        + [
+            {"$group": {
+                "_id": "$participant",
+                "total": {"$sum": 1},
+                "completed": {"$sum": {"$cond": [is_completed, 1, 0]}},
+                "volume": {"$sum": {"$cond": [is_completed, {"$ifNull": ["$amount_usd", 0.0]}, 0.0]}},
+                "hours_total": {"$sum": {"$cond": [
+                    {"$and": [is_completed, has_times]},
+                    {"$divide": [{"$subtract": ["$completed_at", "$created_at"]}, 3600000]},
+                    0.0
+                ]}},
+                "hours_count": {"$sum": {"$cond": [{"$and": [is_completed, has_times]}, 1, 0]}},
+                "last_active": {"$max": {"$ifNull": ["$updated_at", "$created_at"]}}
+            }},
+            {"$project": {
+                "_id": 0,
+                "user_id": "$_id",
+                "total_exchanges": "$total",
+                "completed_exchanges": "$completed",
+                "total_completed_trades": "$completed",  # Alias for dashboard
+                "successful_trades": "$completed",  # Alias for dashboard
+                "failed_trades": {"$subtract": ["$total", "$completed"]},
+                "total_volume_usd": _round2("$volume"),
+                "average_completion_time_hours": _avg_or_zero("$hours_total", "$hours_count"),
+                "success_rate": _round2({"$multiply": [{"$divide": ["$completed", "$total"]}, 100]}),
+                "last_active": 1,  # Latest ticket activity (weekly/monthly leaderboards)
+                **stamp
+            }},
+            merge
+        ]
+    )
+
+    is_exchanger_rating = {"$eq": ["$rated_role", "exchanger"]}
+    is_client_rating = {"$eq": ["$rated_role", "client"]}
+    ratings = restrict("rated_id") + [
+        {"$group": {
+            "_id": "$rated_id",
+            "exchanger_sum": {"$sum": {"$cond": [is_exchanger_rating, "$rating", 0]}},
+            "exchanger_count": {"$sum": {"$cond": [is_exchanger_rating, 1, 0]}},
+            "client_sum": {"$sum": {"$cond": [is_client_rating, "$rating", 0]}},
+            "client_count": {"$sum": {"$cond": [is_client_rating, 1, 0]}}
+        }},
+        {"$project": {
+            "_id": 0,
+            "user_id": "$_id",
+            "exchanger_rating": _avg_or_zero("$exchanger_sum", "$exchanger_count"),
+            "client_rating": _avg_or_zero("$client_sum", "$client_count"),
+            "exchanger_total_ratings": "$exchanger_count",
+            "client_total_ratings": "$client_count",
+            **stamp
+        }},
+        merge
+    ]
+
+    swap_minutes = {"$cond": [
+        {"$and": [is_completed, has_times]},
+        {"$divide": [{"$subtract": ["$completed_at", "$created_at"]}, 60000]},
+        None
+    ]}
+    swaps = restrict("user_id") + [
+        {"$group": {
+            "_id": "$user_id",
+            "total": {"$sum": 1},
+            "completed": {"$sum": {"$cond": [is_completed, 1, 0]}},
+            "avg_minutes": {"$avg": swap_minutes},
+            "min_minutes": {"$min": swap_minutes}
+        }},
+        {"$project": {
+            "_id": 0,
+            "user_id": "$_id",
+            "total_swaps": "$total",
+            "completed_swaps": "$completed",
+            "avg_completion_time_minutes": _round2({"$ifNull": ["$avg_minutes", 0.0]}),
+            "fastest_completion_minutes": _round2({"$ifNull": ["$min_minutes", 0.0]}),
+            **stamp
+        }},
+        merge
+    ]
+
+    ticket_zeros = {
+        "total_exchanges": 0,
+        "completed_exchanges": 0,
+        "total_completed_trades": 0,
+        "successful_trades": 0,
+        "failed_trades": 0,
+        "total_volume_usd": 0.0,
+        "average_completion_time_hours": 0.0,
+        "success_rate": 0.0
+    }
+    rating_zeros = {
+        "exchanger_rating": 0.0,
+        "client_rating": 0.0,
+        "exchanger_total_ratings": 0,
+        "client_total_ratings": 0
+    }
+    swap_zeros = {
+        "total_swaps": 0,
+        "completed_swaps": 0,
+        "avg_completion_time_minutes": 0.0,
+        "fastest_completion_minutes": 0.0
+    }
+
+    def count_pipeline(user_field: str, output_field: str, match: Optional[Dict] = None) -> List[Dict]:
+        return (
+            ([{"$match": match}] if match else [])
+            + restrict(user_field)
+            + [
+                {"$group": {"_id": f"${user_field}", "count": {"$sum": 1}}},
+                {"$match": {"_id": {"$ne": None}}},
+                {"$project": {"_id": 0, "user_id": "$_id", output_field: "$count", **stamp}},
+                merge
+            ]
+        )
+
+    return [
+        ("tickets", tickets, ticket_zeros),
+        ("reputation_ratings", ratings, rating_zeros),
+        ("afroo_swaps", swaps, swap_zeros),
+        ("wallets", count_pipeline("user_id", "total_wallets"), {"total_wallets": 0}),
+        ("transactions", count_pipeline(
+            "user_id", "total_withdrawals",
+            {"transaction_type": "withdrawal", "status": "completed"}
+        ), {"total_withdrawals": 0}),
+        ("vouches", count_pipeline("vouched_user_id", "total_vouches"), {"total_vouches": 0}),
+        ("warnings", count_pipeline("user_id", "warnings"), {"warnings": 0}),
+    ]
+
+
+async def _users_active_since(since: datetime) -> List[ObjectId]:
+    """Users with tickets, ratings, swaps, wallets, withdrawals or vouches touched since a watermark"""
+    sources = [
+        ("tickets", {"updated_at": {"$gte": since}}, ["exchanger_id", "client_id"]),
+        ("reputation_ratings", {"created_at": {"$gte": since}}, ["rated_id"]),
+        ("afroo_swaps", {"$or": [
+            {"created_at": {"$gte": since}},
+            {"completed_at": {"$gte": since}},
+            {"failed_at": {"$gte": since}}
+        ]}, ["user_id"]),
+        ("wallets", {"created_at": {"$gte": since}}, ["user_id"]),
+        ("transactions", {"created_at": {"$gte": since}, "transaction_type": "withdrawal"}, ["user_id"]),
+        ("vouches", {"created_at": {"$gte": since}}, ["vouched_user_id"]),
+        ("warnings", {"created_at": {"$gte": since}}, ["user_id"]),
+    ]
+
+    user_ids = set()
+    for collection_name, match, fields in sources:
+        collection = await get_db_collection(collection_name)
+        pipeline = [
+            {"$match": match},
+            {"$project": {"_id": 0, "uid": [f"${f}" for f in fields]}},
+            {"$unwind": "$uid"},
+            {"$match": {"uid": {"$type": "objectId"}}},
+            {"$group": {"_id": "$uid"}}
+        ]
+        async for row in collection.aggregate(pipeline):
+            user_ids.add(row["_id"])
+
+    return list(user_ids)
+
+
+async def _run_stats_pipelines(user_ids: Optional[List[ObjectId]], calculated_at: datetime) -> Dict[str, float]:
+    """Run every stats pipeline, returning seconds spent per source collection"""
+    stats_db = await get_db_collection("user_statistics")
+    scope = {"user_id": {"$in": user_ids}} if user_ids is not None else {}
+
+    timings: Dict[str, float] = {}
+    for collection_name, pipeline, zeros in _stats_pipelines(user_ids, calculated_at):
+        started = time.monotonic()
+        # Users left without source rows get no merged row; zero them first
+        await stats_db.update_many(scope, {"$set": zeros})
+        collection = await get_db_collection(collection_name)
+        # $merge produces no output; iterating the cursor runs the pipeline
+        async for _ in collection.aggregate(pipeline, allowDiskUse=True):
+            pass
+        timings[collection_name] = timings.get(collection_name, 0.0) + time.monotonic() - started
+    return timings
+
+
 # Background task to recalculate all user stats
-async def recalculate_all_stats():
+async def recalculate_all_stats(full: bool = False):
     """
-    Recalculate statistics for all active users.
-    Should be called daily by background task scheduler.
+    Recalculate user statistics with set-based aggregations.
+
+    Incremental by default: only users with activity since the last successful
+    run's watermark are reprocessed. The first run (or full=True) recomputes
+    every user. Should be called daily by background task scheduler.
+
+    Args:
+        full: Ignore the watermark and recompute all users
+
+    Returns:
+        Dict with mode, users updated, duration and rows/sec
     """
     try:
-        users_db = await get_db_collection("users")
-
-        # Get all users active in last 90 days
-        cutoff = datetime.utcnow() - timedelta(days=90)
-        cursor = users_db.find({"last_activity": {"$gte": cutoff}})
-        users = await cursor.to_list(length=10000)
+        watermarks_db = await get_db_collection("job_watermarks")
+        stats_db = await get_db_collection("user_statistics")
 
-        updated_count = 0
-        for user in users:
-            await ReputationService._update_user_stats(str(user["_id"]))
-            updated_count += 1
+        # Taken before reading, so activity during the run is picked up next time
+        started_at = datetime.utcnow()
+        started = time.monotonic()
 
-        logger.info(f"Recalculated stats for {updated_count} users")
+        watermark_doc = None if full else await watermarks_db.find_one({"_id": STATS_WATERMARK_ID})
+        mode = "incremental" if watermark_doc else "full"
 
-        return {"updated": updated_count}
+        timings: Dict[str, float] = {}
+        if mode == "full":
+            timings = await _run_stats_pipelines(None, started_at)
+            candidates = None
+        else:
+            user_ids = await _users_active_since(watermark_doc["watermark"])
+            candidates = len(user_ids)
+            for i in range(0, len(user_ids), STATS_RECALC_BATCH_SIZE):
+                batch_timings = await _run_stats_pipelines(user_ids[i:i + STATS_RECALC_BATCH_SIZE], started_at)
+                for name, seconds in batch_timings.items():
+                    timings[name] = timings.get(name, 0.0) + seconds
+
+        updated_count = await stats_db.count_documents({"last_calculated": {"$gte": started_at}})
+        duration = time.monotonic() - started
+        rows_per_sec = round(updated_count / duration, 1) if duration > 0 else 0.0
+
+        result = {
+            "mode": mode,
+            "updated": updated_count,
+            "candidates": candidates,
+            "duration_seconds": round(duration, 2),
+            "rows_per_sec": rows_per_sec,
+            "pipeline_seconds": {k: round(v, 2) for k, v in timings.items()}
+        }
+
+        await watermarks_db.update_one(
+            {"_id": STATS_WATERMARK_ID},
+            {"$set": {"watermark": started_at, "last_run": result, "updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+
+        logger.info(
+            f"Recalculated stats ({mode}) for {updated_count} users in "
+            f"{duration:.2f}s ({rows_per_sec} rows/sec)"
+        )
+
+        # Leaderboards are built from user_statistics
+        await CacheService.invalidate_namespace(CacheService.PREFIX_LEADERBOARD)
+
+        return result
 
     except Exception as e:
         logger.error(f"Failed to recalculate stats: {e}", exc_info=True)
@@ -10,6 +10,7 @@ import logging
 
 from app.core.database import get_tickets_collection, get_db_collection
 from app.services.hold_service import HoldService
+from app.services.analytics_rollup_service import AnalyticsRollupService
 
 logger = logging.getLogger(__name__)
 
@@ -97,6 +98,7 @@ class ServerFeeService:
             }
 
             await server_fees.insert_one(fee_record)
+            await AnalyticsRollupService.record_fee("server_fee", server_fee_usd, fee_record["created_at"])
 
             logger.warning(
                 f"Server fee collection failed for ticket {ticket_id}: "
@@ -141,6 +143,7 @@ class ServerFeeService:
         }
 
         fee_result = await server_fees.insert_one(fee_record)
+        await AnalyticsRollupService.record_fee("server_fee", server_fee_usd, fee_record["created_at"])
 
         logger.info(
             f"Server fee collected for ticket {ticket_id}: "
@@ -20,6 +20,13 @@ class StatsTrackingService:
     MIN_REPUTATION = 100
     MAX_REPUTATION = 1000
 
+    @staticmethod
+    async def _invalidate_user_cache(user: dict):
+        """Drop the cached user/auth identity after a reputation or role write"""
+        if user.get("discord_id"):
+            from app.services.auth_cache_service import AuthCacheService
+            await AuthCacheService.invalidate(user["discord_id"])
+
     @staticmethod
     async def _add_reputation(user_id: str, amount: int = 2):
         """
@@ -46,6 +53,7 @@ class StatsTrackingService:
                     {"_id": ObjectId(user_id)},
                     {"$set": {"reputation_score": new_rep}}
                 )
+                await StatsTrackingService._invalidate_user_cache(user)
 
                 logger.debug(f"Updated reputation for user {user_id}: {current_rep} -> {new_rep}")
 
@@ -130,7 +138,7 @@ class StatsTrackingService:
             logger.error(f"Failed to track exchange completion: {e}", exc_info=True)
 
     @staticmethod
-    async def track_swap_completion(user_id: str, from_amount: float, to_amount: float, from_asset: str, to_asset: str, amount_usd: float = 0):
+    async def track_swap_completion(user_id: str, from_amount: float, to_amount: float, from_asset: str, to_asset: str, amount_usd: Optional[float] = 0):
         """
         Track completed swap - NO REPUTATION AWARDED.
 
@@ -140,19 +148,19 @@ class StatsTrackingService:
             to_amount: Amount received
             from_asset: Source asset
             to_asset: Destination asset
-            amount_usd: Swap value in USD
+            amount_usd: Swap value in USD (None if it has no price)
         """
         try:
             user_statistics = await get_db_collection("user_statistics")
 
+            increments = {"swap_total_made": 1, "swap_total_completed": 1}
+            if amount_usd is not None:  # Unpriced swaps count without volume
+                increments["swap_total_volume_usd"] = amount_usd
+
             await user_statistics.update_one(
                 {"user_id": ObjectId(user_id)},
                 {
-                    "$inc": {
-                        "swap_total_made": 1,
-                        "swap_total_completed": 1,
-                        "swap_total_volume_usd": amount_usd
-                    },
+                    "$inc": increments,
                     "$set": {"updated_at": datetime.utcnow()}
                 },
                 upsert=True
@@ -445,6 +453,7 @@ class StatsTrackingService:
                     {"_id": ObjectId(user_id)},
                     {"$addToSet": {"roles": {"$each": roles_to_add}}}
                 )
+                await StatsTrackingService._invalidate_user_cache(user)
                 logger.info(f"Awarded milestone roles to user {user_id}: {roles_to_add}")
 
         except Exception as e:
@@ -4,11 +4,13 @@ Full integration with Tatum API for wallet generation, transactions, and monitor
 """
 
 import httpx
+import asyncio
 import logging
-from typing import Dict, Optional, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from datetime import datetime
 
 from app.core.config import settings
+from app.core.http_client import ProviderClient, get_http_client, provider_client
 
 logger = logging.getLogger(__name__)
 
@@ -44,16 +46,19 @@ def redact_sensitive_fields(data: Dict) -> Dict:
     return sanitized
 
 
-async def try_solana_rpc_with_fallback(client: httpx.AsyncClient, payload: Dict) -> Dict:
+async def try_solana_rpc_with_fallback(
+    client: ProviderClient,
+    payload: Union[Dict, List[Dict]]
+) -> Union[Dict, List[Dict]]:
     """
     Try multiple free Solana RPC endpoints with fallback on rate limit (429)
 
     Args:
-        client: HTTPX async client
-        payload: JSON-RPC payload
+        client: Pooled Solana RPC client
+        payload: JSON-RPC payload, or a list of payloads for a batch call
 
     Returns:
-        JSON-RPC response
+        JSON-RPC response (a list of responses for a batch call)
 
     Raises:
         Exception if all RPCs fail
@@ -70,7 +75,7 @@ async def try_solana_rpc_with_fallback(client: httpx.AsyncClient, payload: Dict)
 
     for rpc_url in rpc_endpoints:
         try:
-            response = await client.post(rpc_url, json=payload, timeout=10.0)
+            response = await client.post(rpc_url, json=payload, timeout=10.0, retry=True)
 
             # If rate limited, try next endpoint
             if response.status_code == 429:
@@ -126,6 +131,37 @@ class TatumService:
         "USDC-SOL": "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v"   # USDC on Solana
     }
 
+    # Bulk balance lookups: addresses per upstream request
+    # UTXO chains use Tatum's multi-address endpoint, Solana/EVM use JSON-RPC batch arrays
+    BALANCE_BATCH_SIZES = {
+        "BTC": 30,
+        "LTC": 30,
+        "DOGE": 30,
+        "SOL": 100,
+        "USDT-SOL": 100,
+        "USDC-SOL": 100,
+        "ETH": 100,
+        "USDT-ETH": 100,
+        "USDC-ETH": 100,
+        "BNB": 100,
+        "MATIC": 100
+    }
+
+    # Chains without a bulk option fall back to this many concurrent single lookups
+    BALANCE_FALLBACK_CONCURRENCY = 5
+
+    # Tatum RPC gateways for EVM JSON-RPC batches
+    EVM_RPC_GATEWAYS = {
+        "ETH": "https://ethereum-mainnet.gateway.tatum.io",
+        "USDT-ETH": "https://ethereum-mainnet.gateway.tatum.io",
+        "USDC-ETH": "https://ethereum-mainnet.gateway.tatum.io",
+        "BNB": "https://bsc-mainnet.gateway.tatum.io",
+        "MATIC": "https://polygon-mainnet.gateway.tatum.io"
+    }
+
+    # ERC-20 balanceOf(address) selector
+    ERC20_BALANCE_OF_SELECTOR = "0x70a08231"
+
     @staticmethod
     def _get_headers() -> Dict[str, str]:
         """Get Tatum API headers"""
@@ -159,7 +195,7 @@ class TatumService:
             if not endpoint:
                 raise ValueError(f"Unsupported blockchain: {blockchain}")
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with provider_client("tatum") as client:
                 # Step 1: Generate wallet (get mnemonic/xpub)
                 # XRP uses /account endpoint instead of /wallet
                 if asset == "XRP":
@@ -245,7 +281,7 @@ class TatumService:
         try:
             asset = blockchain.upper()
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with provider_client("tatum") as client:
                 if asset in ["BTC", "LTC", "DOGE"]:
                     # Bitcoin-based UTXO chains: Get UTXO balance
                     endpoint = TatumService.BLOCKCHAIN_ENDPOINTS.get(asset)
@@ -394,7 +430,7 @@ class TatumService:
                         ]
                     }
 
-                    data = await try_solana_rpc_with_fallback(client, payload)
+                    data = await try_solana_rpc_with_fallback(get_http_client("solana_rpc"), payload)
 
                     # Check if token account exists
                     if 'result' not in data or not data['result'].get('value'):
@@ -425,6 +461,248 @@ class TatumService:
             logger.error(f"Failed to get balance for {blockchain} {address[:10]}...: {e}", exc_info=True)
             raise
 
+    @staticmethod
+    def get_balance_batch_size(blockchain: str) -> int:
+        """Addresses answered per upstream request for an asset (1 when no bulk option exists)"""
+        return TatumService.BALANCE_BATCH_SIZES.get(blockchain.upper(), 1)
+
+    @staticmethod
+    async def get_balances_batch(
+        asset: str,
+        addresses: List[str],
+        rate_limit: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> Dict[str, Optional[Dict[str, float]]]:
+        """
+        Get balances for many addresses of one asset.
+
+        Uses multi-address endpoints (BTC/LTC/DOGE) and JSON-RPC batch arrays
+        (SOL, SPL tokens, ETH, ERC-20, BNB, MATIC). Other chains fall back to
+        bounded concurrent get_balance calls.
+
+        Args:
+            asset: Asset code (BTC, ETH, USDT-SOL, etc.)
+            addresses: Wallet addresses
+            rate_limit: Awaited before every upstream request (each batch chunk
+                and each single-address fallback lookup), e.g. TokenBucket.acquire
+
+        Returns:
+            Dict mapping address to balance dict (total, confirmed, unconfirmed),
+            or None for addresses whose lookup failed
+        """
+        asset = asset.upper()
+        unique_addresses = list(dict.fromkeys(addresses))
+        batch_size = TatumService.get_balance_batch_size(asset)
+
+        if asset in ["BTC", "LTC", "DOGE"]:
+            fetch_chunk = TatumService._get_utxo_balances_chunk
+        elif asset == "SOL":
+            fetch_chunk = TatumService._get_sol_balances_chunk
+        elif asset in ["USDT-SOL", "USDC-SOL"]:
+            fetch_chunk = TatumService._get_spl_balances_chunk
+        elif asset in TatumService.EVM_RPC_GATEWAYS:
+            fetch_chunk = TatumService._get_evm_balances_chunk
+        else:
+            return await TatumService._get_balances_concurrent(asset, unique_addresses, rate_limit)
+
+        results: Dict[str, Optional[Dict[str, float]]] = {}
+        for i in range(0, len(unique_addresses), batch_size):
+            chunk = unique_addresses[i:i + batch_size]
+            try:
+                if rate_limit:
+                    await rate_limit()
+                results.update(await fetch_chunk(asset, chunk))
+            except Exception as e:
+                logger.warning(
+                    f"Batch balance lookup failed for {len(chunk)} {asset} addresses, "
+                    f"falling back to single lookups: {e}"
+                )
+                results.update(await TatumService._get_balances_concurrent(asset, chunk, rate_limit))
+
+        return results
+
+    @staticmethod
+    async def _get_balances_concurrent(
+        asset: str,
+        addresses: List[str],
+        rate_limit: Optional[Callable[[], Awaitable[None]]] = None
+    ) -> Dict[str, Optional[Dict[str, float]]]:
+        """Single-address lookups with bounded concurrency (and rate_limit per lookup)"""
+        semaphore = asyncio.Semaphore(TatumService.BALANCE_FALLBACK_CONCURRENCY)
+
+        async def fetch(address: str) -> Optional[Dict[str, float]]:
+            async with semaphore:
+                try:
+                    if rate_limit:
+                        await rate_limit()
+                    return await TatumService.get_balance(asset, address)
+                except Exception:
+                    # get_balance already logs the failure
+                    return None
+
+        balances = await asyncio.gather(*(fetch(address) for address in addresses))
+        return dict(zip(addresses, balances))
+
+    @staticmethod
+    def _single_balance(balance: float) -> Dict[str, float]:
+        return {"total": balance, "confirmed": balance, "unconfirmed": 0.0}
+
+    @staticmethod
+    async def _get_utxo_balances_chunk(asset: str, addresses: List[str]) -> Dict[str, Optional[Dict[str, float]]]:
+        """BTC/LTC/DOGE balances via Tatum's multi-address balance endpoint"""
+        endpoint = TatumService.BLOCKCHAIN_ENDPOINTS.get(asset)
+        balance_url = f"{TatumService.BASE_URL}/{endpoint}/address/balance/batch"
+
+        async with provider_client("tatum") as client:
+            response = await client.get(
+                balance_url,
+                headers=TatumService._get_headers(),
+                params={"addresses": ",".join(addresses)}
+            )
+            response.raise_for_status()
+            data = response.json()
+
+        if not isinstance(data, list) or len(data) != len(addresses):
+            raise ValueError(f"Unexpected {asset} batch balance response")
+
+        results = {}
+        for address, entry in zip(addresses, data):
+            incoming = float(entry.get("incoming", 0))
+            outgoing = float(entry.get("outgoing", 0))
+            incoming_pending = float(entry.get("incomingPending", 0))
+            outgoing_pending = float(entry.get("outgoingPending", 0))
+
+            confirmed = max(0.0, incoming - outgoing)
+            unconfirmed = max(0.0, incoming_pending - outgoing_pending)
+
+            results[address] = {
+                "total": confirmed + unconfirmed,
+                "confirmed": confirmed,
+                "unconfirmed": unconfirmed
+            }
+
+        return results
+
+    @staticmethod
+    def _index_rpc_batch(data: Union[Dict, List[Dict]]) -> Dict[int, Dict]:
+        """Map JSON-RPC batch responses by request id (servers may reorder them)"""
+        if not isinstance(data, list):
+            raise ValueError(f"Expected JSON-RPC batch response, got: {str(data)[:200]}")
+        return {item.get("id"): item for item in data if isinstance(item, dict)}
+
+    @staticmethod
+    async def _get_sol_balances_chunk(asset: str, addresses: List[str]) -> Dict[str, Optional[Dict[str, float]]]:
+        """Native SOL balances via one JSON-RPC batch of getBalance calls"""
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": "getBalance", "params": [address]}
+            for i, address in enumerate(addresses)
+        ]
+        responses = TatumService._index_rpc_batch(
+            await try_solana_rpc_with_fallback(get_http_client("solana_rpc"), payload)
+        )
+
+        results = {}
+        for i, address in enumerate(addresses):
+            item = responses.get(i, {})
+            if "result" not in item:
+                logger.warning(f"getBalance failed for {address[:10]}...: {item.get('error')}")
+                results[address] = None
+                continue
+            lamports = item["result"].get("value", 0)
+            results[address] = TatumService._single_balance(lamports / 1e9)
+
+        return results
+
+    @staticmethod
+    async def _get_spl_balances_chunk(asset: str, addresses: List[str]) -> Dict[str, Optional[Dict[str, float]]]:
+        """SPL token balances via one JSON-RPC batch of getTokenAccountsByOwner calls"""
+        token_mint = TatumService.TOKEN_CONTRACTS.get(asset)
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "id": i,
+                "method": "getTokenAccountsByOwner",
+                "params": [address, {"mint": token_mint}, {"encoding": "jsonParsed"}]
+            }
+            for i, address in enumerate(addresses)
+        ]
+        responses = TatumService._index_rpc_batch(
+            await try_solana_rpc_with_fallback(get_http_client("solana_rpc"), payload)
+        )
+
+        results = {}
+        for i, address in enumerate(addresses):
+            item = responses.get(i, {})
+            if "result" not in item:
+                logger.warning(f"getTokenAccountsByOwner failed for {address[:10]}...: {item.get('error')}")
+                results[address] = None
+                continue
+
+            token_accounts = item["result"].get("value") or []
+            if not token_accounts:
+                # No token account yet
+                results[address] = TatumService._single_balance(0.0)
+                continue
+
+            # Same as get_balance: balance of the first token account
+            token_info = token_accounts[0]["account"]["data"]["parsed"]["info"]
+            balance = float(token_info["tokenAmount"]["uiAmount"] or 0)
+            results[address] = TatumService._single_balance(balance)
+
+        return results
+
+    @staticmethod
+    async def _get_evm_balances_chunk(asset: str, addresses: List[str]) -> Dict[str, Optional[Dict[str, float]]]:
+        """EVM native (eth_getBalance) or ERC-20 (balanceOf) balances via one JSON-RPC batch"""
+        contract_address = TatumService.TOKEN_CONTRACTS.get(asset)
+
+        if contract_address:
+            # USDT/USDC on Ethereum have 6 decimals
+            decimals = 6
+            payload = [
+                {
+                    "jsonrpc": "2.0",
+                    "id": i,
+                    "method": "eth_call",
+                    "params": [
+                        {
+                            "to": contract_address,
+                            "data": TatumService.ERC20_BALANCE_OF_SELECTOR + address.lower().replace("0x", "").rjust(64, "0")
+                        },
+                        "latest"
+                    ]
+                }
+                for i, address in enumerate(addresses)
+            ]
+        else:
+            decimals = 18
+            payload = [
+                {"jsonrpc": "2.0", "id": i, "method": "eth_getBalance", "params": [address, "latest"]}
+                for i, address in enumerate(addresses)
+            ]
+
+        async with provider_client("tatum") as client:
+            response = await client.post(
+                TatumService.EVM_RPC_GATEWAYS[asset],
+                headers=TatumService._get_headers(),
+                json=payload,
+                retry=True  # Read-only calls are safe to retry
+            )
+            response.raise_for_status()
+            responses = TatumService._index_rpc_batch(response.json())
+
+        results = {}
+        for i, address in enumerate(addresses):
+            item = responses.get(i, {})
+            raw = item.get("result")
+            if raw is None:
+                logger.warning(f"{asset} balance RPC failed for {address[:10]}...: {item.get('error')}")
+                results[address] = None
+                continue
+            balance = int(raw, 16) / (10 ** decimals) if raw not in ("0x", "") else 0.0
+            results[address] = TatumService._single_balance(balance)
+
+        return results
+
     @staticmethod
     async def send_transaction(
         blockchain: str,
@@ -456,7 +734,7 @@ class TatumService:
         try:
             asset = blockchain.upper()
 
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with provider_client("tatum", timeout=60.0) as client:
                 if asset in ["BTC", "LTC", "DOGE"]:
                     # Bitcoin-based UTXO transaction
                     endpoint = TatumService.BLOCKCHAIN_ENDPOINTS.get(asset)
@@ -766,7 +1044,7 @@ class TatumService:
             else:
                 return False, f"Unsupported asset for monitoring: {asset}", None
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with provider_client("tatum") as client:
                 subscription_url = f"{TatumService.BASE_URL}/subscription"
 
                 payload = {
@@ -808,7 +1086,7 @@ class TatumService:
             True if successful
         """
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with provider_client("tatum") as client:
                 delete_url = f"{TatumService.BASE_URL}/subscription/{subscription_id}"
 
                 response = await client.delete(
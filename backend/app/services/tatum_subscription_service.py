@@ -7,10 +7,10 @@ from typing import Optional, Dict, Tuple
 from datetime import datetime
 from bson import ObjectId
 import logging
-import httpx
 
 from app.core.database import get_db_collection
 from app.core.config import settings
+from app.core.http_client import provider_client
 
 logger = logging.getLogger(__name__)
 
@@ -73,7 +73,7 @@ class TatumSubscriptionService:
             webhook_url = f"{settings.TATUM_WEBHOOK_BASE_URL}/api/v1/webhooks/tatum"
 
             # Create subscription via Tatum API
-            async with httpx.AsyncClient() as client:
+            async with provider_client("tatum") as client:
                 headers = {
                     "x-api-key": settings.TATUM_API_KEY,
                     "Content-Type": "application/json"
@@ -192,7 +192,7 @@ class TatumSubscriptionService:
         """
         try:
             # Cancel in Tatum
-            async with httpx.AsyncClient() as client:
+            async with provider_client("tatum") as client:
                 headers = {
                     "x-api-key": settings.TATUM_API_KEY
                 }
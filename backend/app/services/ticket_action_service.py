@@ -902,6 +902,10 @@ class TicketActionService:
             )
 
             logger.info(f"Ticket {ticket_id}: Unclaimed successfully, {len(hold_ids_to_refund)} hold(s) refunded")
+
+            # Back to waiting for a claim, so the unclaimed auto-close applies again
+            from app.services.ticket_service import TicketService
+            await TicketService.schedule_deadlines(result)
         else:
             result = await tickets.find_one_and_update(
                 {"_id": ObjectId(ticket_id)},
@@ -1031,12 +1035,20 @@ class TicketActionService:
                 update_data["$set"]["server_fee_collected"] = fee_result.get("amount_usd", 0)
                 update_data["$set"]["server_fee_status"] = fee_result.get("status", "collected")
 
+            # Only the update that completes the ticket counts it in the daily rollup
             result = await tickets.find_one_and_update(
-                {"_id": ObjectId(ticket_id)},
+                {"_id": ObjectId(ticket_id), "status": {"$ne": "completed"}},
                 update_data,
                 return_document=True
             )
 
+            if result:
+                from app.services.analytics_rollup_service import AnalyticsRollupService
+                await AnalyticsRollupService.record_ticket_completed(ticket.get("amount_usd", 0))
+            else:
+                logger.warning(f"Ticket {ticket_id}: Already completed, not counted again")
+                result = await tickets.find_one({"_id": ObjectId(ticket_id)})
+
             logger.info(f"Ticket {ticket_id}: Completed successfully with transcript")
 
             # Trigger completion notifications for bot to process
@@ -0,0 +1,209 @@
+"""
+Ticket Message Service - Ticket conversations stored outside the ticket document
+Messages live in ticket_messages keyed by (ticket_id, created_at) so ticket
+reads stay small no matter how long the conversation gets
+"""
+
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from datetime import datetime
+from bson import ObjectId
+import logging
+
+from app.core.database import get_db_collection, get_tickets_collection
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "ticket_messages"
+
+
+class TicketMessageService:
+    """Service for storing and paging ticket messages"""
+
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+    STREAM_BATCH_SIZE = 500  # Cursor batch size when streaming a whole conversation
+
+    @staticmethod
+    async def add_message(
+        ticket_id: str,
+        user_id,
+        message: str,
+        is_internal: bool = False,
+        attachments: Optional[List] = None,
+        created_at: Optional[datetime] = None,
+        update_ticket: bool = True
+    ) -> Dict:
+        """
+        Append a message to a ticket's conversation
+
+        Args:
+            ticket_id: Ticket MongoDB _id
+            user_id: Author (ObjectId or ID string)
+            message: Message text
+            is_internal: Staff-only message
+            attachments: Attachment metadata
+            created_at: Message time (defaults to now)
+            update_ticket: Bump the ticket's message_count / last_message_at
+                (False when the caller already did in its own update)
+
+        Returns:
+            Stored message document
+        """
+        messages = await get_db_collection(COLLECTION)
+        tickets = get_tickets_collection()
+
+        if isinstance(user_id, str) and ObjectId.is_valid(user_id):
+            user_id = ObjectId(user_id)
+
+        created_at = created_at or datetime.utcnow()
+        doc = {
+            "ticket_id": ObjectId(ticket_id),
+            "id": str(ObjectId()),
+            "user_id": user_id,
+            "message": message,
+            "is_internal": is_internal,
+            "attachments": attachments or [],
+            "created_at": created_at
+        }
+        result = await messages.insert_one(doc)
+        doc["_id"] = result.inserted_id
+
+        if not update_ticket:
+            return doc
+
+        await tickets.update_one(
+            {"_id": ObjectId(ticket_id)},
+            {
+                "$inc": {"message_count": 1},
+                "$set": {"last_message_at": created_at, "updated_at": created_at}
+            }
+        )
+
+        return doc
+
+    @staticmethod
+    def encode_cursor(message: Dict) -> str:
+        """Opaque page cursor for the position after a message"""
+        return f"{message['created_at'].isoformat()}|{message['_id']}"
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+        try:
+            created_at, message_id = cursor.split("|", 1)
+            return datetime.fromisoformat(created_at), ObjectId(message_id)
+        except Exception:
+            raise ValueError("Invalid message cursor")
+
+    @staticmethod
+    async def get_messages(
+        ticket_id: str,
+        cursor: Optional[str] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        include_internal: bool = True
+    ) -> Dict:
+        """
+        Get one page of a ticket's messages, oldest first
+
+        Args:
+            ticket_id: Ticket MongoDB _id
+            cursor: next_cursor from the previous page
+            limit: Page size (capped at MAX_PAGE_SIZE)
+            include_internal: Include staff-only messages
+
+        Returns:
+            Dict with messages and next_cursor (None on the last page)
+        """
+        messages = await get_db_collection(COLLECTION)
+        limit = max(1, min(limit, TicketMessageService.MAX_PAGE_SIZE))
+
+        query = {"ticket_id": ObjectId(ticket_id)}
+        if cursor:
+            created_at, message_id = TicketMessageService._decode_cursor(cursor)
+            query["$or"] = [
+                {"created_at": {"$gt": created_at}},
+                {"created_at": created_at, "_id": {"$gt": message_id}}
+            ]
+        if not include_internal:
+            query["is_internal"] = {"$ne": True}
+
+        # Fetch one extra to know whether another page exists
+        page = await messages.find(query).sort(
+            [("created_at", 1), ("_id", 1)]
+        ).limit(limit + 1).to_list(length=limit + 1)
+
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = TicketMessageService.encode_cursor(page[-1])
+
+        return {
+            "messages": page,
+            "next_cursor": next_cursor
+        }
+
+    @staticmethod
+    async def iter_messages(ticket_id: str) -> AsyncIterator[Dict]:
+        """
+        Stream a whole conversation oldest first without loading it into memory
+
+        Args:
+            ticket_id: Ticket MongoDB _id
+        """
+        messages = await get_db_collection(COLLECTION)
+        cursor = messages.find({"ticket_id": ObjectId(ticket_id)}).sort(
+            [("created_at", 1), ("_id", 1)]
+        ).batch_size(TicketMessageService.STREAM_BATCH_SIZE)
+
+        async for message in cursor:
+            yield message
+
+    @staticmethod
+    async def migrate_embedded_messages(ticket: Dict) -> int:
+        """
+        Move a legacy ticket's embedded messages array into ticket_messages
+
+        Args:
+            ticket: Ticket document including its messages array
+
+        Returns:
+            Number of messages moved
+        """
+        embedded = ticket.get("messages") or []
+        tickets = get_tickets_collection()
+        messages = await get_db_collection(COLLECTION)
+
+        if embedded:
+            # Skip messages already copied by an interrupted run
+            existing = set(await messages.distinct("id", {"ticket_id": ticket["_id"]}))
+            docs = [
+                {
+                    **msg,
+                    "ticket_id": ticket["_id"],
+                    "id": msg.get("id") or str(ObjectId()),
+                    "created_at": msg.get("created_at") or ticket.get("created_at") or datetime.utcnow()
+                }
+                for msg in embedded
+                if not msg.get("id") or msg.get("id") not in existing
+            ]
+            if docs:
+                await messages.insert_many(docs, ordered=False)
+
+        # Count from the collection so messages added since the deploy are included
+        message_count = await messages.count_documents({"ticket_id": ticket["_id"]})
+        last = await messages.find_one(
+            {"ticket_id": ticket["_id"]},
+            {"created_at": 1},
+            sort=[("created_at", -1)]
+        )
+        await tickets.update_one(
+            {"_id": ticket["_id"]},
+            {
+                "$set": {
+                    "message_count": message_count,
+                    "last_message_at": last["created_at"] if last else None
+                },
+                "$unset": {"messages": ""}
+            }
+        )
+
+        return len(embedded)
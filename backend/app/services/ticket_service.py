@@ -20,11 +20,24 @@ from app.models.ticket import Ticket, TicketCreate, TicketMessageCreate, Exchang
 from app.services.hold_service import HoldService
 from app.services.tos_service import TOSService
 from app.services.milestone_service import MilestoneService
+from app.services.ticket_message_service import TicketMessageService
 
 
 class TicketService:
     """Service for ticket operations"""
 
+    # Ticket reads that don't need the conversation or rendered transcripts
+    SUMMARY_PROJECTION = {"messages": 0, "transcript_html": 0, "transcript_text": 0}
+
+    # Exchange tickets must accept TOS within this window or they are closed
+    TOS_WINDOW_MINUTES = 10
+    # (minutes after creation, message) for each TOS reminder ping
+    TOS_REMINDERS = [
+        (3, "⏰ Reminder: 7 minutes left to accept TOS"),
+        (6, "⏰ Reminder: 4 minutes left to accept TOS"),
+        (9, "URGENT: 1 minute left to accept TOS or ticket will be closed!")
+    ]
+
     @staticmethod
     async def create_ticket(user_id: str, ticket_data: TicketCreate) -> dict:
         """Create new support ticket"""
@@ -52,16 +65,7 @@ class TicketService:
             "priority": "medium",
             "exchange_id": ObjectId(ticket_data.exchange_id) if ticket_data.exchange_id else None,
             "hold_id": None,
-            "messages": [
-                {
-                    "id": str(ObjectId()),
-                    "user_id": ObjectId(user_id),
-                    "message": ticket_data.description,
-                    "is_internal": False,
-                    "attachments": [],
-                    "created_at": datetime.utcnow()
-                }
-            ],
+            "message_count": 0,  # Messages live in ticket_messages
             "tags": [],
             "satisfaction_rating": None,
             "satisfaction_feedback": None,
@@ -94,7 +98,7 @@ class TicketService:
 
             ticket_dict.update({
                 "tos_required": True,
-                "tos_deadline": datetime.utcnow() + timedelta(minutes=10),  # 10 minute deadline
+                "tos_deadline": datetime.utcnow() + timedelta(minutes=TicketService.TOS_WINDOW_MINUTES),
                 "tos_accepted_at": None,
                 "tos_ping_count": 0,
                 "required_tos_ids": tos_ids
@@ -103,6 +107,17 @@ class TicketService:
         result = await tickets.insert_one(ticket_dict)
         ticket_dict["_id"] = result.inserted_id
 
+        # Description is the opening message of the conversation
+        await TicketMessageService.add_message(
+            str(result.inserted_id),
+            user_id,
+            ticket_data.description,
+            created_at=ticket_dict["created_at"]
+        )
+        ticket_dict["message_count"] = 1
+
+        await TicketService.schedule_deadlines(ticket_dict)
+
         # Log ticket creation
         await TicketService.log_action(
             str(result.inserted_id),
@@ -178,12 +193,12 @@ class TicketService:
             "receiving_amount": exchange_data.receiving_amount,
             # TOS workflow
             "tos_required": True,
-            "tos_deadline": datetime.utcnow() + timedelta(minutes=10),
+            "tos_deadline": datetime.utcnow() + timedelta(minutes=TicketService.TOS_WINDOW_MINUTES),
             "tos_accepted_at": None,
             "tos_ping_count": 0,
             "required_tos_ids": tos_ids,
-            # Messages
-            "messages": [],
+            # Messages live in ticket_messages
+            "message_count": 0,
             "tags": ["v4", "exchange"],
             "satisfaction_rating": None,
             "satisfaction_feedback": None,
@@ -200,6 +215,8 @@ class TicketService:
         result = await tickets.insert_one(ticket_dict)
         ticket_dict["_id"] = result.inserted_id
 
+        await TicketService.schedule_deadlines(ticket_dict)
+
         # Log ticket creation
         await TicketService.log_action(
             str(result.inserted_id),
@@ -221,28 +238,18 @@ class TicketService:
         user_id: str,
         message_data: TicketMessageCreate
     ) -> dict:
-        """Add message to ticket"""
+        """Add message to ticket (returns the ticket summary)"""
         tickets = get_tickets_collection()
 
-        message = {
-            "id": str(ObjectId()),
-            "user_id": ObjectId(user_id),
-            "message": message_data.message,
-            "is_internal": message_data.is_internal,
-            "attachments": [],
-            "created_at": datetime.utcnow()
-        }
-
-        # Update ticket
-        result = await tickets.find_one_and_update(
-            {"_id": ObjectId(ticket_id)},
-            {
-                "$push": {"messages": message},
-                "$set": {"updated_at": datetime.utcnow()}
-            },
-            return_document=True
+        await TicketMessageService.add_message(
+            ticket_id,
+            user_id,
+            message_data.message,
+            is_internal=message_data.is_internal
         )
 
+        result = await tickets.find_one({"_id": ObjectId(ticket_id)}, TicketService.SUMMARY_PROJECTION)
+
         # If this is first staff response, update first_response_at
         if message_data.is_internal and not result.get("first_response_at"):
             await tickets.update_one(
@@ -293,6 +300,7 @@ class TicketService:
             },
             return_document=True
         )
+        await TicketService.cancel_deadlines(ticket_id)
 
         await TicketService.log_action(
             ticket_id,
@@ -347,7 +355,7 @@ class TicketService:
         if assigned_to:
             query["assigned_to"] = ObjectId(assigned_to)
 
-        cursor = tickets.find(query).sort("created_at", -1).limit(limit)
+        cursor = tickets.find(query, TicketService.SUMMARY_PROJECTION).sort("created_at", -1).limit(limit)
         return await cursor.to_list(length=limit)
 
     @staticmethod
@@ -403,36 +411,40 @@ class TicketService:
 
         # Now create holds (safe because we atomically claimed above)
         try:
-            # CRITICAL: Sync on-chain balances BEFORE creating holds to prevent ghost funds
-            from app.services.exchanger_service import ExchangerService
-            logger.info(f"Ticket {ticket_id}: Syncing all deposit balances for exchanger {exchanger_id}")
-
-            try:
-                # Get all exchanger deposits
-                from app.core.database import get_db_collection
-                deposits_db = await get_db_collection("exchanger_deposits")
-                deposits = await deposits_db.find({"user_id": exchanger_id}).to_list(length=None)
-
-                # Sync each deposit's balance with blockchain
-                for deposit in deposits:
-                    try:
-                        currency = deposit.get("currency")
-                        await ExchangerService.sync_deposit_balance(exchanger_id, currency)
-                        logger.info(f"Synced {currency} balance for {exchanger_id}")
-                    except Exception as sync_err:
-                        logger.warning(f"Failed to sync {deposit.get('currency')}: {sync_err}")
-
-                logger.info(f"Completed balance sync for exchanger {exchanger_id}")
-            except Exception as sync_err:
-                logger.error(f"Error during balance sync: {sync_err}")
-                # Continue anyway - use cached balances
+            # Hold the exchanger's lease across sync and hold creation so a concurrent
+            # claim, release or withdrawal on another worker cannot interleave
+            from app.core.locks import exchanger_lock
+            async with exchanger_lock(exchanger_id, timeout=30):
+                # CRITICAL: Sync on-chain balances BEFORE creating holds to prevent ghost funds
+                from app.services.exchanger_service import ExchangerService
+                logger.info(f"Ticket {ticket_id}: Syncing all deposit balances for exchanger {exchanger_id}")
+
+                try:
+                    # Get all exchanger deposits
+                    from app.core.database import get_db_collection
+                    deposits_db = await get_db_collection("exchanger_deposits")
+                    deposits = await deposits_db.find({"user_id": exchanger_id}).to_list(length=None)
+
+                    # Sync each deposit's balance with blockchain
+                    for deposit in deposits:
+                        try:
+                            currency = deposit.get("currency")
+                            await ExchangerService.sync_deposit_balance(exchanger_id, currency)
+                            logger.info(f"Synced {currency} balance for {exchanger_id}")
+                        except Exception as sync_err:
+                            logger.warning(f"Failed to sync {deposit.get('currency')}: {sync_err}")
+
+                    logger.info(f"Completed balance sync for exchanger {exchanger_id}")
+                except Exception as sync_err:
+                    logger.error(f"Error during balance sync: {sync_err}")
+                    # Continue anyway - use cached balances
 
-            from app.services.hold_service import HoldService
-            holds = await HoldService.create_multi_currency_hold(
-                ticket_id=ticket_id,
-                user_id=exchanger_id,
-                amount_usd=amount_usd
-            )
+                from app.services.hold_service import HoldService
+                holds = await HoldService.create_multi_currency_hold(
+                    ticket_id=ticket_id,
+                    user_id=exchanger_id,
+                    amount_usd=amount_usd
+                )
 
             # Store first hold ID for legacy compatibility
             first_hold_id = holds[0]["_id"] if holds else None
@@ -472,6 +484,8 @@ class TicketService:
             )
             raise ValueError(f"Failed to claim ticket: {str(e)}")
 
+        await TicketService.cancel_deadlines(ticket_id)
+
         # Calculate total server fee across all holds
         total_server_fee = sum(Decimal(h["server_fee_usd"]) for h in holds)
         currencies_used = [h["currency"] for h in holds]
@@ -535,9 +549,10 @@ class TicketService:
                 # Only require hold if ticket wasn't force-claimed by admin
                 raise ValueError(f"Ticket {ticket_id} has no associated holds")
 
-        # Update ticket status
+        # Update ticket status; a completion that lost the race leaves the
+        # counting (rollup, stats) to the one that won
         result = await tickets.find_one_and_update(
-            {"_id": ObjectId(ticket_id)},
+            {"_id": ObjectId(ticket_id), "status": {"$ne": "completed"}},
             {
                 "$set": {
                     "status": "completed",
@@ -548,6 +563,9 @@ class TicketService:
             },
             return_document=True
         )
+        if result is None:
+            logger.warning(f"Ticket {ticket_id}: Completed concurrently, not counted again")
+            return await tickets.find_one({"_id": ObjectId(ticket_id)})
 
         await TicketService.log_action(
             ticket_id,
@@ -556,6 +574,12 @@ class TicketService:
             {"hold_released": True}
         )
 
+        from app.services.analytics_rollup_service import AnalyticsRollupService
+        await AnalyticsRollupService.record_ticket_completed(
+            ticket.get("amount_usd", 0),
+            result.get("closed_at")
+        )
+
         # Track exchange completion stats
         try:
             from app.services.stats_tracking_service import StatsTrackingService
@@ -669,6 +693,7 @@ class TicketService:
             },
             return_document=True
         )
+        await TicketService.cancel_deadlines(ticket_id)
 
         await TicketService.log_action(
             ticket_id,
@@ -745,6 +770,10 @@ class TicketService:
             return_document=True
         )
 
+        # Reminders and expiry no longer apply, the ticket now waits for a claim
+        await TicketService.cancel_deadlines(ticket_id, tos_only=True)
+        await TicketService.schedule_deadlines(result)
+
         await TicketService.log_action(
             ticket_id,
             user_id,
@@ -758,108 +787,125 @@ class TicketService:
         return result
 
     @staticmethod
-    async def monitor_tos_deadlines():
+    async def send_tos_reminder(ticket_id: str, ping: int) -> bool:
         """
-        Monitor tickets awaiting TOS agreement.
-        Sends pings at 3, 6, 9 minutes and auto-closes at 10 minutes.
-        Called by background task every minute.
-        """
-        import logging
-        logger = logging.getLogger(__name__)
+        Post a TOS reminder to a ticket still awaiting agreement.
+        Run by the ticket's delayed "tos_reminder" job.
+
+        Args:
+            ticket_id: Ticket MongoDB _id
+            ping: Reminder number (1-based index into TOS_REMINDERS)
 
+        Returns:
+            True if the reminder was sent, False if it no longer applies
+        """
         tickets = get_tickets_collection()
+        ping_message = TicketService.TOS_REMINDERS[ping - 1][1]
+        now = datetime.utcnow()
 
-        # Find tickets awaiting TOS
-        awaiting_tickets = await tickets.find({
-            "status": "awaiting_tos",
-            "tos_required": True,
-            "tos_accepted_at": None
-        }).to_list(length=1000)
+        # Claiming the ping number and bumping the counters in one update keeps
+        # a redelivered job from posting the same reminder twice
+        ticket = await tickets.find_one_and_update(
+            {
+                "_id": ObjectId(ticket_id),
+                "status": "awaiting_tos",
+                "tos_accepted_at": None,
+                "assigned_to": None,
+                "exchanger_discord_id": None,
+                "tos_ping_count": {"$lt": ping}
+            },
+            {
+                "$set": {"tos_ping_count": ping, "last_message_at": now, "updated_at": now},
+                "$inc": {"message_count": 1}
+            },
+            projection={"user_id": 1}
+        )
+        if not ticket:
+            logger.info(f"Skipping TOS ping {ping} for ticket {ticket_id} - no longer awaiting TOS")
+            return False
 
-        logger.info(f"Checking {len(awaiting_tickets)} tickets awaiting TOS")
+        # Add system message to ticket
+        await TicketMessageService.add_message(
+            ticket_id,
+            ticket["user_id"],  # System message
+            ping_message,
+            created_at=now,
+            update_ticket=False
+        )
 
-        for ticket in awaiting_tickets:
-            try:
-                created_at = ticket["created_at"]
-                tos_deadline = ticket.get("tos_deadline")
-                ping_count = ticket.get("tos_ping_count", 0)
-                ticket_id = str(ticket["_id"])
-                user_id = str(ticket["user_id"])
-
-                # SAFETY CHECK: Skip if ticket was claimed or TOS was accepted
-                if ticket.get("assigned_to") or ticket.get("exchanger_discord_id"):
-                    logger.info(f"Skipping ticket {ticket_id} - already claimed")
-                    continue
-
-                if ticket.get("tos_accepted_at"):
-                    logger.info(f"Skipping ticket {ticket_id} - TOS already accepted")
-                    continue
-
-                # Calculate time elapsed since creation
-                time_elapsed = datetime.utcnow() - created_at
-                minutes_elapsed = time_elapsed.total_seconds() / 60
-
-                # Auto-close if past deadline (10 minutes)
-                if tos_deadline and datetime.utcnow() >= tos_deadline:
-                    logger.info(f"Auto-closing ticket {ticket_id} - TOS deadline expired")
-                    await TicketService.cancel_ticket(
-                        ticket_id=ticket_id,
-                        user_id=user_id,
-                        reason="TOS agreement deadline expired (10 minutes)"
-                    )
-                    # TODO: Send DM to user via Discord bot
-                    continue
-
-                # Send pings at 3, 6, 9 minutes
-                should_ping = False
-                ping_message = ""
-
-                if minutes_elapsed >= 3 and ping_count == 0:
-                    should_ping = True
-                    ping_message = "⏰ Reminder: 7 minutes left to accept TOS"
-                elif minutes_elapsed >= 6 and ping_count == 1:
-                    should_ping = True
-                    ping_message = "⏰ Reminder: 4 minutes left to accept TOS"
-                elif minutes_elapsed >= 9 and ping_count == 2:
-                    should_ping = True
-                    ping_message = "URGENT: 1 minute left to accept TOS or ticket will be closed!"
-
-                if should_ping:
-                    # Increment ping count
-                    await tickets.update_one(
-                        {"_id": ticket["_id"]},
-                        {
-                            "$inc": {"tos_ping_count": 1},
-                            "$set": {"updated_at": datetime.utcnow()}
-                        }
-                    )
+        logger.info(f"Sent ping {ping} to ticket {ticket_id}")
 
-                    # Add system message to ticket
-                    await tickets.update_one(
-                        {"_id": ticket["_id"]},
-                        {
-                            "$push": {
-                                "messages": {
-                                    "id": str(ObjectId()),
-                                    "user_id": ticket["user_id"],  # System message
-                                    "message": ping_message,
-                                    "is_internal": False,
-                                    "attachments": [],
-                                    "created_at": datetime.utcnow()
-                                }
-                            }
-                        }
-                    )
+        # TODO: Send Discord ping to user
+        # await discord_bot.send_tos_reminder(ticket_id, user_id, ping_message)
 
-                    logger.info(f"Sent ping {ping_count + 1} to ticket {ticket_id}")
+        return True
 
-                    # TODO: Send Discord ping to user
-                    # await discord_bot.send_tos_reminder(ticket_id, user_id, ping_message)
+    @staticmethod
+    async def expire_tos_deadline(ticket_id: str) -> bool:
+        """
+        Cancel a ticket whose TOS deadline passed without agreement.
+        Run by the ticket's delayed "tos_expire" job.
 
-            except Exception as e:
-                logger.error(f"Error monitoring ticket {ticket_id}: {e}", exc_info=True)
+        Args:
+            ticket_id: Ticket MongoDB _id
+
+        Returns:
+            True if the ticket was cancelled
+        """
+        tickets = get_tickets_collection()
+        ticket = await tickets.find_one(
+            {"_id": ObjectId(ticket_id)},
+            {
+                "status": 1, "user_id": 1, "created_at": 1, "assigned_to": 1, "exchanger_discord_id": 1,
+                "tos_accepted_at": 1, "tos_deadline": 1, "tos_ping_count": 1
+            }
+        )
+
+        # SAFETY CHECK: Skip if ticket was claimed or TOS was accepted
+        if (
+            not ticket
+            or ticket.get("status") != "awaiting_tos"
+            or ticket.get("tos_accepted_at")
+            or ticket.get("assigned_to")
+            or ticket.get("exchanger_discord_id")
+        ):
+            return False
+
+        if ticket.get("tos_deadline") and datetime.utcnow() < ticket["tos_deadline"]:
+            # Deadline was moved after the job was scheduled
+            from app.tasks.deadlines import schedule_ticket_deadlines
+            await schedule_ticket_deadlines(ticket)
+            return False
+
+        logger.info(f"Auto-closing ticket {ticket_id} - TOS deadline expired")
+        await TicketService.cancel_ticket(
+            ticket_id=ticket_id,
+            user_id=str(ticket["user_id"]),
+            reason=f"TOS agreement deadline expired ({TicketService.TOS_WINDOW_MINUTES} minutes)"
+        )
+        # TODO: Send DM to user via Discord bot
+        return True
 
-        return len(awaiting_tickets)
+    @staticmethod
+    async def schedule_deadlines(ticket: dict):
+        """Schedule a ticket's TOS / unclaimed deadlines (failures are only logged)"""
+        try:
+            from app.tasks.deadlines import schedule_ticket_deadlines
+            await schedule_ticket_deadlines(ticket)
+        except Exception as e:
+            logger.error(f"Failed to schedule deadlines for ticket {ticket.get('_id')}: {e}")
+
+    @staticmethod
+    async def cancel_deadlines(ticket_id: str, tos_only: bool = False):
+        """Cancel a ticket's pending deadlines (failures are only logged)"""
+        try:
+            from app.tasks.deadlines import cancel_tos_deadlines, cancel_ticket_deadlines
+            if tos_only:
+                await cancel_tos_deadlines(ticket_id)
+            else:
+                await cancel_ticket_deadlines(ticket_id)
+        except Exception as e:
+            logger.error(f"Failed to cancel deadlines for ticket {ticket_id}: {e}")
 
     @staticmethod
     async def log_action(ticket_id: str, user_id: str, action: str, details: dict):
@@ -1456,6 +1502,8 @@ class TicketService:
             }
         )
 
+        await TicketService.cancel_deadlines(ticket_id)
+
         # Update hold with exchanger assignment
         if ticket.get("hold_id"):
             await HoldService.assign_hold_to_exchanger(
@@ -9,6 +9,7 @@ from bson import ObjectId
 import logging
 
 from app.core.database import get_db_collection
+from app.services.cache_service import CacheService
 
 logger = logging.getLogger(__name__)
 
@@ -97,6 +98,8 @@ class TOSService:
                 {"$set": {"is_active": False}}
             )
 
+            await CacheService.invalidate(CacheService.PREFIX_TOS, category)
+
             logger.info(f"Created TOS version: {category} v{version}")
 
             return True, "TOS version created successfully", tos_id
@@ -108,7 +111,7 @@ class TOSService:
     @staticmethod
     async def get_latest_tos(category: str = "general") -> Optional[Dict]:
         """
-        Get latest active TOS version for category.
+        Get latest active TOS version for category (cached, served from memory when hot).
 
         Args:
             category: TOS category
@@ -117,22 +120,32 @@ class TOSService:
             TOS document or None
         """
         try:
-            tos_db = await get_db_collection("tos_versions")
-
-            tos = await tos_db.find_one(
-                {"category": category, "is_active": True},
-                sort=[("effective_date", -1)]
+            return await CacheService.get_or_load(
+                CacheService.PREFIX_TOS,
+                category,
+                lambda: TOSService._load_latest_tos(category),
+                ttl=CacheService.TTL_DAY
             )
 
-            if tos:
-                tos["_id"] = str(tos["_id"])
-
-            return tos
-
         except Exception as e:
             logger.error(f"Failed to get latest TOS: {e}")
             return None
 
+    @staticmethod
+    async def _load_latest_tos(category: str) -> Optional[Dict]:
+        """Read the latest active TOS version for a category from the database"""
+        tos_db = await get_db_collection("tos_versions")
+
+        tos = await tos_db.find_one(
+            {"category": category, "is_active": True},
+            sort=[("effective_date", -1)]
+        )
+
+        if tos:
+            tos["_id"] = str(tos["_id"])
+
+        return tos
+
     @staticmethod
     async def get_all_active_tos() -> Dict[str, Dict]:
         """
@@ -8,7 +8,7 @@ from datetime import datetime
 from bson import ObjectId
 import logging
 
-from app.core.database import get_tickets_collection, get_users_collection
+from app.core.database import get_tickets_collection
 
 logger = logging.getLogger(__name__)
 
@@ -20,22 +20,34 @@ class TranscriptService:
     async def generate_transcript(ticket_id: str) -> Dict:
         """
         Generate a transcript for a completed ticket
+        Messages are streamed from ticket_messages and rendered as they arrive
         Returns dict with HTML and text versions
         """
+        from app.services.ticket_message_service import TicketMessageService
+
         tickets = get_tickets_collection()
-        users = get_users_collection()
 
-        # Get ticket
-        ticket = await tickets.find_one({"_id": ObjectId(ticket_id)})
+        # Get ticket (legacy tickets may still carry an embedded messages array)
+        ticket = await tickets.find_one(
+            {"_id": ObjectId(ticket_id)},
+            {"transcript_html": 0, "transcript_text": 0}
+        )
         if not ticket:
             raise ValueError(f"Ticket {ticket_id} not found")
 
+        if "messages" in ticket:
+            await TicketMessageService.migrate_embedded_messages(ticket)
+
         # Get client and exchanger info
         client_discord_id = ticket.get("discord_user_id", str(ticket["user_id"]))
         exchanger_id = ticket.get("assigned_to")
 
-        # Get messages
-        messages = ticket.get("messages", [])
+        # Render messages straight from the cursor
+        html_parts = []
+        text_parts = []
+        async for msg in TicketMessageService.iter_messages(ticket_id):
+            html_parts.append(TranscriptService._render_html_message(msg))
+            text_parts.append(TranscriptService._render_text_message(msg))
 
         # Build transcript data
         transcript_data = {
@@ -50,7 +62,8 @@ class TranscriptService:
             "created_at": ticket.get("created_at"),
             "closed_at": ticket.get("closed_at"),
             "payout_type": ticket.get("payout_type", "Unknown"),
-            "messages": messages,
+            "message_html": "".join(html_parts),
+            "message_text": "".join(text_parts),
             "status": ticket.get("status", "Unknown")
         }
 
@@ -65,9 +78,39 @@ class TranscriptService:
             "ticket_number": transcript_data["ticket_number"],
             "html": html_transcript,
             "text": text_transcript,
+            "message_count": len(text_parts),
             "generated_at": datetime.utcnow()
         }
 
+    @staticmethod
+    def _render_html_message(msg: Dict) -> str:
+        """Render one message for the HTML transcript"""
+        timestamp = msg["created_at"].strftime("%I:%M %p") if msg.get("created_at") else "Unknown"
+        sender = msg.get("sender_name", "System")
+        content = msg.get("message", msg.get("content", ""))
+        is_internal = msg.get("is_internal", False)
+
+        # Determine message type
+        msg_class = "system" if is_internal else "message"
+
+        return f"""
+            <div class="{msg_class}">
+                <div class="message-header">
+                    <span class="message-author">{sender}</span>
+                    <span class="message-time">{timestamp}</span>
+                </div>
+                <div class="message-content">{content}</div>
+            </div>
+            """
+
+    @staticmethod
+    def _render_text_message(msg: Dict) -> str:
+        """Render one message for the text transcript"""
+        timestamp = msg["created_at"].strftime("%H:%M:%S") if msg.get("created_at") else "Unknown"
+        sender = msg.get("sender_name", "Unknown")
+        content = msg.get("message", msg.get("content", ""))
+        return f"[{timestamp}] {sender}: {content}\n"
+
     @staticmethod
     def _generate_html_transcript(data: Dict) -> str:
         """Generate HTML version of transcript with purple gradient theme"""
@@ -88,26 +131,7 @@ class TranscriptService:
                 mins = int(minutes % 60)
                 duration = f"{hours}h {mins}m"
 
-        # Build message log
-        message_html = ""
-        for msg in data["messages"]:
-            timestamp = msg.get("created_at", datetime.utcnow()).strftime("%I:%M %p") if msg.get("created_at") else "Unknown"
-            sender = msg.get("sender_name", "System")
-            content = msg.get("message", msg.get("content", ""))
-            is_internal = msg.get("is_internal", False)
-
-            # Determine message type
-            msg_class = "system" if is_internal else "message"
-
-            message_html += f"""
-            <div class="{msg_class}">
-                <div class="message-header">
-                    <span class="message-author">{sender}</span>
-                    <span class="message-time">{timestamp}</span>
-                </div>
-                <div class="message-content">{content}</div>
-            </div>
-            """
+        message_html = data["message_html"]
 
         # Calculate profit for display
         platform_fee = data.get("fee_amount", 0)
@@ -388,14 +412,7 @@ MESSAGE LOG
 -----------
 """
 
-        for msg in data["messages"]:
-            timestamp = msg.get("timestamp", datetime.utcnow()).strftime("%H:%M:%S")
-            sender = msg.get("sender_name", "Unknown")
-            content = msg.get("content", "")
-            text += f"[{timestamp}] {sender}: {content}\n"
-
-        if not data["messages"]:
-            text += "No messages recorded\n"
+        text += data["message_text"] or "No messages recorded\n"
 
         text += """
 ========================================
@@ -0,0 +1,301 @@
+"""
+Transcript Storage Service - Compressed, content-addressed transcript files
+Stores uploaded HTML transcripts pre-compressed and serves them as-is
+
+Inline <style> blocks and base64 data: images (the logo, embedded avatars)
+are moved out of each transcript into content-addressed assets under
+assets/, shared by every transcript that uses them. The remaining HTML is
+stored gzip-compressed (plus brotli when installed), so views are sent with
+Content-Encoding and never re-compressed. All compression and file I/O runs
+in worker threads, off the event loop.
+
+Layout (under TRANSCRIPTS_DIR):
+    {ticket_type}/{ticket_id}.html.gz   Body (and .html.br)
+    assets/{sha256}.css.gz              Shared stylesheet
+    assets/{sha256}.{png,jpg,...}       Shared image
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import base64
+import gzip
+import hashlib
+import logging
+import os
+import re
+import zlib
+
+from app.core.database import get_db_collection
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+TRANSCRIPTS_DIR = os.path.join(os.path.dirname(__file__), "../../../transcripts")
+ASSETS_DIR = os.path.join(TRANSCRIPTS_DIR, "assets")
+ASSET_URL_PREFIX = "/transcripts/assets/"
+
+VALID_TYPES = ["ticket", "swap", "automm", "application", "support"]
+
+STYLE_RE = re.compile(r"<style[^>]*>(.*?)</style>", re.DOTALL | re.IGNORECASE)
+DATA_URI_RE = re.compile(r"data:(image/[a-z0-9.+-]+);base64,([A-Za-z0-9+/=]+)")
+ASSET_NAME_RE = re.compile(r"^[0-9a-f]{64}\.(css|png|jpg|gif|webp|svg)$")
+
+IMAGE_EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/gif": "gif",
+    "image/webp": "webp",
+    "image/svg+xml": "svg"
+}
+ASSET_MEDIA_TYPES = {
+    "css": "text/css",
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "svg": "image/svg+xml"
+}
+
+
+def safe_ticket_id(ticket_id: str) -> str:
+    """Ticket ID as used in file names and lookups"""
+    return ticket_id.replace('/', '_').replace('\\', '_')
+
+
+def _write_file(path: str, data: bytes):
+    """Write via a temp file so readers never see a partial body"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    partial = f"{path}.partial"
+    with open(partial, "wb") as f:
+        f.write(data)
+    os.replace(partial, path)
+
+
+def _read_file(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class TranscriptStorageService:
+    """Store and serve compressed transcripts"""
+
+    GZIP_LEVEL = 9  # Bodies are compressed once and served many times
+    BROTLI_QUALITY = 9
+    MAX_UPLOAD_BYTES = 20 * 1024 * 1024  # Compressed upload
+    MAX_HTML_BYTES = 50 * 1024 * 1024  # Decompressed transcript
+
+    # ====================
+    # Upload
+    # ====================
+
+    @staticmethod
+    def decompress_upload(data: bytes) -> bytes:
+        """
+        Inflate a gzip upload (plain HTML passes through), capped at MAX_HTML_BYTES
+
+        Raises:
+            ValueError: Corrupt or oversized upload
+        """
+        if data[:2] != b"\x1f\x8b":
+            html = data
+        else:
+            inflater = zlib.decompressobj(wbits=31)
+            try:
+                html = inflater.decompress(data, TranscriptStorageService.MAX_HTML_BYTES + 1)
+            except zlib.error as e:
+                raise ValueError(f"Corrupt gzip upload: {e}")
+        if len(html) > TranscriptStorageService.MAX_HTML_BYTES:
+            raise ValueError("Transcript too large")
+        return html
+
+    @staticmethod
+    def _extract_assets(html: str) -> Tuple[str, Dict[str, bytes]]:
+        """Replace inline styles and data: images with asset links"""
+        assets: Dict[str, bytes] = {}
+
+        def replace_style(match):
+            css = match.group(1).encode()
+            name = f"{hashlib.sha256(css).hexdigest()}.css"
+            assets[name] = css
+            return f'<link rel="stylesheet" href="{ASSET_URL_PREFIX}{name}">'
+
+        def replace_image(match):
+            extension = IMAGE_EXTENSIONS.get(match.group(1))
+            if not extension:
+                return match.group(0)
+            try:
+                image = base64.b64decode(match.group(2), validate=True)
+            except ValueError:
+                return match.group(0)
+            name = f"{hashlib.sha256(image).hexdigest()}.{extension}"
+            assets[name] = image
+            return f"{ASSET_URL_PREFIX}{name}"
+
+        html = STYLE_RE.sub(replace_style, html)
+        html = DATA_URI_RE.sub(replace_image, html)
+        return html, assets
+
+    @staticmethod
+    def _store_files(ticket_type: str, ticket_id: str, html: bytes) -> Dict:
+        """Split out assets, compress and write everything (runs in a thread)"""
+        body, assets = TranscriptStorageService._extract_assets(html.decode("utf-8", errors="replace"))
+        body = body.encode()
+
+        # Content-addressed: an existing file already holds these bytes
+        for name, content in assets.items():
+            if name.endswith(".css"):
+                path = os.path.join(ASSETS_DIR, f"{name}.gz")
+                if not os.path.exists(path):
+                    _write_file(path, gzip.compress(content, TranscriptStorageService.GZIP_LEVEL, mtime=0))
+            else:
+                path = os.path.join(ASSETS_DIR, name)
+                if not os.path.exists(path):
+                    _write_file(path, content)
+
+        base_path = os.path.join(TRANSCRIPTS_DIR, ticket_type, ticket_id)
+        file_path = f"{base_path}.html.gz"
+        compressed = gzip.compress(body, TranscriptStorageService.GZIP_LEVEL, mtime=0)
+        _write_file(file_path, compressed)
+
+        encodings = ["gzip"]
+        if brotli is not None:
+            _write_file(f"{base_path}.html.br", brotli.compress(body, quality=TranscriptStorageService.BROTLI_QUALITY))
+            encodings.append("br")
+
+        return {
+            "file_path": file_path,
+            "file_size": len(compressed),
+            "raw_size": len(html),
+            "encodings": encodings,
+            "etag": hashlib.sha256(body).hexdigest()[:32],
+            "assets": sorted(assets)
+        }
+
+    @staticmethod
+    async def store(
+        ticket_id: str,
+        ticket_type: str,
+        html: bytes,
+        user_id: str,
+        ticket_number: Optional[int] = None,
+        participants: Optional[List[str]] = None,
+        message_count: int = 0
+    ) -> Dict:
+        """
+        Store a transcript, replacing any earlier upload for the same ticket
+
+        Args:
+            ticket_id: Ticket/swap/escrow ID
+            ticket_type: One of VALID_TYPES
+            html: Transcript HTML (UTF-8)
+            user_id: Discord ID of the primary owner
+            ticket_number: Human-readable number if applicable
+            participants: Other Discord IDs
+            message_count: Messages in the transcript
+
+        Returns:
+            The metadata document
+        """
+        ticket_id = safe_ticket_id(ticket_id)
+        stored = await asyncio.to_thread(TranscriptStorageService._store_files, ticket_type, ticket_id, html)
+
+        transcripts = await get_db_collection("transcript_metadata")
+        metadata = await transcripts.find_one_and_update(
+            {"ticket_id": ticket_id, "ticket_type": ticket_type, "status": "active"},
+            {
+                "$set": {
+                    "ticket_number": ticket_number,
+                    "user_id": user_id,
+                    "participants": participants or [],
+                    "message_count": message_count,
+                    "generated_at": datetime.utcnow(),
+                    **stored
+                },
+                "$setOnInsert": {"view_count": 0, "last_viewed_at": None}
+            },
+            upsert=True,
+            return_document=True
+        )
+
+        logger.info(
+            f"Transcript stored: {ticket_type}/{ticket_id} for user {user_id} "
+            f"({stored['raw_size']} bytes -> {stored['file_size']} gzip, {len(stored['assets'])} shared assets)"
+        )
+        return metadata
+
+    # ====================
+    # Serving
+    # ====================
+
+    @staticmethod
+    async def find(ticket_type: str, ticket_id: str) -> Optional[Dict]:
+        """Active transcript metadata (older uploads may hold the unsanitized ID)"""
+        transcripts = await get_db_collection("transcript_metadata")
+        return await transcripts.find_one({
+            "ticket_type": ticket_type,
+            "ticket_id": {"$in": list({safe_ticket_id(ticket_id), ticket_id})},
+            "status": "active"
+        })
+
+    @staticmethod
+    def choose_encoding(metadata: Dict, accept_encoding: str) -> Optional[str]:
+        """Best stored encoding the client accepts (None means decompress)"""
+        accepted = {part.split(";")[0].strip() for part in (accept_encoding or "").lower().split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding in metadata.get("encodings", []) and encoding in accepted:
+                return encoding
+        return None
+
+    @staticmethod
+    async def read_body(metadata: Dict, encoding: Optional[str]) -> bytes:
+        """
+        Read a stored body
+
+        Args:
+            metadata: Transcript metadata
+            encoding: "br", "gzip", or None for plain HTML
+
+        Returns:
+            Body bytes in the requested encoding
+        """
+        file_path = metadata["file_path"]
+        if not metadata.get("encodings"):
+            # Stored before compression was introduced
+            return await asyncio.to_thread(_read_file, file_path)
+        if encoding == "br":
+            return await asyncio.to_thread(_read_file, file_path[:-len(".gz")] + ".br")
+        data = await asyncio.to_thread(_read_file, file_path)
+        if encoding == "gzip":
+            return data
+        return await asyncio.to_thread(gzip.decompress, data)
+
+    @staticmethod
+    async def read_asset(name: str, gzip_ok: bool) -> Optional[Tuple[bytes, str, Optional[str]]]:
+        """
+        Read a shared asset
+
+        Args:
+            name: Asset file name ({sha256}.{ext})
+            gzip_ok: Whether the client accepts gzip
+
+        Returns:
+            (body, media type, content encoding), or None if unknown
+        """
+        if not ASSET_NAME_RE.match(name):
+            return None
+        extension = name.rsplit(".", 1)[1]
+        path = os.path.join(ASSETS_DIR, f"{name}.gz" if extension == "css" else name)
+        try:
+            data = await asyncio.to_thread(_read_file, path)
+        except FileNotFoundError:
+            return None
+        if extension != "css":
+            return data, ASSET_MEDIA_TYPES[extension], None
+        if gzip_ok:
+            return data, ASSET_MEDIA_TYPES[extension], "gzip"
+        return await asyncio.to_thread(gzip.decompress, data), ASSET_MEDIA_TYPES[extension], None
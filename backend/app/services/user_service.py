@@ -3,22 +3,43 @@ User Service - Business logic for user operations
 Keeps routes clean, handles all user-related logic
 """
 
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import datetime
+import hashlib
+import logging
 from bson import ObjectId
+from pymongo import UpdateOne
 
 from app.core.database import get_users_collection, get_audit_logs_collection
 from app.models.user import User, UserCreate, UserUpdate
+from app.services.cache_service import CacheService
+
+logger = logging.getLogger(__name__)
 
 
 class UserService:
     """Service for user operations"""
 
+    # Members per bulk_write in bulk role sync
+    BULK_SYNC_CHUNK_SIZE = 1000
+
+    # Read-through cache of user documents by Discord ID; every writer to the
+    # users collection calls AuthCacheService.invalidate
+    CACHE_TTL_SECONDS = 60
+
     @staticmethod
     async def get_by_discord_id(discord_id: str) -> Optional[dict]:
-        """Get user by Discord ID"""
-        users = get_users_collection()
-        return await users.find_one({"discord_id": discord_id})
+        """Get user by Discord ID (cached)"""
+        async def load():
+            users = get_users_collection()
+            return await users.find_one({"discord_id": discord_id})
+
+        return await CacheService.get_or_load(
+            CacheService.PREFIX_USER,
+            discord_id,
+            load,
+            ttl=UserService.CACHE_TTL_SECONDS
+        )
 
     @staticmethod
     async def get_by_id(user_id: str) -> Optional[dict]:
@@ -79,6 +100,7 @@ class UserService:
         )
 
         if result:
+            await UserService._invalidate_auth_cache(result.get("discord_id"))
             await UserService.log_action(
                 user_id,
                 "user.updated",
@@ -123,6 +145,7 @@ class UserService:
             {"discord_id": discord_id},
             update_data
         )
+        await UserService._invalidate_auth_cache(discord_id)
 
     @staticmethod
     async def suspend_user(user_id: str, reason: str, admin_id: str):
@@ -143,6 +166,9 @@ class UserService:
             return_document=True
         )
 
+        if result:
+            await UserService._invalidate_auth_cache(result.get("discord_id"))
+
         await UserService.log_action(
             user_id,
             "user.suspended",
@@ -170,6 +196,9 @@ class UserService:
             return_document=True
         )
 
+        if result:
+            await UserService._invalidate_auth_cache(result.get("discord_id"))
+
         await UserService.log_action(
             user_id,
             "user.banned",
@@ -178,6 +207,14 @@ class UserService:
 
         return result
 
+    @staticmethod
+    async def _invalidate_auth_cache(discord_id: Optional[str]):
+        """Drop cached auth identity after a role, status or profile change"""
+        if not discord_id:
+            return
+        from app.services.auth_cache_service import AuthCacheService
+        await AuthCacheService.invalidate(discord_id)
+
     @staticmethod
     async def log_action(user_id: str, action: str, details: dict):
         """Log user action to audit trail"""
@@ -259,8 +296,73 @@ class UserService:
             return_document=True
         )
 
+        await UserService._invalidate_auth_cache(discord_id)
+
         return result
 
+    @staticmethod
+    async def bulk_sync_discord_roles(members: List[dict]) -> dict:
+        """
+        Sync roles and profile fields for many guild members at once.
+
+        Members are upserted with one bulk_write per chunk, so users who have
+        never interacted with the bot are created with the same defaults as
+        create_from_discord.
+
+        Args:
+            members: Dicts with discord_id, role_ids, role_names, username,
+                     discriminator and global_name
+
+        Returns:
+            Dict with received, matched, modified and created counts
+        """
+        users = get_users_collection()
+        totals = {"received": len(members), "matched": 0, "modified": 0, "created": 0}
+
+        for i in range(0, len(members), UserService.BULK_SYNC_CHUNK_SIZE):
+            chunk = members[i:i + UserService.BULK_SYNC_CHUNK_SIZE]
+            now = datetime.utcnow()
+            ops = []
+            for member in chunk:
+                role_ids = [int(r) for r in member.get("role_ids", [])]
+                ops.append(UpdateOne(
+                    {"discord_id": member["discord_id"]},
+                    {
+                        "$set": {
+                            "username": member.get("username"),
+                            "discriminator": member.get("discriminator"),
+                            "global_name": member.get("global_name"),
+                            "discord_roles": role_ids,
+                            "discord_role_ids": [str(r) for r in role_ids],
+                            "roles": member.get("role_names") or ["user"],
+                            "updated_at": now
+                        },
+                        "$setOnInsert": {
+                            "discord_id": member["discord_id"],
+                            "avatar_hash": None,
+                            "status": "active",
+                            "kyc_level": 0,
+                            "reputation_score": 100,
+                            "created_at": now
+                        }
+                    },
+                    upsert=True
+                ))
+
+            result = await users.bulk_write(ops, ordered=False)
+            totals["matched"] += result.matched_count
+            totals["modified"] += result.modified_count
+            totals["created"] += result.upserted_count
+
+            from app.services.auth_cache_service import AuthCacheService
+            await AuthCacheService.invalidate_many([m["discord_id"] for m in chunk])
+
+        logger.info(
+            f"Bulk role sync: {totals['received']} members, {totals['modified']} updated, "
+            f"{totals['created']} created"
+        )
+        return totals
+
     @staticmethod
     async def update_discord_info(
         discord_id: str,
@@ -290,91 +392,70 @@ class UserService:
             {"$set": update_data}
         )
 
+        await UserService._invalidate_auth_cache(discord_id)
+
     # ====================
     # Permission Checks
     # ====================
 
     @staticmethod
-    async def is_admin(discord_id: str) -> bool:
-        """Check if user has admin role"""
-        from app.core.config import settings
+    def role_set_hash(role_ids: List[int]) -> str:
+        """Stable hash of a Discord role set (order and duplicates ignored)"""
+        canonical = ",".join(sorted({str(r) for r in role_ids or []}))
+        return hashlib.sha1(canonical.encode()).hexdigest()
 
-        user = await UserService.get_by_discord_id(discord_id)
-        if not user:
-            return False
+    @staticmethod
+    def compute_role_flags(discord_roles: List[int]) -> Dict[str, bool]:
+        """
+        Compute permission flags from Discord role IDs without touching the database
+
+        Args:
+            discord_roles: User's Discord role IDs
+
+        Returns:
+            Dict with is_admin, is_staff and is_exchanger
+        """
+        from app.core.config import settings
 
-        discord_roles = user.get("discord_roles", [])
+        roles = set(discord_roles or [])
 
-        # Check if user has head admin role
-        admin_role_id = settings.ROLE_HEAD_ADMIN
-        if admin_role_id and admin_role_id in discord_roles:
-            return True
+        def has(role_id) -> bool:
+            return bool(role_id) and role_id in roles
 
-        return False
+        return {
+            # Head Admin or Assistant Admin
+            "is_admin": has(settings.ROLE_HEAD_ADMIN) or has(settings.ROLE_ASSISTANT_ADMIN),
+            # Staff or Head Admin
+            "is_staff": has(settings.ROLE_STAFF) or has(settings.ROLE_HEAD_ADMIN),
+            "is_exchanger": has(settings.ROLE_EXCHANGER)
+        }
 
     @staticmethod
     async def is_admin(discord_id: str) -> bool:
         """Check if user is admin (Head Admin or Assistant Admin)"""
-        from app.core.config import settings
-
         user = await UserService.get_by_discord_id(discord_id)
         if not user:
             return False
 
-        discord_roles = user.get("discord_roles", [])
-
-        # Check for Head Admin or Assistant Admin role
-        head_admin_role_id = settings.ROLE_HEAD_ADMIN
-        assistant_admin_role_id = settings.ROLE_ASSISTANT_ADMIN
-
-        if head_admin_role_id and head_admin_role_id in discord_roles:
-            return True
-
-        if assistant_admin_role_id and assistant_admin_role_id in discord_roles:
-            return True
-
-        return False
+        return UserService.compute_role_flags(user.get("discord_roles", []))["is_admin"]
 
     @staticmethod
     async def is_staff(discord_id: str) -> bool:
         """Check if user is staff (staff or admin)"""
-        from app.core.config import settings
-
         user = await UserService.get_by_discord_id(discord_id)
         if not user:
             return False
 
-        discord_roles = user.get("discord_roles", [])
-
-        # Check for staff or admin role
-        staff_role_id = settings.ROLE_STAFF
-        admin_role_id = settings.ROLE_HEAD_ADMIN
-
-        if staff_role_id and staff_role_id in discord_roles:
-            return True
-
-        if admin_role_id and admin_role_id in discord_roles:
-            return True
-
-        return False
+        return UserService.compute_role_flags(user.get("discord_roles", []))["is_staff"]
 
     @staticmethod
     async def is_exchanger(discord_id: str) -> bool:
         """Check if user is exchanger"""
-        from app.core.config import settings
-
         user = await UserService.get_by_discord_id(discord_id)
         if not user:
             return False
 
-        discord_roles = user.get("discord_roles", [])
-
-        # Check for exchanger role
-        exchanger_role_id = settings.ROLE_EXCHANGER
-        if exchanger_role_id and exchanger_role_id in discord_roles:
-            return True
-
-        return False
+        return UserService.compute_role_flags(user.get("discord_roles", []))["is_exchanger"]
 
     @staticmethod
     async def can_access_resource(
@@ -17,6 +17,7 @@ from app.models.wallet import (
     Wallet, Balance, Transaction, ProfitHold, ProfitBatch,
     is_valid_currency, SUPPORTED_CURRENCIES
 )
+from app.services.cache_service import CacheService
 from app.services.tatum_service import TatumService
 from app.services.crypto import get_crypto_handler
 
@@ -26,6 +27,10 @@ logger = logging.getLogger(__name__)
 class WalletService:
     """Complete wallet service with all operations"""
 
+    # Portfolio read-through cache (USD values follow prices, so keep it short)
+    PORTFOLIO_CACHE_TTL = 30
+    PORTFOLIO_STALE_TTL = 60
+
     def __init__(self):
         self.encryption = get_encryption_service()
         self.tatum = TatumService()
@@ -122,6 +127,7 @@ class WalletService:
             )
 
             await db.balances.insert_one(balance.dict(by_alias=True, exclude={"id"}))
+            await self._invalidate_portfolio(user_id)
 
             # Subscribe to Tatum webhooks for deposits
             webhook_url = f"{settings.TATUM_WEBHOOK_BASE_URL}/api/v1/webhooks/tatum"
@@ -285,6 +291,7 @@ class WalletService:
                 },
                 upsert=True
             )
+            await self._invalidate_portfolio(user_id)
 
             logger.info(f"Synced {currency} balance for {user_id}: {old_balance} -> {blockchain_balance}")
 
@@ -393,6 +400,8 @@ class WalletService:
                     "last_synced": datetime.utcnow()
                 })
 
+            await self._invalidate_portfolio(user_id)
+
             logger.info(f"Deposit confirmed: {amount} {currency} for user {user_id}, tx {tx_hash}")
 
             # Track wallet deposit stats
@@ -652,6 +661,7 @@ class WalletService:
                     }
                 }
             )
+            await self._invalidate_portfolio(user_id)
 
             # Create transaction record
             tx_id = f"WTH-{uuid.uuid4().hex[:12].upper()}"
@@ -705,6 +715,7 @@ class WalletService:
                                 }
                             }
                         )
+                        await self._invalidate_portfolio(user_id)
 
                     # Update transaction status
                     await db.transactions.update_one(
@@ -743,6 +754,7 @@ class WalletService:
                             "$set": {"locked": str(unlock_locked - total_deducted)}
                         }
                     )
+                    await self._invalidate_portfolio(user_id)
 
                 # Process server profit
                 await self.process_server_profit(str(transaction.id), server_fee, currency)
@@ -1022,7 +1034,8 @@ class WalletService:
 
     async def get_portfolio(self, user_id: str) -> List[Dict]:
         """
-        Get all balances for user (portfolio view with USD values)
+        Get all balances for user (portfolio view with USD values), cached briefly.
+        Balance writes in this service invalidate the entry.
 
         Args:
             user_id: Discord user ID
@@ -1030,6 +1043,20 @@ class WalletService:
         Returns:
             List of balances for all currencies with USD values
         """
+        return await CacheService.get_or_load(
+            CacheService.PREFIX_PORTFOLIO,
+            user_id,
+            lambda: self._load_portfolio(user_id),
+            ttl=self.PORTFOLIO_CACHE_TTL,
+            stale_ttl=self.PORTFOLIO_STALE_TTL
+        )
+
+    async def _invalidate_portfolio(self, user_id: str):
+        """Drop the cached portfolio after a balance change"""
+        await CacheService.invalidate(CacheService.PREFIX_PORTFOLIO, user_id)
+
+    async def _load_portfolio(self, user_id: str) -> List[Dict]:
+        """Build the portfolio from balances, wallets and current prices"""
         try:
             from app.services.price_service import price_service
 
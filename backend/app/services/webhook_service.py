@@ -1,21 +1,118 @@
 """
 Webhook Service - Tatum blockchain event handling
 Processes incoming blockchain transactions and credits deposits
+
+The webhook route only verifies the signature and appends the raw event to a
+Redis stream, so Tatum callbacks return immediately however large the burst.
+A pool of WebhookIngestor workers in every API process reads the stream
+through a consumer group and processes events in batches (see
+WebhookService.process_events); an event is acked only after its batch is
+recorded and credited. If a batch fails its events are retried one at a
+time, so one bad event can't hold back the rest; events that still fail are
+redelivered after CLAIM_IDLE_MS and dead-lettered after MAX_DELIVERIES.
+Events with a malformed amount or confirmation count are dead-lettered
+straight away.
 """
 
-from typing import Optional, Dict
+from typing import List, Optional, Dict, Set, Tuple
 from datetime import datetime
+from decimal import Decimal
 from bson import ObjectId
+import asyncio
+import json
 import logging
 import hmac
 import hashlib
+import math
+import os
+import socket
+import time
+
+from pymongo.errors import BulkWriteError
+from redis.exceptions import ResponseError
 
 from app.core.database import get_db_collection
+from app.core.redis import RedisKeys, get_redis
 from app.services.exchanger_deposit_service import ExchangerDepositService
+from app.services.price_service import PriceRateLimited, PriceService, crypto_prices
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+DUPLICATE_KEY_ERROR = 11000
+
+
+class DepositAddressIndex:
+    """In-memory (address, asset) -> exchanger user_id map of deposit addresses"""
+
+    REFRESH_SECONDS = 60
+    MISS_TTL_SECONDS = 60  # Unknown addresses aren't looked up again for this long
+
+    def __init__(self):
+        self._owners: Dict[Tuple[str, str], str] = {}
+        self._misses: Dict[Tuple[str, str], float] = {}
+        self._loaded_at = 0.0
+        self._reload: Optional[asyncio.Task] = None
+
+    async def resolve(self, address: Optional[str], asset: str) -> Optional[str]:
+        """
+        Find the exchanger who owns a deposit address
+
+        Args:
+            address: Receiving address
+            asset: Asset code
+
+        Returns:
+            Exchanger user ID or None if it isn't a platform deposit address
+        """
+        if not address:
+            return None
+
+        if not self._loaded_at:
+            await asyncio.shield(self._start_reload())
+        elif time.monotonic() - self._loaded_at > self.REFRESH_SECONDS:
+            self._start_reload()
+
+        key = (address, asset)
+        owner = self._owners.get(key)
+        if owner or self._misses.get(key, 0) > time.monotonic():
+            return owner
+
+        # Deposit created since the last reload (indexed lookup)
+        deposits_db = await get_db_collection("exchanger_deposits")
+        deposit = await deposits_db.find_one({"address": address, "asset": asset}, {"user_id": 1})
+        if deposit:
+            self._owners[key] = str(deposit["user_id"])
+            return self._owners[key]
+
+        self._misses[key] = time.monotonic() + self.MISS_TTL_SECONDS
+        return None
+
+    def _start_reload(self) -> asyncio.Task:
+        if self._reload is None or self._reload.done():
+            self._reload = asyncio.create_task(self._load())
+        return self._reload
+
+    async def _load(self):
+        try:
+            deposits_db = await get_db_collection("exchanger_deposits")
+            owners: Dict[Tuple[str, str], str] = {}
+            cursor = deposits_db.find({}, {"address": 1, "asset": 1, "user_id": 1}).sort("_id", 1)
+            async for deposit in cursor:
+                if deposit.get("address") and deposit.get("asset"):
+                    # Platform wallets are shared, keep the first (oldest) owner like find_one did
+                    owners.setdefault((deposit["address"], deposit["asset"]), str(deposit["user_id"]))
+            self._owners = owners
+            self._misses.clear()
+            self._loaded_at = time.monotonic()
+        except Exception as e:
+            logger.warning(f"Deposit address index reload failed: {e}")
+            # Keep serving the previous index; retry after REFRESH_SECONDS
+            self._loaded_at = self._loaded_at or time.monotonic()
+
+
+address_index = DepositAddressIndex()
+
 
 class WebhookService:
     """Service for processing Tatum webhooks"""
@@ -36,6 +133,17 @@ class WebhookService:
         "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48": "USDC-ETH",  # USDC on Ethereum
     }
 
+    # Ingestion stream
+    STREAM_GROUP = "webhook-ingest"
+    STREAM_MAXLEN = 100000  # Approximate cap on retained events (acked or not)
+    DEAD_LETTER_MAXLEN = 10000
+
+    # Re-valuing historical deposits (CoinGecko history endpoint, public rate limits)
+    BACKFILL_BATCH_SIZE = 100
+    BACKFILL_REQUEST_INTERVAL_SECONDS = 2.5
+    BACKFILL_RATE_LIMIT_BACKOFF_SECONDS = 60
+    BACKFILL_MAX_RATE_LIMIT_RETRIES = 5
+
     @staticmethod
     def verify_signature(payload: bytes, signature: str) -> bool:
         """Verify webhook signature from Tatum"""
@@ -51,98 +159,222 @@ class WebhookService:
 
         return hmac.compare_digest(expected, signature)
 
+    @staticmethod
+    async def enqueue(body: bytes) -> str:
+        """
+        Append a raw webhook to the durable ingestion stream
+
+        Args:
+            body: Raw request body (signature already verified)
+
+        Returns:
+            Stream event ID
+        """
+        return await get_redis().xadd(
+            RedisKeys.TATUM_WEBHOOK_EVENTS,
+            {"body": body.decode(), "received_at": datetime.utcnow().isoformat()},
+            maxlen=WebhookService.STREAM_MAXLEN,
+            approximate=True
+        )
+
     @staticmethod
     async def process_incoming_transaction(webhook_data: dict) -> dict:
         """
-        Process incoming blockchain transaction.
+        Process one incoming blockchain transaction right away (test endpoint).
         Credits exchanger deposit if it's to a platform wallet.
         """
-        try:
-            # Extract transaction data
+        return (await WebhookService.process_events([webhook_data]))[0]
+
+    @staticmethod
+    async def process_events(events: List[dict]) -> List[dict]:
+        """
+        Process a batch of Tatum webhooks.
+
+        Each transaction is recorded insert-first in blockchain_transactions
+        (unique on tx_hash), so retries and duplicate deliveries stop at the
+        insert. Credits are then applied per exchanger deposit in one update
+        each, guarded so a transaction is never credited twice even when a
+        crashed batch is redelivered.
+
+        Args:
+            events: Parsed webhook payloads
+
+        Returns:
+            One result dict per event, in order ("invalid" for payloads whose
+            amount or confirmations aren't numbers)
+        """
+        results: List[Optional[dict]] = [None] * len(events)
+        rows: Dict[str, dict] = {}
+        row_events: Dict[str, int] = {}
+
+        for i, webhook_data in enumerate(events):
             blockchain = webhook_data.get("chain")
             tx_hash = webhook_data.get("txId")
             to_address = webhook_data.get("to")
-            amount = float(webhook_data.get("amount", 0))
-            confirmations = webhook_data.get("confirmations", 0)
             token_address = webhook_data.get("tokenAddress")
 
             # Determine asset
-            asset = await WebhookService._determine_asset(
-                blockchain, token_address
-            )
-
+            asset = WebhookService._determine_asset(blockchain, token_address)
             if not asset:
                 logger.warning(f"Unknown asset: blockchain={blockchain} token={token_address}")
-                return {"status": "ignored", "reason": "unknown_asset"}
+                results[i] = {"status": "ignored", "reason": "unknown_asset"}
+                continue
 
-            # Check if this is to a platform wallet
-            user_id = await WebhookService._find_deposit_owner(to_address, asset)
+            if not tx_hash:
+                results[i] = {"status": "ignored", "reason": "missing_tx_hash"}
+                continue
 
+            try:
+                amount, confirmations = WebhookService._parse_numbers(webhook_data)
+            except ValueError as e:
+                logger.warning(f"Invalid webhook for {tx_hash}: {e}")
+                results[i] = {"status": "invalid", "reason": str(e)}
+                continue
+
+            # Check if this is to a platform wallet
+            user_id = await address_index.resolve(to_address, asset)
             if not user_id:
                 logger.info(f"Transaction not to platform wallet: {tx_hash}")
-                return {"status": "ignored", "reason": "not_platform_wallet"}
+                results[i] = {"status": "ignored", "reason": "not_platform_wallet"}
+                continue
 
             # Check confirmations
             min_confirmations = WebhookService._get_min_confirmations(asset)
             if confirmations < min_confirmations:
-                logger.info(
-                    f"Insufficient confirmations: {confirmations}/{min_confirmations}"
-                )
-                return {
-                    "status": "pending",
-                    "confirmations": confirmations,
-                    "required": min_confirmations
-                }
+                logger.info(f"Insufficient confirmations for {tx_hash}: {confirmations}/{min_confirmations}")
+                results[i] = {"status": "pending", "confirmations": confirmations, "required": min_confirmations}
+                continue
 
-            # Check if already processed
-            if await WebhookService._is_transaction_processed(tx_hash):
-                logger.info(f"Transaction already processed: {tx_hash}")
-                return {"status": "duplicate"}
+            if tx_hash in rows:
+                results[i] = {"status": "duplicate"}
+                continue
 
-            # Get USD value
-            amount_usd = await WebhookService._get_usd_value(asset, amount)
+            # Get USD value (None if no price snapshot is available yet)
+            amount_usd, price_usd, price_at = await WebhookService._get_usd_value(asset, amount)
 
-            # Credit deposit
-            result = await ExchangerDepositService.credit_deposit(
-                user_id=user_id,
-                asset=asset,
-                amount_units=amount,
-                amount_usd=amount_usd,
-                tx_hash=tx_hash
-            )
-
-            # Record transaction
-            await WebhookService._record_transaction(
+            rows[tx_hash] = WebhookService._build_transaction(
                 user_id=user_id,
                 asset=asset,
                 amount_units=amount,
                 amount_usd=amount_usd,
+                price_usd=price_usd,
+                price_at=price_at,
                 tx_hash=tx_hash,
                 from_address=webhook_data.get("from"),
                 to_address=to_address,
                 confirmations=confirmations
             )
+            row_events[tx_hash] = i
+
+        if rows:
+            duplicates = await WebhookService._insert_new(list(rows.values()))
+
+            # Duplicates still "received" were recorded by a worker that died (or is
+            # still running) before crediting; crediting them again is a no-op if it did
+            to_credit = [row for tx_hash, row in rows.items() if tx_hash not in duplicates]
+            if duplicates:
+                txs_db = await get_db_collection("blockchain_transactions")
+                to_credit += await txs_db.find(
+                    {"tx_hash": {"$in": list(duplicates)}, "status": "received"}
+                ).to_list(length=None)
+
+            credited = await WebhookService._apply_credits(to_credit)
+
+            for tx_hash, i in row_events.items():
+                row = rows[tx_hash]
+                if tx_hash in credited:
+                    results[i] = {
+                        "status": "credited",
+                        "user_id": str(row["user_id"]),
+                        "asset": row["asset"],
+                        "amount_units": row["amount_units"],
+                        "amount_usd": row["amount_usd"],
+                        "tx_hash": tx_hash
+                    }
+                else:
+                    logger.info(f"Transaction already processed: {tx_hash}")
+                    results[i] = {"status": "duplicate"}
+
+        return results
 
-            logger.info(
-                f"Deposit credited: user={user_id} asset={asset} "
-                f"amount={amount} tx={tx_hash}"
-            )
+    @staticmethod
+    async def _insert_new(rows: List[dict]) -> Set[str]:
+        """Insert transaction rows, returning the tx hashes that already existed"""
+        txs_db = await get_db_collection("blockchain_transactions")
+        try:
+            await txs_db.insert_many(rows, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != DUPLICATE_KEY_ERROR for error in errors):
+                raise
+            return {error["op"]["tx_hash"] for error in errors}
+        return set()
 
-            return {
-                "status": "credited",
-                "user_id": user_id,
-                "asset": asset,
-                "amount_units": amount,
-                "amount_usd": amount_usd,
-                "tx_hash": tx_hash
-            }
+    @staticmethod
+    async def _apply_credits(rows: List[dict]) -> Set[str]:
+        """
+        Credit recorded transactions, one deposit update per (exchanger, asset)
 
-        except Exception as e:
-            logger.error(f"Error processing webhook: {e}", exc_info=True)
-            raise
+        Returns:
+            tx hashes credited by this call
+        """
+        if not rows:
+            return set()
+
+        groups: Dict[Tuple[str, str], List[dict]] = {}
+        for row in rows:
+            groups.setdefault((str(row["user_id"]), row["asset"]), []).append(row)
+
+        credited_lists = await asyncio.gather(*(
+            ExchangerDepositService.credit_deposits(user_id, asset, group)
+            for (user_id, asset), group in groups.items()
+        ))
+        credited = {tx_hash for credited_list in credited_lists for tx_hash in credited_list}
+
+        txs_db = await get_db_collection("blockchain_transactions")
+        await txs_db.update_many(
+            {"_id": {"$in": [row["_id"] for row in rows]}, "status": "received"},
+            {"$set": {"status": "confirmed", "confirmed_at": datetime.utcnow()}}
+        )
+
+        unpriced = [row["_id"] for row in rows if row["tx_hash"] in credited and row.get("amount_usd") is None]
+        if unpriced:
+            # Credited as $0; backfill_usd_values adds their USD value once it is known
+            await txs_db.update_many({"_id": {"$in": unpriced}}, {"$set": {"usd_backfill_pending": True}})
+
+        if credited:
+            logger.info(f"Deposits credited: {len(credited)} transactions across {len(groups)} deposits")
+        return credited
 
     @staticmethod
-    async def _determine_asset(
+    def _parse_numbers(webhook_data: dict) -> Tuple[float, int]:
+        """
+        Amount and confirmation count of a webhook
+
+        Raises:
+            ValueError: Amount missing, not a positive number, or confirmations not a number
+        """
+        raw_amount = webhook_data.get("amount")
+        try:
+            amount = float(raw_amount)
+        except (TypeError, ValueError):
+            raise ValueError(f"amount {raw_amount!r} is not a number")
+        if not math.isfinite(amount) or amount <= 0:
+            raise ValueError(f"amount {raw_amount!r} is not positive")
+
+        raw_confirmations = webhook_data.get("confirmations")
+        if raw_confirmations is None:
+            return amount, 0
+        try:
+            confirmations = float(raw_confirmations)
+        except (TypeError, ValueError):
+            raise ValueError(f"confirmations {raw_confirmations!r} is not a number")
+        if not math.isfinite(confirmations):
+            raise ValueError(f"confirmations {raw_confirmations!r} is not a number")
+        return amount, int(confirmations)
+
+    @staticmethod
+    def _determine_asset(
         blockchain: str,
         token_address: Optional[str]
     ) -> Optional[str]:
@@ -158,18 +390,6 @@ class WebhookService:
         blockchain_lower = blockchain.lower() if blockchain else ""
         return WebhookService.ASSET_MAPPING.get(blockchain_lower)
 
-    @staticmethod
-    async def _find_deposit_owner(address: str, asset: str) -> Optional[str]:
-        """Find exchanger who owns this deposit address"""
-        deposits_db = await get_db_collection("exchanger_deposits")
-
-        deposit = await deposits_db.find_one({
-            "address": address,
-            "asset": asset
-        })
-
-        return str(deposit["user_id"]) if deposit else None
-
     @staticmethod
     def _get_min_confirmations(asset: str) -> int:
         """Get minimum confirmations required for asset"""
@@ -186,61 +406,366 @@ class WebhookService:
         return confirmations_map.get(asset, 1)
 
     @staticmethod
-    async def _is_transaction_processed(tx_hash: str) -> bool:
-        """Check if transaction already processed"""
-        txs_db = await get_db_collection("blockchain_transactions")
-
-        tx = await txs_db.find_one({"tx_hash": tx_hash})
-        return tx is not None
+    async def _get_usd_value(
+        asset: str,
+        amount: float
+    ) -> Tuple[Optional[float], Optional[float], Optional[datetime]]:
+        """
+        Get USD value of amount from the in-memory price snapshot
+        (never calls the price provider, see app.services.price_service)
 
-    @staticmethod
-    async def _get_usd_value(asset: str, amount: float) -> float:
-        """Get USD value of amount"""
-        # TODO: Integrate with price API
-        # For now use fallback rates from config
-        rates = {
-            "BTC": 100000.0,
-            "ETH": 3500.0,
-            "LTC": 120.0,
-            "SOL": 218.0,
-            "USDT-SOL": 1.0,
-            "USDC-SOL": 1.0,
-            "USDT-ETH": 1.0,
-            "USDC-ETH": 1.0
-        }
+        Returns:
+            (amount_usd, price_usd, snapshot time), all None if the asset has no price
+        """
+        snapshot = await crypto_prices.get()
+        price = snapshot.values.get(asset) if snapshot else None
+        if price is None:
+            logger.warning(f"No price for {asset}, recording deposit without USD value")
+            return None, None, None
 
-        base_asset = asset.split("-")[0] if "-" in asset else asset
-        rate = rates.get(base_asset, 1.0)
+        if snapshot.stale:
+            logger.warning(f"Valuing {asset} deposit with a {snapshot.age_seconds:.0f}s old price snapshot")
 
-        return amount * rate
+        amount_usd = float(Decimal(str(amount)) * price)
+        return amount_usd, float(price), datetime.utcfromtimestamp(snapshot.updated_at)
 
     @staticmethod
-    async def _record_transaction(
+    def _build_transaction(
         user_id: str,
         asset: str,
         amount_units: float,
-        amount_usd: float,
+        amount_usd: Optional[float],
+        price_usd: Optional[float],
+        price_at: Optional[datetime],
         tx_hash: str,
         from_address: str,
         to_address: str,
         confirmations: int
-    ):
-        """Record transaction in database"""
-        txs_db = await get_db_collection("blockchain_transactions")
-
-        tx_dict = {
+    ) -> dict:
+        """New blockchain_transactions row, credited later (price_at is the price snapshot time)"""
+        return {
             "user_id": ObjectId(user_id),
             "type": "deposit",
             "asset": asset,
             "amount_units": amount_units,
             "amount_usd": amount_usd,
+            "price_usd": price_usd,
+            "price_at": price_at,
+            "price_source": "snapshot" if price_at else None,
             "tx_hash": tx_hash,
             "from_address": from_address,
             "to_address": to_address,
             "confirmations": confirmations,
-            "status": "confirmed",
+            "status": "received",
             "created_at": datetime.utcnow(),
-            "confirmed_at": datetime.utcnow()
+            "confirmed_at": None
         }
 
-        await txs_db.insert_one(tx_dict)
+    @staticmethod
+    async def backfill_usd_values(dry_run: bool = False, limit: Optional[int] = None) -> Dict:
+        """
+        Re-value deposits recorded without a price snapshot (the old hard-coded
+        rates, or no price at ingestion) at CoinGecko's price for the day they
+        were recorded. Deposits that were credited without a price counted as
+        $0 towards the exchanger's balance_usd, so their re-valued USD is added
+        to the deposit, once per transaction (guarded by usd_backfilled). Safe
+        to re-run: finished rows drop out of the query.
+
+        Args:
+            dry_run: Only count the rows that would be re-valued
+            limit: Stop after this many rows
+
+        Returns:
+            Dict with pending, revalued, deposits_credited, skipped and unpriced counts
+        """
+        txs_db = await get_db_collection("blockchain_transactions")
+        query = {"type": "deposit", "$or": [{"price_at": None}, {"usd_backfill_pending": True}]}
+
+        pending = await txs_db.count_documents(query)
+        result = {"pending": pending, "revalued": 0, "deposits_credited": 0, "skipped": 0, "unpriced": []}
+        if dry_run or not pending:
+            return result
+
+        prices: Dict[Tuple[str, str], Optional[Decimal]] = {}
+        last_id = None
+        processed = 0
+        while limit is None or processed < limit:
+            batch_query = dict(query)
+            if last_id is not None:
+                batch_query["_id"] = {"$gt": last_id}
+            batch = await txs_db.find(
+                batch_query,
+                {
+                    "user_id": 1, "asset": 1, "amount_units": 1, "amount_usd": 1, "status": 1, "created_at": 1,
+                    "price_at": 1, "usd_backfill_pending": 1, "usd_backfilled": 1
+                }
+            ).sort("_id", 1).limit(WebhookService.BACKFILL_BATCH_SIZE).to_list(length=WebhookService.BACKFILL_BATCH_SIZE)
+            if not batch:
+                break
+
+            for tx in batch:
+                last_id = tx["_id"]
+                if limit is not None and processed >= limit:
+                    break
+                processed += 1
+
+                # Credited at $0: flagged at credit time, or confirmed before the flag existed
+                credited_without_usd = not tx.get("usd_backfilled") and (
+                    tx.get("usd_backfill_pending") or (tx.get("amount_usd") is None and tx.get("status") == "confirmed")
+                )
+                amount_usd = tx.get("amount_usd")
+
+                if tx.get("price_at") is None:
+                    day = (tx.get("created_at") or datetime.utcnow()).replace(hour=0, minute=0, second=0, microsecond=0)
+                    price_key = (tx["asset"], day.date().isoformat())
+                    if price_key not in prices:
+                        prices[price_key] = await WebhookService._historical_price(tx["asset"], day)
+                    price = prices[price_key]
+
+                    if price is None:
+                        result["skipped"] += 1
+                        if price_key not in result["unpriced"]:
+                            result["unpriced"].append(price_key)
+                        continue
+
+                    amount_usd = float(Decimal(str(tx["amount_units"])) * price)
+                    revalued = {
+                        "amount_usd": amount_usd,
+                        "price_usd": float(price),
+                        "price_at": day,
+                        "price_source": "coingecko_history",
+                        "revalued_at": datetime.utcnow()
+                    }
+                    if credited_without_usd:
+                        # Kept in the query until the deposit has been credited
+                        revalued["usd_backfill_pending"] = True
+                    await txs_db.update_one({"_id": tx["_id"], "price_at": None}, {"$set": revalued})
+                    result["revalued"] += 1
+
+                if credited_without_usd and amount_usd is not None:
+                    if await WebhookService._credit_backfilled_usd(tx, amount_usd):
+                        result["deposits_credited"] += 1
+
+        logger.info(
+            f"Deposit USD backfill: {result['revalued']} re-valued, {result['deposits_credited']} deposit "
+            f"balances credited, {result['skipped']} without a price"
+        )
+        return result
+
+    @staticmethod
+    async def _credit_backfilled_usd(tx: dict, amount_usd: float) -> bool:
+        """Add a re-valued transaction's USD to its deposit, at most once per transaction"""
+        txs_db = await get_db_collection("blockchain_transactions")
+        claimed = await txs_db.update_one(
+            {"_id": tx["_id"], "usd_backfilled": {"$ne": True}},
+            {"$set": {"usd_backfilled": True, "usd_backfill_pending": False}}
+        )
+        if not claimed.modified_count:
+            return False
+
+        if not await ExchangerDepositService.add_usd_value(str(tx["user_id"]), tx["asset"], amount_usd):
+            logger.error(f"No {tx['asset']} deposit of {tx['user_id']} to add ${amount_usd:.2f} for transaction {tx['_id']}")
+            return False
+        return True
+
+    @staticmethod
+    async def _historical_price(asset: str, day: datetime) -> Optional[Decimal]:
+        """Daily price for the backfill, paced and retried around CoinGecko rate limits"""
+        for attempt in range(WebhookService.BACKFILL_MAX_RATE_LIMIT_RETRIES):
+            await asyncio.sleep(WebhookService.BACKFILL_REQUEST_INTERVAL_SECONDS)
+            try:
+                return await PriceService.get_historical_price_usd(asset, day)
+            except PriceRateLimited:
+                logger.warning(f"CoinGecko rate limited during backfill, waiting (attempt {attempt + 1})")
+                await asyncio.sleep(WebhookService.BACKFILL_RATE_LIMIT_BACKOFF_SECONDS)
+            except Exception as e:
+                logger.warning(f"Historical price lookup failed for {asset} on {day.date()}: {e}")
+                return None
+        return None
+
+
+class WebhookIngestor:
+    """Pool of workers draining the webhook stream in batches"""
+
+    WORKERS = 4
+    BATCH_SIZE = 100
+    BLOCK_MS = 5000
+    CLAIM_IDLE_MS = 60000  # Unacked events older than this are redelivered
+    MAX_DELIVERIES = 5  # Then moved to the dead-letter stream
+    ERROR_BACKOFF_SECONDS = 1.0
+
+    def __init__(self):
+        self.instance_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {"events": 0, "batches": 0, "credited": 0, "duplicates": 0, "failed_batches": 0, "failed_events": 0, "dead_lettered": 0}
+
+    async def _ensure_group(self, redis):
+        try:
+            await redis.xgroup_create(
+                RedisKeys.TATUM_WEBHOOK_EVENTS,
+                WebhookService.STREAM_GROUP,
+                id="0",
+                mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _dead_letter(self, redis, event_id: str, fields: Dict, reason: str):
+        await redis.xadd(
+            RedisKeys.TATUM_WEBHOOK_EVENTS_DEAD,
+            {**fields, "original_id": event_id, "reason": reason},
+            maxlen=WebhookService.DEAD_LETTER_MAXLEN,
+            approximate=True
+        )
+        await redis.xack(RedisKeys.TATUM_WEBHOOK_EVENTS, WebhookService.STREAM_GROUP, event_id)
+        self.stats["dead_lettered"] += 1
+        logger.error(f"Webhook event {event_id} moved to {RedisKeys.TATUM_WEBHOOK_EVENTS_DEAD}: {reason}")
+
+    async def _dead_letter_exhausted(self, redis):
+        """Dead-letter events that failed MAX_DELIVERIES times instead of retrying them forever"""
+        pending = await redis.xpending_range(
+            RedisKeys.TATUM_WEBHOOK_EVENTS,
+            WebhookService.STREAM_GROUP,
+            min="-",
+            max="+",
+            count=self.BATCH_SIZE,
+            idle=self.CLAIM_IDLE_MS
+        )
+        for entry in pending:
+            if entry["times_delivered"] < self.MAX_DELIVERIES:
+                continue
+            entries = await redis.xrange(RedisKeys.TATUM_WEBHOOK_EVENTS, entry["message_id"], entry["message_id"])
+            fields = entries[0][1] if entries else {}
+            await self._dead_letter(redis, entry["message_id"], fields, f"failed {entry['times_delivered']} deliveries")
+
+    async def _read(self, redis, consumer: str) -> List[Tuple[str, Dict]]:
+        # Events of a worker that died mid-batch come first
+        claimed = await redis.xautoclaim(
+            RedisKeys.TATUM_WEBHOOK_EVENTS,
+            WebhookService.STREAM_GROUP,
+            consumer,
+            min_idle_time=self.CLAIM_IDLE_MS,
+            start_id="0-0",
+            count=self.BATCH_SIZE
+        )
+        if claimed[1]:
+            logger.warning(f"Redelivering {len(claimed[1])} unacked webhook events to {consumer}")
+            return claimed[1]
+
+        result = await redis.xreadgroup(
+            WebhookService.STREAM_GROUP,
+            consumer,
+            {RedisKeys.TATUM_WEBHOOK_EVENTS: ">"},
+            count=self.BATCH_SIZE,
+            block=self.BLOCK_MS
+        )
+        return result[0][1] if result else []
+
+    async def _handle(self, redis, entries: List[Tuple[str, Dict]]):
+        event_ids, events = [], []
+        fields_by_id = dict(entries)
+        for event_id, fields in entries:
+            if not fields:
+                # Trimmed or deleted while pending
+                await redis.xack(RedisKeys.TATUM_WEBHOOK_EVENTS, WebhookService.STREAM_GROUP, event_id)
+                continue
+            try:
+                events.append(json.loads(fields["body"]))
+                event_ids.append(event_id)
+            except (KeyError, ValueError) as e:
+                await self._dead_letter(redis, event_id, fields, f"unparseable body: {e}")
+
+        if not events:
+            return
+
+        try:
+            results = list(zip(event_ids, await WebhookService.process_events(events)))
+        except Exception as e:
+            # Retry one at a time so the events that fail on their own don't hold back the rest
+            self.stats["failed_batches"] += 1
+            logger.warning(f"Webhook batch of {len(events)} failed, retrying its events one at a time: {e}")
+            results = []
+            for event_id, event in zip(event_ids, events):
+                try:
+                    results.append((event_id, (await WebhookService.process_events([event]))[0]))
+                except Exception as e:
+                    # Left pending, redelivered after CLAIM_IDLE_MS
+                    self.stats["failed_events"] += 1
+                    logger.error(f"Webhook event {event_id} failed, will be redelivered: {e}", exc_info=True)
+
+        processed = []
+        for event_id, result in results:
+            if result["status"] == "invalid":
+                await self._dead_letter(redis, event_id, fields_by_id[event_id], f"invalid payload: {result['reason']}")
+            else:
+                processed.append(event_id)
+        if processed:
+            await redis.xack(RedisKeys.TATUM_WEBHOOK_EVENTS, WebhookService.STREAM_GROUP, *processed)
+
+        self.stats["events"] += len(results)
+        self.stats["batches"] += 1
+        self.stats["credited"] += sum(1 for _, result in results if result["status"] == "credited")
+        self.stats["duplicates"] += sum(1 for _, result in results if result["status"] == "duplicate")
+
+    async def _work(self, consumer: str, sweeper: bool):
+        redis = get_redis()
+        while True:
+            try:
+                if sweeper:
+                    await self._dead_letter_exhausted(redis)
+                entries = await self._read(redis, consumer)
+                if entries:
+                    await self._handle(redis, entries)
+            except asyncio.CancelledError:
+                raise
+            except ResponseError as e:
+                if "NOGROUP" in str(e):
+                    # Stream was deleted, recreate the group
+                    await self._ensure_group(redis)
+                else:
+                    logger.error(f"Webhook worker {consumer} error: {e}")
+                    await asyncio.sleep(self.ERROR_BACKOFF_SECONDS)
+            except Exception as e:
+                logger.error(f"Webhook worker {consumer} error: {e}", exc_info=True)
+                await asyncio.sleep(self.ERROR_BACKOFF_SECONDS)
+
+    async def start(self):
+        """Create the consumer group and start the worker pool"""
+        if self._tasks:
+            return
+        await self._ensure_group(get_redis())
+        self._tasks = [
+            asyncio.create_task(self._work(f"{self.instance_id}-{n}", sweeper=n == 0))
+            for n in range(self.WORKERS)
+        ]
+        logger.info(f"✅ Webhook ingestion started ({self.WORKERS} workers)")
+
+    async def stop(self):
+        """Stop the workers; unacked events are redelivered to another worker"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def get_stats(self) -> Dict:
+        """Stream backlog, pending and dead-letter counts plus this process's counters"""
+        redis = get_redis()
+        pending = 0
+        try:
+            summary = await redis.xpending(RedisKeys.TATUM_WEBHOOK_EVENTS, WebhookService.STREAM_GROUP)
+            pending = summary.get("pending", 0)
+        except ResponseError:
+            pass
+
+        return {
+            "workers": len(self._tasks),
+            "stream_length": await redis.xlen(RedisKeys.TATUM_WEBHOOK_EVENTS),
+            "pending": pending,
+            "dead_letters": await redis.xlen(RedisKeys.TATUM_WEBHOOK_EVENTS_DEAD),
+            **self.stats
+        }
+
+
+# Process-wide worker pool, started in the app lifespan
+webhook_ingestor = WebhookIngestor()
@@ -10,10 +10,12 @@ from decimal import Decimal
 import logging
 
 from app.core.database import get_db_collection
+from app.core.status_refresh import StatusRefresher
 from app.core.validators import CryptoValidators
 from app.services.afroo_wallet_service import AfrooWalletService
 from app.services.crypto_handler_service import CryptoHandlerService
 from app.services.fee_collection_service import FeeCollectionService
+from app.services.price_service import PriceService
 
 logger = logging.getLogger(__name__)
 
@@ -209,8 +211,13 @@ class WithdrawalService:
                 # Transaction sent successfully
                 tx_hash = tx_hash_or_error
 
-                # Collect platform fee (network fee goes to blockchain)
-                platform_fee_usd = fee_info["platform_fee"] * await WithdrawalService._get_usd_price(asset)
+                # Collect platform fee (network fee goes to blockchain); None without a price
+                asset_usd_price = await PriceService.get_price_usd(asset)
+                if asset_usd_price is None:
+                    logger.warning(f"Withdrawal {withdrawal_id}: No price for {asset}, recording platform fee without USD value")
+                    platform_fee_usd = None
+                else:
+                    platform_fee_usd = fee_info["platform_fee"] * float(asset_usd_price)
                 await FeeCollectionService.collect_fee(
                     transaction_type="withdrawal",
                     transaction_id=withdrawal_id,
@@ -273,7 +280,8 @@ class WithdrawalService:
     async def update_withdrawal_status(withdrawal_id: str) -> bool:
         """
         Update withdrawal status by checking blockchain confirmation.
-        Called by webhook handler or periodic checker.
+        Called by webhook handler or on demand; the periodic checker goes
+        through withdrawal_refresher instead.
 
         Args:
             withdrawal_id: Withdrawal record ID
@@ -292,67 +300,76 @@ class WithdrawalService:
             if withdrawal["status"] not in ["processing"]:
                 return True  # Already completed or failed
 
-            tx_hash = withdrawal.get("tx_hash")
-            if not tx_hash:
-                logger.warning(f"Withdrawal {withdrawal_id} has no tx_hash")
+            update_dict = await WithdrawalService.check_withdrawal(withdrawal)
+            if update_dict is None:
                 return False
 
-            # Get transaction details from blockchain
-            tx_data = await CryptoHandlerService.get_transaction(
-                asset=withdrawal["asset"],
-                tx_hash=tx_hash
+            changed = update_dict.get("status", withdrawal["status"]) != withdrawal["status"]
+            update_dict["next_check_at"] = withdrawal_refresher.next_check_at(withdrawal, datetime.utcnow(), changed)
+
+            await withdrawals_db.update_one(
+                {"_id": withdrawal["_id"], "status": withdrawal["status"]},
+                {"$set": update_dict}
             )
 
-            if not tx_data:
-                logger.warning(f"Transaction {tx_hash} not found on blockchain yet")
-                return False
+            return True
 
-            # Check confirmations
-            confirmations = tx_data.get("confirmations", 0)
-            min_confirmations = {
-                "BTC": 2,
-                "LTC": 2,
-                "ETH": 12,
-                "SOL": 1
-            }.get(withdrawal["asset"], 1)
-
-            if confirmations >= min_confirmations:
-                # Update to completed
-                await withdrawals_db.update_one(
-                    {"_id": ObjectId(withdrawal_id)},
-                    {
-                        "$set": {
-                            "status": "completed",
-                            "confirmations": confirmations,
-                            "completed_at": datetime.utcnow()
-                        }
-                    }
-                )
+        except Exception as e:
+            logger.error(f"Failed to update withdrawal status: {e}", exc_info=True)
+            return False
 
-                logger.info(
-                    f"Withdrawal completed: {withdrawal_id} - "
-                    f"{confirmations} confirmations"
-                )
+    @staticmethod
+    async def check_withdrawal(withdrawal: Dict) -> Optional[Dict]:
+        """
+        Look up a withdrawal's transaction on chain
 
-                return True
+        Args:
+            withdrawal: Withdrawal record
 
-            else:
-                # Update confirmations count
-                await withdrawals_db.update_one(
-                    {"_id": ObjectId(withdrawal_id)},
-                    {
-                        "$set": {
-                            "confirmations": confirmations,
-                            "last_checked": datetime.utcnow()
-                        }
-                    }
-                )
+        Returns:
+            Fields to set on the withdrawal, or None if the lookup failed
+        """
+        withdrawal_id = str(withdrawal["_id"])
+        tx_hash = withdrawal.get("tx_hash")
+        if not tx_hash:
+            logger.warning(f"Withdrawal {withdrawal_id} has no tx_hash")
+            return None
 
-                return True
+        # Get transaction details from blockchain
+        tx_data = await CryptoHandlerService.get_transaction(
+            asset=withdrawal["asset"],
+            tx_hash=tx_hash
+        )
 
-        except Exception as e:
-            logger.error(f"Failed to update withdrawal status: {e}", exc_info=True)
-            return False
+        if not tx_data:
+            logger.warning(f"Transaction {tx_hash} not found on blockchain yet")
+            return None
+
+        # Check confirmations
+        confirmations = tx_data.get("confirmations", 0)
+        min_confirmations = {
+            "BTC": 2,
+            "LTC": 2,
+            "ETH": 12,
+            "SOL": 1
+        }.get(withdrawal["asset"], 1)
+
+        if confirmations >= min_confirmations:
+            logger.info(
+                f"Withdrawal completed: {withdrawal_id} - "
+                f"{confirmations} confirmations"
+            )
+            return {
+                "status": "completed",
+                "confirmations": confirmations,
+                "completed_at": datetime.utcnow()
+            }
+
+        # Update confirmations count
+        return {
+            "confirmations": confirmations,
+            "last_checked": datetime.utcnow()
+        }
 
     @staticmethod
     async def cancel_withdrawal(withdrawal_id: str, user_id: str) -> Tuple[bool, str]:
@@ -462,49 +479,25 @@ class WithdrawalService:
 
         return withdrawal
 
-    @staticmethod
-    async def _get_usd_price(asset: str) -> float:
-        """
-        Get USD price for asset.
-        TODO: Integrate with real price API.
-        """
-        rates = {
-            "BTC": 100000.0,
-            "ETH": 3500.0,
-            "LTC": 120.0,
-            "SOL": 218.0,
-            "USDT-SOL": 1.0,
-            "USDC-SOL": 1.0,
-            "USDT-ETH": 1.0,
-            "USDC-ETH": 1.0
-        }
 
-        base_asset = asset.split("-")[0] if "-" in asset else asset
-        return rates.get(base_asset, 1.0)
+# Background task to update pending withdrawal statuses
+# Confirmation polling for withdrawals that have been broadcast
+withdrawal_refresher = StatusRefresher(
+    name="Withdrawal status refresh",
+    collection="withdrawals",
+    active_statuses=["processing"],
+    check=WithdrawalService.check_withdrawal,
+    age_field="sent_at"
+)
 
 
-# Background task to update pending withdrawal statuses
 async def update_pending_withdrawals():
     """
-    Update status for all processing withdrawals.
+    Update status for the processing withdrawals that are due a check.
     Should be called periodically by background task scheduler.
     """
     try:
-        withdrawals_db = await get_db_collection("withdrawals")
-
-        # Get all processing withdrawals
-        cursor = withdrawals_db.find({"status": "processing"})
-        withdrawals = await cursor.to_list(length=1000)
-
-        updated_count = 0
-        for withdrawal in withdrawals:
-            success = await WithdrawalService.update_withdrawal_status(str(withdrawal["_id"]))
-            if success:
-                updated_count += 1
-
-        logger.info(f"Updated {updated_count}/{len(withdrawals)} pending withdrawals")
-
-        return {"checked": len(withdrawals), "updated": updated_count}
+        return await withdrawal_refresher.run_due()
 
     except Exception as e:
         logger.error(f"Failed to update pending withdrawals: {e}", exc_info=True)
@@ -0,0 +1,146 @@
+"""
+Ticket Deadlines
+Delayed jobs for the TOS reminder/expiry window and closing tickets nobody
+claimed. Jobs are scheduled when the deadline is created and cancelled when it
+stops applying (TOS accepted, ticket claimed or closed); handlers re-check the
+ticket so a late or duplicate run is a no-op.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict
+
+from app.core import delayed_jobs
+from app.core.database import get_tickets_collection
+
+logger = logging.getLogger(__name__)
+
+UNCLAIMED_STATUSES = ["open", "pending", "awaiting_claim"]
+
+
+def _tos_ping_ids(ticket_id: str):
+    from app.services.ticket_service import TicketService
+    return [f"tos:{ticket_id}:ping:{n}" for n in range(1, len(TicketService.TOS_REMINDERS) + 1)]
+
+
+def _tos_expire_id(ticket_id: str) -> str:
+    return f"tos:{ticket_id}:expire"
+
+
+def _unclaimed_close_id(ticket_id: str) -> str:
+    return f"ticket:{ticket_id}:unclaimed_close"
+
+
+def _ticket_jobs(ticket: Dict):
+    """(job_id, job_type, due_at, args) tuples for a ticket's open deadlines"""
+    from app.services.ticket_service import TicketService
+    from app.tasks.ticket_cleanup import UNCLAIMED_CLOSE_HOURS
+
+    ticket_id = str(ticket["_id"])
+    created_at = ticket.get("created_at") or datetime.utcnow()
+    status = ticket.get("status")
+
+    if status == "awaiting_tos" and not ticket.get("tos_accepted_at"):
+        ping_count = ticket.get("tos_ping_count", 0)
+        for ping, (minutes, _) in enumerate(TicketService.TOS_REMINDERS, start=1):
+            if ping > ping_count:
+                yield (
+                    f"tos:{ticket_id}:ping:{ping}",
+                    "tos_reminder",
+                    created_at + timedelta(minutes=minutes),
+                    {"ticket_id": ticket_id, "ping": ping}
+                )
+        deadline = ticket.get("tos_deadline") or created_at + timedelta(minutes=TicketService.TOS_WINDOW_MINUTES)
+        yield (_tos_expire_id(ticket_id), "tos_expire", deadline, {"ticket_id": ticket_id})
+
+    elif status in UNCLAIMED_STATUSES and not ticket.get("assigned_to") and not ticket.get("exchanger_discord_id"):
+        yield (
+            _unclaimed_close_id(ticket_id),
+            "unclaimed_close",
+            created_at + timedelta(hours=UNCLAIMED_CLOSE_HOURS),
+            {"ticket_id": ticket_id}
+        )
+
+
+async def schedule_ticket_deadlines(ticket: Dict) -> int:
+    """
+    Schedule the deadlines that apply to a ticket in its current state
+
+    Args:
+        ticket: Ticket document (needs _id, status, created_at and the TOS fields)
+
+    Returns:
+        Number of jobs scheduled
+    """
+    return await delayed_jobs.schedule_many(_ticket_jobs(ticket))
+
+
+async def cancel_tos_deadlines(ticket_id: str):
+    """Cancel the TOS reminders and expiry of a ticket"""
+    await delayed_jobs.cancel(*_tos_ping_ids(ticket_id), _tos_expire_id(ticket_id))
+
+
+async def cancel_ticket_deadlines(ticket_id: str):
+    """Cancel every deadline of a ticket (claimed, closed or cancelled)"""
+    await delayed_jobs.cancel(*_tos_ping_ids(ticket_id), _tos_expire_id(ticket_id), _unclaimed_close_id(ticket_id))
+
+
+async def schedule_unclaimed_close(ticket_id: str, created_at: datetime):
+    """
+    (Re)schedule the auto-close of a ticket nobody claims
+
+    Args:
+        ticket_id: Ticket MongoDB _id
+        created_at: Ticket creation time the 12 hour window counts from
+    """
+    from app.tasks.ticket_cleanup import UNCLAIMED_CLOSE_HOURS
+
+    await delayed_jobs.schedule(
+        _unclaimed_close_id(ticket_id),
+        "unclaimed_close",
+        created_at + timedelta(hours=UNCLAIMED_CLOSE_HOURS),
+        ticket_id=ticket_id
+    )
+
+
+@delayed_jobs.register("tos_reminder")
+async def _tos_reminder(ticket_id: str, ping: int):
+    from app.services.ticket_service import TicketService
+    await TicketService.send_tos_reminder(ticket_id, ping)
+
+
+@delayed_jobs.register("tos_expire")
+async def _tos_expire(ticket_id: str):
+    from app.services.ticket_service import TicketService
+    await TicketService.expire_tos_deadline(ticket_id)
+
+
+@delayed_jobs.register("unclaimed_close")
+async def _unclaimed_close(ticket_id: str):
+    from app.tasks.ticket_cleanup import close_unclaimed_ticket
+    await close_unclaimed_ticket(ticket_id)
+
+
+async def reconcile_deadlines():
+    """
+    Schedule deadlines for every ticket that is still waiting on one.
+    Run once when this worker becomes the scheduler leader, so tickets created
+    before the deploy (or while Redis was unavailable) are covered.
+    """
+    try:
+        tickets = get_tickets_collection()
+        cursor = tickets.find(
+            {"status": {"$in": ["awaiting_tos"] + UNCLAIMED_STATUSES}},
+            {
+                "status": 1, "created_at": 1, "assigned_to": 1, "exchanger_discord_id": 1,
+                "tos_accepted_at": 1, "tos_deadline": 1, "tos_ping_count": 1
+            }
+        )
+        ticket_jobs = 0
+        async for ticket in cursor:
+            ticket_jobs += await schedule_ticket_deadlines(ticket)
+
+        logger.info(f"✅ Deadlines reconciled: {ticket_jobs} ticket jobs")
+
+    except Exception as e:
+        logger.error(f"Error reconciling deadlines: {e}", exc_info=True)
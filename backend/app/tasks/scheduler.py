@@ -5,9 +5,9 @@ Sets up APScheduler to run periodic background tasks
 
 import logging
 import asyncio
+from datetime import datetime
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
@@ -46,20 +46,36 @@ def start_scheduler():
     if scheduler is None:
         scheduler = create_scheduler()
 
-    # Import task functions
-    from app.tasks.ticket_cleanup import run_cleanup_task
+    # Deadlines (TOS reminders, unclaimed ticket close)
+    # run as delayed jobs; importing the module registers their handlers
+    from app.core import delayed_jobs
+    from app.tasks.deadlines import reconcile_deadlines
+
+    delayed_jobs.runner.start()
 
-    # Add ticket auto-close task (runs every hour)
+    # Queue deadlines for documents created before this worker became leader
     scheduler.add_job(
-        run_cleanup_task,
-        trigger=IntervalTrigger(hours=1),
-        id="ticket_auto_close",
-        name="Auto-close unclaimed tickets older than 12 hours",
-        replace_existing=True,
-        max_instances=1,  # Prevent overlapping runs
-        next_run_time=datetime.utcnow()  # Run immediately on startup
+        reconcile_deadlines,
+        id="deadline_reconcile",
+        name="Reconcile ticket deadlines",
+        replace_existing=True
     )
 
+    # Shared price snapshots, fetched in one batch per feed; readers never call the providers
+    from app.services.price_service import crypto_prices, fiat_rates
+
+    for feed in (crypto_prices, fiat_rates):
+        scheduler.add_job(
+            feed.refresh,
+            trigger=IntervalTrigger(seconds=feed.refresh_seconds),
+            id=f"price_refresh_{feed.name}",
+            name=f"Refresh {feed.name} prices",
+            next_run_time=datetime.utcnow(),
+            coalesce=True,
+            max_instances=1,
+            replace_existing=True
+        )
+
     # Start the scheduler
     scheduler.start()
 
@@ -74,6 +90,9 @@ def stop_scheduler():
     """
     global scheduler
 
+    from app.core import delayed_jobs
+    delayed_jobs.runner.stop()
+
     if scheduler is not None:
         scheduler.shutdown(wait=True)
         logger.info("Scheduler stopped")
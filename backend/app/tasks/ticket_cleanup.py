@@ -1,47 +1,97 @@
 """
 Ticket Cleanup Background Task
 Automatically closes tickets that have been unclaimed for more than 12 hours
+
+Each ticket gets a delayed "unclaimed_close" job at creation (see
+app.tasks.deadlines); close_old_unclaimed_tickets is the manual catch-up sweep.
 """
 
 import logging
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import Dict, Optional
+
+from bson.objectid import ObjectId
 
 from app.core.database import get_tickets_collection
-from app.services.ticket_service import TicketService
 
 logger = logging.getLogger(__name__)
 
+UNCLAIMED_CLOSE_HOURS = 12
+UNCLAIMED_STATUSES = ["open", "pending", "awaiting_claim"]
+
+
+async def close_unclaimed_ticket(ticket_id: str) -> Optional[Dict]:
+    """
+    Close a ticket if it is still unclaimed (no-op otherwise).
+
+    Args:
+        ticket_id: Ticket MongoDB _id
+
+    Returns:
+        Details of the closed ticket, or None if it was claimed/closed already
+    """
+    tickets = get_tickets_collection()
+
+    # Status must be one of: open, pending, awaiting_claim
+    # Must NOT have assigned_to or exchanger_discord_id (not claimed)
+    result = await tickets.find_one_and_update(
+        {
+            "_id": ObjectId(ticket_id),
+            "status": {"$in": UNCLAIMED_STATUSES},
+            "assigned_to": None,
+            "exchanger_discord_id": None
+        },
+        {
+            "$set": {
+                "status": "closed",
+                "closed_at": datetime.utcnow(),
+                "close_reason": f"Auto-closed: No exchanger claimed within {UNCLAIMED_CLOSE_HOURS} hours",
+                "auto_closed": True,
+                "updated_at": datetime.utcnow()
+            }
+        },
+        projection={"ticket_number": 1, "created_at": 1},
+        return_document=True
+    )
+
+    if not result:
+        return None
+
+    created_at = result.get("created_at")
+    closed = {
+        "ticket_id": ticket_id,
+        "ticket_number": result.get("ticket_number", "Unknown"),
+        "created_at": created_at.isoformat() if created_at else None,
+        "age_hours": (datetime.utcnow() - created_at).total_seconds() / 3600 if created_at else None
+    }
+    logger.info(
+        f"Auto-closed ticket #{closed['ticket_number']} (ID: {ticket_id}) - "
+        f"unclaimed for {closed['age_hours'] or 0:.1f} hours"
+    )
+    return closed
+
 
 async def close_old_unclaimed_tickets():
     """
     Find and close tickets that have been open/unclaimed for more than 12 hours.
 
-    Runs periodically (every hour) to check for stale tickets.
-    Only closes tickets that are still in 'open', 'pending', or 'awaiting_claim' status.
-    Does NOT close claimed tickets.
+    Manual catch-up sweep (admin run-now); normally each ticket is closed by
+    its own delayed job. Does NOT close claimed tickets.
     """
     try:
         tickets = get_tickets_collection()
 
         # Calculate cutoff time (12 hours ago)
-        cutoff_time = datetime.utcnow() - timedelta(hours=12)
+        cutoff_time = datetime.utcnow() - timedelta(hours=UNCLAIMED_CLOSE_HOURS)
 
-        # Find unclaimed tickets older than 12 hours
-        # Status must be one of: open, pending, awaiting_claim
-        # Must NOT have assigned_to or exchanger_discord_id (not claimed)
         query = {
-            "status": {"$in": ["open", "pending", "awaiting_claim"]},
+            "status": {"$in": UNCLAIMED_STATUSES},
             "created_at": {"$lt": cutoff_time},
-            "$or": [
-                {"assigned_to": None},
-                {"assigned_to": {"$exists": False}},
-                {"exchanger_discord_id": None},
-                {"exchanger_discord_id": {"$exists": False}}
-            ]
+            "assigned_to": None,
+            "exchanger_discord_id": None
         }
 
-        old_tickets = await tickets.find(query).to_list(length=None)
+        old_tickets = await tickets.find(query, {"_id": 1}).to_list(length=None)
 
         if not old_tickets:
             logger.debug("No unclaimed tickets older than 12 hours found")
@@ -57,39 +107,12 @@ async def close_old_unclaimed_tickets():
 
         for ticket in old_tickets:
             ticket_id = str(ticket["_id"])
-            ticket_number = ticket.get("ticket_number", "Unknown")
-            created_at = ticket.get("created_at")
-
             try:
-                # Close the ticket with auto-close reason
-                from bson.objectid import ObjectId
-
-                result = await tickets.find_one_and_update(
-                    {"_id": ObjectId(ticket_id)},
-                    {
-                        "$set": {
-                            "status": "closed",
-                            "closed_at": datetime.utcnow(),
-                            "close_reason": "Auto-closed: No exchanger claimed within 12 hours",
-                            "auto_closed": True,
-                            "updated_at": datetime.utcnow()
-                        }
-                    },
-                    return_document=True
-                )
-
-                if result:
-                    closed_tickets.append({
-                        "ticket_id": ticket_id,
-                        "ticket_number": ticket_number,
-                        "created_at": created_at.isoformat() if created_at else None,
-                        "age_hours": (datetime.utcnow() - created_at).total_seconds() / 3600 if created_at else None
-                    })
-
-                    logger.info(f"Auto-closed ticket #{ticket_number} (ID: {ticket_id}) - unclaimed for {closed_tickets[-1]['age_hours']:.1f} hours")
-
+                closed = await close_unclaimed_ticket(ticket_id)
+                if closed:
+                    closed_tickets.append(closed)
             except Exception as e:
-                logger.error(f"Failed to auto-close ticket #{ticket_number} (ID: {ticket_id}): {e}", exc_info=True)
+                logger.error(f"Failed to auto-close ticket {ticket_id}: {e}", exc_info=True)
                 continue
 
         logger.info(f"Auto-close task completed: {len(closed_tickets)}/{len(old_tickets)} tickets closed successfully")
@@ -112,7 +135,7 @@ async def close_old_unclaimed_tickets():
 async def run_cleanup_task():
     """
     Wrapper function to run the cleanup task.
-    This is called by the scheduler.
+    This is called by the admin run-now endpoint.
     """
     logger.info("Starting ticket auto-close cleanup task...")
     result = await close_old_unclaimed_tickets()
@@ -0,0 +1,43 @@
+"""Throttling primitives for outbound provider calls"""
+
+import asyncio
+import time
+
+
+class TokenBucket:
+    """
+    Async token bucket.
+
+    Tokens refill continuously at `rate` per second up to `capacity`.
+    Each `acquire()` consumes one token, sleeping until one is available.
+    A caller reserves its token under the lock (the count may go negative
+    while callers queue) and sleeps outside it, so waiters are spaced at
+    `rate` without queueing behind each other's sleeps.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self):
+        """Wait for and consume a single token"""
+        async with self._lock:
+            self._refill()
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+        if wait > 0:
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                # Hand the reserved token back to the callers queued behind
+                self._tokens += 1
+                raise
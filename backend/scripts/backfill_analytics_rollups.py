@@ -0,0 +1,98 @@
+"""
+Backfill / verify analytics_daily_rollups
+Rebuilds daily analytics rollups from tickets, afroo_swaps, platform_fees and
+server_fees, or compares existing rollups against the raw data
+
+Usage:
+    python scripts/backfill_analytics_rollups.py --days 365
+    python scripts/backfill_analytics_rollups.py --since 2024-01-01
+    python scripts/backfill_analytics_rollups.py --days 30 --check
+    python scripts/backfill_analytics_rollups.py --days 30 --check --repair
+"""
+
+import argparse
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import connect_to_mongo, close_mongo_connection  # noqa: E402
+from app.services.analytics_rollup_service import AnalyticsRollupService  # noqa: E402
+
+# Days rebuilt per pass, keeps each aggregation well inside the socket timeout
+CHUNK_DAYS = 30
+
+
+async def backfill(start_date: datetime, end_date: datetime):
+    """Rebuild rollups chunk by chunk"""
+    total_written = 0
+    total_removed = 0
+
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        chunk_end = min(chunk_start + timedelta(days=CHUNK_DAYS - 1), end_date)
+        result = await AnalyticsRollupService.rebuild(chunk_start, chunk_end)
+        total_written += result["days_written"]
+        total_removed += result["days_removed"]
+        print(
+            f"  {chunk_start.date()} .. {chunk_end.date()}: "
+            f"{result['days_written']} days written, {result['days_removed']} removed"
+        )
+        chunk_start = chunk_end + timedelta(days=1)
+
+    print(f"\n✅ Backfill complete: {total_written} days written, {total_removed} removed")
+
+
+async def check(start_date: datetime, end_date: datetime, repair: bool):
+    """Compare rollups against raw data"""
+    result = await AnalyticsRollupService.check_consistency(start_date, end_date, repair=repair)
+
+    print(f"Days checked: {result['days_checked']}")
+    if result["consistent"]:
+        print("\n✅ Rollups match raw data")
+        return
+
+    for mismatch in result["mismatches"]:
+        print(
+            f"  {mismatch['date'].date()} {mismatch['field']}: "
+            f"rollup={mismatch['rollup']} raw={mismatch['raw']}"
+        )
+
+    if result["repaired"]:
+        print(f"\n✅ Repaired {len(result['mismatched_days'])} day(s)")
+    else:
+        print(f"\n❌ {len(result['mismatched_days'])} day(s) inconsistent (run with --repair to rebuild them)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backfill or verify analytics daily rollups")
+    parser.add_argument("--days", type=int, default=90, help="Number of days back from today (default: 90)")
+    parser.add_argument("--since", type=str, help="Start date YYYY-MM-DD (overrides --days)")
+    parser.add_argument("--check", action="store_true", help="Compare rollups against raw data instead of rebuilding")
+    parser.add_argument("--repair", action="store_true", help="With --check, rebuild inconsistent days")
+    args = parser.parse_args()
+
+    end_date = AnalyticsRollupService.day_start(datetime.utcnow())
+    if args.since:
+        start_date = datetime.strptime(args.since, "%Y-%m-%d")
+    else:
+        start_date = end_date - timedelta(days=args.days - 1)
+
+    print("=" * 60)
+    print(f"Analytics rollups {'check' if args.check else 'backfill'}: {start_date.date()} .. {end_date.date()}")
+    print("=" * 60)
+
+    await connect_to_mongo()
+    try:
+        if args.check:
+            await check(start_date, end_date, args.repair)
+        else:
+            await backfill(start_date, end_date)
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
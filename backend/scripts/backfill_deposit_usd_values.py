@@ -0,0 +1,51 @@
+"""
+Backfill deposit USD values
+Re-values blockchain_transactions deposits recorded with the old hard-coded
+rates (or without a price) at CoinGecko's price for the day they were
+recorded, and adds the USD value of deposits that were credited without a
+price to the exchanger's deposit balance. Safe to re-run: finished rows are
+skipped.
+
+Usage:
+    python scripts/backfill_deposit_usd_values.py --dry-run
+    python scripts/backfill_deposit_usd_values.py
+    python scripts/backfill_deposit_usd_values.py --limit 500
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.core.database import connect_to_mongo, close_mongo_connection  # noqa: E402
+from app.services.webhook_service import WebhookService  # noqa: E402
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Re-value deposits recorded without a price snapshot")
+    parser.add_argument("--dry-run", action="store_true", help="Only count deposits that still need re-valuing")
+    parser.add_argument("--limit", type=int, help="Stop after this many deposits")
+    args = parser.parse_args()
+
+    await connect_to_mongo()
+    try:
+        result = await WebhookService.backfill_usd_values(dry_run=args.dry_run, limit=args.limit)
+    finally:
+        await close_mongo_connection()
+
+    print(f"Deposits without a price snapshot or USD credit: {result['pending']}")
+    if args.dry_run:
+        return
+
+    for asset, day in result["unpriced"]:
+        print(f"  no price for {asset} on {day}")
+    print(
+        f"\n✅ Backfill complete: {result['revalued']} re-valued, "
+        f"{result['deposits_credited']} deposit balances credited, {result['skipped']} skipped"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
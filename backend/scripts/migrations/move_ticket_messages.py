@@ -0,0 +1,65 @@
+"""
+MongoDB Migration: Move embedded ticket messages into ticket_messages
+Copies each ticket's messages array into the ticket_messages collection,
+sets message_count / last_message_at and removes the array. Safe to re-run:
+messages already copied are skipped.
+
+Usage:
+    python scripts/migrations/move_ticket_messages.py
+    python scripts/migrations/move_ticket_messages.py --dry-run
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from app.core.database import connect_to_mongo, close_mongo_connection, get_tickets_collection  # noqa: E402
+from app.services.ticket_message_service import TicketMessageService  # noqa: E402
+
+# Tickets loaded per batch (each carries its full messages array)
+BATCH_SIZE = 100
+
+
+async def migrate(dry_run: bool):
+    tickets = get_tickets_collection()
+    query = {"messages": {"$exists": True}}
+
+    remaining = await tickets.count_documents(query)
+    print(f"Tickets with embedded messages: {remaining}")
+    if dry_run or not remaining:
+        return
+
+    migrated_tickets = 0
+    migrated_messages = 0
+    while True:
+        # Migrated tickets drop out of the query, so always read the first batch
+        batch = await tickets.find(query, {"messages": 1, "created_at": 1}).limit(BATCH_SIZE).to_list(length=BATCH_SIZE)
+        if not batch:
+            break
+
+        for ticket in batch:
+            migrated_messages += await TicketMessageService.migrate_embedded_messages(ticket)
+            migrated_tickets += 1
+
+        print(f"  {migrated_tickets}/{remaining} tickets, {migrated_messages} messages moved")
+
+    print(f"\n✅ Migration complete: {migrated_messages} messages from {migrated_tickets} tickets")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Move embedded ticket messages into ticket_messages")
+    parser.add_argument("--dry-run", action="store_true", help="Only count tickets that still need migrating")
+    args = parser.parse_args()
+
+    await connect_to_mongo()
+    try:
+        await migrate(args.dry_run)
+    finally:
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
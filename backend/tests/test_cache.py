@@ -0,0 +1,286 @@
+"""
+Two-tier cache: codec round-trips (msgpack, orjson and json), the local
+LRU/TTL tier, the Redis tier, cross-worker invalidation and read-through
+loads racing an invalidation
+"""
+
+from datetime import datetime
+from decimal import Decimal
+import asyncio
+
+import pytest
+
+pytest.importorskip("bson")
+pytest.importorskip("fakeredis")
+
+import fakeredis
+from bson import ObjectId
+
+from app.core import cache
+from app.core import redis as redis_module
+from app.core.cache import TwoTierCache, decode, encode
+from app.services import cache_service
+from app.services.cache_service import CacheService
+
+VALUE = {
+    "amount": Decimal("1.234567890123456789"),
+    "id": ObjectId(),
+    "at": datetime(2026, 1, 2, 3, 4, 5, 678000),
+    "nested": [{"fee": Decimal("0.1"), "ids": [ObjectId()]}],
+    "count": 3,
+    "label": "BTC",
+    "missing": None
+}
+
+
+@pytest.fixture(params=["msgpack", "orjson", "json"])
+def codec(request, monkeypatch):
+    """Force one codec by hiding the libraries ahead of it"""
+    if request.param == "msgpack":
+        pytest.importorskip("msgpack")
+    if request.param in ("orjson", "json"):
+        monkeypatch.setattr(cache, "msgpack", None)
+    if request.param == "orjson":
+        pytest.importorskip("orjson")
+    if request.param == "json":
+        monkeypatch.setattr(cache, "orjson", None)
+    return request.param
+
+
+@pytest.fixture
+async def binary_redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    await client.flushall()
+    monkeypatch.setattr(redis_module, "redis_binary_client", client)
+    yield client
+    await client.aclose()
+
+
+# ====================
+# Codec
+# ====================
+
+def test_round_trip(codec):
+    data = encode(VALUE)
+
+    assert data[:1] == {"msgpack": b"m", "orjson": b"o", "json": b"j"}[codec]
+    assert decode(data) == VALUE
+
+
+def test_entries_from_other_codecs_stay_readable(monkeypatch):
+    with monkeypatch.context() as patch:
+        patch.setattr(cache, "msgpack", None)
+        patch.setattr(cache, "orjson", None)
+        json_entry = encode(VALUE)
+
+    assert decode(json_entry) == VALUE
+
+
+def test_msgpack_entry_without_msgpack_is_an_error(monkeypatch):
+    pytest.importorskip("msgpack")
+    data = encode(VALUE)
+    monkeypatch.setattr(cache, "msgpack", None)
+
+    with pytest.raises(ValueError):
+        decode(data)
+
+
+def test_unknown_codec_is_an_error():
+    with pytest.raises(ValueError):
+        decode(b"x{}")
+
+
+def test_uncacheable_value_is_an_error(codec):
+    with pytest.raises(TypeError):
+        encode({"value": object()})
+
+
+# ====================
+# Local tier
+# ====================
+
+def test_local_entries_expire(monkeypatch):
+    engine = TwoTierCache()
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+
+    engine.set_local("k", b"v", ttl=5)
+    assert engine.get_local("k") == b"v"
+
+    now[0] += 5
+    assert engine.get_local("k") is None
+
+
+def test_local_ttl_is_capped(monkeypatch):
+    engine = TwoTierCache()
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+
+    engine.set_local("k", b"v", ttl=3600)
+    now[0] += cache.LOCAL_MAX_TTL_SECONDS
+    assert engine.get_local("k") is None
+
+
+def test_least_recently_used_entry_is_evicted(monkeypatch):
+    monkeypatch.setattr(cache, "LOCAL_MAX_ENTRIES", 2)
+    engine = TwoTierCache()
+
+    engine.set_local("a", b"1", ttl=10)
+    engine.set_local("b", b"2", ttl=10)
+    engine.get_local("a")
+    engine.set_local("c", b"3", ttl=10)
+
+    assert engine.get_local("a") == b"1"
+    assert engine.get_local("b") is None
+    assert engine.get_local("c") == b"3"
+
+
+# ====================
+# Both tiers
+# ====================
+
+async def test_value_shared_through_redis(binary_redis):
+    writer, reader = TwoTierCache(), TwoTierCache()
+
+    await writer.set("cache:k", VALUE, ttl=30)
+
+    assert await reader.get("cache:k") == VALUE
+    assert reader.stats["redis_hits"] == 1
+    assert await reader.get("cache:k") == VALUE
+    assert reader.stats["local_hits"] == 1
+    assert 0 < await binary_redis.ttl("cache:k") <= 30
+
+
+async def test_reads_return_copies(binary_redis):
+    engine = TwoTierCache()
+    await engine.set("cache:k", {"items": [1]}, ttl=30)
+
+    (await engine.get("cache:k"))["items"].append(2)
+
+    assert await engine.get("cache:k") == {"items": [1]}
+
+
+async def test_delete_removes_both_tiers(binary_redis):
+    engine = TwoTierCache()
+    await engine.set("cache:k", VALUE, ttl=30)
+
+    await engine.delete("cache:k")
+
+    assert await engine.get("cache:k") is None
+    assert await binary_redis.exists("cache:k") == 0
+
+
+def test_invalidation_messages():
+    engine, other = TwoTierCache(), TwoTierCache()
+    for key in ("user:1", "user:2", "rate:btc"):
+        engine.set_local(key, b"v", ttl=10)
+
+    engine._apply(f"{engine.instance_id}|k|user:1".encode())
+    assert engine.get_local("user:1") == b"v"
+
+    engine._apply(f"{other.instance_id}|k|user:1".encode())
+    assert engine.get_local("user:1") is None
+
+    engine._apply(f"{other.instance_id}|p|user:".encode())
+    assert engine.get_local("user:2") is None
+    assert engine.get_local("rate:btc") == b"v"
+
+    engine._apply(f"{other.instance_id}|a|".encode())
+    assert engine.get_local("rate:btc") is None
+
+
+async def test_write_drops_other_workers_local_copy(binary_redis):
+    writer, reader = TwoTierCache(), TwoTierCache()
+    await writer.set("cache:k", {"v": 1}, ttl=30)
+    assert await reader.get("cache:k") == {"v": 1}
+
+    reader.start()
+    try:
+        for _ in range(100):
+            if reader.stats["invalidations_received"] or not reader._local:
+                break
+            await asyncio.sleep(0.01)
+        # Subscribing clears the local tier; re-read so the copy is local again
+        assert await reader.get("cache:k") == {"v": 1}
+
+        await writer.set("cache:k", {"v": 2}, ttl=30)
+        for _ in range(100):
+            if reader.stats["invalidations_received"]:
+                break
+            await asyncio.sleep(0.01)
+
+        assert await reader.get("cache:k") == {"v": 2}
+    finally:
+        await reader.stop()
+
+
+# ====================
+# Read-through (CacheService)
+# ====================
+
+class Loader:
+    """Loads the current document; can be held mid-load until released"""
+
+    def __init__(self, document):
+        self.document = document
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = None
+
+    async def __call__(self):
+        self.calls += 1
+        value = dict(self.document)
+        self.started.set()
+        if self.release:
+            await self.release.wait()
+        return value
+
+
+@pytest.fixture
+def read_through(binary_redis, monkeypatch):
+    monkeypatch.setattr(CacheService, "_read_script", None)
+    monkeypatch.setattr(CacheService, "_store_script", None)
+    monkeypatch.setattr(CacheService, "_inflight", {})
+    monkeypatch.setattr(cache, "cache_engine", TwoTierCache())
+    monkeypatch.setattr(cache_service, "cache_engine", cache.cache_engine)
+
+
+async def test_read_through_loads_once(read_through):
+    loader = Loader({"role": "user"})
+
+    assert await CacheService.get_or_load(CacheService.PREFIX_USER, "1", loader) == {"role": "user"}
+    assert await CacheService.get_or_load(CacheService.PREFIX_USER, "1", loader) == {"role": "user"}
+    assert loader.calls == 1
+
+
+async def test_load_invalidated_midway_is_not_stored(read_through, binary_redis):
+    loader = Loader({"role": "user"})
+    loader.release = asyncio.Event()
+    load = asyncio.create_task(CacheService.get_or_load(CacheService.PREFIX_USER, "1", loader, ttl=60, stale_ttl=60))
+    await loader.started.wait()
+
+    # An admin change lands while the load still holds the old document
+    loader.document = {"role": "admin"}
+    await CacheService.invalidate(CacheService.PREFIX_USER, "1")
+    assert await binary_redis.exists("lock:cache:cache:user:v0:1") == 0
+    loader.release.set()
+    assert await load == {"role": "user"}
+
+    loader.release = None
+    assert await CacheService.get_or_load(CacheService.PREFIX_USER, "1", loader) == {"role": "admin"}
+    assert loader.calls == 2
+
+
+async def test_load_across_namespace_invalidation_is_not_stored(read_through):
+    loader = Loader({"role": "user"})
+    loader.release = asyncio.Event()
+    load = asyncio.create_task(CacheService.get_or_load(CacheService.PREFIX_USER, "1", loader))
+    await loader.started.wait()
+
+    loader.document = {"role": "admin"}
+    await CacheService.invalidate_namespace(CacheService.PREFIX_USER)
+    loader.release.set()
+    await load
+
+    loader.release = None
+    assert await CacheService.get_or_load(CacheService.PREFIX_USER, "1", loader) == {"role": "admin"}
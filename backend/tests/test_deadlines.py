@@ -0,0 +1,281 @@
+"""
+Delayed jobs and ticket deadlines: jobs fire once when due, cancelled or
+moved jobs don't fire, failures are retried and handlers tolerate redelivery
+"""
+
+from datetime import datetime, timedelta
+import asyncio
+
+import pytest
+
+pytest.importorskip("mongomock_motor")
+pytest.importorskip("fakeredis")
+
+from bson import ObjectId
+
+from app.core import delayed_jobs
+from app.tasks import deadlines
+
+
+@pytest.fixture
+def runner(redis):
+    runner = delayed_jobs.DelayedJobRunner()
+    runner._claim = redis.register_script(delayed_jobs.CLAIM_SCRIPT)
+    runner._ack = redis.register_script(delayed_jobs.ACK_SCRIPT)
+    return runner
+
+
+class Handler:
+    """Test job handler recording its calls, raising while fail is set"""
+
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    async def __call__(self, **args):
+        self.calls.append(args)
+        if self.fail:
+            raise RuntimeError("handler failed")
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    handler = Handler()
+    monkeypatch.setitem(delayed_jobs._handlers, "test_job", handler)
+    return handler
+
+
+async def run_due(runner) -> int:
+    """One runner tick: claim and execute every due job"""
+    jobs = await runner._claim_due()
+    for job_id, payload in jobs:
+        await runner._execute(job_id, payload)
+    return len(jobs)
+
+
+def ago(**kwargs) -> datetime:
+    return datetime.utcnow() - timedelta(**kwargs)
+
+
+def from_now(**kwargs) -> datetime:
+    return datetime.utcnow() + timedelta(**kwargs)
+
+
+async def job_ids(redis):
+    return set(await redis.hkeys(delayed_jobs.PAYLOAD_KEY))
+
+
+# ====================
+# Runner
+# ====================
+
+async def test_due_job_fires_once(redis, runner, handler):
+    await delayed_jobs.schedule("test:1", "test_job", ago(seconds=1), value=1)
+
+    assert await run_due(runner) == 1
+    assert await run_due(runner) == 0
+    assert handler.calls == [{"value": 1}]
+    assert await job_ids(redis) == set()
+    assert await redis.zcard(delayed_jobs.PROCESSING_KEY) == 0
+
+
+async def test_future_job_waits(redis, runner, handler):
+    await delayed_jobs.schedule("test:1", "test_job", from_now(minutes=5), value=1)
+
+    assert await run_due(runner) == 0
+    assert handler.calls == []
+    assert await job_ids(redis) == {"test:1"}
+
+
+async def test_cancelled_job_never_fires(redis, runner, handler):
+    await delayed_jobs.schedule("test:1", "test_job", ago(seconds=1), value=1)
+    await delayed_jobs.cancel("test:1", "test:unknown")
+
+    assert await run_due(runner) == 0
+    assert handler.calls == []
+    assert await job_ids(redis) == set()
+
+
+async def test_rescheduling_replaces_job(redis, runner, handler):
+    await delayed_jobs.schedule("test:1", "test_job", ago(seconds=1), value=1)
+    await delayed_jobs.schedule("test:1", "test_job", ago(seconds=1), value=2)
+
+    await run_due(runner)
+    assert handler.calls == [{"value": 2}]
+
+
+async def test_failed_job_is_retried_with_backoff(redis, runner, handler):
+    handler.fail = True
+    await delayed_jobs.schedule("test:1", "test_job", ago(seconds=1), value=1)
+
+    await run_due(runner)
+
+    assert len(handler.calls) == 1
+    retry_at = await redis.zscore(delayed_jobs.DUE_KEY, "test:1")
+    assert retry_at > datetime.utcnow().timestamp() * 1000
+    assert await redis.zcard(delayed_jobs.PROCESSING_KEY) == 0
+    assert '"attempts": 1' in await redis.hget(delayed_jobs.PAYLOAD_KEY, "test:1")
+
+
+async def test_job_dropped_after_max_attempts(redis, runner, handler, monkeypatch):
+    monkeypatch.setattr(delayed_jobs, "RETRY_BACKOFF_SECONDS", 0)
+    handler.fail = True
+    await delayed_jobs.schedule("test:1", "test_job", ago(seconds=1), value=1)
+
+    for _ in range(delayed_jobs.MAX_ATTEMPTS):
+        await run_due(runner)
+
+    assert len(handler.calls) == delayed_jobs.MAX_ATTEMPTS
+    assert await job_ids(redis) == set()
+    assert await redis.zcard(delayed_jobs.DUE_KEY) == 0
+
+
+async def test_job_cancelled_while_failing_is_not_retried(redis, runner, monkeypatch):
+    async def cancel_then_fail(**args):
+        await delayed_jobs.cancel("test:1")
+        raise RuntimeError("handler failed")
+
+    monkeypatch.setitem(delayed_jobs._handlers, "test_job", cancel_then_fail)
+    await delayed_jobs.schedule("test:1", "test_job", ago(seconds=1), value=1)
+
+    await run_due(runner)
+    assert await job_ids(redis) == set()
+    assert await redis.zcard(delayed_jobs.DUE_KEY) == 0
+
+
+async def test_unacked_job_is_redelivered_after_visibility_timeout(redis, runner, handler):
+    await delayed_jobs.schedule("test:1", "test_job", ago(seconds=1), value=1)
+
+    # Claimed by a worker that died before acking
+    assert len(await runner._claim_due()) == 1
+    assert await run_due(runner) == 0
+
+    await redis.zadd(delayed_jobs.PROCESSING_KEY, {"test:1": 0})
+    assert await run_due(runner) == 1
+    assert handler.calls == [{"value": 1}]
+
+
+async def test_unknown_job_type_is_dropped(redis, runner):
+    await delayed_jobs.schedule("test:1", "no_such_type", ago(seconds=1))
+
+    assert await run_due(runner) == 1
+    assert await job_ids(redis) == set()
+
+
+async def test_started_runner_fires_due_jobs(redis, handler):
+    runner = delayed_jobs.DelayedJobRunner()
+    await delayed_jobs.schedule("test:1", "test_job", ago(seconds=1), value=1)
+
+    runner.start()
+    try:
+        for _ in range(100):
+            if handler.calls:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        runner.stop()
+
+    assert handler.calls == [{"value": 1}]
+
+
+# ====================
+# Ticket deadlines
+# ====================
+
+async def create_ticket(db, **fields) -> dict:
+    ticket = {
+        "user_id": ObjectId(),
+        "status": "awaiting_tos",
+        "created_at": ago(minutes=4),
+        "tos_accepted_at": None,
+        "tos_ping_count": 0,
+        "assigned_to": None,
+        "exchanger_discord_id": None,
+        "message_count": 0,
+        **fields
+    }
+    await db.tickets.insert_one(ticket)
+    return ticket
+
+
+async def test_tos_deadlines_scheduled_for_new_ticket(db, redis):
+    ticket = await create_ticket(db)
+    ticket_id = str(ticket["_id"])
+
+    assert await deadlines.schedule_ticket_deadlines(ticket) == 4
+    assert await job_ids(redis) == {
+        f"tos:{ticket_id}:ping:1",
+        f"tos:{ticket_id}:ping:2",
+        f"tos:{ticket_id}:ping:3",
+        f"tos:{ticket_id}:expire"
+    }
+
+
+async def test_sent_pings_not_rescheduled(db, redis):
+    ticket = await create_ticket(db, tos_ping_count=2)
+
+    await deadlines.schedule_ticket_deadlines(ticket)
+    assert f"tos:{ticket['_id']}:ping:1" not in await job_ids(redis)
+    assert f"tos:{ticket['_id']}:ping:3" in await job_ids(redis)
+
+
+async def test_due_tos_reminder_fires_once(db, redis, runner):
+    ticket = await create_ticket(db)
+    await deadlines.schedule_ticket_deadlines(ticket)
+
+    # Only the 3 minute reminder is due four minutes in
+    assert await run_due(runner) == 1
+    fired = await db.tickets.find_one({"_id": ticket["_id"]})
+    assert fired["tos_ping_count"] == 1
+    assert await db.ticket_messages.count_documents({"ticket_id": ticket["_id"]}) == 1
+
+    # A redelivered reminder doesn't post again
+    await delayed_jobs.schedule(f"tos:{ticket['_id']}:ping:1", "tos_reminder", ago(seconds=1), ticket_id=str(ticket["_id"]), ping=1)
+    await run_due(runner)
+    assert await db.ticket_messages.count_documents({"ticket_id": ticket["_id"]}) == 1
+
+
+async def test_accepted_tos_cancels_reminders_and_expiry(db, redis, runner):
+    ticket = await create_ticket(db, created_at=ago(minutes=20))
+    await deadlines.schedule_ticket_deadlines(ticket)
+
+    await deadlines.cancel_tos_deadlines(str(ticket["_id"]))
+
+    assert await job_ids(redis) == set()
+    assert await run_due(runner) == 0
+    assert (await db.tickets.find_one({"_id": ticket["_id"]}))["status"] == "awaiting_tos"
+
+
+async def test_expiry_skips_ticket_that_accepted_tos(db, redis, runner):
+    ticket = await create_ticket(db, created_at=ago(minutes=20), tos_deadline=ago(minutes=10))
+    await deadlines.schedule_ticket_deadlines(ticket)
+    await db.tickets.update_one({"_id": ticket["_id"]}, {"$set": {"tos_accepted_at": datetime.utcnow()}})
+
+    await run_due(runner)
+
+    after = await db.tickets.find_one({"_id": ticket["_id"]})
+    assert after["status"] == "awaiting_tos"
+    assert after["tos_ping_count"] == 0
+    assert await job_ids(redis) == set()
+
+
+async def test_unclaimed_close_scheduled_and_cancelled_on_claim(db, redis):
+    from app.tasks.ticket_cleanup import UNCLAIMED_CLOSE_HOURS
+
+    ticket = await create_ticket(db, status="open", created_at=ago(hours=1))
+    ticket_id = str(ticket["_id"])
+    await deadlines.schedule_ticket_deadlines(ticket)
+
+    job_id = f"ticket:{ticket_id}:unclaimed_close"
+    assert await job_ids(redis) == {job_id}
+    due_at = await redis.zscore(delayed_jobs.DUE_KEY, job_id)
+    assert due_at == delayed_jobs._ms(ticket["created_at"] + timedelta(hours=UNCLAIMED_CLOSE_HOURS))
+
+    await deadlines.cancel_ticket_deadlines(ticket_id)
+    assert await job_ids(redis) == set()
+
+
+async def test_claimed_ticket_gets_no_deadlines(db, redis):
+    ticket = await create_ticket(db, status="open", assigned_to="222222222222222222")
+
+    assert await deadlines.schedule_ticket_deadlines(ticket) == 0
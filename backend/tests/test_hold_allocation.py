@@ -0,0 +1,103 @@
+"""
+HoldAllocationService.allocate_hold: deposits are unlocked again when the
+hold records can't be written, and a compensation that a concurrent write
+got in front of is reported instead of retried over
+"""
+
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("mongomock_motor")
+
+from bson import ObjectId
+
+from app.core.locks import ConcurrentUpdateError
+from app.services import hold_allocation_service
+from app.services.hold_allocation_service import HoldAllocationService
+
+EXCHANGER_ID = "111111111111111111"
+
+
+class FailingInserts:
+    """ticket_holds stand-in whose insert_many fails, optionally after a concurrent deposit write"""
+
+    def __init__(self, collection, before_failing=None):
+        self.collection = collection
+        self.before_failing = before_failing
+
+    async def insert_many(self, documents, *args, **kwargs):
+        if self.before_failing:
+            await self.before_failing()
+        raise RuntimeError("insert failed")
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+
+@pytest.fixture
+async def deposit(db, monkeypatch):
+    async def prices(currencies):
+        return {currency: Decimal("100") for currency in currencies}
+
+    monkeypatch.setattr(hold_allocation_service.price_service, "get_prices_batch", prices)
+    await db.exchanger_deposits.insert_one({
+        "user_id": EXCHANGER_ID,
+        "currency": "LTC",
+        "balance": "1",
+        "held": "0",
+        "fee_reserved": "0",
+        "version": 3
+    })
+
+
+def failing_holds(monkeypatch, db, before_failing=None):
+    async def get_db_collection(name):
+        if name == "ticket_holds":
+            return FailingInserts(db.ticket_holds, before_failing)
+        return db[name]
+
+    monkeypatch.setattr(hold_allocation_service, "get_db_collection", get_db_collection)
+
+
+async def get_deposit(db):
+    return await db.exchanger_deposits.find_one({"user_id": EXCHANGER_ID})
+
+
+async def test_hold_allocated(db, deposit):
+    records, fee_usd = await HoldAllocationService.allocate_hold(str(ObjectId()), EXCHANGER_ID, Decimal("50"))
+
+    assert fee_usd == Decimal("1.00")
+    assert len(records) == 1
+    locked = await get_deposit(db)
+    assert Decimal(locked["held"]) == Decimal("0.49")
+    assert Decimal(locked["fee_reserved"]) == Decimal("0.01")
+    assert await db.ticket_holds.count_documents({"status": "active"}) == 1
+
+
+async def test_failed_hold_insert_unlocks_deposits(db, deposit, monkeypatch):
+    failing_holds(monkeypatch, db)
+
+    with pytest.raises(RuntimeError):
+        await HoldAllocationService.allocate_hold(str(ObjectId()), EXCHANGER_ID, Decimal("50"))
+
+    unlocked = await get_deposit(db)
+    assert Decimal(unlocked["held"]) == 0
+    assert Decimal(unlocked["fee_reserved"]) == 0
+    assert await db.ticket_holds.count_documents({}) == 0
+
+
+async def test_compensation_beaten_by_concurrent_write_is_reported(db, deposit, monkeypatch):
+    async def withdrawal_lands():
+        await db.exchanger_deposits.update_one(
+            {"user_id": EXCHANGER_ID},
+            {"$set": {"balance": "0.9"}, "$inc": {"version": 1}}
+        )
+
+    failing_holds(monkeypatch, db, withdrawal_lands)
+
+    with pytest.raises(ConcurrentUpdateError):
+        await HoldAllocationService.allocate_hold(str(ObjectId()), EXCHANGER_ID, Decimal("50"))
+
+    # Left as the concurrent write found it, for manual release
+    assert Decimal((await get_deposit(db))["held"]) == Decimal("0.49")
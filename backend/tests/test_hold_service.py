@@ -0,0 +1,130 @@
+"""
+HoldService.release_hold: deductions, refunds, double releases and the
+rollback of a hold whose deposit update failed
+"""
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("mongomock_motor")
+pytest.importorskip("fakeredis")
+
+from bson import ObjectId
+
+from app.core.locks import StaleLeaseError
+from app.services.hold_service import HoldService
+
+EXCHANGER_ID = "111111111111111111"
+
+
+@pytest.fixture
+async def deposit(db, redis):
+    deposit = {
+        "user_id": EXCHANGER_ID,
+        "currency": "LTC",
+        "balance": "2.0",
+        "held": "0.5",
+        "fee_reserved": "0.01"
+    }
+    await db.exchanger_deposits.insert_one(deposit)
+    return deposit
+
+
+@pytest.fixture
+async def hold(db, deposit):
+    hold = {
+        "ticket_id": ObjectId(),
+        "user_id": EXCHANGER_ID,
+        "currency": "LTC",
+        "crypto_held": "0.5",
+        "server_fee_crypto": "0.01",
+        "server_fee_usd": "1.00",
+        "status": "active"
+    }
+    await db.ticket_holds.insert_one(hold)
+    return hold
+
+
+async def get_deposit(db, user_id=EXCHANGER_ID):
+    return await db.exchanger_deposits.find_one({"user_id": user_id, "currency": "LTC"})
+
+
+async def test_release_deducts_and_collects_fee(db, hold):
+    await HoldService.release_hold(str(hold["_id"]))
+
+    deposit = await get_deposit(db)
+    assert Decimal(deposit["balance"]) == Decimal("1.49")
+    assert Decimal(deposit["held"]) == 0
+    assert Decimal(deposit["fee_reserved"]) == 0
+
+    released = await db.ticket_holds.find_one({"_id": hold["_id"]})
+    assert released["status"] == "released"
+    assert released["released_at"] is not None
+
+    admin = await get_deposit(db, user_id="admin")
+    assert Decimal(admin["balance"]) == Decimal("0.01")
+    assert await db.server_fees.count_documents({"ticket_id": hold["ticket_id"]}) == 1
+
+
+async def test_refund_unlocks_without_deducting(db, hold):
+    await HoldService.refund_hold(str(hold["_id"]))
+
+    deposit = await get_deposit(db)
+    assert Decimal(deposit["balance"]) == Decimal("2.0")
+    assert Decimal(deposit["held"]) == 0
+    assert Decimal(deposit["fee_reserved"]) == 0
+
+    refunded = await db.ticket_holds.find_one({"_id": hold["_id"]})
+    assert refunded["status"] == "refunded"
+    assert await get_deposit(db, user_id="admin") is None
+
+
+async def test_second_release_is_rejected(db, hold):
+    await HoldService.release_hold(str(hold["_id"]))
+
+    with pytest.raises(ValueError, match="not active"):
+        await HoldService.release_hold(str(hold["_id"]))
+
+    assert Decimal((await get_deposit(db))["balance"]) == Decimal("1.49")
+
+
+async def test_concurrent_releases_deduct_once(db, hold):
+    results = await asyncio.gather(
+        HoldService.release_hold(str(hold["_id"])),
+        HoldService.release_hold(str(hold["_id"])),
+        return_exceptions=True
+    )
+
+    errors = [result for result in results if isinstance(result, Exception)]
+    assert len(errors) == 1
+    assert isinstance(errors[0], ValueError)
+    assert Decimal((await get_deposit(db))["balance"]) == Decimal("1.49")
+    assert await db.server_fees.count_documents({}) == 1
+
+
+async def test_failed_deposit_update_reactivates_hold(db, hold):
+    # A newer lease holder has written the deposit, so this release's write is fenced off
+    await db.exchanger_deposits.update_one({"user_id": EXCHANGER_ID}, {"$set": {"lock_fence": 10 ** 9}})
+
+    with pytest.raises(StaleLeaseError):
+        await HoldService.release_hold(str(hold["_id"]))
+
+    restored = await db.ticket_holds.find_one({"_id": hold["_id"]})
+    assert restored["status"] == "active"
+    assert restored["released_at"] is None
+
+    deposit = await get_deposit(db)
+    assert Decimal(deposit["balance"]) == Decimal("2.0")
+    assert Decimal(deposit["held"]) == Decimal("0.5")
+    assert await db.server_fees.count_documents({}) == 0
+
+
+async def test_missing_deposit_leaves_hold_active(db, hold):
+    await db.exchanger_deposits.delete_many({})
+
+    with pytest.raises(ValueError, match="Deposit not found"):
+        await HoldService.release_hold(str(hold["_id"]))
+
+    assert (await db.ticket_holds.find_one({"_id": hold["_id"]}))["status"] == "active"
@@ -0,0 +1,165 @@
+"""
+Lease locks: acquire/renew/release, fencing tokens (including after Redis
+loses its keys), re-entry, the local fallback and versioned_update
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("mongomock_motor")
+pytest.importorskip("fakeredis")
+
+from app.core import locks
+from app.core import redis as redis_module
+from app.core.locks import (
+    ConcurrentUpdateError,
+    LockAcquireTimeout,
+    StaleLeaseError,
+    lease_lock,
+    versioned_update
+)
+
+
+async def test_acquire_returns_increasing_fencing_tokens(db, redis):
+    first = await locks.try_acquire("exchanger:1", "owner-a", ttl=5)
+    assert first > 0
+    assert await locks.try_acquire("exchanger:1", "owner-b", ttl=5) == 0
+
+    assert await locks.release("exchanger:1", "owner-a")
+    second = await locks.try_acquire("exchanger:1", "owner-b", ttl=5)
+    assert second > first
+
+
+async def test_fencing_tokens_survive_redis_losing_its_keys(db, redis):
+    first = await locks.try_acquire("exchanger:1", "owner-a", ttl=5)
+    await db.deposits.insert_one({"user_id": "1", "balance": 1})
+    await versioned_update(db.deposits, {"user_id": "1"}, lambda doc: {"balance": 2}, fence=first)
+
+    # Evicted under allkeys-lru, or a restart without persistence
+    await redis.flushall()
+
+    second = await locks.try_acquire("exchanger:1", "owner-b", ttl=5)
+    assert second > first
+    updated = await versioned_update(db.deposits, {"user_id": "1"}, lambda doc: {"balance": 3}, fence=second)
+    assert updated["balance"] == 3
+
+
+async def test_fencing_tokens_continue_from_legacy_redis_counter(db, redis):
+    await redis.set(locks.LEGACY_FENCE_KEY.format(name="exchanger:1"), 41)
+
+    assert await locks.try_acquire("exchanger:1", "owner-a", ttl=5) == 42
+    assert await locks.release("exchanger:1", "owner-a")
+    assert await locks.try_acquire("exchanger:1", "owner-b", ttl=5) == 43
+
+
+async def test_lease_released_when_token_unavailable(redis, monkeypatch):
+    async def mongo_down(name):
+        raise ConnectionError("MongoDB unreachable")
+
+    monkeypatch.setattr(locks.database, "get_next_sequence", mongo_down)
+
+    with pytest.raises(ConnectionError):
+        await locks.try_acquire("exchanger:1", "owner-a", ttl=5)
+    assert await redis.get("lock:exchanger:1") is None
+
+
+async def test_only_owner_can_renew_or_release(db, redis):
+    await locks.try_acquire("exchanger:1", "owner-a", ttl=5)
+
+    assert not await locks.renew("exchanger:1", "owner-b", ttl=5)
+    assert not await locks.release("exchanger:1", "owner-b")
+    assert await locks.renew("exchanger:1", "owner-a", ttl=5)
+    assert await locks.release("exchanger:1", "owner-a")
+    assert await redis.get("lock:exchanger:1") is None
+
+
+async def test_lease_times_out_while_held_by_another_task(db, redis):
+    held, done = asyncio.Event(), asyncio.Event()
+
+    async def holder():
+        async with lease_lock("exchanger:1") as lease:
+            held.set()
+            await done.wait()
+        return lease
+
+    task = asyncio.create_task(holder())
+    await held.wait()
+    with pytest.raises(LockAcquireTimeout):
+        async with lease_lock("exchanger:1", timeout=0.05):
+            pass
+
+    done.set()
+    first = await task
+    async with lease_lock("exchanger:1", timeout=0.05) as second:
+        assert second.distributed
+        assert second.token > first.token
+
+
+async def test_lease_reentrant_within_task(db, redis):
+    async with lease_lock("exchanger:1") as outer:
+        async with lease_lock("exchanger:1", timeout=0.05) as inner:
+            assert inner is outer
+
+
+async def test_lease_serialises_tasks(db, redis):
+    inside = []
+
+    async def critical(n):
+        async with lease_lock("exchanger:1"):
+            inside.append(n)
+            assert len(inside) == 1
+            await asyncio.sleep(0.01)
+            inside.remove(n)
+
+    await asyncio.gather(*(critical(n) for n in range(5)))
+
+
+async def test_falls_back_to_local_lock_without_redis(monkeypatch):
+    monkeypatch.setattr(redis_module, "redis_client", None)
+
+    async with lease_lock("exchanger:1") as lease:
+        assert not lease.distributed
+        assert lease.fence is None
+
+
+async def test_versioned_update_bumps_version(db):
+    await db.deposits.insert_one({"user_id": "1", "balance": 1})
+
+    updated = await versioned_update(db.deposits, {"user_id": "1"}, lambda doc: {"balance": doc["balance"] + 1})
+
+    assert updated["balance"] == 2
+    assert updated["version"] == 1
+
+
+async def test_versioned_update_rejects_older_fence(db):
+    await db.deposits.insert_one({"user_id": "1", "balance": 1})
+    await versioned_update(db.deposits, {"user_id": "1"}, lambda doc: {"balance": 2}, fence=7)
+
+    with pytest.raises(StaleLeaseError):
+        await versioned_update(db.deposits, {"user_id": "1"}, lambda doc: {"balance": 3}, fence=6)
+
+    assert (await db.deposits.find_one({"user_id": "1"}))["balance"] == 2
+
+
+class LaggingReads:
+    """Collection whose reads are always one version behind, as if another writer got in first"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def find_one(self, *args, **kwargs):
+        doc = await self.collection.find_one(*args, **kwargs)
+        return doc and {**doc, "version": doc["version"] - 1}
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+
+async def test_versioned_update_gives_up_after_lost_races(db):
+    await db.deposits.insert_one({"user_id": "1", "balance": 1, "version": 5})
+
+    with pytest.raises(ConcurrentUpdateError):
+        await versioned_update(LaggingReads(db.deposits), {"user_id": "1"}, lambda doc: {"balance": 2}, max_attempts=3)
+
+    assert (await db.deposits.find_one({"user_id": "1"}))["balance"] == 1
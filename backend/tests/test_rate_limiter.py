@@ -0,0 +1,105 @@
+"""
+RateLimiter: each algorithm allows up to the limit then denies, recovers
+once the window passes, keeps its state under rate_limit:{algorithm}:{key},
+and short-circuits known-denied keys in process
+"""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("fakeredis")
+
+from app.core import redis as redis_module
+from app.core.rate_limiter import GCRA, SLIDING_WINDOW, TOKEN_BUCKET, RateLimiter
+
+ALGORITHMS = [SLIDING_WINDOW, GCRA, TOKEN_BUCKET]
+
+
+@pytest.fixture(params=ALGORITHMS)
+def limiter(request, redis):
+    return RateLimiter(request.param)
+
+
+async def test_allows_up_to_limit_then_denies(limiter):
+    results = [await limiter.hit("user:1", max_requests=3, window_seconds=60) for _ in range(4)]
+
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert [result.remaining for result in results[:3]] == [2, 1, 0]
+    denied = results[3]
+    assert 0 < denied.retry_after_ms <= 60000
+    assert 1 <= denied.retry_after <= 60
+
+
+async def test_keys_are_limited_separately(limiter):
+    assert (await limiter.hit("user:1", max_requests=1, window_seconds=60)).allowed
+    assert not (await limiter.hit("user:1", max_requests=1, window_seconds=60)).allowed
+    assert (await limiter.hit("user:2", max_requests=1, window_seconds=60)).allowed
+
+
+async def test_allowed_again_after_window(limiter):
+    for _ in range(2):
+        await limiter.hit("user:1", max_requests=2, window_seconds=0.2)
+    assert not (await limiter.hit("user:1", max_requests=2, window_seconds=0.2)).allowed
+
+    await asyncio.sleep(0.25)
+
+    assert (await limiter.hit("user:1", max_requests=2, window_seconds=0.2)).allowed
+
+
+async def test_state_kept_under_algorithm_key(limiter, redis):
+    await limiter.hit("user:1", max_requests=5, window_seconds=60)
+
+    key = f"rate_limit:{limiter.algorithm}:user:1"
+    assert await redis.exists(key) == 1
+    assert 0 < await redis.pttl(key) <= 61000
+    assert await redis.keys("rate_limit:*") == [key]
+
+
+async def test_algorithm_override_uses_its_own_key(redis):
+    limiter = RateLimiter(SLIDING_WINDOW)
+
+    await limiter.hit("user:1", max_requests=5, window_seconds=60, algorithm=GCRA)
+
+    assert await redis.keys("rate_limit:*") == ["rate_limit:gcra:user:1"]
+
+
+async def test_denied_key_rejected_locally_until_retry_time(limiter):
+    for _ in range(2):
+        await limiter.hit("user:1", max_requests=1, window_seconds=60)
+    checks = limiter.stats["redis_checks"]
+
+    result = await limiter.hit("user:1", max_requests=1, window_seconds=60)
+
+    assert not result.allowed
+    assert result.local
+    assert limiter.stats["redis_checks"] == checks
+    assert limiter.stats["local_rejections"] == 1
+
+
+async def test_reset_clears_every_algorithm(redis):
+    limiter = RateLimiter()
+    for algorithm in ALGORITHMS:
+        for _ in range(2):
+            await limiter.hit("user:1", max_requests=1, window_seconds=60, algorithm=algorithm)
+
+    await limiter.reset_rate_limit("user:1")
+
+    assert await redis.keys("rate_limit:*") == []
+    for algorithm in ALGORITHMS:
+        assert (await limiter.hit("user:1", max_requests=1, window_seconds=60, algorithm=algorithm)).allowed
+
+
+async def test_fails_open_without_redis(monkeypatch):
+    monkeypatch.setattr(redis_module, "redis_client", None)
+    limiter = RateLimiter()
+
+    result = await limiter.hit("user:1", max_requests=1, window_seconds=60)
+
+    assert result.allowed
+    assert limiter.stats["errors"] == 1
+
+
+def test_unknown_algorithm_rejected():
+    with pytest.raises(ValueError):
+        RateLimiter("leaky_bucket")
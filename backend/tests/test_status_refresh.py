@@ -0,0 +1,152 @@
+"""
+StatusRefresher: due selection, adaptive intervals, failed lookups, and
+conflicts with a concurrent writer (transition side effects only run for
+the writes a tick actually applied)
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("mongomock_motor")
+
+from app.core.status_refresh import StatusRefresher
+
+
+class Provider:
+    """Fake provider lookup: returns the next status per record, None for failures"""
+
+    def __init__(self, statuses=None, failing=()):
+        self.statuses = statuses or {}
+        self.failing = set(failing)
+        self.checked = []
+        self.during_check = None
+
+    async def __call__(self, record):
+        self.checked.append(record["_id"])
+        if self.during_check:
+            await self.during_check(record)
+        if record["_id"] in self.failing:
+            return None
+        return {"status": self.statuses.get(record["_id"], record["status"]), "last_status_check": datetime.utcnow()}
+
+
+class Transitions:
+    def __init__(self):
+        self.applied = []
+
+    async def __call__(self, record, update):
+        self.applied.append((record["_id"], record["status"], update["status"]))
+
+
+def make_refresher(provider, transitions=None):
+    return StatusRefresher(
+        name="Test refresh",
+        collection="records",
+        active_statuses=["pending", "processing"],
+        check=provider,
+        on_transition=transitions
+    )
+
+
+async def insert(db, _id, status="pending", age=timedelta(minutes=5), next_check_at=None):
+    now = datetime.utcnow()
+    await db.records.insert_one({
+        "_id": _id,
+        "status": status,
+        "created_at": now - age,
+        "next_check_at": next_check_at
+    })
+
+
+def test_interval_follows_record_age():
+    refresher = make_refresher(Provider())
+    now = datetime.utcnow()
+
+    def interval(age, changed=False):
+        return refresher.next_check_at({"created_at": now - age}, now, changed) - now
+
+    assert interval(timedelta(minutes=5)) == timedelta(minutes=1)
+    assert interval(timedelta(hours=1)) == timedelta(minutes=5)
+    assert interval(timedelta(hours=3)) == timedelta(minutes=15)
+    assert interval(timedelta(days=2)) == timedelta(hours=1)
+    assert interval(timedelta(days=2), changed=True) == timedelta(minutes=1)
+
+
+async def test_only_due_active_records_checked(db):
+    now = datetime.utcnow()
+    await insert(db, "due", next_check_at=now - timedelta(seconds=1))
+    await insert(db, "never_checked")
+    await insert(db, "later", next_check_at=now + timedelta(minutes=5))
+    await insert(db, "done", status="completed")
+    provider = Provider()
+
+    result = await make_refresher(provider).run_due()
+
+    assert sorted(provider.checked) == ["due", "never_checked"]
+    assert result["checked"] == 2
+    rescheduled = await db.records.find_one({"_id": "never_checked"})
+    assert rescheduled["next_check_at"] > now
+
+
+async def test_applied_transition_runs_side_effects_once(db):
+    await insert(db, "a")
+    await insert(db, "b")
+    transitions = Transitions()
+    refresher = make_refresher(Provider(statuses={"a": "processing"}), transitions)
+
+    result = await refresher.run_due()
+
+    assert result["transitions"] == 1
+    assert transitions.applied == [("a", "pending", "processing")]
+    assert (await db.records.find_one({"_id": "a"}))["status"] == "processing"
+
+    # Not due again until its next check
+    assert (await refresher.run_due())["checked"] == 0
+    assert len(transitions.applied) == 1
+
+
+async def test_concurrent_write_wins_over_tick(db):
+    await insert(db, "a")
+    transitions = Transitions()
+    provider = Provider(statuses={"a": "processing"})
+
+    async def webhook_lands(record):
+        await db.records.update_one({"_id": record["_id"]}, {"$set": {"status": "completed"}})
+
+    provider.during_check = webhook_lands
+    refresher = make_refresher(provider, transitions)
+
+    result = await refresher.run_due()
+
+    assert result["transitions"] == 0
+    assert transitions.applied == []
+    assert refresher.stats["conflicts"] == 1
+    assert (await db.records.find_one({"_id": "a"}))["status"] == "completed"
+
+
+async def test_failed_lookup_rescheduled_without_status_change(db):
+    await insert(db, "a", age=timedelta(hours=3))
+    transitions = Transitions()
+    refresher = make_refresher(Provider(statuses={"a": "processing"}, failing={"a"}), transitions)
+
+    before = datetime.utcnow().replace(microsecond=0)  # Stored datetimes have millisecond precision
+    result = await refresher.run_due()
+
+    assert result["failed"] == 1
+    assert transitions.applied == []
+    record = await db.records.find_one({"_id": "a"})
+    assert record["status"] == "pending"
+    assert record["next_check_at"] >= before + timedelta(minutes=15)
+
+
+async def test_failing_transition_handler_does_not_stop_tick(db):
+    await insert(db, "a")
+    await insert(db, "b")
+
+    async def broken(record, update):
+        raise RuntimeError("notification failed")
+
+    result = await make_refresher(Provider(statuses={"a": "processing", "b": "processing"}), broken).run_due()
+
+    assert result["transitions"] == 2
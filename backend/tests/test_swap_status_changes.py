@@ -0,0 +1,75 @@
+"""
+Swap status change feed: cursors, and a named consumer resuming after a
+restart without losing the changes made while it was down
+"""
+
+import pytest
+
+pytest.importorskip("mongomock_motor")
+pytest.importorskip("fakeredis")
+
+from bson import ObjectId
+
+from app.services.afroo_swap_service import AfrooSwapService
+
+
+async def publish(status: str, previous: str = "waiting") -> str:
+    swap = {"_id": ObjectId(), "user_id": ObjectId(), "status": previous, "discord_channel_id": "123"}
+    return await AfrooSwapService.publish_status_change(swap, {"status": status, "changenow_status": status})
+
+
+async def read(since=None, consumer=None):
+    return await AfrooSwapService.get_status_changes(since, block_ms=0, consumer=consumer)
+
+
+async def test_first_read_starts_at_newest_change(redis):
+    assert await read() == {"events": [], "cursor": "0-0"}
+
+    latest = await publish("confirming")
+    assert await read() == {"events": [], "cursor": latest}
+
+
+async def test_cursor_returns_only_later_changes(redis):
+    cursor = (await read())["cursor"]
+    await publish("confirming")
+    await publish("exchanging", previous="confirming")
+
+    result = await read(cursor)
+
+    assert [event["status"] for event in result["events"]] == ["confirming", "exchanging"]
+    assert result["events"][0]["channel_id"] == "123"
+    assert (await read(result["cursor"]))["events"] == []
+
+
+async def test_consumer_resumes_after_restart(redis):
+    cursor = (await read(consumer="swap-monitor"))["cursor"]
+    await publish("confirming")
+    cursor = (await read(cursor, consumer="swap-monitor"))["cursor"]
+
+    # Acknowledges the first change, then restarts while another lands
+    await read(cursor, consumer="swap-monitor")
+    await publish("exchanging", previous="confirming")
+
+    result = await read(consumer="swap-monitor")
+    assert [event["status"] for event in result["events"]] == ["exchanging"]
+
+
+async def test_unacknowledged_changes_are_read_again_after_restart(redis):
+    cursor = (await read(consumer="swap-monitor"))["cursor"]
+    await publish("confirming")
+    await read(cursor, consumer="swap-monitor")
+
+    # Crashed before passing the new cursor back
+    result = await read(consumer="swap-monitor")
+    assert [event["status"] for event in result["events"]] == ["confirming"]
+
+
+async def test_consumers_keep_separate_cursors(redis):
+    await read(consumer="a")
+    await read(consumer="b")
+    await publish("confirming")
+    cursor_a = (await read("0-0", consumer="a"))["cursor"]
+    await read(cursor_a, consumer="a")
+
+    assert (await read(consumer="a"))["events"] == []
+    assert len((await read(consumer="b"))["events"]) == 1
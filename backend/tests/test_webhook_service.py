@@ -0,0 +1,327 @@
+"""
+Tatum webhook ingestion: duplicate and redelivered deposits are credited
+exactly once, whether they repeat within a batch, across batches, or after a
+worker died part way through a batch; a bad event fails on its own
+"""
+
+from decimal import Decimal
+import json
+import time
+
+import pytest
+
+pytest.importorskip("mongomock_motor")
+pytest.importorskip("fakeredis")
+
+from bson import ObjectId
+
+from app.core.redis import RedisKeys
+from app.services import webhook_service
+from app.services.price_service import PriceSnapshot
+from app.services.webhook_service import DepositAddressIndex, WebhookIngestor, WebhookService
+
+EXCHANGER_ID = ObjectId()
+ADDRESS = "LdepositAddress1"
+
+
+@pytest.fixture
+async def deposit(db, redis, monkeypatch):
+    await db.blockchain_transactions.create_index("tx_hash", unique=True)
+    await db.exchanger_deposits.insert_one({
+        "user_id": EXCHANGER_ID,
+        "asset": "LTC",
+        "address": ADDRESS,
+        "balance_units": 0.0,
+        "balance_usd": 0.0
+    })
+
+    monkeypatch.setattr(webhook_service, "address_index", DepositAddressIndex())
+    prices = webhook_service.crypto_prices
+    monkeypatch.setattr(prices, "snapshot", PriceSnapshot({"LTC": Decimal("80")}, time.time(), 600))
+    monkeypatch.setattr(prices, "_checked_at", time.monotonic())
+
+
+def tatum_event(tx_hash: str, amount: str = "0.5", **fields) -> dict:
+    return {
+        "chain": "litecoin",
+        "txId": tx_hash,
+        "from": "LsenderAddress",
+        "to": ADDRESS,
+        "amount": amount,
+        "confirmations": 3,
+        **fields
+    }
+
+
+async def get_deposit(db) -> dict:
+    return await db.exchanger_deposits.find_one({"user_id": EXCHANGER_ID, "asset": "LTC"})
+
+
+# ====================
+# process_events
+# ====================
+
+async def test_deposit_credited(db, deposit):
+    results = await WebhookService.process_events([tatum_event("tx1")])
+
+    assert results[0]["status"] == "credited"
+    assert results[0]["amount_usd"] == 40.0
+
+    credited = await get_deposit(db)
+    assert credited["balance_units"] == 0.5
+    assert credited["balance_usd"] == 40.0
+    assert credited["credited_tx_hashes"] == ["tx1"]
+    assert (await db.blockchain_transactions.find_one({"tx_hash": "tx1"}))["status"] == "confirmed"
+
+
+async def test_batch_of_deposits_credited_together(db, deposit):
+    results = await WebhookService.process_events([tatum_event("tx1"), tatum_event("tx2", amount="0.25")])
+
+    assert [result["status"] for result in results] == ["credited", "credited"]
+    assert (await get_deposit(db))["balance_units"] == 0.75
+    assert await db.audit_logs.count_documents({"action": "deposit.credited"}) == 2
+
+
+async def test_duplicate_within_batch_credited_once(db, deposit):
+    results = await WebhookService.process_events([tatum_event("tx1"), tatum_event("tx1")])
+
+    assert [result["status"] for result in results] == ["credited", "duplicate"]
+    assert (await get_deposit(db))["balance_units"] == 0.5
+
+
+async def test_redelivered_webhook_credited_once(db, deposit):
+    await WebhookService.process_events([tatum_event("tx1")])
+    results = await WebhookService.process_events([tatum_event("tx1"), tatum_event("tx2")])
+
+    assert [result["status"] for result in results] == ["duplicate", "credited"]
+    assert (await get_deposit(db))["balance_units"] == 1.0
+    assert await db.blockchain_transactions.count_documents({}) == 2
+
+
+async def test_recorded_but_uncredited_transaction_is_credited(db, deposit):
+    # A worker inserted the row and died before crediting it
+    await db.blockchain_transactions.insert_one({
+        "user_id": EXCHANGER_ID,
+        "type": "deposit",
+        "asset": "LTC",
+        "amount_units": 0.5,
+        "amount_usd": 40.0,
+        "tx_hash": "tx1",
+        "status": "received"
+    })
+
+    results = await WebhookService.process_events([tatum_event("tx1")])
+
+    assert results[0]["status"] == "credited"
+    assert (await get_deposit(db))["balance_units"] == 0.5
+    assert (await db.blockchain_transactions.find_one({"tx_hash": "tx1"}))["status"] == "confirmed"
+
+
+async def test_credited_but_unconfirmed_transaction_not_credited_again(db, deposit):
+    await WebhookService.process_events([tatum_event("tx1")])
+    # A worker credited the deposit and died before marking the row confirmed
+    await db.blockchain_transactions.update_one({"tx_hash": "tx1"}, {"$set": {"status": "received"}})
+
+    results = await WebhookService.process_events([tatum_event("tx1")])
+
+    assert results[0]["status"] == "duplicate"
+    assert (await get_deposit(db))["balance_units"] == 0.5
+
+
+async def test_unconfirmed_and_foreign_transactions_not_credited(db, deposit):
+    results = await WebhookService.process_events([
+        tatum_event("tx1", confirmations=0),
+        tatum_event("tx2", to="LsomeoneElse"),
+        tatum_event("tx3", chain="dogecoin"),
+        tatum_event(None)
+    ])
+
+    assert [result["status"] for result in results] == ["pending", "ignored", "ignored", "ignored"]
+    assert (await get_deposit(db))["balance_units"] == 0.0
+    assert await db.blockchain_transactions.count_documents({}) == 0
+
+
+async def test_malformed_numbers_are_invalid_not_fatal(db, deposit):
+    results = await WebhookService.process_events([
+        tatum_event("tx1", amount=None),
+        tatum_event("tx2", amount="0"),
+        tatum_event("tx3", confirmations="many"),
+        tatum_event("tx4", confirmations="3")
+    ])
+
+    assert [result["status"] for result in results] == ["invalid", "invalid", "invalid", "credited"]
+    assert (await get_deposit(db))["balance_units"] == 0.5
+
+
+# ====================
+# USD backfill
+# ====================
+
+@pytest.fixture
+def no_price(deposit, monkeypatch):
+    monkeypatch.setattr(webhook_service.crypto_prices, "snapshot", PriceSnapshot({}, time.time(), 600))
+
+
+@pytest.fixture
+def historical_price(monkeypatch):
+    async def price(asset, day):
+        return Decimal("100")
+
+    monkeypatch.setattr(WebhookService, "_historical_price", price)
+
+
+async def test_deposit_credited_without_price_gets_usd_from_backfill(db, deposit, no_price, historical_price):
+    results = await WebhookService.process_events([tatum_event("tx1")])
+    assert results[0]["status"] == "credited"
+    assert results[0]["amount_usd"] is None
+    assert (await get_deposit(db))["balance_usd"] == 0.0
+
+    result = await WebhookService.backfill_usd_values()
+
+    assert result["revalued"] == 1
+    assert result["deposits_credited"] == 1
+    credited = await get_deposit(db)
+    assert credited["balance_usd"] == 50.0
+    assert credited["claim_limit_usd"] == 50.0
+
+    # Re-running changes nothing
+    assert (await WebhookService.backfill_usd_values())["pending"] == 0
+    assert (await get_deposit(db))["balance_usd"] == 50.0
+
+
+async def test_backfill_leaves_deposits_credited_at_a_price_alone(db, deposit, historical_price):
+    # Recorded with the old hard-coded rates: re-valued, but its USD was already credited
+    await db.blockchain_transactions.insert_one({
+        "user_id": EXCHANGER_ID,
+        "type": "deposit",
+        "asset": "LTC",
+        "amount_units": 0.5,
+        "amount_usd": 35.0,
+        "price_at": None,
+        "tx_hash": "tx1",
+        "status": "confirmed"
+    })
+
+    result = await WebhookService.backfill_usd_values()
+
+    assert result["revalued"] == 1
+    assert result["deposits_credited"] == 0
+    assert (await get_deposit(db))["balance_usd"] == 0.0
+
+
+async def test_unpriced_deposit_waits_for_a_later_backfill(db, deposit, no_price, monkeypatch):
+    await WebhookService.process_events([tatum_event("tx1")])
+
+    async def no_history(asset, day):
+        return None
+
+    monkeypatch.setattr(WebhookService, "_historical_price", no_history)
+    assert (await WebhookService.backfill_usd_values())["skipped"] == 1
+
+    async def price(asset, day):
+        return Decimal("100")
+
+    monkeypatch.setattr(WebhookService, "_historical_price", price)
+    assert (await WebhookService.backfill_usd_values())["deposits_credited"] == 1
+    assert (await get_deposit(db))["balance_usd"] == 50.0
+
+
+# ====================
+# WebhookIngestor
+# ====================
+
+@pytest.fixture
+async def ingestor(redis, monkeypatch):
+    ingestor = WebhookIngestor()
+    monkeypatch.setattr(ingestor, "BLOCK_MS", 10)
+    await ingestor._ensure_group(redis)
+    return ingestor
+
+
+async def enqueue(event: dict) -> str:
+    return await WebhookService.enqueue(json.dumps(event).encode())
+
+
+async def pending_count(redis) -> int:
+    return (await redis.xpending(RedisKeys.TATUM_WEBHOOK_EVENTS, WebhookService.STREAM_GROUP))["pending"]
+
+
+async def test_ingested_batch_is_acked(db, deposit, redis, ingestor):
+    await enqueue(tatum_event("tx1"))
+    await enqueue(tatum_event("tx1"))
+
+    await ingestor._handle(redis, await ingestor._read(redis, "worker-1"))
+
+    assert (await get_deposit(db))["balance_units"] == 0.5
+    assert await pending_count(redis) == 0
+    assert ingestor.stats["credited"] == 1
+    assert ingestor.stats["duplicates"] == 1
+
+
+async def test_failed_batch_is_redelivered_and_credited_once(db, deposit, redis, ingestor, monkeypatch):
+    await enqueue(tatum_event("tx1"))
+
+    async def crash(events):
+        raise RuntimeError("worker died")
+
+    # First delivery fails and stays pending
+    with monkeypatch.context() as patch:
+        patch.setattr(WebhookService, "process_events", crash)
+        await ingestor._handle(redis, await ingestor._read(redis, "worker-1"))
+    assert await pending_count(redis) == 1
+    assert ingestor.stats["failed_batches"] == 1
+
+    # Another worker reclaims it once it has been idle long enough
+    monkeypatch.setattr(ingestor, "CLAIM_IDLE_MS", 0)
+    entries = await ingestor._read(redis, "worker-2")
+    assert len(entries) == 1
+    await ingestor._handle(redis, entries)
+
+    assert (await get_deposit(db))["balance_units"] == 0.5
+    assert await pending_count(redis) == 0
+
+
+async def test_unparseable_webhook_is_dead_lettered(redis, ingestor):
+    await redis.xadd(RedisKeys.TATUM_WEBHOOK_EVENTS, {"body": "{not json"})
+
+    await ingestor._handle(redis, await ingestor._read(redis, "worker-1"))
+
+    assert await redis.xlen(RedisKeys.TATUM_WEBHOOK_EVENTS_DEAD) == 1
+    assert await pending_count(redis) == 0
+
+
+async def test_invalid_event_dead_lettered_alone(db, deposit, redis, ingestor):
+    await enqueue(tatum_event("tx1", amount=None))
+    await enqueue(tatum_event("tx2"))
+
+    await ingestor._handle(redis, await ingestor._read(redis, "worker-1"))
+
+    assert (await get_deposit(db))["balance_units"] == 0.5
+    assert await pending_count(redis) == 0
+    dead = await redis.xrange(RedisKeys.TATUM_WEBHOOK_EVENTS_DEAD)
+    assert len(dead) == 1
+    assert json.loads(dead[0][1]["body"])["txId"] == "tx1"
+
+
+async def test_event_failing_batch_does_not_hold_back_the_rest(db, deposit, redis, ingestor, monkeypatch):
+    process_events = WebhookService.process_events
+
+    async def fails_on_bad(events):
+        if any(event["txId"] == "bad" for event in events):
+            raise RuntimeError("bad event")
+        return await process_events(events)
+
+    monkeypatch.setattr(WebhookService, "process_events", fails_on_bad)
+    await enqueue(tatum_event("tx1"))
+    await enqueue(tatum_event("bad"))
+    await enqueue(tatum_event("tx2"))
+
+    await ingestor._handle(redis, await ingestor._read(redis, "worker-1"))
+
+    assert (await get_deposit(db))["balance_units"] == 1.0
+    assert ingestor.stats["failed_events"] == 1
+    # Only the failing event is left for redelivery (and, eventually, the dead-letter stream)
+    pending = await redis.xpending_range(RedisKeys.TATUM_WEBHOOK_EVENTS, WebhookService.STREAM_GROUP, "-", "+", 10)
+    assert len(pending) == 1
+    body = (await redis.xrange(RedisKeys.TATUM_WEBHOOK_EVENTS, pending[0]["message_id"], pending[0]["message_id"]))[0][1]["body"]
+    assert json.loads(body)["txId"] == "bad"
@@ -1214,6 +1214,61 @@ class APIClient:
         data = await self.get("/api/v1/afroo-swaps/supported-assets")
         return data.get("assets", [])
 
+    async def afroo_swap_set_channel(
+        self,
+        swap_id: str,
+        channel_id: str,
+        user_id: str,
+        discord_roles: List[int]
+    ) -> Dict[str, Any]:
+        """
+        Record the Discord channel of a swap ticket
+
+        Args:
+            swap_id: Swap ID
+            channel_id: Discord channel ID
+            user_id: Discord user ID (swap owner)
+            discord_roles: User's role IDs
+        """
+        return await self.post(
+            f"/api/v1/afroo-swaps/{swap_id}/channel",
+            data={"channel_id": channel_id},
+            discord_user_id=user_id,
+            discord_roles=discord_roles
+        )
+
+    async def afroo_swap_get_changes(
+        self,
+        since: Optional[str] = None,
+        consumer: Optional[str] = None,
+        block_ms: int = 15000,
+        count: int = 100
+    ) -> Dict[str, Any]:
+        """
+        Long-poll swap status changes
+
+        Args:
+            since: Cursor from the previous call (None resumes the consumer's
+                saved cursor, or starts from now)
+            consumer: Name the API saves the cursor under
+            block_ms: How long the API waits for a change
+            count: Maximum changes to return
+
+        Returns:
+            Dict with events (swap_id, channel_id, status, previous_status, ...) and cursor
+        """
+        params = {"block_ms": block_ms, "count": count}
+        if since:
+            params["since"] = since
+        if consumer:
+            params["consumer"] = consumer
+
+        return await self.get(
+            "/api/v1/afroo-swaps/changes",
+            params=params,
+            discord_user_id="SYSTEM"
+        )
+
     # =======================
     # AutoMM / Escrow Operations
     # =======================
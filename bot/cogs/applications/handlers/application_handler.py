@@ -15,6 +15,7 @@ from config import config
 from utils.embeds import create_themed_embed, error_embed
 from utils.colors import PURPLE_GRADIENT, ERROR_RED
 from utils.support_transcript import generate_support_transcript_html
+from utils.render_pool import render
 
 logger = logging.getLogger(__name__)
 
@@ -724,7 +725,8 @@ async def save_application_transcript(
             messages.append(message)
 
         # Generate transcript HTML
-        html_transcript = generate_support_transcript_html(
+        html_transcript = await render(
+            generate_support_transcript_html,
             ticket_number=app_number,
             ticket_type=app_type,
             messages=messages,
@@ -743,6 +745,8 @@ async def save_application_transcript(
             upload_url = f"{api_base}/api/v1/transcripts/upload"
             bot_token = config.BOT_SERVICE_TOKEN
 
+            from utils.transcript_upload import transcript_upload_form
+
             upload_data = {
                 "ticket_id": str(app_number),
                 "ticket_type": "application",
@@ -756,10 +760,9 @@ async def save_application_transcript(
             async with aiohttp.ClientSession() as session:
                 async with session.post(
                     upload_url,
-                    json=upload_data,
+                    data=await transcript_upload_form(upload_data),
                     headers={
-                        'X-Bot-Token': bot_token,
-                        'Content-Type': 'application/json'
+                        'X-Bot-Token': bot_token
                     }
                 ) as response:
                     if response.status in [200, 201]:
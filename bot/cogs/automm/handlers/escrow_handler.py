@@ -2,11 +2,10 @@
 import logging
 import discord
 import asyncio
-import io
-import qrcode
 from discord.ui import View, Button, Modal, InputText
 from utils.embeds import create_themed_embed, create_success_embed
 from utils.colors import PURPLE_GRADIENT, SUCCESS_GREEN, ERROR_RED
+from utils.qr_generator import create_qr_discord_file_async
 from config import config
 
 logger = logging.getLogger(__name__)
@@ -174,17 +173,12 @@ class EscrowControlsView(View):
 
         try:
             # Generate QR code
-            qr = qrcode.QRCode(version=1, box_size=10, border=4)
-            qr.add_data(self.deposit_address)
-            qr.make(fit=True)
-
-            img = qr.make_image(fill_color="black", back_color="white")
-
-            buffer = io.BytesIO()
-            img.save(buffer, format="PNG")
-            buffer.seek(0)
-
-            file = discord.File(buffer, filename=f"escrow_qr_{self.escrow_id[-8:]}.png")
+            file = await create_qr_discord_file_async(
+                self.deposit_address,
+                filename=f"escrow_qr_{self.escrow_id[-8:]}.png"
+            )
+            if not file:
+                raise RuntimeError("QR rendering unavailable")
 
             embed = create_themed_embed(
                 title="",
@@ -898,6 +892,7 @@ async def generate_transcript(bot, channel, escrow_id, buyer_member, seller_memb
     """Generate branded HTML transcript using support_transcript system"""
     try:
         from utils.support_transcript import generate_support_transcript_html
+        from utils.render_pool import render
         from datetime import datetime
 
         # Collect all messages
@@ -931,7 +926,8 @@ async def generate_transcript(bot, channel, escrow_id, buyer_member, seller_memb
             opened_at = datetime.utcnow()
 
         # Generate HTML
-        html_content = generate_support_transcript_html(
+        html_content = await render(
+            generate_support_transcript_html,
             ticket_number=int(mm_id, 16) % 100000,  # Convert hex to readable number
             ticket_type="AutoMM_Escrow",
             messages=messages,
@@ -967,6 +963,8 @@ async def upload_transcript_to_url(escrow_id, transcript_html):
         # Bot service token for authentication
         bot_token = config.config.BOT_SERVICE_TOKEN
 
+        from utils.transcript_upload import transcript_upload_form
+
         # Prepare upload data
         upload_data = {
             "ticket_id": escrow_id,
@@ -982,10 +980,9 @@ async def upload_transcript_to_url(escrow_id, transcript_html):
         async with aiohttp.ClientSession() as session:
             async with session.post(
                 upload_url,
-                json=upload_data,
+                data=await transcript_upload_form(upload_data),
                 headers={
-                    'X-Bot-Token': bot_token,
-                    'Content-Type': 'application/json'
+                    'X-Bot-Token': bot_token
                 }
             ) as response:
                 if response.status in [200, 201]:
@@ -20,6 +20,8 @@ class RoleSyncCog(commands.Cog):
     Events:
         - on_member_update: Sync roles when they change
         - on_member_join: Sync roles when member joins
+
+    Full guild sweeps are done by tasks.role_sync.RoleSyncTask
     """
 
     def __init__(self, bot: discord.Bot):
@@ -27,36 +29,48 @@ class RoleSyncCog(commands.Cog):
         self.api: APIClient = bot.api_client
         logger.info("✅ Role sync system initialized")
 
+    def _queue(self, member: discord.Member) -> bool:
+        """Hand the member to the bulk role sync task if it is running"""
+        task = getattr(self.bot, "role_sync_task", None)
+        if task and task.running:
+            task.queue_member(member)
+            return True
+        return False
+
+    async def _sync_member(self, member: discord.Member):
+        """Sync a single member directly (used when the bulk task is not running)"""
+        role_ids = [role.id for role in member.roles]
+        await self.api.post(
+            "/api/v1/users/sync-roles",
+            data={
+                "discord_id": str(member.id),
+                "role_ids": role_ids,
+                "username": member.name,
+                "discriminator": member.discriminator,
+                "global_name": member.global_name if hasattr(member, 'global_name') else None
+            },
+            discord_user_id=str(member.id),
+            discord_roles=role_ids
+        )
+
     @commands.Cog.listener()
     async def on_member_update(self, before: discord.Member, after: discord.Member):
         """
         Sync roles when member's roles change
 
-        This ensures the API has up-to-date permission information
+        Changes are batched by the role sync task; the full sweep on startup
+        and every 3 hours covers anything missed.
         """
         # Check if roles changed
         if before.roles != after.roles:
-            try:
-                # Extract role IDs
-                role_ids = [role.id for role in after.roles]
-
-                # Sync to API
-                await self.api.post(
-                    "/api/v1/users/sync-roles",
-                    data={
-                        "discord_id": str(after.id),
-                        "role_ids": role_ids,
-                        "username": after.name,
-                        "discriminator": after.discriminator,
-                        "global_name": after.global_name if hasattr(after, 'global_name') else None
-                    },
-                    discord_user_id=str(after.id),
-                    discord_roles=role_ids
-                )
+            if self._queue(after):
+                return
 
+            try:
+                await self._sync_member(after)
                 logger.info(
                     f"✅ Synced roles for {after.name} "
-                    f"({len(role_ids)} roles)"
+                    f"({len(after.roles)} roles)"
                 )
 
             except APIError as e:
@@ -72,24 +86,11 @@ class RoleSyncCog(commands.Cog):
 
         Creates user in database if they don't exist
         """
-        try:
-            # Extract role IDs
-            role_ids = [role.id for role in member.roles]
-
-            # Sync to API (will create user if doesn't exist)
-            await self.api.post(
-                "/api/v1/users/sync-roles",
-                data={
-                    "discord_id": str(member.id),
-                    "role_ids": role_ids,
-                    "username": member.name,
-                    "discriminator": member.discriminator,
-                    "global_name": member.global_name if hasattr(member, 'global_name') else None
-                },
-                discord_user_id=str(member.id),
-                discord_roles=role_ids
-            )
+        if self._queue(member):
+            return
 
+        try:
+            await self._sync_member(member)
             logger.info(f"✅ Synced new member: {member.name}")
 
         except APIError as e:
@@ -98,55 +99,6 @@ class RoleSyncCog(commands.Cog):
                 exc_info=True
             )
 
-    @commands.Cog.listener()
-    async def on_ready(self):
-        """
-        Sync all members on bot startup (optional, can be resource-intensive)
-
-        Only runs if bot is not already synced
-        """
-        if hasattr(self.bot, '_roles_synced'):
-            return  # Already synced
-
-        logger.info("🔄 Starting initial role sync...")
-
-        try:
-            guild = self.bot.guilds[0]  # Assuming single guild
-            synced = 0
-            failed = 0
-
-            for member in guild.members:
-                try:
-                    role_ids = [role.id for role in member.roles]
-
-                    await self.api.post(
-                        "/api/v1/users/sync-roles",
-                        data={
-                            "discord_id": str(member.id),
-                            "role_ids": role_ids,
-                            "username": member.name,
-                            "discriminator": member.discriminator,
-                            "global_name": member.global_name if hasattr(member, 'global_name') else None
-                        },
-                        discord_user_id=str(member.id),
-                        discord_roles=role_ids
-                    )
-
-                    synced += 1
-
-                except APIError as e:
-                    logger.warning(f"Failed to sync {member.name}: {e}")
-                    failed += 1
-
-            self.bot._roles_synced = True
-            logger.info(
-                f"✅ Initial role sync complete: "
-                f"{synced} synced, {failed} failed"
-            )
-
-        except Exception as e:
-            logger.error(f"❌ Initial role sync failed: {e}", exc_info=True)
-
 
 def setup(bot: discord.Bot):
     """Required function to load cog"""
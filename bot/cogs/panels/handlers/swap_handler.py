@@ -105,6 +105,17 @@ async def create_swap_ticket(
 
         logger.info(f"Created swap channel: #{swap_channel.name} ({swap_channel.id})")
 
+        # Status changes and the completion notice are routed by this mapping
+        try:
+            await api.afroo_swap_set_channel(
+                swap_id=swap_id,
+                channel_id=str(swap_channel.id),
+                user_id=str(user.id),
+                discord_roles=roles
+            )
+        except Exception as e:
+            logger.error(f"Failed to record channel for swap {swap_id}: {e}")
+
         # Build combined swap ticket embed
         ticket_embed = create_themed_embed(
             title="",
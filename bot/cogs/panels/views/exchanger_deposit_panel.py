@@ -5,14 +5,13 @@ Manages exchanger liquidity deposits, holds, withdrawals, and claim limits
 
 import discord
 import logging
-import io
-import qrcode
 from decimal import Decimal
 from typing import Optional
 
 from utils.view_manager import PersistentView
 from utils.embeds import create_embed, error_embed, get_color
 from utils.formatting import format_crypto
+from utils.qr_generator import create_qr_discord_file_async
 from api.errors import APIError, NotFoundError
 
 logger = logging.getLogger(__name__)
@@ -1281,7 +1280,7 @@ class ExchangerCryptoSelectorView(discord.ui.View):
                 return
 
         # Generate QR code
-        qr_file = self._generate_qr_code(wallet_address)
+        qr_file = await self._generate_qr_code(wallet_address)
 
         name = CURRENCY_NAMES.get(currency, currency)
         emoji = get_crypto_emoji(self.bot, currency)
@@ -1504,19 +1503,9 @@ class ExchangerCryptoSelectorView(discord.ui.View):
                 ephemeral=True
             )
 
-    def _generate_qr_code(self, data: str) -> discord.File:
-        """Generate QR code image"""
-        qr = qrcode.QRCode(version=1, box_size=10, border=4)
-        qr.add_data(data)
-        qr.make(fit=True)
-
-        img = qr.make_image(fill_color="black", back_color="white")
-
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        buffer.seek(0)
-
-        return discord.File(buffer, filename="qr.png")
+    async def _generate_qr_code(self, data: str) -> discord.File:
+        """Generate QR code image (rendered off the event loop, cached per address)"""
+        return await create_qr_discord_file_async(data, filename="qr.png")
 
 
 class ExchangerWithdrawModal(discord.ui.Modal):
@@ -12,6 +12,7 @@ from utils.view_manager import PersistentView
 from utils.embeds import create_themed_embed
 from utils.colors import SUCCESS_GREEN, ERROR_RED, PURPLE_GRADIENT
 from utils.support_transcript import generate_support_transcript_html
+from utils.render_pool import render
 from config import config
 
 logger = logging.getLogger(__name__)
@@ -133,7 +134,8 @@ class SupportTicketView(PersistentView):
             # Generate transcript
             closed_at = datetime.utcnow()
 
-            html_transcript = generate_support_transcript_html(
+            html_transcript = await render(
+                generate_support_transcript_html,
                 ticket_number=self.ticket_number,
                 ticket_type=self.ticket_type,
                 messages=messages,
@@ -151,6 +153,8 @@ class SupportTicketView(PersistentView):
                 upload_url = f"{api_base}/api/v1/transcripts/upload"
                 bot_token = config.BOT_SERVICE_TOKEN
 
+                from utils.transcript_upload import transcript_upload_form
+
                 upload_data = {
                     "ticket_id": str(self.ticket_number),
                     "ticket_type": "support",
@@ -164,10 +168,9 @@ class SupportTicketView(PersistentView):
                 async with aiohttp.ClientSession() as session:
                     async with session.post(
                         upload_url,
-                        json=upload_data,
+                        data=await transcript_upload_form(upload_data),
                         headers={
-                            'X-Bot-Token': bot_token,
-                            'Content-Type': 'application/json'
+                            'X-Bot-Token': bot_token
                         }
                     ) as response:
                         if response.status in [200, 201]:
@@ -329,20 +329,11 @@ class SwapManagementView(discord.ui.View):
 
             # Generate QR code
             try:
-                import qrcode
-                from io import BytesIO
-
-                qr = qrcode.QRCode(version=1, box_size=10, border=4)
-                qr.add_data(self.deposit_address)
-                qr.make(fit=True)
-
-                qr_img = qr.make_image(fill_color="black", back_color="white")
+                from utils.qr_generator import create_qr_discord_file_async
 
-                buffer = BytesIO()
-                qr_img.save(buffer, format="PNG")
-                buffer.seek(0)
-
-                qr_file = discord.File(buffer, filename="deposit_qr.png")
+                qr_file = await create_qr_discord_file_async(self.deposit_address, filename="deposit_qr.png")
+                if not qr_file:
+                    raise RuntimeError("QR rendering unavailable")
 
                 qr_embed = create_themed_embed(
                     title="",
@@ -449,9 +440,11 @@ class SwapManagementView(discord.ui.View):
             if messages:
                 # Generate HTML transcript
                 from utils.swap_transcript import generate_swap_transcript_html
+                from utils.render_pool import render
                 from io import BytesIO
 
-                transcript_html = generate_swap_transcript_html(
+                transcript_html = await render(
+                    generate_swap_transcript_html,
                     swap_id=self.swap_id,
                     messages=messages,
                     swap_data=swap_data,
@@ -470,6 +463,8 @@ class SwapManagementView(discord.ui.View):
                     upload_url = f"{api_base}/api/v1/transcripts/upload"
                     bot_token = config.BOT_SERVICE_TOKEN
 
+                    from utils.transcript_upload import transcript_upload_form
+
                     upload_data = {
                         "ticket_id": self.swap_id,
                         "ticket_type": "swap",
@@ -483,10 +478,9 @@ class SwapManagementView(discord.ui.View):
                     async with aiohttp.ClientSession() as session:
                         async with session.post(
                             upload_url,
-                            json=upload_data,
+                            data=await transcript_upload_form(upload_data),
                             headers={
-                                'X-Bot-Token': bot_token,
-                                'Content-Type': 'application/json'
+                                'X-Bot-Token': bot_token
                             }
                         ) as response:
                             if response.status in [200, 201]:
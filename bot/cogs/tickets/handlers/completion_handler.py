@@ -259,6 +259,8 @@ async def generate_transcript(
                     if len(parts) >= 3:
                         customer_id = parts[2]
 
+                from utils.transcript_upload import transcript_upload_form
+
                 # Prepare upload data
                 upload_data = {
                     "ticket_id": ticket_id,
@@ -274,10 +276,9 @@ async def generate_transcript(
                 async with aiohttp.ClientSession() as session:
                     async with session.post(
                         upload_url,
-                        json=upload_data,
+                        data=await transcript_upload_form(upload_data),
                         headers={
-                            'X-Bot-Token': bot_token,
-                            'Content-Type': 'application/json'
+                            'X-Bot-Token': bot_token
                         }
                     ) as response:
                         if response.status in [200, 201]:
@@ -315,6 +315,7 @@ class ManualConfirmationView(discord.ui.View):
 
             try:
                 from utils.support_transcript import generate_support_transcript_html
+                from utils.render_pool import render
 
                 # Get all messages from channel
                 messages = []
@@ -326,7 +327,8 @@ class ManualConfirmationView(discord.ui.View):
                 closed_at = datetime.utcnow()
 
                 # Generate HTML transcript
-                transcript_html = generate_support_transcript_html(
+                transcript_html = await render(
+                    generate_support_transcript_html,
                     ticket_number=ticket_number,
                     ticket_type="exchange_ticket",
                     messages=messages,
@@ -355,6 +357,8 @@ class ManualConfirmationView(discord.ui.View):
                     if exchanger_id:
                         participants.append(str(exchanger_id))
 
+                    from utils.transcript_upload import transcript_upload_form
+
                     # Prepare upload request
                     upload_data = {
                         "ticket_id": str(ticket_number),
@@ -370,12 +374,11 @@ class ManualConfirmationView(discord.ui.View):
                     api_base = config.API_BASE_URL
                     upload_url = f"{api_base}/transcripts/upload"
                     headers = {
-                        "X-Bot-Token": config.BOT_SERVICE_TOKEN,
-                        "Content-Type": "application/json"
+                        "X-Bot-Token": config.BOT_SERVICE_TOKEN
                     }
 
                     async with aiohttp.ClientSession() as session:
-                        async with session.post(upload_url, json=upload_data, headers=headers) as resp:
+                        async with session.post(upload_url, data=await transcript_upload_form(upload_data), headers=headers) as resp:
                             if resp.status == 200:
                                 result = await resp.json()
                                 transcript_url = result.get("public_url")
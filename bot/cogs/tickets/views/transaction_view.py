@@ -677,6 +677,8 @@ class CloseTicketModal(Modal):
                     api_base = config.API_BASE_URL
                     upload_url = f"{api_base}/api/v1/transcripts/upload"
 
+                    from utils.transcript_upload import transcript_upload_form
+
                     upload_data = {
                         "ticket_id": str(self.ticket_id),
                         "ticket_type": "ticket",  # Valid types: ticket, swap, automm, application, support
@@ -690,10 +692,9 @@ class CloseTicketModal(Modal):
                     async with aiohttp.ClientSession() as session:
                         async with session.post(
                             upload_url,
-                            json=upload_data,
+                            data=await transcript_upload_form(upload_data),
                             headers={
-                                'X-Bot-Token': config.BOT_SERVICE_TOKEN,
-                                'Content-Type': 'application/json'
+                                'X-Bot-Token': config.BOT_SERVICE_TOKEN
                             }
                         ) as response:
                             if response.status in [200, 201]:
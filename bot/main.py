@@ -144,7 +144,13 @@ class AfrooBot(discord.Bot):
         except Exception as e:
             logger.error(f"Failed to start ticket sync task: {e}", exc_info=True)
 
-        logger.info("⏸Role sync task disabled (backend 500 errors)")
+        try:
+            from tasks.role_sync import RoleSyncTask
+            self.role_sync_task = RoleSyncTask(self, self.api_client, config)
+            self.role_sync_task.start()
+            logger.info("Role sync task started (bulk, changed members only)")
+        except Exception as e:
+            logger.error(f"Failed to start role sync task: {e}", exc_info=True)
 
         try:
             from tasks.swap_monitor import SwapMonitor
@@ -223,6 +229,10 @@ class AfrooBot(discord.Bot):
             self.role_sync_task.stop()
             logger.info("Role sync task stopped")
 
+        # Stop rendering threads
+        from utils import render_pool
+        render_pool.shutdown()
+
         # Close API client
         if self.api_client:
             await self.api_client.close()
@@ -1,17 +1,22 @@
 """
-Completion Notifier Task - Monitors for completed tickets and sends notifications
+Completion Notifier Task - Consumes completion events and sends notifications
 Handles DMs, vouch posting, and history channel updates
+
+Events are long-polled from the API's completion stream and acked once
+processed; an event that fails is left unacked and redelivered by the API.
 """
 
 import discord
 import asyncio
 import logging
+import socket
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 from pathlib import Path
 import aiofiles
 
 from api.client import APIClient
+from tasks.swap_monitor import find_swap_channel
 from utils.embeds import create_themed_embed
 from utils.colors import SUCCESS_GREEN, PURPLE_GRADIENT
 import config
@@ -20,7 +25,10 @@ logger = logging.getLogger(__name__)
 
 
 class CompletionNotifier:
-    """Background task that monitors for completed tickets and sends notifications"""
+    """Background task that consumes completion events and sends notifications"""
+
+    BATCH_SIZE = 10  # Events per read
+    BLOCK_MS = 15000  # Long-poll time (below the API client's 30s timeout)
 
     def __init__(self, bot: discord.Bot, api: APIClient, bot_config):
         self.bot = bot
@@ -28,6 +36,8 @@ class CompletionNotifier:
         self.config = bot_config
         self.running = False
         self.task: Optional[asyncio.Task] = None
+        # Stable across restarts so this instance resumes its own unacked events
+        self.consumer = f"bot-{socket.gethostname()}"
 
     def start(self):
         """Start the background task"""
@@ -44,59 +54,75 @@ class CompletionNotifier:
         logger.info("Completion notifier task stopped")
 
     async def _notification_loop(self):
-        """Main loop that checks for pending notifications"""
+        """Main loop that long-polls for completion events"""
         await self.bot.wait_until_ready()
 
         while self.running:
             try:
-                # Check for pending exchange ticket notifications
                 result = await self.api.get(
-                    "/api/v1/tickets/pending-notifications",
-                    discord_user_id="SYSTEM"
-                )
-
-                pending_tickets = result.get("tickets", [])
-
-                for ticket_data in pending_tickets:
-                    try:
-                        await self._process_completion(ticket_data)
-                    except Exception as e:
-                        logger.error(f"Error processing completion for ticket {ticket_data.get('_id')}: {e}", exc_info=True)
-
-                # Check for pending swap notifications
-                swap_result = await self.api.get(
-                    "/api/v1/afroo-swaps/pending-notifications",
+                    "/api/v1/notifications/completions",
+                    params={
+                        "consumer": self.consumer,
+                        "count": self.BATCH_SIZE,
+                        "block_ms": self.BLOCK_MS
+                    },
                     discord_user_id="SYSTEM"
                 )
 
-                pending_swaps = swap_result.get("swaps", [])
-
-                for swap_data in pending_swaps:
-                    try:
-                        await self._process_swap_completion(swap_data)
-                    except Exception as e:
-                        logger.error(f"Error processing swap completion {swap_data.get('_id')}: {e}", exc_info=True)
-
-                # Check every 10 seconds
-                await asyncio.sleep(10)
+                for event in result.get("events", []):
+                    await self._handle_event(event)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Error in completion notification loop: {e}", exc_info=True)
-                await asyncio.sleep(30)  # Wait longer on error
+                await asyncio.sleep(5)
+
+    async def _handle_event(self, event: Dict):
+        """Process one event and ack it (failures are redelivered by the API)"""
+        event_id = event.get("event_id")
+        event_type = event.get("type")
+        payload = event.get("payload", {})
 
-    async def _process_completion(self, ticket_data: dict):
+        try:
+            if event_type == "ticket_completed":
+                await self._process_completion(payload)
+            elif event_type == "swap_completed":
+                await self._process_swap_completion(payload)
+            else:
+                logger.warning(f"Ignoring unknown completion event type {event_type} ({event_id})")
+        except Exception as e:
+            logger.error(f"Error processing {event_type} event {event_id}: {e}", exc_info=True)
+            return
+
+        try:
+            await self.api.post(
+                "/api/v1/notifications/completions/ack",
+                data={"event_ids": [event_id]},
+                discord_user_id="SYSTEM"
+            )
+        except Exception as e:
+            logger.error(f"Failed to ack completion event {event_id}: {e}")
+
+    async def _process_completion(self, notification: dict):
         """
         Process completion notifications for a ticket
         Sends DMs, posts vouches, and posts to history channel
         """
-        ticket_id = ticket_data.get("_id")
-        ticket_number = ticket_data.get("ticket_number")
-        notification = ticket_data.get("completion_notification", {})
+        ticket_id = notification.get("ticket_id")
+        ticket_number = notification.get("ticket_number")
 
         logger.info(f"Processing completion notifications for ticket {ticket_number}")
 
+        # Transcript is referenced by ticket ID; a failed fetch is retried via redelivery
+        transcript_text = ""
+        if notification.get("has_transcript"):
+            transcript = await self.api.get(
+                f"/api/v1/tickets/{ticket_id}/transcript",
+                discord_user_id="SYSTEM"
+            )
+            transcript_text = transcript.get("transcript_text") or ""
+
         # Get Discord user objects
         client_discord_id = notification.get("client_discord_id")
         exchanger_discord_id = notification.get("exchanger_discord_id")
@@ -116,9 +142,7 @@ class CompletionNotifier:
         except Exception as e:
             logger.error(f"Failed to fetch exchanger user {exchanger_discord_id}: {e}")
 
-        # Get transcript and vouch templates
-        transcript_html = notification.get("transcript_html", "")
-        transcript_text = notification.get("transcript_text", "")
+        # Get vouch templates
         client_vouch = notification.get("client_vouch_template", "")
         exchanger_vouch = notification.get("exchanger_vouch_template", "")
 
@@ -151,11 +175,11 @@ class CompletionNotifier:
                 logger.error(f"Failed to DM exchanger for ticket {ticket_number}: {e}")
 
         # Post to history channel
-        if transcript_html:
+        if transcript_text:
             try:
                 await self._post_to_history_channel(
                     ticket_number=ticket_number,
-                    ticket_data=ticket_data,
+                    notification=notification,
                     transcript_text=transcript_text
                 )
                 logger.info(f"Ticket {ticket_number}: Posted to history channel")
@@ -166,17 +190,6 @@ class CompletionNotifier:
         # Users can manually post their vouch in the rep channel if they want
         logger.info(f"Ticket {ticket_number}: Vouch templates sent in DMs (not posted to rep channel)")
 
-        # Mark notification as processed
-        try:
-            await self.api.post(
-                f"/api/v1/tickets/{ticket_id}/mark-notification-processed",
-                data={},
-                discord_user_id="SYSTEM"
-            )
-            logger.info(f"Ticket {ticket_number}: Marked notification as processed")
-        except Exception as e:
-            logger.error(f"Failed to mark notification as processed for ticket {ticket_number}: {e}")
-
     async def _dm_completion_transcript(
         self,
         user: discord.User,
@@ -238,7 +251,7 @@ class CompletionNotifier:
     async def _post_to_history_channel(
         self,
         ticket_number: int,
-        ticket_data: dict,
+        notification: dict,
         transcript_text: str
     ):
         """Post transcript summary to history channel"""
@@ -253,8 +266,6 @@ class CompletionNotifier:
             logger.warning(f"History channel {history_channel_id} not found")
             return
 
-        notification = ticket_data.get("completion_notification", {})
-
         # Create history embed
         embed = create_themed_embed(
             title="",
@@ -332,7 +343,7 @@ class CompletionNotifier:
         Sends DM with transcript, posts vouch message in ticket channel, posts to history channel with transcript
         """
         swap_id = swap_data.get("_id")
-        user_id = swap_data.get("user_id")
+        user_id = swap_data.get("user_discord_id")
 
         logger.info(f"Processing swap completion for swap {swap_id}")
 
@@ -356,15 +367,7 @@ class CompletionNotifier:
         except Exception as e:
             logger.error(f"Failed to fetch user {user_id}: {e}")
 
-        # Find swap channel (format: swap-username-swapidshort)
-        swap_channel = None
-        guild = self.bot.get_guild(self.config.GUILD_ID)
-        if guild:
-            swap_id_short = swap_id[:8]
-            for channel in guild.text_channels:
-                if f"swap-" in channel.name and swap_id_short in channel.name:
-                    swap_channel = channel
-                    break
+        swap_channel = find_swap_channel(self.bot, swap_id, swap_data.get("discord_channel_id"))
 
         # Generate transcript
         transcript_html = None
@@ -379,8 +382,10 @@ class CompletionNotifier:
                 if messages:
                     # Generate HTML transcript
                     from utils.swap_transcript import generate_swap_transcript_html
+                    from utils.render_pool import render
 
-                    transcript_html = generate_swap_transcript_html(
+                    transcript_html = await render(
+                        generate_swap_transcript_html,
                         swap_id=swap_id,
                         messages=messages,
                         swap_data=swap_data,
@@ -495,17 +500,6 @@ class CompletionNotifier:
             except Exception as e:
                 logger.error(f"Failed to schedule channel deletion for swap {swap_id}: {e}")
 
-        # Mark notification as processed
-        try:
-            await self.api.post(
-                f"/api/v1/afroo-swaps/{swap_id}/mark-notification-processed",
-                data={},
-                discord_user_id="SYSTEM"
-            )
-            logger.info(f"Swap {swap_id}: Marked notification as processed")
-        except Exception as e:
-            logger.error(f"Failed to mark swap notification as processed: {e}")
-
     async def _schedule_swap_channel_deletion(self, channel: discord.TextChannel, swap_id: str):
         """Delete swap channel after 2 hours"""
         try:
@@ -1,13 +1,17 @@
 """
 Role Sync Task - Syncs Discord server roles to database
-Runs on startup and every 3 hours
+Runs on startup and every 3 hours, plus batched deltas from member updates
+
+Only members whose roles or profile changed since their last successful
+sync are sent, in bulk requests of up to BATCH_SIZE members.
 """
 
 import discord
 import asyncio
+import hashlib
 import logging
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterable, Optional
 
 from api.client import APIClient
 
@@ -17,19 +21,30 @@ logger = logging.getLogger(__name__)
 class RoleSyncTask:
     """Background task that syncs all guild members' roles to the database"""
 
+    BATCH_SIZE = 1000  # Members per bulk request
+    FLUSH_INTERVAL = 5  # Seconds between flushes of queued member updates
+
     def __init__(self, bot: discord.Bot, api: APIClient, bot_config):
         self.bot = bot
         self.api = api
         self.config = bot_config
         self.running = False
         self.task: Optional[asyncio.Task] = None
+        self.flush_task: Optional[asyncio.Task] = None
         self.sync_interval = 3 * 60 * 60  # 3 hours in seconds
+        self.last_full_sync: Optional[datetime] = None
+
+        # Member ID -> hash of the state the API last acknowledged
+        self._synced: Dict[int, str] = {}
+        # Members changed since the last flush (latest state wins)
+        self._pending: Dict[int, discord.Member] = {}
 
     def start(self):
         """Start the background task"""
         if not self.running:
             self.running = True
             self.task = asyncio.create_task(self._sync_loop())
+            self.flush_task = asyncio.create_task(self._flush_loop())
             logger.info("Role sync task started")
 
     def stop(self):
@@ -37,8 +52,95 @@ class RoleSyncTask:
         self.running = False
         if self.task:
             self.task.cancel()
+        if self.flush_task:
+            self.flush_task.cancel()
         logger.info("Role sync task stopped")
 
+    def queue_member(self, member: discord.Member):
+        """Queue a member whose roles or profile changed (sent on the next flush)"""
+        if not member.bot:
+            self._pending[member.id] = member
+
+    @staticmethod
+    def _member_payload(member: discord.Member) -> Dict:
+        # Role IDs match what the bot sends in X-Discord-Roles, names exclude @everyone
+        return {
+            "discord_id": str(member.id),
+            "role_ids": [role.id for role in member.roles],
+            "role_names": [role.name for role in member.roles if not role.is_default()],
+            "username": member.name,
+            "discriminator": member.discriminator,
+            "global_name": getattr(member, "global_name", None)
+        }
+
+    @staticmethod
+    def _payload_hash(payload: Dict) -> str:
+        canonical = "|".join([
+            ",".join(sorted(str(r) for r in payload["role_ids"])),
+            payload["username"] or "",
+            payload["discriminator"] or "",
+            payload["global_name"] or ""
+        ])
+        return hashlib.sha1(canonical.encode()).hexdigest()
+
+    async def _sync_members(self, members: Iterable[discord.Member]) -> Dict[str, int]:
+        """Send changed members in bulk batches"""
+        changed = []
+        skipped = 0
+        for member in members:
+            if member.bot:
+                continue
+            payload = self._member_payload(member)
+            member_hash = self._payload_hash(payload)
+            if self._synced.get(member.id) == member_hash:
+                skipped += 1
+                continue
+            changed.append((member.id, member_hash, payload))
+
+        synced = 0
+        failed = 0
+        for i in range(0, len(changed), self.BATCH_SIZE):
+            batch = changed[i:i + self.BATCH_SIZE]
+            try:
+                await self.api.post(
+                    "/api/v1/users/sync-roles/bulk",
+                    data={"members": [payload for _, _, payload in batch]},
+                    discord_user_id="SYSTEM"  # System sync
+                )
+            except Exception as e:
+                # Hashes stay stale, so these members are retried on the next sweep
+                failed += len(batch)
+                logger.error(f"Failed to sync roles for {len(batch)} members: {e}")
+                continue
+
+            for member_id, member_hash, _ in batch:
+                self._synced[member_id] = member_hash
+            synced += len(batch)
+
+        return {"synced": synced, "skipped": skipped, "failed": failed}
+
+    async def _flush_loop(self):
+        """Send queued member updates in batches"""
+        await self.bot.wait_until_ready()
+
+        while self.running:
+            try:
+                await asyncio.sleep(self.FLUSH_INTERVAL)
+                if not self._pending:
+                    continue
+
+                pending, self._pending = self._pending, {}
+                result = await self._sync_members(pending.values())
+                if result["synced"] or result["failed"]:
+                    logger.info(
+                        f"Role delta sync: {result['synced']} synced, {result['failed']} failed"
+                    )
+
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in role delta flush: {e}", exc_info=True)
+
     async def _sync_loop(self):
         """Main loop that syncs roles periodically"""
         await self.bot.wait_until_ready()
@@ -58,7 +160,7 @@ class RoleSyncTask:
                 await asyncio.sleep(60)
 
     async def _sync_all_roles(self):
-        """Sync all guild members' roles to the database"""
+        """Sync all changed guild members' roles to the database"""
         try:
             guild = self.bot.get_guild(self.config.DISCORD_GUILD_ID)
             if not guild:
@@ -67,42 +169,18 @@ class RoleSyncTask:
 
             logger.info(f"🔄 Starting role sync for {guild.name} ({guild.member_count} members)...")
 
-            synced = 0
-            failed = 0
-
-            # Sync roles for all guild members
-            for member in guild.members:
-                try:
-                    # Skip bots
-                    if member.bot:
-                        continue
-
-                    # Get role IDs and names (exclude @everyone role)
-                    roles = [role for role in member.roles if role.id != guild.id]
-                    role_ids = [role.id for role in roles]
-                    role_names = [role.name for role in roles]
-
-                    # Sync to database via API
-                    await self.api.post(
-                        "/api/v1/users/sync-roles",
-                        data={
-                            "discord_id": str(member.id),
-                            "role_ids": role_ids,
-                            "role_names": role_names,
-                            "username": member.name,
-                            "discriminator": member.discriminator,
-                            "global_name": member.global_name
-                        },
-                        discord_user_id="SYSTEM"  # System sync
-                    )
-
-                    synced += 1
+            members = list(guild.members)
+            result = await self._sync_members(members)
 
-                except Exception as e:
-                    failed += 1
-                    logger.error(f"Failed to sync roles for user {member.id}: {e}")
+            # Forget members who left so the map tracks the guild
+            current_ids = {member.id for member in members}
+            self._synced = {mid: h for mid, h in self._synced.items() if mid in current_ids}
+            self.last_full_sync = datetime.utcnow()
 
-            logger.info(f"✅ Role sync complete: {synced} users synced, {failed} failed")
+            logger.info(
+                f"✅ Role sync complete: {result['synced']} users synced, "
+                f"{result['skipped']} unchanged, {result['failed']} failed"
+            )
 
         except Exception as e:
             logger.error(f"Error syncing all roles: {e}", exc_info=True)
@@ -1,27 +1,68 @@
 """
-Swap Monitor Task - Periodically checks pending swap statuses
-Monitors active swaps and updates their status from ChangeNOW
+Swap Monitor Task - Posts swap status changes to their ticket channels
+The API tracks swap status with ChangeNOW and publishes every change; this
+task long-polls that feed with a cursor and only touches the channels of
+swaps that changed
 """
 
 import discord
 import asyncio
 import logging
-from typing import Optional
-from datetime import datetime, timedelta
+from typing import Dict, Optional
 
 from api.client import APIClient
+from config import config
+from utils.embeds import create_themed_embed
+from utils.colors import PURPLE_GRADIENT, INFO_BLUE, ERROR_RED
 
 logger = logging.getLogger(__name__)
 
+# Status -> (emoji, label, color); completions are announced by CompletionNotifier
+STATUS_DISPLAY = {
+    "waiting": ("⏰", "Waiting for Deposit", INFO_BLUE),
+    "confirming": ("🔍", "Confirming Transaction", INFO_BLUE),
+    "exchanging": ("⚡", "Exchanging", PURPLE_GRADIENT),
+    "sending": ("📤", "Sending to Your Address", INFO_BLUE),
+    "verifying": ("🔐", "Under Verification", PURPLE_GRADIENT),
+    "processing": ("⏳", "Processing", PURPLE_GRADIENT),
+    "failed": ("❌", "Failed", ERROR_RED),
+    "refunded": ("↩️", "Refunded", PURPLE_GRADIENT),
+    "expired": ("⌛", "Expired", ERROR_RED),
+}
+
+
+def find_swap_channel(bot: discord.Bot, swap_id: str, channel_id: Optional[str]) -> Optional[discord.TextChannel]:
+    """
+    Channel of a swap ticket
+
+    Uses the channel ID recorded on the swap; swaps created before it was
+    recorded fall back to the channel name (swap-username-swapidshort).
+    """
+    if channel_id:
+        return bot.get_channel(int(channel_id))
+
+    guild = bot.get_guild(config.GUILD_ID)
+    if not guild:
+        return None
+    swap_id_short = swap_id[:8]
+    for channel in guild.text_channels:
+        if channel.name.startswith("swap-") and swap_id_short in channel.name:
+            return channel
+    return None
+
 
 class SwapMonitor:
-    """Background task that monitors pending swaps and updates their status"""
+    """Background task that relays swap status changes to ticket channels"""
+
+    BLOCK_MS = 15000  # Long-poll time (below the API client's 30s timeout)
+    CONSUMER = "swap-monitor"  # The API keeps this consumer's cursor across restarts
 
     def __init__(self, bot: discord.Bot, api: APIClient):
         self.bot = bot
         self.api = api
         self.running = False
         self.task: Optional[asyncio.Task] = None
+        self.cursor: Optional[str] = None
 
     def start(self):
         """Start the background task"""
@@ -38,113 +79,56 @@ class SwapMonitor:
         logger.info("Swap monitor task stopped")
 
     async def _monitor_loop(self):
-        """Main loop that checks pending swaps"""
+        """Main loop that long-polls for swap status changes"""
         await self.bot.wait_until_ready()
 
-        # Wait 30 seconds before first check to let bot fully initialize
-        await asyncio.sleep(30)
-
-        # Cache of swap IDs we've seen to track status changes
-        last_known_statuses = {}
-
         while self.running:
             try:
-                # Get active swaps from API - need to get all users' swaps
-                # We'll collect swaps from all open swap channels
-                guild = self.bot.get_guild(self.bot.guilds[0].id if self.bot.guilds else None)
-
-                if not guild:
-                    logger.warning("No guild found, skipping swap monitoring")
-                    await asyncio.sleep(30)
-                    continue
-
-                active_swaps = []
-
-                # Find all swap channels (format: swap-username-swapidshort)
-                for channel in guild.text_channels:
-                    if channel.name.startswith("swap-"):
-                        # Extract swap ID from channel topic if available
-                        # Topic format: "Swap Ticket | BTC → ETH | User: 123456"
-                        try:
-                            # Get last 8 chars of channel name which should be swap ID prefix
-                            parts = channel.name.split("-")
-                            if len(parts) >= 3:
-                                swap_id_short = parts[-1]
-                                user_id = channel.topic.split("User: ")[-1] if channel.topic else None
-
-                                if user_id:
-                                    active_swaps.append({
-                                        "swap_id_short": swap_id_short,
-                                        "user_id": user_id,
-                                        "channel": channel
-                                    })
-                        except Exception as e:
-                            logger.debug(f"Could not parse swap channel {channel.name}: {e}")
-                            continue
-
-                if active_swaps:
-                    logger.debug(f"Monitoring {len(active_swaps)} swap channels...")
-
-                for swap_info in active_swaps:
+                # No cursor after a restart: the API resumes from the last one we passed
+                result = await self.api.afroo_swap_get_changes(
+                    since=self.cursor,
+                    consumer=self.CONSUMER,
+                    block_ms=self.BLOCK_MS
+                )
+
+                for event in result.get("events", []):
                     try:
-                        user_id = swap_info["user_id"]
-                        swap_id_short = swap_info["swap_id_short"]
-
-                        # Get user's swap history to find full swap ID
-                        try:
-                            history = await self.api.afroo_swap_get_history(
-                                user_id=user_id,
-                                discord_roles=[],
-                                limit=50
-                            )
-
-                            swaps = history.get("swaps", [])
-
-                            # Find the swap matching the short ID
-                            matching_swap = None
-                            for s in swaps:
-                                full_id = str(s.get("_id", ""))
-                                if full_id.startswith(swap_id_short):
-                                    matching_swap = s
-                                    break
-
-                            if not matching_swap:
-                                continue
-
-                            swap_id = str(matching_swap.get("_id", ""))
-                            old_status = last_known_statuses.get(swap_id, matching_swap.get("status"))
-
-                            # Only refresh if not in final state
-                            if matching_swap.get("status") not in ["completed", "failed", "refunded"]:
-                                # Refresh status from ChangeNOW
-                                updated_swap = await self.api.afroo_swap_get_details(
-                                    swap_id=swap_id,
-                                    user_id=user_id,
-                                    discord_roles=[],
-                                    refresh=True
-                                )
-
-                                new_status = updated_swap.get("status")
-                                last_known_statuses[swap_id] = new_status
-
-                                if old_status != new_status:
-                                    logger.info(
-                                        f"✅ Swap {swap_id[:8]} status changed: {old_status} → {new_status}"
-                                    )
-
-                        except Exception as e:
-                            logger.debug(f"Error fetching swap history for user {user_id}: {e}")
-                            continue
-
+                        await self._handle_change(event)
                     except Exception as e:
-                        logger.error(f"Error updating swap: {e}")
-                        continue
+                        logger.error(f"Error posting status change for swap {event.get('swap_id')}: {e}")
 
-                # Check every 30 seconds
-                await asyncio.sleep(30)
+                self.cursor = result.get("cursor", self.cursor)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 logger.error(f"Error in swap monitor loop: {e}", exc_info=True)
-                await asyncio.sleep(60)  # Wait longer on error
+                await asyncio.sleep(5)
+
+    async def _handle_change(self, event: Dict):
+        """Post one status change to the swap's channel, if it has one"""
+        swap_id = event.get("swap_id", "")
+        status = event.get("status")
+        channel_id = event.get("channel_id")
+
+        logger.info(f"✅ Swap {swap_id[:8]} status changed: {event.get('previous_status')} → {status}")
+
+        if status not in STATUS_DISPLAY:
+            return
+
+        channel = find_swap_channel(self.bot, swap_id, channel_id)
+        if not channel:
+            return
+
+        emoji, label, color = STATUS_DISPLAY[status]
+        embed = create_themed_embed(
+            title="",
+            description=(
+                f"## Swap Status {emoji}\n\n"
+                f"**Status:** {emoji} {label}\n"
+                f"**Exchange Status:** {event.get('changenow_status') or 'pending'}\n\n"
+                f"**Swap ID:** `{swap_id}`"
+            ),
+            color=color
+        )
+        await channel.send(embed=embed)
@@ -19,10 +19,12 @@ from utils.auth import (
 )
 from utils.qr_generator import (
     generate_qr_code,
+    generate_qr_code_async,
     generate_qr_for_btc,
     generate_qr_for_eth,
     generate_qr_for_ltc,
     generate_qr_for_sol,
     create_qr_discord_file,
+    create_qr_discord_file_async,
     is_qr_available
 )
@@ -10,12 +10,19 @@ Supports:
 - Any ERC-20/SPL tokens (USDT, USDC, etc.)
 
 Returns BytesIO object that can be sent as Discord file attachment
+
+PNGs are kept in an LRU cache keyed by (address, asset, amount, label), so
+re-opening a deposit QR is free; the *_async variants render cache misses in
+the render pool instead of on the event loop.
 """
 
 import io
 import logging
+from functools import lru_cache
 from typing import Optional
 
+from utils.render_pool import render
+
 logger = logging.getLogger(__name__)
 
 # Try to import qrcode library
@@ -27,6 +34,42 @@ except ImportError:
     QR_AVAILABLE = False
     logger.warning("⚠️ QR code generation requires 'qrcode' package. Install with: pip install qrcode[pil]")
 
+QR_CACHE_SIZE = 256  # Rendered PNGs kept in memory (a few KB each)
+
+
+@lru_cache(maxsize=QR_CACHE_SIZE)
+def _render_qr_png(
+    address: str,
+    asset: str,
+    amount: Optional[float],
+    label: Optional[str]
+) -> bytes:
+    """Render a QR PNG (raises on failure, so failures aren't cached)"""
+    # Create QR code instance
+    qr = qrcode.QRCode(
+        version=1,  # Size of QR code (1 is smallest, 40 is largest)
+        error_correction=ERROR_CORRECT_L,  # Error correction level
+        box_size=10,  # Size of each box in pixels
+        border=4,  # Border size in boxes
+    )
+
+    # Build URI based on asset type
+    uri = _build_crypto_uri(address, asset, amount, label)
+
+    # Add data and generate
+    qr.add_data(uri)
+    qr.make(fit=True)
+
+    # Create image
+    img = qr.make_image(fill_color="black", back_color="white")
+
+    # Save to buffer
+    img_buffer = io.BytesIO()
+    img.save(img_buffer, format='PNG')
+
+    logger.debug(f"Generated QR code for {asset} address: {address[:8]}...")
+    return img_buffer.getvalue()
+
 
 def generate_qr_code(
     address: str,
@@ -65,35 +108,33 @@ def generate_qr_code(
         return None
 
     try:
-        # Create QR code instance
-        qr = qrcode.QRCode(
-            version=1,  # Size of QR code (1 is smallest, 40 is largest)
-            error_correction=ERROR_CORRECT_L,  # Error correction level
-            box_size=10,  # Size of each box in pixels
-            border=4,  # Border size in boxes
-        )
-
-        # Build URI based on asset type
-        uri = _build_crypto_uri(address, asset.upper(), amount, label)
+        # Fresh buffer per call, discord.File consumes it
+        return io.BytesIO(_render_qr_png(address, asset.upper(), amount, label))
 
-        # Add data and generate
-        qr.add_data(uri)
-        qr.make(fit=True)
+    except Exception as e:
+        logger.error(f"Failed to generate QR code for {address}: {e}")
+        return None
 
-        # Create image
-        img = qr.make_image(fill_color="black", back_color="white")
 
-        # Save to buffer
-        img_buffer = io.BytesIO()
-        img.save(img_buffer, format='PNG')
-        img_buffer.seek(0)
+async def generate_qr_code_async(
+    address: str,
+    asset: str = "CRYPTO",
+    amount: Optional[float] = None,
+    label: Optional[str] = None
+) -> Optional[io.BytesIO]:
+    """
+    generate_qr_code without blocking the event loop
 
-        logger.debug(f"Generated QR code for {asset} address: {address[:8]}...")
-        return img_buffer
+    Args:
+        address: Crypto wallet address
+        asset: Asset type (BTC, ETH, LTC, SOL, USDT, USDC, etc.)
+        amount: Optional amount to include in QR code
+        label: Optional label for the payment
 
-    except Exception as e:
-        logger.error(f"Failed to generate QR code for {address}: {e}")
-        return None
+    Returns:
+        BytesIO object containing PNG image, or None if generation fails
+    """
+    return await render(generate_qr_code, address, asset, amount, label)
 
 
 def _build_crypto_uri(
@@ -273,6 +314,38 @@ def create_qr_discord_file(
     return file
 
 
+async def create_qr_discord_file_async(
+    address: str,
+    asset: str = "CRYPTO",
+    amount: Optional[float] = None,
+    label: Optional[str] = None,
+    filename: Optional[str] = None
+) -> Optional[object]:
+    """
+    create_qr_discord_file without blocking the event loop
+
+    Args:
+        address: Crypto wallet address
+        asset: Asset type ("CRYPTO" encodes the bare address)
+        amount: Optional amount
+        label: Optional label
+        filename: Custom filename (default: "{asset}_address_qr.png")
+
+    Returns:
+        discord.File object or None if generation fails
+    """
+    import discord
+
+    qr_buffer = await generate_qr_code_async(address, asset, amount, label)
+    if not qr_buffer:
+        return None
+
+    if filename is None:
+        filename = f"{asset.lower()}_address_qr.png"
+
+    return discord.File(qr_buffer, filename=filename)
+
+
 # Export check function for other modules
 def is_qr_available() -> bool:
     """
@@ -0,0 +1,42 @@
+"""
+Render Pool - Runs CPU-bound rendering off the event loop
+QR images and HTML transcripts are built in a small thread pool so button
+handlers keep answering while a large transcript renders
+
+Threads rather than processes: transcript builders read discord.Message and
+guild caches, which can't be pickled into another process. The loop thread
+still gets the GIL every switch interval, so interactions stay responsive.
+"""
+
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "2"))
+
+_executor = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix="render")
+
+
+async def render(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking render function in the pool
+
+    Args:
+        func: Synchronous function (QR or transcript builder)
+        *args, **kwargs: Passed to func
+
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+def shutdown():
+    """Stop the pool, letting running renders finish"""
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -84,14 +84,23 @@ def parse_discord_content(content: str, guild: discord.Guild = None) -> str:
     return content
 
 
+# Logo data URI, read and encoded once per process
+_logo_data_uri = None
+
+
 def get_logo_base64() -> str:
     """Get logo as base64 data URI"""
+    global _logo_data_uri
+    if _logo_data_uri is not None:
+        return _logo_data_uri
+
     try:
         logo_path = Path(__file__).parent.parent / "assets" / "logo.png"
         if logo_path.exists():
             with open(logo_path, "rb") as f:
                 logo_data = base64.b64encode(f.read()).decode()
-                return f"data:image/png;base64,{logo_data}"
+                _logo_data_uri = f"data:image/png;base64,{logo_data}"
+                return _logo_data_uri
     except Exception as e:
         print(f"Failed to load logo: {e}")
 